@@ -0,0 +1,5 @@
+from main import app
+from src.flask_app.asgi_app import AsyncJobApp
+
+# ASGI: uv run --with uvicorn uvicorn asgi:application --host 0.0.0.0 --port 8081
+application = AsyncJobApp(app)
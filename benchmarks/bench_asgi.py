@@ -0,0 +1,63 @@
+"""
+Бенчмарк одного воркера: скільки одночасних джоб POST /v1/api/job він тягне —
+gunicorn gthread (8 потоків) проти ASGI (uvicorn, asgi:application, один event loop).
+
+    pip install uvicorn  # ASGI-сервер не є залежністю проєкту
+    python benchmarks/bench_asgi.py --requests 64 --concurrency 64
+
+Апстрім — локальний стаб (benchmarks/stub_sales_api.py), як і в bench_gunicorn.py.
+"""
+
+import argparse
+import importlib.util
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_gunicorn import run_profile  # noqa: E402
+from stub_sales_api import start_stub  # noqa: E402
+
+
+def profiles(port: int) -> dict:
+    bind = f"127.0.0.1:{port}"
+    result = {
+        "gunicorn gthread, 1 worker": (
+            ["gunicorn", "-c", "gunicorn.conf.py", "-b", bind, "main:app"],
+            {"WEB_CONCURRENCY": "1"},
+        ),
+    }
+    if importlib.util.find_spec("uvicorn"):
+        result["uvicorn asgi, 1 worker"] = (
+            ["uvicorn", "asgi:application", "--port", str(port)]
+            + ["--log-level", "warning", "--no-access-log"],
+            {},
+        )
+    else:
+        print("uvicorn is not installed: ASGI profile skipped")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=18082)
+    args = parser.parse_args()
+
+    stub = start_stub(pages=args.pages, latency=args.latency)
+    stub_url = "http://%s:%s" % stub.server_address
+
+    print(f"{'profile':<28} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'total s':>8}")
+    for name, (command, extra_env) in profiles(args.port).items():
+        result = run_profile(args, command, stub_url, args.port, extra_env)
+        print(
+            f"{name:<28} {result['rps']:>8.2f} {result['p50']:>8.2f} "
+            f"{result['p95']:>8.2f} {result['elapsed']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Бенчмарк DB-стадії: рядків/с при завантаженні дня продажів у SQLite —
+по рядку з комітом на кожен (як наївний ORM), по рядку в одній транзакції
+і SQLiteSalesSink (executemany пакетами + заміна партиції).
+
+    python benchmarks/bench_db_sink.py --rows 200000 --batch-size 5000
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.jobs.job_1_and_2.db_sink import (  # noqa: E402
+    COLUMNS,
+    SQLiteSalesSink,
+    partitions,
+)
+
+INSERT = f"INSERT INTO sales ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?)"
+
+
+def make_records(count: int, days: int = 1) -> list:
+    rng = random.Random(42)
+    return [
+        {
+            "client": f"Client {rng.randrange(10_000)}",
+            "purchase_date": f"2022-08-{1 + index % days:02d}",
+            "product": rng.choice(["TV", "Laptop", "Phone", "Coffee machine"]),
+            "price": rng.randrange(100, 3000),
+        }
+        for index in range(count)
+    ]
+
+
+def _fresh_sink(directory: str, name: str, batch_size: int) -> SQLiteSalesSink:
+    sink = SQLiteSalesSink(Path(directory) / f"{name}.sqlite3", batch_size=batch_size)
+    with sink.pool.connection():
+        pass  # створює файл і схему поза заміром
+    return sink
+
+
+def row_by_row(sink: SQLiteSalesSink, records: list, commit_each: bool) -> None:
+    rows = [row for part in partitions(records).values() for row in part]
+    with sink.pool.connection() as conn:
+        if not commit_each:
+            conn.execute("BEGIN")
+        for row in rows:
+            conn.execute(INSERT, row)  # isolation_level=None: кожен — свій коміт
+        if not commit_each:
+            conn.execute("COMMIT")
+
+
+def measure(name: str, func, rows: int) -> None:
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<38} {rows:>9} rows {elapsed:8.3f}s {rows / elapsed:>12,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--naive-rows", type=int, default=5_000)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=1)
+    args = parser.parse_args()
+
+    records = make_records(args.rows, args.days)
+    print(f"sqlite {sqlite3.sqlite_version}, {args.rows} rows over {args.days} day(s)")
+    with tempfile.TemporaryDirectory(prefix="bench_db_") as tmp:
+        naive = records[: args.naive_rows]
+        sink = _fresh_sink(tmp, "autocommit", args.batch_size)
+        measure(
+            "row by row, commit per row",
+            lambda: row_by_row(sink, naive, commit_each=True),
+            len(naive),
+        )
+        sink = _fresh_sink(tmp, "one_tx", args.batch_size)
+        measure(
+            "row by row, one transaction",
+            lambda: row_by_row(sink, records, commit_each=False),
+            len(records),
+        )
+        sink = _fresh_sink(tmp, "sink", args.batch_size)
+        measure(
+            "SQLiteSalesSink (executemany)", lambda: sink.load(records), len(records)
+        )
+        measure(
+            "SQLiteSalesSink reload (idempotent)",
+            lambda: sink.load(records),
+            len(records),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Навантажувальний бенчмарк: пропускна здатність POST /v1/api/job
+при паралельних запитах — bare `gunicorn main:app -w 2` (sync) проти gunicorn.conf.py.
+
+    python benchmarks/bench_gunicorn.py --requests 32 --concurrency 16
+
+Апстрім — локальний стаб (benchmarks/stub_sales_api.py), дані пишуться у тимчасову
+директорію (FILE_STORAGE), тож бенчмарк не ходить у мережу і не чіпає src/file_storage.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_sales_api import start_stub  # noqa: E402
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+PROFILES = {
+    # -c /dev/null: не підхоплювати ./gunicorn.conf.py автоматично
+    "baseline (2 sync workers)": ["-c", "/dev/null", "-w", "2", "main:app"],
+    "gunicorn.conf.py": ["-c", "gunicorn.conf.py", "main:app"],
+}
+
+
+def _wait_ready(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+def _post_job(url: str, day: date) -> float:
+    body = json.dumps({"date": day.isoformat(), "to_stg": True}).encode()
+    request = urllib.request.Request(
+        f"{url}/v1/api/job", data=body, headers={"Content-Type": "application/json"}
+    )
+    started = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - started
+
+
+def run_profile(
+    args, command, stub_url: str, port: int, extra_env: Optional[dict] = None
+) -> dict:
+    """Запустити сервер (`python -m <command>`) і прогнати по ньому джоби."""
+    storage = tempfile.mkdtemp(prefix="bench_storage_")
+    env = {
+        **os.environ,
+        "AUTH_TOKEN": "bench",
+        "SALES_API_HOST": stub_url,
+        "FILE_STORAGE": storage,
+        "LOG_LEVEL": "WARNING",
+        "GUNICORN_BIND": f"127.0.0.1:{port}",
+        # бенчмарк міряє пропускну здатність, а не ліміти джоб
+        "RATE_LIMIT_PER_MINUTE": "0",
+        "MAX_CONCURRENT_JOBS": "0",
+        **(extra_env or {}),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", *command],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(url)
+        days = [date(2022, 1, 1) + timedelta(days=i) for i in range(args.requests)]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = sorted(pool.map(lambda d: _post_job(url, d), days))
+        elapsed = time.perf_counter() - started
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {
+        "rps": args.requests / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "elapsed": elapsed,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--port", type=int, default=18081)
+    args = parser.parse_args()
+
+    stub = start_stub(pages=args.pages, latency=args.latency)
+    stub_url = "http://%s:%s" % stub.server_address
+
+    print(f"{'profile':<28} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'total s':>8}")
+    for name, gunicorn_args in PROFILES.items():
+        command = ["gunicorn", "-b", f"127.0.0.1:{args.port}", *gunicorn_args]
+        result = run_profile(args, command, stub_url, args.port)
+        print(
+            f"{name:<28} {result['rps']:>8.2f} {result['p50']:>8.2f} "
+            f"{result['p95']:>8.2f} {result['elapsed']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
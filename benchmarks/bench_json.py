@@ -0,0 +1,151 @@
+"""
+Бенчмарк JSON-бекенду (src/services/fast_json.py): stdlib json проти orjson
+на гарячих місцях — розбір сторінки апстріму, запис і читання raw-файлу дня
+(з відступом) і компактна JSON-відповідь Flask (sort_keys).
+Заодно перевіряє, що результат однаковий: розібрані сторінки рівні,
+raw-файли семантично рівні (різняться лише відступом 4 -> 2),
+компактні відповіді — побайтово (за винятком \\uXXXX-екранування в stdlib).
+
+    pip install orjson  # опційний бекенд
+    python benchmarks/bench_json.py --records 200000
+
+Код виходу 1, якщо результати бекендів розходяться.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services import fast_json  # noqa: E402
+
+
+def make_records(count: int) -> list:
+    rng = random.Random(42)
+    names = ["Тарас", "Леся", "Іван", "Ольга", "Client", "Мирослава"]
+    return [
+        {
+            "client": f"{rng.choice(names)} {rng.randrange(10_000)}",
+            "purchase_date": "2022-08-09",
+            "product": rng.choice(["TV", "Laptop", "Телефон", "Coffee machine"]),
+            "price": rng.randrange(100, 3000) + rng.choice([0, 0.5, 0.99]),
+        }
+        for _ in range(count)
+    ]
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def report(name: str, size: int, stdlib_s: float, fast_s: float, same: str) -> None:
+    print(
+        f"{name:<28} {size / 1e6:>8.1f} MB {stdlib_s * 1000:>10.1f} ms "
+        f"{fast_s * 1000:>10.1f} ms {stdlib_s / fast_s:>7.1f}x  {same}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if fast_json.BACKEND != "orjson":
+        print("orjson is not installed (pip install orjson): nothing to compare")
+        return
+    records = make_records(args.records)
+    pages = [
+        json.dumps(records[start : start + args.page_size]).encode()
+        for start in range(0, len(records), args.page_size)
+    ]
+    print(f"{args.records} records, {len(pages)} upstream pages, best of {args.repeat}")
+    print(f"{'':<28} {'size':>11} {'stdlib':>13} {'orjson':>13} {'speedup':>8}")
+    ok = True
+
+    # 1) сторінки апстріму: resp.json()
+    stdlib_s = best_of(lambda: [json.loads(page) for page in pages], args.repeat)
+    fast_s = best_of(lambda: [fast_json.loads(page) for page in pages], args.repeat)
+    same = [json.loads(page) for page in pages] == [
+        fast_json.loads(page) for page in pages
+    ]
+    ok &= same
+    report(
+        "decode upstream pages",
+        sum(map(len, pages)),
+        stdlib_s,
+        fast_s,
+        "identical" if same else "MISMATCH",
+    )
+
+    # 2) raw-файл дня: indent=4 (stdlib) проти indent=2 (orjson)
+    stdlib_raw = json.dumps(records, ensure_ascii=False, indent=4).encode()
+    fast_raw = fast_json.dumps(records, indent=True)
+    stdlib_s = best_of(
+        lambda: json.dumps(records, ensure_ascii=False, indent=4).encode(), args.repeat
+    )
+    fast_s = best_of(lambda: fast_json.dumps(records, indent=True), args.repeat)
+    same = json.loads(stdlib_raw) == json.loads(fast_raw)
+    ok &= same
+    report(
+        "encode raw file (indent)",
+        len(stdlib_raw),
+        stdlib_s,
+        fast_s,
+        (
+            f"semantic ({len(fast_raw) / len(stdlib_raw):.0%} size)"
+            if same
+            else "MISMATCH"
+        ),
+    )
+
+    # 3) читання raw-файлу (кеш днів, /v1/api/sales/<date>)
+    stdlib_s = best_of(lambda: json.loads(stdlib_raw), args.repeat)
+    fast_s = best_of(lambda: fast_json.loads(stdlib_raw), args.repeat)
+    same = json.loads(stdlib_raw) == fast_json.loads(stdlib_raw)
+    ok &= same
+    report(
+        "decode raw file",
+        len(stdlib_raw),
+        stdlib_s,
+        fast_s,
+        "identical" if same else "MISMATCH",
+    )
+
+    # 4) компактна відповідь jsonify (sort_keys, як у Flask)
+    body = {"date": "2022-08-09", "rows": records[:10_000]}
+    stdlib_body = json.dumps(
+        body, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+    ).encode()
+    stdlib_s = best_of(
+        lambda: json.dumps(body, separators=(",", ":"), sort_keys=True).encode(),
+        args.repeat,
+    )
+    fast_s = best_of(lambda: fast_json.dumps(body, sort_keys=True), args.repeat)
+    same = fast_json.dumps(body, sort_keys=True) == stdlib_body
+    ok &= same
+    report(
+        "encode JSON response",
+        len(stdlib_body),
+        stdlib_s,
+        fast_s,
+        "byte-identical" if same else "MISMATCH",
+    )
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
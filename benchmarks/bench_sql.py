@@ -0,0 +1,131 @@
+"""
+Бенчмарк аналітичних запитів src/db/home_task_queries.sql на синтетичному
+датасеті у формі dvdrental (SQLite): перцентилі латентності, план запиту,
+альтернативні формулювання і допоміжні індекси; збереження результату та
+перевірка регресій відносно попереднього прогону.
+
+    python benchmarks/bench_sql.py --scale 1 --repeat 20
+    python benchmarks/bench_sql.py --scale 5 --variants src/db/home_task_queries_alt.sql --plan
+    python benchmarks/bench_sql.py --index "CREATE INDEX ix ON rental (inventory_id)"
+    python benchmarks/bench_sql.py --save baseline.json
+    python benchmarks/bench_sql.py --baseline baseline.json --threshold 1.25  # exit 1 при регресії
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.db.dvdrental import SUPPORTING_INDEXES, build_database  # noqa: E402
+from src.db.query_bench import (  # noqa: E402
+    QUERIES_FILE,
+    load_queries,
+    regressions,
+    run_suite,
+)
+
+
+def print_table(label: str, results: List[Dict[str, Any]]) -> None:
+    originals = {r["name"]: r["result"] for r in results if r["name"].isdigit()}
+    print(f"\n== {label}")
+    print(
+        f"{'query':<6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'mean ms':>10}"
+        f"{'rows':>7}  {'result':<13}same"
+    )
+    for r in results:
+        base = originals.get(r["name"].rstrip("abcdefgh"))
+        same = (
+            ""
+            if r["name"].isdigit() or base is None
+            else ("yes" if base == r["result"] else "NO")
+        )
+        print(
+            f"{r['name']:<6}{r['p50_ms']:>10.3f}{r['p90_ms']:>10.3f}"
+            f"{r['p99_ms']:>10.3f}{r['mean_ms']:>10.3f}{r['rows']:>7}  "
+            f"{r['result']:<13}{same}"
+        )
+
+
+def print_plans(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(f"\n-- {r['name']}. {r['title']}")
+        for line in r["plan"]:
+            print(f"   {line}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = dvdrental size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file (default: temp dir, reused)")
+    parser.add_argument("--queries", default=str(QUERIES_FILE))
+    parser.add_argument("--variants", help=".sql with alternative formulations (Nb)")
+    parser.add_argument("--only", help="comma-separated query names, e.g. 2,2b")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument(
+        "--index",
+        action="append",
+        help="CREATE INDEX to compare (repeatable); default: dvdrental FK indexes",
+    )
+    parser.add_argument("--no-index-run", action="store_true")
+    parser.add_argument("--plan", action="store_true", help="print query plans")
+    parser.add_argument("--save", help="write results JSON")
+    parser.add_argument("--baseline", help="results JSON to check regressions against")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    db_path = args.db or (
+        Path(tempfile.gettempdir()) / f"dvdrental_{args.scale}_{args.seed}.sqlite3"
+    )
+    conn = build_database(db_path, scale=args.scale, seed=args.seed)
+    queries = load_queries(args.queries)
+    if args.variants:
+        queries += load_queries(args.variants)
+    if args.only:
+        wanted = set(args.only.split(","))
+        queries = [q for q in queries if q.name in wanted]
+    counts = {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        for table in ("film", "inventory", "rental", "payment")
+    }
+    print(f"dataset {db_path} (scale={args.scale}): {counts}")
+
+    runs = {"pk_only": run_suite(conn, queries, args.repeat, args.warmup)}
+    print_table("primary keys only", runs["pk_only"])
+    if not args.no_index_run:
+        indexes = args.index or SUPPORTING_INDEXES
+        runs["indexed"] = run_suite(conn, queries, args.repeat, args.warmup, indexes)
+        print_table(f"+ {len(indexes)} supporting index(es)", runs["indexed"])
+    if args.plan:
+        for label, results in runs.items():
+            print(f"\n==== plans: {label}")
+            print_plans(results)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(runs, ensure_ascii=False, indent=2))
+        print(f"\nsaved {args.save}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        problems = [
+            f"[{label}] {problem}"
+            for label, results in runs.items()
+            for problem in regressions(
+                results, baseline.get(label, []), threshold=args.threshold
+            )
+        ]
+        print("\nregressions:" if problems else "\nno regressions")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""
+Локальний стаб апстріму /sales для бенчмарків: фіксована затримка на сторінку,
+PAGES сторінок по RECORDS записів, далі — порожній список.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def start_stub(
+    pages: int = 3, records: int = 50, latency: float = 0.1
+) -> ThreadingHTTPServer:
+    """Запустити стаб у фоновому потоці; адреса — server.server_address."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_HEAD(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            page = int(query.get("page", ["1"])[0])
+            sale_date = query.get("date", ["2022-08-09"])[0]
+            time.sleep(latency)
+            data = []
+            if page <= pages:
+                data = [
+                    {
+                        "client": f"Client {page}-{i}",
+                        "purchase_date": sale_date,
+                        "product": "Phone",
+                        "price": 100 + i,
+                    }
+                    for i in range(records)
+                ]
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        # десятки одночасних з'єднань: дефолтний backlog 5 дає SYN-ретраї по 1 с
+        request_queue_size = 128
+        daemon_threads = True
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
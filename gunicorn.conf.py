@@ -0,0 +1,117 @@
+"""
+Конфіг gunicorn: uv run gunicorn -c gunicorn.conf.py main:app
+
+- preload_app: застосунок (Flask, схема, fastavro/requests) завантажується в master
+  один раз, воркери отримують ці сторінки пам'яті через copy-on-write;
+- gthread: довгий /v1/api/job блокує один потік, а не весь процес;
+- workers: доступні процесу CPU + 1 — з урахуванням affinity (taskset, cpuset)
+  і квоти cgroup (docker --cpus, limits.cpu у Kubernetes), а не всіх ядер
+  хоста; WEB_CONCURRENCY перевизначає;
+- post_fork: кожен воркер відкриває власний пул HTTP-з'єднань до апстріму
+  і, якщо JOB_QUEUE_WORKERS > 0, запускає споживачів черги джоб; якщо
+  SCHEDULER_ENABLED — планувальник (тікає лише один воркер, див. scheduler.py);
+- child_exit: master зливає файл метрик завершеного воркера в агрегат.
+"""
+
+import math
+import os
+from typing import Optional
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8081")
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true")
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def cgroup_cpu_quota(root: str = CGROUP_ROOT) -> Optional[float]:
+    """Квота CPU контейнера (ядер, може бути дробовою) або None, якщо її немає."""
+    # cgroup v2: cpu.max = "<quota> <period>" або "max <period>"
+    try:
+        with open(os.path.join(root, "cpu.max")) as f:
+            quota, period = f.read().split()[:2]
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    # cgroup v1: cpu.cfs_quota_us = -1, якщо квоти немає
+    try:
+        with open(os.path.join(root, "cpu", "cpu.cfs_quota_us")) as f:
+            quota = int(f.read())
+        with open(os.path.join(root, "cpu", "cpu.cfs_period_us")) as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 and period > 0 else None
+
+
+def available_cpus(root: str = CGROUP_ROOT) -> int:
+    """CPU, на яких процес реально може виконуватись: affinity і квота cgroup."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # немає на macOS
+        cpus = os.cpu_count() or 1
+    quota = cgroup_cpu_quota(root)
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+workers = int(os.environ.get("WEB_CONCURRENCY") or available_cpus() + 1)
+# джоби здебільшого чекають на апстрім (I/O), тож потоків більше, ніж ядер
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# перезапуск воркерів проти повільного росту пам'яті
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+
+def on_starting(server):
+    """Master, до завантаження застосунку: прибрати файли метрик попереднього запуску."""
+    from src.services.metrics.app_metrics import registry
+
+    registry.clear()
+
+
+def when_ready(server):
+    """
+    Master (після preload): довантажити ліниві модулі і кеш схеми до fork,
+    щоб воркери ділили їх через copy-on-write, а не вантажили кожен окремо.
+    """
+    from src.config import FILE_STORAGE
+    from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+    # HTTP-сесія master-а після fork скидається (register_at_fork у fake_api_tool)
+    SalesExporter(file_storage=FILE_STORAGE)._ensure_schema()
+
+
+def post_fork(server, worker):
+    """Воркер: HTTP-сесія з keep-alive з'єднанням до апстріму до першого запиту."""
+    from src.services.jobs.job_1_and_2.fake_api_tool import warm_session
+    from src.services.jobs.job_1_and_2.job_queue import start_queue_workers
+    from src.services.jobs.job_1_and_2.scheduler import start_scheduler
+
+    warm_session()
+    start_queue_workers()
+    start_scheduler()
+
+
+def worker_exit(server, worker):
+    """Дочекатись поточних джоб черги і дописати логи перед завершенням воркера."""
+    from src.services.jobs.job_1_and_2.job_queue import stop_queue_workers
+    from src.services.jobs.job_1_and_2.scheduler import stop_scheduler
+    from src.services.loggers.py_logger import stop_logging
+
+    stop_scheduler(timeout=5)
+    stop_queue_workers(timeout=graceful_timeout)
+    stop_logging()
+
+
+def child_exit(server, worker):
+    """
+    Master, після завершення воркера: його лічильники і гістограми — в
+    aggregate.json, файл <pid>.json видаляється (див. metrics/registry.py).
+    """
+    from src.services.metrics.app_metrics import registry
+
+    registry.mark_process_dead(worker.pid)
@@ -0,0 +1,87 @@
+"""
+Черга джоб без веб-сервера (та сама SQLite-черга, що й у /v1/api/jobs):
+    uv run python queue_worker.py work --processes 2 --threads 4
+    uv run python queue_worker.py backfill 2022-08-01 2022-08-31 --to-stg
+    uv run python queue_worker.py status
+    uv run python queue_worker.py schedule   # планувальник (SCHEDULER_START_DATE)
+"""
+
+import argparse
+import json
+import multiprocessing
+import signal
+import threading
+from datetime import date
+
+from src.services.jobs.job_1_and_2.job_queue import (
+    JobQueueWorker,
+    enqueue_range,
+    get_job_queue,
+)
+from src.services.jobs.job_1_and_2.scheduler import build_scheduler_runner
+
+
+def wait_for_shutdown() -> None:
+    """Чекати SIGTERM або Ctrl+C."""
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    try:
+        while not stopped.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+
+
+def work(threads: int) -> None:
+    """Один процес-споживач: до SIGTERM / Ctrl+C, поточні джоби доробляються."""
+    worker = JobQueueWorker(get_job_queue(), threads=threads)
+    worker.start()
+    wait_for_shutdown()
+    worker.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    work_cmd = commands.add_parser("work", help="run queue consumers")
+    work_cmd.add_argument("--processes", type=int, default=1)
+    work_cmd.add_argument("--threads", type=int, default=2)
+    backfill = commands.add_parser("backfill", help="enqueue one job per day")
+    backfill.add_argument("start", type=date.fromisoformat)
+    backfill.add_argument("end", type=date.fromisoformat)
+    backfill.add_argument("--to-stg", action="store_true")
+    backfill.add_argument("--priority", type=int, default=-1)
+    commands.add_parser("status", help="job counts by status")
+    commands.add_parser("schedule", help="run the ingestion scheduler")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        ids = enqueue_range(args.start, args.end, args.to_stg, args.priority)
+        print(f"queued {len(ids)} jobs: {ids[0]}..{ids[-1]}" if ids else "nothing")
+    elif args.command == "status":
+        print(json.dumps(get_job_queue().counts(), indent=2))
+    elif args.command == "schedule":
+        runner = build_scheduler_runner()
+        runner.start()
+        wait_for_shutdown()
+        runner.stop()
+    elif args.processes <= 1:
+        work(args.threads)
+    else:
+        processes = [
+            multiprocessing.Process(target=work, args=(args.threads,))
+            for _ in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+                process.join()
+
+
+if __name__ == "__main__":
+    main()
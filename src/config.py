@@ -1,17 +1,14 @@
 import os
+import tempfile
+from typing import Any, Callable, Dict, Tuple
 
-from dotenv import find_dotenv, load_dotenv
-
-load_dotenv(find_dotenv())
-
-AUTH_TOKEN = os.getenv("AUTH_TOKEN")
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))  # ../src
+# .env шукаємо у відомому місці (корінь репозиторію), без обходу директорій
+DOTENV_PATH = os.environ.get("DOTENV_PATH") or os.path.join(
+    os.path.dirname(PROJECT_ROOT), ".env"
+)
 LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
 FILE_LOG = os.path.join(LOGS_DIR, "app.log")
-FILE_STORAGE = os.path.join(PROJECT_ROOT, "file_storage")
-check_storage = os.path.exists(FILE_STORAGE)
-if not check_storage:
-    os.makedirs(FILE_STORAGE)
 
 # Flask App data
 PORT = 8081
@@ -22,11 +19,167 @@ else:
     HOST = "0.0.0.0"
 STATIC_FOLDER = os.path.join(PROJECT_ROOT, "flask_app/static")
 TEMPLATE_FOLDER = os.path.join(PROJECT_ROOT, "flask_app/templates")
-SECRET_KEY = os.environ.get("SECRET_KEY")  # for Flask-WTF CSRF protection
-LOG_KEY = os.environ.get("LOG_KEY")  # for logging sensitive data masking
-
-# Database config
-POSTGRES_DB = os.environ.get("POSTGRES_DB")
-POSTGRES_PASSWORD = os.environ.get("POSTGRES_PASSWORD")
-POSTGRES_USER = os.environ.get("POSTGRES_USER")
-POSTGRES_PORT = int(os.environ.get("POSTGRES_PORT", 5432))
+
+
+def _as_bool(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+# Налаштування з оточення: ім'я -> (значення за замовчуванням, приведення типу)
+ENV_SETTINGS: Dict[str, Tuple[Any, Callable[[str], Any]]] = {
+    "AUTH_TOKEN": (None, str),
+    # директорія створюється тим, хто в неї пише (mkdir(parents=True)), не при імпорті
+    "FILE_STORAGE": (os.path.join(PROJECT_ROOT, "file_storage"), str),
+    # апстрім API продажів і HTTP-клієнт до нього
+    "SALES_API_HOST": ("https://fake-api-vycpfa6oca-uc.a.run.app", str),
+    "HTTP_POOL_SIZE": (16, int),
+    "HTTP_TIMEOUT": (30.0, float),
+    "SECRET_KEY": (None, str),  # for Flask-WTF CSRF protection
+    "LOG_KEY": (None, str),  # for logging sensitive data masking
+    # логування через чергу: розмір черги і що робити, коли вона повна (drop|block)
+    "LOG_QUEUE_SIZE": (10000, int),
+    "LOG_QUEUE_POLICY": ("drop", str),
+    "LOG_FORMAT": ("text", str),  # text | json
+    # рівень логера застосунку і перевизначення по модулях: "src.services=INFO,..."
+    "LOG_LEVEL": ("DEBUG", str.upper),
+    "LOG_LEVELS": ("", str),
+    # семплінг повторюваних DEBUG/INFO: 1 з N і не більше K за інтервал;
+    # однакових WARNING+ — не більше LOG_WARNING_RATE_LIMIT за інтервал
+    "LOG_SAMPLE_EVERY_N": (10, int),
+    "LOG_RATE_LIMIT": (20, int),
+    "LOG_WARNING_RATE_LIMIT": (100, int),
+    "LOG_RATE_INTERVAL": (60.0, float),
+    # ротація app.log: "size" (LOG_MAX_BYTES) або інтервал ("midnight", "H", "W0"...)
+    "LOG_ROTATE_WHEN": ("size", str),
+    "LOG_MAX_BYTES": (10 * 1024 * 1024, int),
+    "LOG_BACKUP_COUNT": (7, int),
+    # метрики /metrics: файли значень по процесах (спільні для воркерів; за замовчуванням
+    # <tmp>/robotdreams_metrics_<хеш FILE_STORAGE>) і період скидання
+    "METRICS_DIR": (None, str),
+    "METRICS_FLUSH_INTERVAL": (1.0, float),
+    # профілі запитів на вимогу (X-Profile: <LOG_KEY>) і скільки останніх зберігати
+    "PROFILES_DIR": (os.path.join(LOGS_DIR, "profiles"), str),
+    "PROFILES_KEEP": (20, int),
+    # ліміти джоб-ендпоінтів (спільні для воркерів через файл SQLite):
+    # token bucket на клієнта (RATE_LIMIT_PER_MINUTE=0 вимикає) і стеля одночасних джоб
+    "RATE_LIMIT_DB": (
+        os.path.join(tempfile.gettempdir(), "robotdreams_ratelimit.sqlite3"),
+        str,
+    ),
+    "RATE_LIMIT_PER_MINUTE": (30.0, float),
+    "RATE_LIMIT_BURST": (10, int),
+    "MAX_CONCURRENT_JOBS": (4, int),
+    # скільки проксі перед сервісом дописують X-Forwarded-For (як x_for у
+    # werkzeug ProxyFix); 0 — заголовок ігнорується, клієнт = адреса з'єднання
+    "TRUSTED_PROXIES": (0, int),
+    # черга джоб (SQLite, за замовчуванням FILE_STORAGE/jobs.sqlite3): споживачі на процес
+    # (0 — лише окремий queue_worker.py work),
+    # lease джоби, спроби і базова пауза між повторами (backoff * 2^(спроба-1))
+    "JOB_QUEUE_DB": (None, str),
+    "JOB_QUEUE_WORKERS": (1, int),
+    "JOB_VISIBILITY_TIMEOUT": (300.0, float),
+    "JOB_MAX_ATTEMPTS": (3, int),
+    "JOB_RETRY_BACKOFF": (5.0, float),
+    # планувальник інкрементального завантаження (через чергу джоб): з якої дати,
+    # період тіку, як часто перезавантажувати "сьогодні", коли дата закривається
+    # (секунд після кінця доби), скільки його джоб одночасно в черзі і базова пауза
+    # перед новою джобою для дати, чия джоба вичерпала спроби (x2 за кожен провал)
+    "SCHEDULER_ENABLED": (False, _as_bool),
+    "SCHEDULER_START_DATE": (None, str),
+    "SCHEDULER_TO_STG": (True, _as_bool),
+    "SCHEDULER_INTERVAL": (60.0, float),
+    "SCHEDULER_POLL_TODAY": (900.0, float),
+    "SCHEDULER_GRACE": (3600.0, float),
+    "SCHEDULER_MAX_IN_FLIGHT": (2, int),
+    "SCHEDULER_RETRY_BACKOFF": (300.0, float),
+    # опційна дедуплікація записів продажів між сторінками API: за upstream-id
+    # (поле SALES_DEDUP_KEY), записи без id — лише повтори на межі сторінок
+    "SALES_DEDUP": (False, _as_bool),
+    "SALES_DEDUP_KEY": ("id", str),
+    # DB-стадія після експорту: "" (вимкнено) | sqlite | postgres; для sqlite файл
+    # за замовчуванням FILE_STORAGE/sales.sqlite3; рядків у пакеті і з'єднань у пулі;
+    # скільки секунд чекати вільне з'єднання, коли всі зайняті
+    "DB_SINK": ("", str.lower),
+    "DB_SINK_SQLITE_PATH": (None, str),
+    "DB_SINK_BATCH_SIZE": (5000, int),
+    "DB_SINK_POOL_SIZE": (4, int),
+    "DB_SINK_POOL_TIMEOUT": (30.0, float),
+    # куди SalesExporter пише файли: local (FILE_STORAGE) | s3 (S3-сумісне сховище,
+    # path-style {S3_ENDPOINT_URL}/{S3_BUCKET}/{S3_PREFIX}...); розмір частини
+    # multipart upload і скільки частин вантажиться паралельно
+    "STORAGE_BACKEND": ("local", str.lower),
+    "S3_ENDPOINT_URL": (None, str),
+    "S3_BUCKET": (None, str),
+    "S3_PREFIX": ("", str),
+    "S3_REGION": ("us-east-1", str),
+    "AWS_ACCESS_KEY_ID": (None, str),
+    "AWS_SECRET_ACCESS_KEY": (None, str),
+    "S3_PART_SIZE": (8 * 1024 * 1024, int),
+    "S3_MAX_CONCURRENCY": (4, int),
+    # холодний шар raw/sales (tiering.py): стискати дні, старші за N днів (zstd
+    # або gzip), видаляти старші за M днів, якщо є STG-копія (0 — ніколи не
+    # видаляти)
+    "RAW_COMPRESS_AFTER_DAYS": (30, int),
+    "RAW_DELETE_AFTER_DAYS": (0, int),
+    "RAW_COLD_CODEC": ("zstd", str.lower),
+    "RAW_COLD_LEVEL": (None, int),
+    # спільний для воркерів кеш нещодавно експортованих днів (mmap-файли; каталог
+    # за замовчуванням /dev/shm/sales_day_cache_<хеш FILE_STORAGE>), бюджет у байтах
+    # (0 — вимкнено)
+    "DAY_CACHE_DIR": (None, str),
+    "DAY_CACHE_MAX_BYTES": (256 * 1024 * 1024, int),
+    # JSON-бекенд сторінок апстріму, raw-файлів і JSON-відповідей: auto (orjson,
+    # якщо встановлено, інакше stdlib) | orjson | json
+    "JSON_BACKEND": ("auto", str.lower),
+    # кеш звітів home_task_queries.sql: файл SQLite з таблицями dvdrental
+    # (без нього /v1/api/reports відповідає 503) і допустима давність даних, с
+    "REPORT_DB": (None, str),
+    "REPORT_MAX_STALENESS": (60.0, float),
+    # Database config
+    "POSTGRES_HOST": ("localhost", str),
+    "POSTGRES_DB": (None, str),
+    "POSTGRES_PASSWORD": (None, str),
+    "POSTGRES_USER": (None, str),
+    "POSTGRES_PORT": (5432, int),
+}
+
+
+class Settings:
+    """
+    Ліниві налаштування: .env читається один раз при першому зверненні,
+    кожне значення приводиться до типу і кешується.
+    """
+
+    def __init__(self, env_file: str = DOTENV_PATH) -> None:
+        self._env_file = env_file
+        self._dotenv_loaded = False
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in ENV_SETTINGS:
+            raise AttributeError(f"unknown setting {name!r}")
+        self._load_dotenv()
+        default, cast = ENV_SETTINGS[name]
+        raw = os.environ.get(name)
+        value = default if raw is None else cast(raw)
+        setattr(self, name, value)
+        return value
+
+    def _load_dotenv(self) -> None:
+        if self._dotenv_loaded:
+            return
+        self._dotenv_loaded = True
+        if os.path.exists(self._env_file):
+            from dotenv import load_dotenv
+
+            load_dotenv(self._env_file)
+
+
+settings = Settings()
+
+
+def __getattr__(name: str) -> Any:
+    """`from src.config import AUTH_TOKEN` резолвиться через settings."""
+    try:
+        return getattr(settings, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
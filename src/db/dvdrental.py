@@ -0,0 +1,205 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Union
+
+from src.services.loggers.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+# таблиці dvdrental, які читають запити home_task_queries.sql (без зайвих колонок);
+# лише первинні ключі — допоміжні індекси порівнюються окремо (SUPPORTING_INDEXES)
+SCHEMA = """
+CREATE TABLE category (
+    category_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE film (
+    film_id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    release_year INTEGER,
+    rental_rate REAL NOT NULL,
+    length INTEGER
+);
+CREATE TABLE film_category (
+    film_id INTEGER NOT NULL,
+    category_id INTEGER NOT NULL,
+    PRIMARY KEY (film_id, category_id)
+);
+CREATE TABLE actor (
+    actor_id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL
+);
+CREATE TABLE film_actor (
+    actor_id INTEGER NOT NULL,
+    film_id INTEGER NOT NULL,
+    PRIMARY KEY (actor_id, film_id)
+);
+CREATE TABLE inventory (
+    inventory_id INTEGER PRIMARY KEY,
+    film_id INTEGER NOT NULL,
+    store_id INTEGER NOT NULL
+);
+CREATE TABLE rental (
+    rental_id INTEGER PRIMARY KEY,
+    rental_date TEXT NOT NULL,
+    inventory_id INTEGER NOT NULL,
+    customer_id INTEGER NOT NULL,
+    return_date TEXT
+);
+CREATE TABLE payment (
+    payment_id INTEGER PRIMARY KEY,
+    customer_id INTEGER NOT NULL,
+    rental_id INTEGER NOT NULL,
+    amount REAL NOT NULL,
+    payment_date TEXT NOT NULL
+);
+CREATE TABLE dataset_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+# індекси зовнішніх ключів, як у справжній dvdrental (idx_fk_*)
+SUPPORTING_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_fk_film_actor_film_id ON film_actor (film_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fk_inventory_film_id ON inventory (film_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fk_rental_inventory_id ON rental (inventory_id)",
+    "CREATE INDEX IF NOT EXISTS idx_fk_payment_rental_id ON payment (rental_id)",
+]
+
+CATEGORIES = [
+    "Action", "Animation", "Children", "Classics", "Comedy", "Documentary",
+    "Drama", "Family", "Foreign", "Games", "Horror", "Music", "New",
+    "Sci-Fi", "Sports", "Travel",
+]  # fmt: skip
+FIRST_NAMES = ["Penelope", "Nick", "Ed", "Jennifer", "Johnny", "Bette", "Grace"]
+LAST_NAMES = ["Guiness", "Wahlberg", "Chase", "Davis", "Lollobrigida", "Nicholson"]
+AMOUNTS = [0.99, 1.99, 2.99, 3.99, 4.99, 5.99, 6.99, 7.99, 8.99, 9.99]
+
+# розміри справжньої dvdrental (scale=1)
+BASE_SIZES = {"film": 1000, "actor": 200, "rental": 16044}
+
+
+def sizes(scale: float) -> Dict[str, int]:
+    """Кількість фільмів / акторів / прокатів для масштабу (категорій завжди 16)."""
+    return {name: max(1, round(count * scale)) for name, count in BASE_SIZES.items()}
+
+
+def generate(conn: sqlite3.Connection, scale: float = 1.0, seed: int = 42) -> None:
+    """
+    Заповнити порожню базу синтетичними даними у формі dvdrental:
+    ~4.6 копії на фільм (≈4% фільмів без inventory, для запиту 4),
+    ~5.5 актора на фільм, популярність фільмів нерівномірна (як у житті),
+    ~91% прокатів мають платіж. Детерміновано для (scale, seed).
+    """
+    rng = random.Random(seed)
+    counts = sizes(scale)
+    conn.executescript(SCHEMA)
+
+    films = range(1, counts["film"] + 1)
+    actors = range(1, counts["actor"] + 1)
+    conn.executemany(
+        "INSERT INTO category VALUES (?, ?)", enumerate(CATEGORIES, start=1)
+    )
+    conn.executemany(
+        "INSERT INTO film VALUES (?, ?, ?, ?, ?)",
+        (
+            (
+                f,
+                f"FILM {f:06d}",
+                2006,
+                rng.choice([0.99, 2.99, 4.99]),
+                rng.randint(46, 185),
+            )
+            for f in films
+        ),
+    )
+    conn.executemany(
+        "INSERT INTO film_category VALUES (?, ?)",
+        ((f, rng.randint(1, len(CATEGORIES))) for f in films),
+    )
+    conn.executemany(
+        "INSERT INTO actor VALUES (?, ?, ?)",
+        ((a, rng.choice(FIRST_NAMES), f"{rng.choice(LAST_NAMES)} {a}") for a in actors),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO film_actor VALUES (?, ?)",
+        (
+            (actor, f)
+            for f in films
+            for actor in rng.sample(actors, min(len(actors), rng.randint(1, 10)))
+        ),
+    )
+
+    inventory: List[int] = []  # film_id кожної копії, індекс = inventory_id - 1
+    for f in films:
+        if rng.random() >= 0.042:
+            inventory.extend([f] * rng.randint(2, 8))
+    conn.executemany(
+        "INSERT INTO inventory VALUES (?, ?, ?)",
+        ((i, f, rng.randint(1, 2)) for i, f in enumerate(inventory, start=1)),
+    )
+
+    # популярність копії ~ 1/rank фільму: кілька хітів і довгий хвіст
+    weights = [1.0 / (1 + (f * 7919) % counts["film"]) ** 0.5 for f in inventory]
+    picks = rng.choices(
+        range(1, len(inventory) + 1), weights=weights, k=counts["rental"]
+    )
+    customers = max(1, round(599 * scale))
+    start = datetime(2005, 5, 24, 22, 53)
+    step = timedelta(days=90) / counts["rental"]
+    rentals = []
+    payments = []
+    for rental_id, inventory_id in enumerate(picks, start=1):
+        rented = start + step * rental_id
+        customer = rng.randint(1, customers)
+        rentals.append(
+            (
+                rental_id,
+                rented.isoformat(sep=" "),
+                inventory_id,
+                customer,
+                (rented + timedelta(days=rng.randint(1, 9))).isoformat(sep=" "),
+            )
+        )
+        if rng.random() < 0.91:
+            paid = rented + timedelta(hours=rng.randint(1, 48))
+            payments.append(
+                (customer, rental_id, rng.choice(AMOUNTS), paid.isoformat(sep=" "))
+            )
+    conn.executemany("INSERT INTO rental VALUES (?, ?, ?, ?, ?)", rentals)
+    conn.executemany(
+        "INSERT INTO payment (customer_id, rental_id, amount, payment_date) "
+        "VALUES (?, ?, ?, ?)",
+        payments,
+    )
+    conn.executemany(
+        "INSERT INTO dataset_meta VALUES (?, ?)",
+        [("scale", str(scale)), ("seed", str(seed))],
+    )
+    conn.commit()
+
+
+def build_database(
+    path: Union[str, Path], scale: float = 1.0, seed: int = 42
+) -> sqlite3.Connection:
+    """
+    Відкрити файл бази з датасетом (scale, seed); якщо файлу нема або він
+    згенерований з іншими параметрами — перегенерувати.
+    """
+    path = Path(path)
+    if path.exists():
+        conn = sqlite3.connect(path)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM dataset_meta"))
+        except sqlite3.Error:
+            meta = {}
+        if meta == {"scale": str(scale), "seed": str(seed)}:
+            return conn
+        conn.close()
+        path.unlink()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    generate(conn, scale=scale, seed=seed)
+    logger.info("dvdrental dataset (scale=%s, seed=%s) built at %s", scale, seed, path)
+    return conn
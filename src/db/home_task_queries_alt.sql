@@ -0,0 +1,48 @@
+/*
+ Альтернативні формулювання запитів з home_task_queries.sql для порівняння
+ у бенчмарку (benchmarks/bench_sql.py --variants). Ім'я "Nb" — варіант запиту N,
+ результат має збігатися з оригіналом (колонка "same").
+ */
+
+/* 2b. Топ-10 акторів: спершу прокати по фільму, потім сума по акторах */
+WITH film_rentals AS (
+  SELECT i.film_id, COUNT(*) AS rentals
+  FROM rental    r
+  JOIN inventory i USING (inventory_id)
+  GROUP BY i.film_id
+)
+SELECT
+  a.actor_id,
+  a.first_name,
+  a.last_name,
+  SUM(fr.rentals) AS rentals_count
+FROM actor a
+JOIN film_actor   fa USING (actor_id)
+JOIN film_rentals fr USING (film_id)
+GROUP BY a.actor_id, a.first_name, a.last_name
+ORDER BY rentals_count DESC
+LIMIT 10;
+
+/* 3b. Категорія з найбільшим виторгом: спершу виторг по фільму */
+WITH film_revenue AS (
+  SELECT i.film_id, SUM(p.amount) AS revenue
+  FROM payment   p
+  JOIN rental    r USING (rental_id)
+  JOIN inventory i USING (inventory_id)
+  GROUP BY i.film_id
+)
+SELECT
+  c.name AS category,
+  SUM(fr.revenue) AS total_revenue
+FROM film_revenue  fr
+JOIN film_category fc USING (film_id)
+JOIN category      c  USING (category_id)
+GROUP BY c.category_id, c.name
+ORDER BY total_revenue DESC
+LIMIT 1;
+
+/* 4b. Фільми без inventory через NOT EXISTS (анти-join без IN) */
+SELECT f.title
+FROM film f
+WHERE NOT EXISTS (SELECT 1 FROM inventory i WHERE i.film_id = f.film_id)
+ORDER BY f.title;
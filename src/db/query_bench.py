@@ -0,0 +1,168 @@
+import hashlib
+import re
+import sqlite3
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+QUERIES_FILE = Path(__file__).resolve().parent / "home_task_queries.sql"
+
+_COMMENT = re.compile(r"/\*(.*?)\*/", re.S)
+_NAME = re.compile(r"^\s*(\d+[a-z]?)\.\s*(.*)$", re.S)
+
+
+class Query:
+    """Один запит із .sql: name ("2", "2b"...), title з коментаря і текст SQL."""
+
+    __slots__ = ("name", "title", "sql")
+
+    def __init__(self, name: str, title: str, sql: str) -> None:
+        self.name = name
+        self.title = title
+        self.sql = sql
+
+    def __repr__(self) -> str:
+        return f"Query({self.name!r}, {self.title!r})"
+
+
+def load_queries(path: Union[str, Path] = QUERIES_FILE) -> List[Query]:
+    """
+    Розібрати .sql на запити. Ім'я береться з першого коментаря перед запитом,
+    що починається з "N." (як у home_task_queries.sql); без нього — порядковий номер.
+    """
+    queries: List[Query] = []
+    for chunk in Path(path).read_text(encoding="utf-8").split(";"):
+        sql = _COMMENT.sub("", chunk).strip()
+        if not sql:
+            continue
+        name, title = str(len(queries) + 1), ""
+        for comment in _COMMENT.findall(chunk):
+            match = _NAME.match(comment)
+            if match:
+                name, title = match.group(1), " ".join(match.group(2).split())
+                break
+        queries.append(Query(name, title, sql))
+    return queries
+
+
+def fingerprint(rows: Iterable[tuple]) -> str:
+    """Короткий хеш результату: альтернативні формулювання мають його збігатися."""
+    digest = hashlib.sha1()
+    for row in rows:
+        digest.update(
+            repr(
+                tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+            ).encode()
+        )
+    return digest.hexdigest()[:12]
+
+
+def explain(conn: sqlite3.Connection, sql: str) -> List[str]:
+    """EXPLAIN QUERY PLAN деревом (відступ за рівнем вкладеності)."""
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    depth: Dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append(f"{'  ' * depth[node_id]}{detail}")
+    return lines
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Перцентиль із лінійною інтерполяцією (values відсортовані)."""
+    if len(values) == 1:
+        return values[0]
+    position = (len(values) - 1) * pct / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def run_query(
+    conn: sqlite3.Connection, query: Query, repeat: int = 20, warmup: int = 2
+) -> Dict[str, Any]:
+    """
+    Виконати запит warmup + repeat разів (кожен раз — до останнього рядка).
+    :return: мс (min/p50/p90/p99/mean), рядків, відбиток результату і план
+    """
+    for _ in range(warmup):
+        conn.execute(query.sql).fetchall()
+    timings = []
+    rows: List[tuple] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = conn.execute(query.sql).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "name": query.name,
+        "title": query.title,
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p90_ms": round(percentile(timings, 90), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "rows": len(rows),
+        "result": fingerprint(rows),
+        "plan": explain(conn, query.sql),
+    }
+
+
+def run_suite(
+    conn: sqlite3.Connection,
+    queries: List[Query],
+    repeat: int = 20,
+    warmup: int = 2,
+    indexes: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Прогнати всі запити; з indexes — спершу створити їх (і ANALYZE),
+    а після прогону видалити, щоб наступний набір мірявся на чистій схемі.
+    """
+    created = []
+    for statement in indexes or []:
+        conn.execute(statement)
+        created.append(_index_name(statement))
+    if created:
+        conn.execute("ANALYZE")
+    try:
+        return [run_query(conn, query, repeat, warmup) for query in queries]
+    finally:
+        for name in created:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.commit()
+
+
+def regressions(
+    current: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    threshold: float = 1.25,
+    metric: str = "p50_ms",
+) -> List[str]:
+    """
+    Порівняти з попереднім прогоном (JSON від --save): запит став повільнішим
+    за threshold разів або змінився його результат.
+    """
+    previous = {result["name"]: result for result in baseline}
+    problems = []
+    for result in current:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        if result["result"] != before["result"]:
+            problems.append(f"{result['name']}: result changed")
+        if before[metric] > 0 and result[metric] > before[metric] * threshold:
+            problems.append(
+                f"{result['name']}: {metric} {before[metric]} -> {result[metric]} "
+                f"(x{result[metric] / before[metric]:.2f})"
+            )
+    return problems
+
+
+def _index_name(statement: str) -> str:
+    match = re.search(r"INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", statement, re.I)
+    if not match:
+        raise ValueError(f"not a CREATE INDEX statement: {statement!r}")
+    return match.group(1)
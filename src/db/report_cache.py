@@ -0,0 +1,258 @@
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from src.config import REPORT_DB, REPORT_MAX_STALENESS
+from src.services.loggers.py_logger import get_logger
+from src.services.sqlite_store import SQLiteStore
+
+logger = get_logger(__name__)
+
+# зведені таблиці поруч із таблицями dvdrental; report_state — водяні знаки
+# (останній врахований rental_id / payment_id) і час останнього оновлення
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS report_category_films (
+    category_id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    film_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_actor_rentals (
+    actor_id INTEGER PRIMARY KEY,
+    rentals_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_category_revenue (
+    category_id INTEGER PRIMARY KEY,
+    total_revenue REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS report_state (
+    source TEXT PRIMARY KEY,
+    watermark INTEGER NOT NULL,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+# приріст із нових рядків (id у межах (watermark, max]) додається до накопиченого
+_ADD_RENTALS = """
+INSERT INTO report_actor_rentals (actor_id, rentals_count)
+SELECT fa.actor_id, COUNT(*)
+FROM rental r
+JOIN inventory  i  USING (inventory_id)
+JOIN film_actor fa USING (film_id)
+WHERE r.rental_id > ? AND r.rental_id <= ?
+GROUP BY fa.actor_id
+ON CONFLICT (actor_id) DO UPDATE
+SET rentals_count = rentals_count + excluded.rentals_count
+"""
+_ADD_PAYMENTS = """
+INSERT INTO report_category_revenue (category_id, total_revenue)
+SELECT fc.category_id, SUM(p.amount)
+FROM payment p
+JOIN rental        r  USING (rental_id)
+JOIN inventory     i  USING (inventory_id)
+JOIN film_category fc USING (film_id)
+WHERE p.payment_id > ? AND p.payment_id <= ?
+GROUP BY fc.category_id
+ON CONFLICT (category_id) DO UPDATE
+SET total_revenue = total_revenue + excluded.total_revenue
+"""
+# запит 1 читає лише довідники (тисячі рядків) — його перераховуємо цілком
+_CATEGORY_FILMS = """
+INSERT INTO report_category_films (category_id, category, film_count)
+SELECT c.category_id, c.name, COUNT(fc.film_id)
+FROM category c
+JOIN film_category fc USING (category_id)
+GROUP BY c.category_id, c.name
+"""
+
+# звіт -> (SELECT для віддачі, LIMIT за замовчуванням як у home_task_queries.sql)
+REPORTS: Dict[str, tuple] = {
+    "category_films": (
+        "SELECT category, film_count FROM report_category_films "
+        "ORDER BY film_count DESC, category",
+        None,
+    ),
+    "top_actors": (
+        "SELECT a.actor_id, a.first_name, a.last_name, r.rentals_count "
+        "FROM report_actor_rentals r JOIN actor a USING (actor_id) "
+        "ORDER BY r.rentals_count DESC, a.actor_id",
+        10,
+    ),
+    "category_revenue": (
+        "SELECT c.name AS category, ROUND(r.total_revenue, 2) AS total_revenue "
+        "FROM report_category_revenue r JOIN category c USING (category_id) "
+        "ORDER BY r.total_revenue DESC, c.name",
+        1,
+    ),
+}
+
+# джерело (таблиця фактів) -> (колонка id, SQL приросту)
+_SOURCES = {
+    "rental": ("rental_id", _ADD_RENTALS),
+    "payment": ("payment_id", _ADD_PAYMENTS),
+}
+
+
+class ReportCache:
+    """
+    Матеріалізовані результати звітних запитів 1-3 з home_task_queries.sql.
+
+    refresh() додає до зведених таблиць лише рядки rental/payment з id понад
+    водяний знак (id зростають у порядку вставки; змінені чи видалені старі
+    рядки не враховуються — для цього rebuild()). get() віддає готові рядки,
+    а якщо останнє оновлення старше за max_staleness секунд — спершу оновлює.
+    Оновлення йде в транзакції BEGIN IMMEDIATE, тож паралельні запити
+    (і процеси) не рахують той самий приріст двічі.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_staleness: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = SQLiteStore(path, SCHEMA)
+        self.max_staleness = max_staleness
+        self.clock = clock
+
+    # ---------- публічний API ----------
+
+    def refresh(self, max_staleness: Optional[float] = None) -> Dict[str, int]:
+        """
+        Інкрементально оновити зведені таблиці (з max_staleness — лише якщо
+        дані старші, перевірка вже під блокуванням).
+        :return: {джерело: на скільки id зсунувся водяний знак}
+        """
+        started = time.perf_counter()
+        with self.store.transaction() as conn:
+            state = self._state(conn)
+            if max_staleness is not None and not self._is_stale(
+                state, self.clock(), max_staleness
+            ):
+                return {source: 0 for source in _SOURCES}
+            added = self._apply(conn, state)
+        logger.info(
+            "report cache refreshed in %.1f ms: %s",
+            (time.perf_counter() - started) * 1000,
+            ", ".join(f"+{count} {source}" for source, count in added.items()),
+        )
+        return added
+
+    def rebuild(self) -> Dict[str, int]:
+        """Перерахувати все з нуля (після змін довідників чи старих рядків)."""
+        with self.store.transaction() as conn:
+            conn.execute("DELETE FROM report_actor_rentals")
+            conn.execute("DELETE FROM report_category_revenue")
+            added = self._apply(conn, {})
+        logger.info("report cache rebuilt: %s", added)
+        return added
+
+    def get(
+        self,
+        name: str,
+        limit: Optional[int] = None,
+        max_staleness: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Рядки звіту name (див. REPORTS) не старші за max_staleness секунд
+        (за замовчуванням self.max_staleness).
+        :return: report, rows, refreshed_at (ISO), staleness_s, watermarks
+        """
+        if name not in REPORTS:
+            raise KeyError(name)
+        bound = self.max_staleness if max_staleness is None else max_staleness
+        conn = self.store.connection()
+        if self._is_stale(self._state(conn), self.clock(), bound):
+            self.refresh(max_staleness=bound)
+        sql, default_limit = REPORTS[name]
+        limit = default_limit if limit is None else limit
+        if limit is not None:
+            sql = f"{sql} LIMIT {int(limit)}"
+        # один знімок WAL на рядки і стан, щоб watermarks відповідали rows
+        conn.execute("BEGIN")
+        try:
+            rows = [dict(row) for row in conn.execute(sql)]
+            state = self._state(conn)
+        finally:
+            conn.execute("COMMIT")
+        refreshed_at = min(item["refreshed_at"] for item in state.values())
+        return {
+            "report": name,
+            "rows": rows,
+            "refreshed_at": datetime.fromtimestamp(
+                refreshed_at, tz=timezone.utc
+            ).isoformat(timespec="seconds"),
+            "staleness_s": round(max(0.0, self.clock() - refreshed_at), 3),
+            "watermarks": {source: item["watermark"] for source, item in state.items()},
+        }
+
+    # ---------- приватні методи ----------
+
+    def _apply(self, conn, state: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+        """Додати приріст кожного джерела понад його водяний знак (у транзакції)."""
+        now = self.clock()
+        added = {}
+        for source, (id_column, add_sql) in _SOURCES.items():
+            low = state[source]["watermark"] if source in state else 0
+            high = conn.execute(
+                f"SELECT COALESCE(MAX({id_column}), 0) FROM {source}"
+            ).fetchone()[0]
+            added[source] = max(0, high - low)
+            if high > low:
+                conn.execute(add_sql, (low, high))
+            conn.execute(
+                "INSERT INTO report_state (source, watermark, refreshed_at) "
+                "VALUES (?, ?, ?) ON CONFLICT (source) DO UPDATE "
+                "SET watermark = excluded.watermark, "
+                "refreshed_at = excluded.refreshed_at",
+                (source, max(low, high), now),
+            )
+        conn.execute("DELETE FROM report_category_films")
+        conn.execute(_CATEGORY_FILMS)
+        return added
+
+    @staticmethod
+    def _state(conn) -> Dict[str, Dict[str, Any]]:
+        return {
+            row["source"]: {
+                "watermark": row["watermark"],
+                "refreshed_at": row["refreshed_at"],
+            }
+            for row in conn.execute("SELECT * FROM report_state")
+        }
+
+    @staticmethod
+    def _is_stale(state: Dict[str, Dict[str, Any]], now: float, bound: float) -> bool:
+        if set(state) != set(_SOURCES):
+            return True  # ще жодного оновлення
+        return any(now - item["refreshed_at"] > bound for item in state.values())
+
+
+# ---------- кеш за замовчуванням (налаштування з config) ----------
+
+_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """Кеш звітів процесу над REPORT_DB (None, якщо REPORT_DB не задано)."""
+    global _cache
+    if _cache is None and REPORT_DB:
+        _cache = ReportCache(REPORT_DB, max_staleness=REPORT_MAX_STALENESS)
+    return _cache
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo: звіти над синтетичною dvdrental, потім приріст прокатів."""
+    import tempfile
+
+    from src.db.dvdrental import build_database
+
+    demo_path = Path(tempfile.gettempdir()) / "dvdrental_1.0_42.sqlite3"
+    build_database(demo_path).close()
+    demo = ReportCache(demo_path, max_staleness=5)
+    print(demo.rebuild())
+    for report in REPORTS:
+        print(demo.get(report))
+    print(demo.refresh())  # без нових рядків — нічого не додається
@@ -0,0 +1,225 @@
+import asyncio
+import sys
+import time
+import uuid
+from contextlib import AbstractContextManager, asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Flask
+
+from src.config import LOG_KEY
+from src.flask_app.create_app import profile_store
+from src.flask_app.profiling import requested_mode
+from src.flask_app.routes.api_routes import (
+    day_summary,
+    job_limiter,
+    log_job_timings,
+    parse_job_payload,
+    rejected_job,
+)
+from src.services import fast_json
+from src.services.jobs.job_1_and_2 import async_save_sales
+from src.services.jobs.job_1_and_2.async_api_tool import close_async_api_tool
+from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import REQUEST_LATENCY
+from src.services.metrics.timings import collect_timings
+from src.services.profiling.profiler import ProfileStore, profile_call_async
+from src.services.ratelimit.limiter import client_address
+
+logger = get_logger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class AsyncJobApp:
+    """
+    ASGI-застосунок: uv run --with uvicorn uvicorn asgi:application --port 8081
+    - POST /v1/api/job обробляється нативно в event loop (async-клієнт апстріму,
+      запис файлів, ліміти і підсумок дня — в executor-потоках, бо це
+      синхронний SQLite/файловий I/O) — той самий контракт, що й у Flask-роуту;
+    - усі інші маршрути віддаються Flask-застосунку через asgiref WsgiToAsgi
+      (їх профілює ProfilingMiddleware Flask-застосунку);
+    - X-Profile: <LOG_KEY> на нативному роуті профілює потік event loop-а
+      (див. profile_call_async), id профілю — у заголовку X-Profile-Id.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Flask,
+        profile_store: ProfileStore = profile_store,
+        profile_key: Optional[str] = LOG_KEY,
+    ) -> None:
+        self.wsgi = WsgiToAsgi(wsgi_app)
+        self.profile_store = profile_store
+        self.profile_key = profile_key
+        self.routes: Dict[Tuple[str, str], Callable[[Scope, bytes], Awaitable[Any]]] = {
+            ("POST", "/v1/api/job"): self.job,
+        }
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        handler = None
+        if scope["type"] == "http":
+            handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            await self.wsgi(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = _header(scope, b"x-request-id") or uuid.uuid4().hex
+        body = await _read_body(receive)
+        mode = requested_mode(
+            _header(scope, b"x-profile"),
+            _header(scope, b"x-profile-mode"),
+            self.profile_key,
+        )
+        if mode is None:
+            status, payload, headers = await handler(scope, body)
+        else:
+            (status, payload, headers), profile_id = await profile_call_async(
+                lambda: handler(scope, body),
+                self.profile_store,
+                f"{scope['method']} {scope['path']}",
+                mode=mode,
+            )
+            headers = {**headers, "X-Profile-Id": profile_id or "busy"}
+        await _send_json(send, status, payload, request_id, headers)
+        elapsed = time.perf_counter() - started
+        REQUEST_LATENCY.observe(
+            elapsed, route=scope["path"], method=scope["method"], status=status
+        )
+        duration_ms = round(elapsed * 1000, 2)
+        logger.info(
+            "%s %s -> %s (%s ms)",
+            scope["method"],
+            scope["path"],
+            status,
+            duration_ms,
+            extra={
+                "request_id": request_id,
+                "route": scope["path"],
+                "method": scope["method"],
+                "status": status,
+                "duration_ms": duration_ms,
+            },
+        )
+
+    # ---------- ендпоінти ----------
+
+    async def job(
+        self, scope: Scope, body: bytes
+    ) -> Tuple[int, Optional[Dict[str, Any]], Dict[str, str]]:
+        """Async-версія /v1/api/job (див. api_routes.job), з тими самими лімітами."""
+        remote = scope.get("client")
+        client = client_address(
+            _header(scope, b"x-forwarded-for"), remote[0] if remote else None
+        )
+        admission = await asyncio.to_thread(job_limiter.check_rate, client)
+        if not admission.allowed:
+            return (429, *rejected_job(client, admission))
+        try:
+            data = fast_json.loads(body) if body else {}
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        date_obj, to_stg, error = parse_job_payload(data)
+        if error:
+            return 400, {"message": error}, {}
+        date_str = data["date"]
+        async with _in_thread(job_limiter.job_slot()) as admission:
+            if not admission.allowed:
+                return (429, *rejected_job(client, admission))
+            try:
+                with collect_timings() as timings:
+                    file_path = await async_save_sales.save_sales_to_local_disk_async(
+                        date_=date_obj, to_stg=to_stg
+                    )
+            except Exception as e:
+                logger.error("job failed: %s", str(e))
+                return 500, {"message": "failed to process job", "error": str(e)}, {}
+        log_job_timings(date_str, timings)
+        headers = {"Server-Timing": timings.server_timing()}
+        if not file_path:
+            return 204, None, headers
+        payload = {
+            "message": f"Data retrieved successfully from API for date {date_str}",
+            "file_path": str(file_path),
+        }
+        summary = await asyncio.to_thread(day_summary, date_obj)
+        if summary is not None:
+            payload["summary"] = summary
+        if data.get("timings"):
+            payload["timings"] = timings.as_dict()
+        return 201, payload, headers
+
+    # ---------- приватні методи ----------
+
+    @staticmethod
+    async def _lifespan(receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await close_async_api_tool()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+@asynccontextmanager
+async def _in_thread(manager: AbstractContextManager) -> AsyncIterator[Any]:
+    """Синхронний контекст-менеджер, чиї вхід і вихід (блокуючий I/O) — в потоці."""
+    value = await asyncio.to_thread(manager.__enter__)
+    try:
+        yield value
+    except BaseException:
+        if not await asyncio.to_thread(manager.__exit__, *sys.exc_info()):
+            raise
+    else:
+        await asyncio.to_thread(manager.__exit__, None, None, None)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", []):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _send_json(
+    send: Send,
+    status: int,
+    payload: Optional[Dict[str, Any]],
+    request_id: str,
+    extra_headers: Optional[Dict[str, str]] = None,
+) -> None:
+    # 204 No Content — без тіла
+    body = b"" if payload is None else fast_json.dumps(payload)
+    headers = [(b"x-request-id", request_id.encode("latin-1"))]
+    headers += [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in (extra_headers or {}).items()
+    ]
+    if payload is not None:
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
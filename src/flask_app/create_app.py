@@ -1,16 +1,75 @@
-from flask import Flask
+import time
+import uuid
+
+from flask import Flask, g, request
 from flask_wtf.csrf import CSRFProtect
 
-from src.config import SECRET_KEY, STATIC_FOLDER, TEMPLATE_FOLDER
+from src.config import (
+    LOG_KEY,
+    PROFILES_DIR,
+    PROFILES_KEEP,
+    SECRET_KEY,
+    STATIC_FOLDER,
+    TEMPLATE_FOLDER,
+)
+from src.flask_app.json_provider import FastJSONProvider
+from src.flask_app.profiling import ProfilingMiddleware
+from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import REQUEST_LATENCY
+from src.services.profiling.profiler import ProfileStore
+
+logger = get_logger(__name__)
 
 app = Flask(
     __name__,
     template_folder=TEMPLATE_FOLDER,  # Вказуємо шлях до папки templates
     static_folder=STATIC_FOLDER,  # Вказуємо шлях до папки static
 )
+# jsonify і request.get_json через orjson, якщо встановлено (див. fast_json)
+app.json = FastJSONProvider(app)
 
 # Ініціалізація CSRF
 csrf = CSRFProtect(app)
 
 # Налаштування секретного ключа для CSRF захисту
 app.config["SECRET_KEY"] = SECRET_KEY
+
+# Профілювання окремого запиту на вимогу адміна (заголовок X-Profile: <LOG_KEY>)
+profile_store = ProfileStore(PROFILES_DIR, keep=PROFILES_KEEP)
+app.wsgi_app = ProfilingMiddleware(app.wsgi_app, profile_store, key=LOG_KEY)
+
+
+@app.before_request
+def start_request() -> None:
+    """Ідентифікатор і час початку запиту (для логів)."""
+    g.request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def finish_request(response):
+    """Один рядок логу і точка гістограми латентності на запит."""
+    started = g.get("request_start")
+    duration_ms = round((time.perf_counter() - started) * 1000, 2) if started else None
+    if started:
+        # шаблон маршруту, а не шлях: кардинальність міток не росте від параметрів
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            route=request.url_rule.rule if request.url_rule else "<unmatched>",
+            method=request.method,
+            status=response.status_code,
+        )
+    response.headers["X-Request-ID"] = g.get("request_id", "")
+    logger.info(
+        "%s %s -> %s (%s ms)",
+        request.method,
+        request.path,
+        response.status_code,
+        duration_ms,
+        extra={
+            "method": request.method,
+            "status": response.status_code,
+            "duration_ms": duration_ms,
+        },
+    )
+    return response
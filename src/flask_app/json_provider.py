@@ -0,0 +1,39 @@
+from typing import Any
+
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+from src.services import fast_json
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify/request.get_json через fast_json (orjson, якщо встановлено).
+    Формат як у DefaultJSONProvider: компактно (з відступом у debug),
+    sort_keys; date/datetime і решта нестандартних типів — через той самий
+    DefaultJSONProvider.default (дати у форматі HTTP, Decimal, dataclass...).
+    Єдина різниця: не-ASCII символи пишуться як UTF-8, а не \\uXXXX.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._dump_bytes(obj, indent=bool(kwargs.get("indent"))).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return fast_json.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        # байти одразу в тіло відповіді, без проміжного str
+        return self._app.response_class(
+            self._dump_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+    def _dump_bytes(self, obj: Any, indent: bool) -> bytes:
+        return fast_json.dumps(
+            obj,
+            indent=indent,
+            sort_keys=self.sort_keys,
+            default=self.default,
+            passthrough_datetime=True,
+        )
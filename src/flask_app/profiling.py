@@ -0,0 +1,63 @@
+import hmac
+from typing import Any, Callable, Iterable, List, Optional
+
+from src.services.profiling.profiler import MODES, ProfileStore, profile_call
+
+PROFILE_HEADER = "HTTP_X_PROFILE"  # X-Profile: <LOG_KEY>
+MODE_HEADER = "HTTP_X_PROFILE_MODE"  # X-Profile-Mode: cprofile | sample
+
+
+class ProfilingMiddleware:
+    """
+    WSGI-обгортка: запит із заголовком X-Profile, що дорівнює LOG_KEY,
+    виконується під профайлером (див. profile_call); id профілю повертається
+    у заголовку X-Profile-Id, файли — через адмін-роути /profiles.
+    Без заголовка (або з невірним ключем) — жодного оверхеду, крім перевірки.
+    Тіло відповіді профілюється повністю (стрімінг для такого запиту вимкнено).
+    Нативний ASGI-роут POST /v1/api/job профілює сам AsyncJobApp.
+    """
+
+    def __init__(
+        self, wsgi_app: Callable, store: ProfileStore, key: Optional[str]
+    ) -> None:
+        self.wsgi_app = wsgi_app
+        self.store = store
+        self.key = key
+
+    def __call__(self, environ: dict, start_response: Callable) -> Iterable[bytes]:
+        mode = requested_mode(
+            environ.get(PROFILE_HEADER), environ.get(MODE_HEADER), self.key
+        )
+        if mode is None:
+            return self.wsgi_app(environ, start_response)
+
+        captured: List[Any] = []
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured[:] = [status, headers, exc_info]
+            return lambda data: None  # write() не використовується Flask
+
+        def run() -> List[bytes]:
+            app_iter = self.wsgi_app(environ, capture_start_response)
+            try:
+                return list(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+
+        label = f"{environ.get('REQUEST_METHOD', '')} {environ.get('PATH_INFO', '')}"
+        body, profile_id = profile_call(run, self.store, label, mode=mode)
+        status, headers, exc_info = captured
+        headers = list(headers) + [("X-Profile-Id", profile_id or "busy")]
+        start_response(status, headers, exc_info)
+        return body
+
+
+def requested_mode(
+    supplied: Optional[str], mode: Optional[str], key: Optional[str]
+) -> Optional[str]:
+    """Режим профілювання, якщо X-Profile збігається з ключем, інакше None."""
+    if not supplied or not key or not hmac.compare_digest(supplied, key):
+        return None
+    mode = (mode or "cprofile").lower()
+    return mode if mode in MODES else "cprofile"
@@ -1,7 +1,10 @@
-from flask import abort, redirect, request, send_file, url_for
+import hmac
+
+from flask import Response, abort, jsonify, redirect, request, send_file, url_for
 
 from src.config import FILE_LOG, LOG_KEY
-from src.flask_app.create_app import app
+from src.flask_app.create_app import app, csrf, profile_store
+from src.services.loggers.log_reader import gzip_stream, log_files, read_log
 from src.services.loggers.py_logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,16 +15,76 @@ def log():
     """
     Якщо GET — редірект на home.
     Якщо POST — перевіряємо ключ з форми і якщо ОК — відправляємо файл з логами і редірект на home.
+    Опційні поля форми (або query string):
+      tail=N, since/until='YYYY-MM-DD[ HH:MM[:SS]]', level=WARNING
+    — тоді читаються файл і його ротовані архіви у вікні, відповідь стрімиться
+    (gzip, якщо клієнт його приймає).
     """
     if request.method == "POST":
         # беремо ключ із тіла форми (не з JS)
         supplied = request.form.get("log_key")
         if supplied and supplied == LOG_KEY:
             logger.info("Log file requested and key accepted.")
-            return send_file(path_or_file=FILE_LOG, download_name="app.log")
+            filters = {
+                "tail": request.values.get("tail", type=int),
+                "since": request.values.get("since") or None,
+                "until": request.values.get("until") or None,
+                "level": request.values.get("level") or None,
+            }
+            if not any(filters.values()):
+                return send_file(path_or_file=FILE_LOG, download_name="app.log")
+            return _stream_log(filters)
         else:
             # НЕ даємо детальну причину (security)
             logger.warning("Log file not accepted.")
             abort(403)
     # GET — або редірект, або форма (за необхідності)
     return redirect(url_for("home"))
+
+
+def _stream_log(filters: dict) -> Response:
+    """Вибірка з логу (і ротованих архівів) стрімом; gzip, якщо клієнт його підтримує."""
+    if not log_files(FILE_LOG):
+        abort(404)
+    chunks = read_log(FILE_LOG, **filters)
+    headers = {"Content-Disposition": "inline; filename=app.log"}
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        chunks = gzip_stream(chunks)
+    return Response(chunks, mimetype="text/plain", headers=headers)
+
+
+def _admin_key_accepted() -> bool:
+    """Ключ LOG_KEY з форми (log_key) або заголовка X-Log-Key (для curl)."""
+    supplied = request.form.get("log_key") or request.headers.get("X-Log-Key")
+    return bool(supplied and LOG_KEY and hmac.compare_digest(supplied, LOG_KEY))
+
+
+@app.route("/profiles", methods=["POST"])
+def profiles():
+    """
+    Список профілів запитів (новіші першими).
+    Профіль знімається запитом із заголовком X-Profile: <LOG_KEY>
+    (X-Profile-Mode: cprofile | sample), id — у заголовку відповіді X-Profile-Id.
+    """
+    if not _admin_key_accepted():
+        logger.warning("Profiles list not accepted.")
+        abort(403)
+    return jsonify({"profiles": profile_store.list()})
+
+
+@app.route("/profiles/<name>", methods=["POST"])
+def profile_file(name: str):
+    """Завантажити .prof (pstats / snakeviz) або .folded (flamegraph.pl / speedscope)."""
+    if not _admin_key_accepted():
+        logger.warning("Profile download not accepted.")
+        abort(403)
+    path = profile_store.path(name)
+    if path is None:
+        abort(404)
+    return send_file(path_or_file=path, download_name=path.name, as_attachment=True)
+
+
+# ключ адміна замість сесії: CSRF тут не застосовний (виклики з curl)
+csrf.exempt(profiles)
+csrf.exempt(profile_file)
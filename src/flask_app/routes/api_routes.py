@@ -1,18 +1,95 @@
-from datetime import datetime
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
 
-from flask import jsonify, request
+from flask import Response, jsonify, request
 from flask import typing as flask_typing
 
-from src.config import AUTH_TOKEN
+from src.config import (
+    AUTH_TOKEN,
+    MAX_CONCURRENT_JOBS,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_DB,
+    RATE_LIMIT_PER_MINUTE,
+)
+from src.db.report_cache import REPORTS, get_report_cache
 from src.flask_app.create_app import app, csrf
-from src.services.jobs.job_1_and_2.save_sales import save_sales_to_local_disk
+from src.services.cache.day_cache import get_day_cache
+from src.services.jobs.job_1_and_2.job_queue import get_job_queue
+from src.services.jobs.job_1_and_2.save_sales import (
+    read_sales_day,
+    read_sales_summary,
+    save_sales_to_local_disk,
+)
 from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import JOBS_REJECTED
+from src.services.metrics.timings import StageTimings, collect_timings
+from src.services.ratelimit.limiter import Admission, JobLimiter, client_address
 
 logger = get_logger(__name__)
 
 if not AUTH_TOKEN:
     logger.error("AUTH_TOKEN environment variable must be set")
 
+# спільний для WSGI- і ASGI-ендпоінтів; з'єднання з файлом — при першому запиті
+job_limiter = JobLimiter(
+    RATE_LIMIT_DB,
+    rate_per_minute=RATE_LIMIT_PER_MINUTE,
+    burst=RATE_LIMIT_BURST,
+    max_jobs=MAX_CONCURRENT_JOBS,
+)
+
+
+def parse_job_payload(data: dict) -> Tuple[Optional[date], bool, Optional[str]]:
+    """
+    Розібрати тіло запиту джоби (спільне для WSGI- і ASGI-ендпоінтів).
+    :return: (дата, to_stg, повідомлення про помилку валідації або None)
+    """
+    date_str = data.get("date")
+    to_stg = data.get("to_stg", False)
+    logger.debug("Received job request with date=%s and to_stg=%s", date_str, to_stg)
+    if not date_str:
+        return None, to_stg, "date parameter missed"
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d").date(), to_stg, None
+    except ValueError:
+        return None, to_stg, "date must be in format YYYY-MM-DD"
+
+
+def rejected_job(
+    client: str, admission: Admission
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Тіло і заголовки відповіді 429 (спільні для WSGI- і ASGI-ендпоінтів)."""
+    JOBS_REJECTED.inc(reason=admission.reason)
+    logger.warning(
+        "job rejected for %s: %s limit, retry after %ss",
+        client,
+        admission.reason,
+        admission.retry_after,
+    )
+    message = (
+        "too many requests"
+        if admission.reason == "rate"
+        else "too many jobs in progress"
+    )
+    return {"message": message}, {"Retry-After": str(admission.retry_after)}
+
+
+def day_summary(date_obj: date) -> Optional[Dict[str, Any]]:
+    """Підсумок щойно експортованого дня зі спільного кешу (без читання файлу)."""
+    cache = get_day_cache()
+    return cache.summary(date_obj) if cache else None
+
+
+def log_job_timings(date_str: str, timings: StageTimings) -> None:
+    """Один структурований рядок логу зі стадіями джоби (поле timings у JSON-логах)."""
+    stages = timings.as_dict()
+    logger.info(
+        "job timings for %s: %s",
+        date_str,
+        " ".join(f"{name}={ms}ms" for name, ms in stages.items()),
+        extra={"timings": stages},
+    )
+
 
 @app.route("/v1/api/job", methods=["POST"])
 def job() -> flask_typing.ResponseReturnValue:
@@ -23,11 +100,18 @@ def job() -> flask_typing.ResponseReturnValue:
       "to_stg": false
     }
     ps: Якщо to_stg=true, то крім JSON створює AVRO-файл у відповідній папці stg.
+    ps: Якщо timings=true, у відповідь додається поле timings (мс по стадіях);
+        заголовок Server-Timing є завжди.
+    ps: 429 + Retry-After, якщо клієнт вичерпав ліміт запитів (RATE_LIMIT_*)
+        або вже виконується MAX_CONCURRENT_JOBS джоб.
+    ps: summary — підсумок дня зі спільного кешу (нема, якщо кеш вимкнено).
     --------------------------------------------------------------------------
     Example response (201 Created) if to_stg=false and data exists:
     {
       "message": "Data retrieved successfully from API for date 2022-08-09",
-      "file_path": "/file_storage/raw/sales/2022-08-09/sales_2022-08-09.json"
+      "file_path": "/file_storage/raw/sales/2022-08-09/sales_2022-08-09.json",
+      "summary": {"records": 120, "revenue": 95321.5, "clients": 97, "products": 10,
+                  "invalid": 0}
     }
     ---
     Example response (201 Created) if to_stg=true and data exists:
@@ -37,38 +121,176 @@ def job() -> flask_typing.ResponseReturnValue:
     }
     --------------------------------------------------------------------------
     """
+    client = client_address(request.headers.get("X-Forwarded-For"), request.remote_addr)
+    admission = job_limiter.check_rate(client)
+    if not admission.allowed:
+        body, headers = rejected_job(client, admission)
+        return jsonify(body), 429, headers
     data: dict = request.get_json(silent=True) or {}
-    date_str = data.get("date")
-    to_stg = data.get("to_stg", False)
-    logger.debug("Received job request with date=%s and to_stg=%s", date_str, to_stg)
     # 1) Перевірка дати
-    if not date_str:
-        return jsonify({"message": "date parameter missed"}), 400
+    date_obj, to_stg, error = parse_job_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    date_str = data["date"]
+    # 2) Виклик збереження даних (у межах глобальної стелі одночасних джоб)
+    with job_limiter.job_slot() as admission:
+        if not admission.allowed:
+            body, headers = rejected_job(client, admission)
+            return jsonify(body), 429, headers
+        try:
+            with collect_timings() as timings:
+                file_path = save_sales_to_local_disk(date_=date_obj, to_stg=to_stg)
+        except Exception as e:
+            logger.error("job failed: %s", str(e))
+            return jsonify({"message": "failed to process job", "error": str(e)}), 500
+    log_job_timings(date_str, timings)
+    headers = {"Server-Timing": timings.server_timing()}
+    if not file_path:
+        return (
+            jsonify({"message": f"No data found for date {date_str}"}),
+            204,
+            headers,
+        )
+    body = {
+        "message": f"Data retrieved successfully from API for date {date_str}",
+        "file_path": str(file_path),
+    }
+    summary = day_summary(date_obj)
+    if summary is not None:
+        body["summary"] = summary
+    if data.get("timings"):
+        body["timings"] = timings.as_dict()
+    return jsonify(body), 201, headers
+
+
+@app.route("/v1/api/jobs", methods=["POST"])
+def enqueue_job() -> flask_typing.ResponseReturnValue:
+    """
+    Поставити джобу в чергу (виконають споживачі, див. job_queue) і одразу
+    відповісти 202. Приймає JSON як /v1/api/job + опційний "priority" (int,
+    більший — раніше). Повторний запит на ту саму (date, to_stg), поки джоба
+    активна, повертає id наявної джоби.
+    --------------------------------------------------------------------------
+    Example response (202 Accepted):
+    {"job_id": 7, "status": "queued", "status_url": "/v1/api/jobs/7"}
+    --------------------------------------------------------------------------
+    """
+    client = client_address(request.headers.get("X-Forwarded-For"), request.remote_addr)
+    admission = job_limiter.check_rate(client)
+    if not admission.allowed:
+        body, headers = rejected_job(client, admission)
+        return jsonify(body), 429, headers
+    data: dict = request.get_json(silent=True) or {}
+    date_obj, to_stg, error = parse_job_payload(data)
+    if error:
+        return jsonify({"message": error}), 400
+    priority = data.get("priority", 0)
+    if not isinstance(priority, int) or isinstance(priority, bool):
+        return jsonify({"message": "priority must be an integer"}), 400
+
+    queue = get_job_queue()
+    job_id = queue.enqueue(date_obj, to_stg=bool(to_stg), priority=priority)
+    status_url = f"/v1/api/jobs/{job_id}"
+    return (
+        jsonify(
+            {
+                "job_id": job_id,
+                "status": queue.get(job_id)["status"],
+                "status_url": status_url,
+            }
+        ),
+        202,
+        {"Location": status_url},
+    )
+
+
+@app.route("/v1/api/jobs/<int:job_id>", methods=["GET"])
+def job_status(job_id: int) -> flask_typing.ResponseReturnValue:
+    """Стан джоби з черги: queued | running | done | failed, спроби, результат."""
+    job_info = get_job_queue().get(job_id)
+    if job_info is None:
+        return jsonify({"message": f"job {job_id} not found"}), 404
+    return jsonify(job_info), 200
+
+
+@app.route("/v1/api/sales/<date_str>", methods=["GET"])
+def sales_day(date_str: str) -> flask_typing.ResponseReturnValue:
+    """
+    JSON уже експортованого дня (як у raw/sales/...): зі спільного кешу днів,
+    при промаху — зі сховища (і день потрапляє в кеш). 404, якщо raw-файлу нема.
+    """
+    date_obj, error = _parse_date(date_str)
+    if error:
+        return jsonify({"message": error}), 400
+    day = read_sales_day(date_obj)
+    if day is None:
+        return jsonify({"message": f"No data exported for date {date_str}"}), 404
+    return Response(day.payload, mimetype="application/json")
+
+
+@app.route("/v1/api/sales/<date_str>/summary", methods=["GET"])
+def sales_day_summary(date_str: str) -> flask_typing.ResponseReturnValue:
+    """
+    Підсумок дня без payload.
+    --------------------------------------------------------------------------
+    Example response (200 OK):
+    {"date": "2022-08-09", "records": 120, "revenue": 95321.5, "clients": 97,
+     "products": 10, "invalid": 0}
+    --------------------------------------------------------------------------
+    """
+    date_obj, error = _parse_date(date_str)
+    if error:
+        return jsonify({"message": error}), 400
+    summary = read_sales_summary(date_obj)
+    if summary is None:
+        return jsonify({"message": f"No data exported for date {date_str}"}), 404
+    return jsonify({"date": date_str, **summary}), 200
+
+
+def _parse_date(date_str: str) -> Tuple[Optional[date], Optional[str]]:
     try:
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+        return datetime.strptime(date_str, "%Y-%m-%d").date(), None
     except ValueError:
-        return jsonify({"message": "date must be in format YYYY-MM-DD"}), 400
-    # 2) Виклик збереження даних
-    try:
-        file_path = save_sales_to_local_disk(date_=date_obj, to_stg=to_stg)
-        if not file_path:
-            return (
-                jsonify({"message": f"No data found for date {date_str}"}),
-                204,
-            )
+        return None, "date must be in format YYYY-MM-DD"
+
+
+@app.route("/v1/api/reports/<name>", methods=["GET"])
+def report(name: str) -> flask_typing.ResponseReturnValue:
+    """
+    Готові рядки звіту з матеріалізованих таблиць (див. src/db/report_cache.py):
+    category_films | top_actors | category_revenue.
+    Query: max_staleness — допустима давність у секундах (за замовчуванням
+    REPORT_MAX_STALENESS; старіші дані спершу інкрементально оновлюються),
+    limit — кількість рядків (за замовчуванням як у home_task_queries.sql).
+    --------------------------------------------------------------------------
+    Example response (200 OK):
+    {
+      "report": "category_revenue",
+      "rows": [{"category": "Sports", "total_revenue": 5314.21}],
+      "refreshed_at": "2024-05-01T10:00:00+00:00",
+      "staleness_s": 12.5,
+      "watermarks": {"rental": 16044, "payment": 14596}
+    }
+    --------------------------------------------------------------------------
+    """
+    cache = get_report_cache()
+    if cache is None:
+        return jsonify({"message": "reports are not configured (REPORT_DB)"}), 503
+    if name not in REPORTS:
         return (
-            jsonify(
-                {
-                    "message": f"Data retrieved successfully from API for date {date_str}",
-                    "file_path": str(file_path),
-                }
-            ),
-            201,
+            jsonify({"message": f"unknown report {name}", "reports": list(REPORTS)}),
+            404,
         )
-    except Exception as e:
-        logger.error("job failed: %s", str(e))
-        return jsonify({"message": "failed to process job", "error": str(e)}), 500
+    max_staleness = request.args.get("max_staleness", type=float)
+    limit = request.args.get("limit", type=int)
+    if max_staleness is not None and max_staleness < 0:
+        return jsonify({"message": "max_staleness must be >= 0"}), 400
+    if limit is not None and limit <= 0:
+        return jsonify({"message": "limit must be a positive integer"}), 400
+    result = cache.get(name, limit=limit, max_staleness=max_staleness)
+    return jsonify(result), 200, {"Age": str(int(result["staleness_s"]))}
 
 
 # відключаємо CSRF
 csrf.exempt(job)
+csrf.exempt(enqueue_job)
@@ -1,10 +1,16 @@
-from flask import flash, jsonify, render_template, request, send_file
+import io
+
+from flask import Response, flash, jsonify, render_template, request, send_file
 from flask import typing as flask_typing
 
 from src.flask_app.create_app import app
 from src.flask_app.form import DateReport
+from src.services.cache.day_cache import get_day_cache
 from src.services.jobs.job_1_and_2.save_sales import save_sales_to_local_disk
 from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import render_metrics
+from src.services.ratelimit.limiter import client_address
+from src.services.storage.object_storage import open_location
 
 logger = get_logger(__name__)
 
@@ -15,11 +21,21 @@ def health_check() -> flask_typing.ResponseReturnValue:
     return jsonify({"status": "ok"}), 200
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics() -> flask_typing.ResponseReturnValue:
+    """Метрики у текстовому форматі Prometheus (зведені по всіх воркерах)."""
+    return Response(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.route("/", methods=["GET", "POST"])
 def home():
     """Main page to getting the Excel file."""
-    ip_address = request.headers.get("X-Forwarded-For") or request.remote_addr
-    logger.info(f"ipAddress={ip_address}")
+    ip_address = client_address(
+        request.headers.get("X-Forwarded-For"), request.remote_addr
+    )
+    logger.info("ipAddress=%s", ip_address)
     form = DateReport()
     data = {"title": "SB", "page": "home", "form": form}
     if form.validate_on_submit():
@@ -37,8 +53,13 @@ def home():
             )
             format_ = "avro" if sale_date_stg else "json"
             if file_:
+                # JSON щойно ліг у спільний кеш днів: віддаємо без читання файлу
+                cache = get_day_cache() if not sale_date_stg else None
+                day = cache.get(sale_date) if cache else None
                 return send_file(
-                    path_or_file=file_,
+                    path_or_file=(
+                        io.BytesIO(day.payload) if day else open_location(file_)
+                    ),
                     as_attachment=True,
                     download_name=f"sales_{sale_date}.{format_}",
                     mimetype=f"application/{format_}",
@@ -49,6 +70,6 @@ def home():
                     "danger",
                 )
         except Exception as e:
-            logger.error(f"Error processing date {sale_date}: {e}")
+            logger.error("Error processing date %s: %s", sale_date, e)
             flash(f"<h3 style='color: red';>сталося помилка: <p>{e}</p></h3>", "error")
     return render_template(template_name_or_list="index.html", data=data)
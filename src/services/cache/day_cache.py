@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from src.config import DAY_CACHE_DIR, DAY_CACHE_MAX_BYTES, FILE_STORAGE
+from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import CACHE_REQUESTS
+
+logger = get_logger(__name__)
+
+# заголовок запису: magic + довжина JSON-підсумку, далі підсумок і payload
+_HEADER = struct.Struct("<4sI")
+_MAGIC = b"DAY1"
+# частіше не оновлюємо mtime (LRU-мітку) одного запису: зайвий syscall на хіт
+TOUCH_INTERVAL = 1.0
+
+
+class CachedDay:
+    """Запис кешу: підсумок дня (dict) і payload (байти JSON, як у raw)."""
+
+    __slots__ = ("summary", "payload")
+
+    def __init__(self, summary: Dict[str, Any], payload: bytes) -> None:
+        self.summary = summary
+        self.payload = payload
+
+    def __repr__(self) -> str:
+        return f"CachedDay(summary={self.summary!r}, payload={len(self.payload)} B)"
+
+
+class DayCache:
+    """
+    Кеш нещодавно експортованих днів, спільний для всіх воркерів і процесів:
+    - один файл на день у directory (за замовчуванням на tmpfs /dev/shm, тобто
+      в спільній пам'яті); читання — через mmap: сторінки ділять усі процеси,
+      а підсумок читається без розбору payload;
+    - запис — тимчасовий файл + атомарна заміна, тож читач бачить або старий,
+      або новий запис (відкритий mmap переживає заміну і видалення);
+    - LRU: хіт оновлює mtime файлу, після запису найстаріші за mtime файли
+      видаляються, поки сума розмірів більша за max_bytes;
+    - кеш переживає рестарт воркерів (але не перезавантаження хоста).
+    """
+
+    SUFFIX = ".day"
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    # ---------- публічний API ----------
+
+    def get(self, for_date: Union[date, str]) -> Optional[CachedDay]:
+        """Підсумок і payload дня або None (промах)."""
+        return self._read(for_date, with_payload=True)
+
+    def summary(self, for_date: Union[date, str]) -> Optional[Dict[str, Any]]:
+        """Лише підсумок дня (payload не копіюється) або None."""
+        day = self._read(for_date, with_payload=False)
+        return day.summary if day else None
+
+    def put(
+        self, for_date: Union[date, str], payload: bytes, summary: Dict[str, Any]
+    ) -> bool:
+        """Покласти день у кеш; :return: False, якщо запис більший за весь бюджет."""
+        meta = json.dumps(summary, ensure_ascii=False).encode("utf-8")
+        size = _HEADER.size + len(meta) + len(payload)
+        if size > self.max_bytes:
+            logger.info("day cache: %s (%d B) exceeds budget, skipped", for_date, size)
+            return False
+        path = self._path(for_date)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            with tmp_path.open("wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(meta)))
+                f.write(meta)
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self._evict()
+        return True
+
+    def invalidate(self, for_date: Union[date, str]) -> None:
+        self._path(for_date).unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._entries()
+        return {
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+    # ---------- приватні методи ----------
+
+    def _path(self, for_date: Union[date, str]) -> Path:
+        key = for_date.isoformat() if isinstance(for_date, date) else str(for_date)
+        # ключ лише з дати: жодних шляхів з "/" чи ".." у назві файлу
+        date.fromisoformat(key)
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def _read(
+        self, for_date: Union[date, str], with_payload: bool
+    ) -> Optional[CachedDay]:
+        path = self._path(for_date)
+        try:
+            with path.open("rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    magic, meta_length = _HEADER.unpack_from(mm)
+                    if magic != _MAGIC:
+                        raise ValueError(f"bad magic {magic!r}")
+                    start = _HEADER.size + meta_length
+                    summary = json.loads(mm[_HEADER.size : start])
+                    payload = mm[start:] if with_payload else b""
+                self._touch(f.fileno())
+        except FileNotFoundError:
+            CACHE_REQUESTS.inc(cache="day", result="miss")
+            return None
+        except (ValueError, struct.error) as err:  # порожній/битий файл
+            logger.warning("day cache: dropping broken %s: %s", path.name, err)
+            path.unlink(missing_ok=True)
+            CACHE_REQUESTS.inc(cache="day", result="miss")
+            return None
+        CACHE_REQUESTS.inc(cache="day", result="hit")
+        return CachedDay(summary, payload)
+
+    @staticmethod
+    def _touch(fd: int) -> None:
+        now = time.time()
+        if now - os.fstat(fd).st_mtime >= TOUCH_INTERVAL:
+            try:
+                os.utime(fd, (now, now))
+            except OSError:  # read-only том: LRU тоді за часом запису
+                pass
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """(mtime, size, path) усіх записів."""
+        entries: List[Tuple[float, int, Path]] = []
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return entries
+        for name in names:
+            if not name.endswith(self.SUFFIX) or name.startswith("."):
+                continue
+            path = self.directory / name
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # інший воркер щойно витіснив
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            logger.debug("day cache: evicted %s", path.name)
+
+
+def default_directory(file_storage: Union[str, Path] = FILE_STORAGE) -> Path:
+    """
+    /dev/shm/sales_day_cache_<хеш FILE_STORAGE> (спільна пам'ять), або
+    FILE_STORAGE/day_cache, якщо tmpfs нема (mmap тоді ділить page cache).
+    """
+    if os.path.isdir("/dev/shm"):
+        digest = hashlib.md5(str(Path(file_storage).resolve()).encode()).hexdigest()
+        return Path("/dev/shm") / f"sales_day_cache_{digest[:8]}"
+    return Path(file_storage) / "day_cache"
+
+
+# ---------- кеш за замовчуванням (налаштування з config) ----------
+
+_cache: Optional[DayCache] = None
+
+
+def get_day_cache() -> Optional[DayCache]:
+    """Кеш днів процесу (None, якщо DAY_CACHE_MAX_BYTES=0)."""
+    global _cache
+    if _cache is None and DAY_CACHE_MAX_BYTES > 0:
+        _cache = DayCache(
+            DAY_CACHE_DIR or default_directory(), max_bytes=DAY_CACHE_MAX_BYTES
+        )
+    return _cache
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo."""
+    import tempfile
+
+    demo = DayCache(tempfile.mkdtemp(), max_bytes=1000)
+    for day in range(1, 6):
+        demo.put(f"2022-08-0{day}", b"x" * 300, {"records": day})
+    print(demo.stats(), demo.summary("2022-08-05"), demo.get("2022-08-01"))
@@ -0,0 +1,82 @@
+import json
+from types import ModuleType
+from typing import Any, Callable, Optional, Union
+
+from src.config import JSON_BACKEND
+from src.services.loggers.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _load_orjson(backend: str) -> Optional[ModuleType]:
+    """orjson за JSON_BACKEND: auto — якщо встановлено, json — ніколи."""
+    if backend not in ("auto", "orjson", "json"):
+        raise ValueError(f"JSON_BACKEND must be auto, orjson or json, got {backend!r}")
+    if backend == "json":
+        return None
+    try:
+        import orjson  # опційна залежність: pip install orjson
+    except ImportError:
+        if backend == "orjson":
+            raise
+        return None
+    return orjson
+
+
+_orjson = _load_orjson(JSON_BACKEND)
+
+# "orjson" | "json" — що реально використовується (для логів і бенчмарку)
+BACKEND = "orjson" if _orjson else "json"
+# відступ "красивого" JSON (raw-файли): orjson уміє лише 2 пробіли, stdlib
+# лишає історичні 4 — вміст однаковий, відрізняються лише пробіли
+INDENT = 2 if _orjson else 4
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """
+    Розібрати JSON (bytes без проміжного decode). Те, що orjson не приймає
+    (NaN/Infinity, не-UTF-8 кодування), розбирається stdlib-ом.
+    Увага: цілі поза 64 бітами orjson повертає як float.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.loads(data)
+        except _orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps(
+    obj: Any,
+    indent: bool = False,
+    sort_keys: bool = False,
+    default: Optional[Callable[[Any], Any]] = None,
+    passthrough_datetime: bool = False,
+) -> bytes:
+    """
+    JSON у UTF-8 (не-ASCII символи як є, як ensure_ascii=False).
+    indent=True — з відступом INDENT; без нього — компактно.
+    passthrough_datetime — date/datetime віддаються в default (як у stdlib),
+    а не форматуються orjson-ом у ISO 8601.
+    Те, що orjson не серіалізує (цілі поза 64 бітами тощо), пише stdlib.
+    """
+    if _orjson is not None:
+        option = _orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= _orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= _orjson.OPT_SORT_KEYS
+        if passthrough_datetime:
+            option |= _orjson.OPT_PASSTHROUGH_DATETIME
+        try:
+            return _orjson.dumps(obj, default=default, option=option)
+        except _orjson.JSONEncodeError as err:
+            logger.debug("orjson could not encode (%s), falling back to json", err)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=INDENT if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        default=default,
+    ).encode("utf-8")
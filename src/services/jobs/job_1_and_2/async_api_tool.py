@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from src.config import (
+    AUTH_TOKEN,
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    LOG_RATE_INTERVAL,
+    LOG_RATE_LIMIT,
+    LOG_SAMPLE_EVERY_N,
+    LOG_WARNING_RATE_LIMIT,
+    SALES_API_HOST,
+)
+from src.services import fast_json
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
+from src.services.jobs.job_1_and_2.fake_api_tool import MAX_PAGES, IncompleteFetchError
+from src.services.lazy_import import lazy_import
+from src.services.loggers.py_logger import get_logger
+from src.services.loggers.sampling import SamplingFilter
+from src.services.metrics.app_metrics import UPSTREAM_ERRORS, UPSTREAM_PAGE_LATENCY
+from src.services.metrics.timings import record_stage
+
+logger = get_logger(__name__)
+logger.addFilter(
+    SamplingFilter(
+        every_n=LOG_SAMPLE_EVERY_N,
+        max_per_interval=LOG_RATE_LIMIT,
+        interval=LOG_RATE_INTERVAL,
+        warning_per_interval=LOG_WARNING_RATE_LIMIT,
+    )
+)
+
+httpx = lazy_import("httpx")
+
+
+def new_async_client(
+    base_url: str, pool_size: int = HTTP_POOL_SIZE, timeout: float = HTTP_TIMEOUT
+) -> "httpx.AsyncClient":
+    """
+    httpx.AsyncClient до апстріму: пул keep-alive з'єднань, не більше
+    pool_size одночасно (як HTTPAdapter у синхронного APITool).
+    Прив'язаний до event loop, у якому вперше використаний.
+    """
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+    )
+
+
+class AsyncAPITool:
+    """
+    Async-варіант APITool: ті ж запити і та ж пагінація, але очікування
+    апстріму не блокує потік — один воркер веде десятки дат одночасно.
+    """
+
+    def __init__(self, client: Optional["httpx.AsyncClient"] = None) -> None:
+        self.host = SALES_API_HOST
+        # як і requests, заголовки зі значенням None не надсилаємо
+        self.headers = {"Authorization": AUTH_TOKEN} if AUTH_TOKEN else {}
+        self.client = client or new_async_client(self.host)
+
+    async def _get(self, endpoint: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        started = time.perf_counter()
+        try:
+            resp = await self.client.get(endpoint, params=params, headers=self.headers)
+            resp.raise_for_status()
+            return fast_json.loads(resp.content)
+        except httpx.HTTPStatusError:
+            UPSTREAM_ERRORS.inc(client="async", kind="http")
+            raise
+        except httpx.TransportError:
+            UPSTREAM_ERRORS.inc(client="async", kind="connection")
+            raise
+        except Exception:
+            UPSTREAM_ERRORS.inc(client="async", kind="other")
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_PAGE_LATENCY.observe(elapsed, client="async")
+            record_stage("page", elapsed)
+
+    async def get_one_page(self, date_: date, page: int = 1) -> List[Dict[str, Any]]:
+        """Get sales data from the API."""
+        params = {
+            "date": date_.isoformat(),
+            "page": str(page),
+        }
+        return await self._get(endpoint="sales", params=params)
+
+    async def get_sales(
+        self, date_: date, deduplicator: Optional[RecordDeduplicator] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all sales data from the API for a specific date.
+        If a deduplicator is given, repeated records are dropped page by page.
+        Pagination ends on an empty (or non-list) page or a 404; any other
+        error raises IncompleteFetchError instead of returning partial data.
+        """
+        all_data = []
+        page = 1
+        while page <= MAX_PAGES:
+            try:
+                logger.debug("Fetching page %s for date %s", page, date_)
+                data = await self.get_one_page(date_=date_, page=page)
+            except httpx.HTTPStatusError as err:
+                if err.response.status_code == 404:
+                    break  # сторінки скінчились
+                logger.error("Error fetching data from API: %s", err)
+                raise IncompleteFetchError(date_, page, len(all_data), err) from err
+            except Exception as err:
+                logger.error("Error fetching data from API: %s", err)
+                raise IncompleteFetchError(date_, page, len(all_data), err) from err
+            if not data or not isinstance(data, list):
+                break
+            if deduplicator is not None:
+                data = deduplicator.filter(data)
+            all_data.extend(data)
+            page += 1
+            await asyncio.sleep(0.2)  # To avoid hitting rate limits
+        else:
+            raise IncompleteFetchError(
+                date_, page, len(all_data), f"more than {MAX_PAGES} pages"
+            )
+        return all_data
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+# один AsyncAPITool (пул з'єднань) на event loop
+_tools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAPITool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_api_tool() -> AsyncAPITool:
+    """Спільний для корутин поточного event loop AsyncAPITool."""
+    loop = asyncio.get_running_loop()
+    tool = _tools.get(loop)
+    if tool is None:
+        tool = _tools[loop] = AsyncAPITool()
+    return tool
+
+
+async def close_async_api_tool() -> None:
+    """Закрити пул з'єднань поточного event loop (ASGI lifespan shutdown)."""
+    tool = _tools.pop(asyncio.get_running_loop(), None)
+    if tool is not None:
+        await tool.aclose()
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo."""
+
+    async def _demo():
+        dates = [date(2022, 8, day) for day in range(9, 12)]
+        api_tool = AsyncAPITool()
+        results = await asyncio.gather(*(api_tool.get_sales(d) for d in dates))
+        for d, sales in zip(dates, results):
+            print(f"{d}: {len(sales)} sales records")
+        await api_tool.aclose()
+
+    asyncio.run(_demo())
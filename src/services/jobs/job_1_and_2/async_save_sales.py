@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from datetime import date
+from functools import partial
+from typing import Optional
+
+from src.config import FILE_STORAGE, SALES_DEDUP, SALES_DEDUP_KEY
+from src.services.cache.day_cache import get_day_cache
+from src.services.jobs.job_1_and_2.async_api_tool import (
+    AsyncAPITool,
+    get_async_api_tool,
+)
+from src.services.jobs.job_1_and_2.db_sink import get_sales_sink
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+from src.services.metrics.app_metrics import JOBS_IN_FLIGHT
+from src.services.metrics.timings import stage
+from src.services.storage.object_storage import get_storage
+
+# ---------- async-варіант save_sales_to_local_disk ----------
+
+
+async def save_sales_to_local_disk_async(
+    date_: date,
+    to_stg: bool = False,
+    api_tool: Optional[AsyncAPITool] = None,
+) -> Optional[str]:
+    """
+    Те саме, що save_sales_to_local_disk, але для event loop:
+    сторінки API тягнуться неблокуючим клієнтом, а запис JSON/AVRO
+    (диск + CPU) виконується в executor-потоці, щоб не зупиняти інші джоби.
+    Повертає str-шлях до створеного файлу або None.
+    """
+    with JOBS_IN_FLIGHT.track_inprogress(mode="async"):
+        api = api_tool or get_async_api_tool()
+        # exporter тут лише пише на диск (save), мережею займається async-клієнт
+        exporter = SalesExporter(
+            file_storage=FILE_STORAGE,
+            api_tool=api,
+            sink=get_sales_sink(),
+            storage=get_storage(FILE_STORAGE),
+            cache=get_day_cache(),
+        )
+
+        with stage("fetch"):
+            if SALES_DEDUP:
+                deduplicator = RecordDeduplicator(key=SALES_DEDUP_KEY)
+                sales_data = await api.get_sales(date_=date_, deduplicator=deduplicator)
+                exporter.report_duplicates(date_, deduplicator)
+            else:
+                sales_data = await api.get_sales(date_=date_)
+
+        loop = asyncio.get_running_loop()
+        # run_in_executor не переносить contextvars: таймінги стадій — через копію
+        context = contextvars.copy_context()
+        result = await loop.run_in_executor(
+            None,
+            partial(context.run, exporter.save, date_, sales_data, to_stg=to_stg),
+        )
+    return str(result) if result else None
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo."""
+
+    async def _demo():
+        dates = [date(2022, 8, day) for day in range(9, 12)]
+        paths = await asyncio.gather(
+            *(save_sales_to_local_disk_async(d, to_stg=True) for d in dates)
+        )
+        for path in paths:
+            print(path)
+
+    asyncio.run(_demo())
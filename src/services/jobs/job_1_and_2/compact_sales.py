@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from collections import defaultdict
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.config import FILE_STORAGE
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.lazy_import import lazy_import
+from src.services.loggers.py_logger import get_logger
+
+fastavro = lazy_import("fastavro")
+
+logger = get_logger(__name__)
+
+
+class SalesCompactor:
+    """
+    Компактор STG-партицій:
+    - зливає денні .../stg/sales/YYYY-MM-DD/sales_YYYY-MM-DD.avro у місячні
+      (або тижневі) файли .../stg/sales_compacted/<period>/sales_<period>.avro
+    - дні йдуть у відсортованому порядку, кожен день — окремі AVRO-блоки,
+      тож дата = один неперервний діапазон байтів [offset, offset + length)
+    - індекс діапазонів пишеться поруч (sales_<period>.index.json) і в маніфест
+    - джерело правди — маніфест: день, експортований знову після компакції,
+      вказує на денний файл, а його застарілий блок у компактному файлі
+      не читається і викидається при наступній перезбірці періоду
+    """
+
+    PERIODS = ("month", "week")
+
+    def __init__(
+        self,
+        file_storage: Union[str, Path],
+        period: str = "month",
+        codec: str = "deflate",
+        manifest: Optional[SalesManifest] = None,
+    ) -> None:
+        if period not in self.PERIODS:
+            raise ValueError(f"period must be one of {self.PERIODS}, got {period!r}")
+        self.file_storage = Path(file_storage).resolve()
+        self.period = period
+        self.codec = codec
+        self.manifest = manifest or SalesManifest(self.file_storage)
+        self.daily_dir = self.file_storage / "stg" / "sales"
+        self.compacted_dir = self.file_storage / "stg" / "sales_compacted"
+
+    # ---------- публічний API ----------
+
+    def period_key(self, for_date: date) -> str:
+        """2022-08-09 -> '2022-08' (month) або '2022-W32' (week)."""
+        if self.period == "month":
+            return f"{for_date.year:04d}-{for_date.month:02d}"
+        iso_year, iso_week, _ = for_date.isocalendar()
+        return f"{iso_year:04d}-W{iso_week:02d}"
+
+    def compact(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        remove_daily: bool = False,
+    ) -> List[Path]:
+        """
+        Злити денні партиції [start, end] у файли періодів.
+        :return: список створених/перезаписаних компактних файлів.
+        """
+        groups: Dict[str, List[date]] = defaultdict(list)
+        for for_date in self._daily_dates():
+            if (start and for_date < start) or (end and for_date > end):
+                continue
+            groups[self.period_key(for_date)].append(for_date)
+
+        written = []
+        for key, new_dates in sorted(groups.items()):
+            written.append(self._compact_period(key, new_dates))
+            if remove_daily:
+                for for_date in new_dates:
+                    self._daily_path(for_date).unlink()
+        return written
+
+    def read_date(self, for_date: date) -> List[Dict[str, Any]]:
+        """Записи за одну дату: з компактного файлу (по діапазону) або денного."""
+        entry = self.manifest.get(for_date, "stg")
+        if entry and entry.get("compacted"):
+            path = self.manifest.resolve(entry)
+            with path.open("rb") as f:
+                return list(_read_ranges(f, entry["header_length"], [entry]))
+
+        daily_path = self._daily_path(for_date)
+        with daily_path.open("rb") as f:
+            return list(fastavro.reader(f))
+
+    def iter_range(self, start: date, end: date) -> Iterator[Dict[str, Any]]:
+        """
+        Записи за діапазон дат: кожен компактний файл відкривається один раз,
+        суміжні дні читаються одним seek + read, а прогалини між ними
+        (дні поза діапазоном, застарілі блоки) не читаються.
+        """
+        by_file: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for key in self.manifest.dates("stg"):
+            if not start.isoformat() <= key <= end.isoformat():
+                continue
+            entry = self.manifest.get(key, "stg")
+            if entry.get("compacted"):
+                by_file[entry["path"]].append(entry)
+            else:
+                by_file[entry["path"]] = []
+
+        for rel_path, entries in by_file.items():
+            with (self.file_storage / rel_path).open("rb") as f:
+                if not entries:
+                    yield from fastavro.reader(f)
+                else:
+                    yield from _read_ranges(f, entries[0]["header_length"], entries)
+
+    # ---------- приватні методи ----------
+
+    def _daily_path(self, for_date: date) -> Path:
+        key = for_date.isoformat()
+        return self.daily_dir / key / f"sales_{key}.avro"
+
+    def _daily_dates(self) -> List[date]:
+        if not self.daily_dir.exists():
+            return []
+        dates = []
+        for day_dir in self.daily_dir.iterdir():
+            try:
+                for_date = date.fromisoformat(day_dir.name)
+            except ValueError:
+                continue
+            if self._daily_path(for_date).exists():
+                dates.append(for_date)
+        return sorted(dates)
+
+    def _compact_period(self, key: str, new_dates: List[date]) -> Path:
+        """Перезібрати файл періоду: нові денні файли + дні, що вже були в ньому."""
+        out_dir = self.compacted_dir / key
+        out_dir.mkdir(parents=True, exist_ok=True)
+        out_path = out_dir / f"sales_{key}.avro"
+        index_path = out_dir / f"sales_{key}.index.json"
+
+        sources: Dict[date, Tuple[str, Any]] = {}
+        old_index: Dict[str, Any] = {}
+        if index_path.exists():
+            with index_path.open("r", encoding="utf-8") as f:
+                old_index = json.load(f)
+            rel_path = self.manifest.relative(out_path)
+            sales = self.manifest.load()["sales"]
+            for day, entry in old_index["dates"].items():
+                current = sales.get(day, {}).get("stg") or {}
+                if not (current.get("compacted") and current["path"] == rel_path):
+                    # день експортовано знову (або видалено): блок застарів
+                    continue
+                sources[date.fromisoformat(day)] = ("compacted", entry)
+        for for_date in new_dates:
+            sources[for_date] = ("daily", self._daily_path(for_date))
+
+        index: Dict[str, Dict[str, int]] = {}
+        tmp_path = out_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("wb") as out:
+            writer = None
+            for for_date in sorted(sources):
+                records, day_schema = self._load_source(
+                    out_path, old_index, sources[for_date]
+                )
+                if writer is None:
+                    schema = fastavro.parse_schema(day_schema)
+                    writer = fastavro.write.Writer(out, schema, codec=self.codec)
+                    header_length = out.tell()
+                offset = out.tell()
+                for record in records:
+                    writer.write(record)
+                writer.flush()
+                index[for_date.isoformat()] = {
+                    "offset": offset,
+                    "length": out.tell() - offset,
+                    "records": len(records),
+                }
+        os.replace(tmp_path, out_path)
+
+        with index_path.open("w", encoding="utf-8") as f:
+            json.dump(
+                {"period": key, "header_length": header_length, "dates": index},
+                f,
+                indent=2,
+            )
+
+        rel_path = self.manifest.relative(out_path)
+        self.manifest.update_many(
+            zone="stg",
+            entries={
+                day: {
+                    "path": rel_path,
+                    "compacted": True,
+                    "header_length": header_length,
+                    **entry,
+                }
+                for day, entry in index.items()
+            },
+        )
+        logger.info("✅ STG compacted: %s (%d days)", out_path, len(index))
+        return out_path
+
+    def _load_source(
+        self, out_path: Path, old_index: Dict[str, Any], source: Tuple[str, Any]
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        kind, value = source
+        if kind == "daily":
+            with value.open("rb") as f:
+                reader = fastavro.reader(f)
+                return list(reader), reader.writer_schema
+        with out_path.open("rb") as f:
+            header_length = old_index["header_length"]
+            header = f.read(header_length)
+            schema = fastavro.reader(io.BytesIO(header)).writer_schema
+            return list(_read_ranges(f, header_length, [value])), schema
+
+
+def _read_ranges(
+    f: io.BufferedReader, header_length: int, entries: List[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Прочитати блоки днів entries: заголовок один раз, далі кожен неперервний
+    ряд суміжних діапазонів — одним seek + read (прогалини пропускаються).
+    """
+    f.seek(0)
+    header = f.read(header_length)
+    for start, end in _merge_ranges(entries):
+        f.seek(start)
+        yield from fastavro.reader(io.BytesIO(header + f.read(end - start)))
+
+
+def _merge_ranges(entries: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    ranges: List[Tuple[int, int]] = []
+    for entry in sorted(entries, key=lambda e: e["offset"]):
+        start, end = entry["offset"], entry["offset"] + entry["length"]
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def compact_sales(period: str = "month", remove_daily: bool = False) -> List[str]:
+    """Злити всі денні STG-партиції у FILE_STORAGE. Повертає str-шляхи."""
+    compactor = SalesCompactor(file_storage=FILE_STORAGE, period=period)
+    return [str(path) for path in compactor.compact(remove_daily=remove_daily)]
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo."""
+    print(compact_sales(period="month"))
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.config import (
+    DB_SINK,
+    DB_SINK_BATCH_SIZE,
+    DB_SINK_POOL_SIZE,
+    DB_SINK_POOL_TIMEOUT,
+    DB_SINK_SQLITE_PATH,
+    FILE_STORAGE,
+    POSTGRES_DB,
+    POSTGRES_HOST,
+    POSTGRES_PASSWORD,
+    POSTGRES_PORT,
+    POSTGRES_USER,
+)
+from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import RECORDS_WRITTEN
+
+logger = get_logger(__name__)
+
+# порядок колонок у таблиці sales і в COPY/executemany
+COLUMNS = ("purchase_date", "client", "product", "price")
+Row = Tuple[str, str, str, float]
+
+
+class PoolTimeout(RuntimeError):
+    """Усі з'єднання пулу зайняті довше за timeout."""
+
+
+class ConnectionPool:
+    """
+    Простий пул з'єднань: до size з'єднань створюються ліниво і
+    повертаються в чергу після використання (одне з'єднання — один потік за раз).
+    Якщо всі зайняті, чекаємо вільне не довше timeout секунд, далі PoolTimeout.
+    """
+
+    def __init__(
+        self, connect: Callable[[], Any], size: int = 4, timeout: float = 30.0
+    ) -> None:
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            conn.close()  # стан з'єднання невідомий — не повертаємо в пул
+            self._forget()
+            raise
+        self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+            self._forget()
+
+    # ---------- приватні методи ----------
+
+    def _acquire(self) -> Any:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if not create:
+            # чекаємо, поки хтось поверне з'єднання (зависле/втрачене — не вічно)
+            try:
+                return self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PoolTimeout(
+                    f"no free DB connection within {self.timeout:g}s "
+                    f"(all {self.size} in use)"
+                ) from None
+        try:
+            return self.connect()
+        except BaseException:
+            self._forget()
+            raise
+
+    def _forget(self) -> None:
+        with self._lock:
+            self._created -= 1
+
+
+def partitions(records: Iterable[Dict[str, Any]]) -> Dict[str, List[Row]]:
+    """Записи продажів -> {purchase_date: [рядки у порядку COLUMNS]}."""
+    grouped: Dict[str, List[Row]] = defaultdict(list)
+    for record in records:
+        grouped[record["purchase_date"]].append(
+            (
+                record["purchase_date"],
+                record["client"],
+                record["product"],
+                float(record["price"]),
+            )
+        )
+    return grouped
+
+
+def _batches(rows: List[Row], size: int) -> Iterator[List[Row]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class SalesSink(ABC):
+    """
+    Стадія після SalesExporter.save: завантажити записи дня в БД.
+    Ідемпотентно по партиціях purchase_date: кожна партиція з вхідних записів
+    замінюється цілком в одній транзакції (повтор джоби не дублює рядки),
+    а sales_partitions(purchase_date, rows, loaded_at) оновлюється upsert-ом.
+    """
+
+    def __init__(self, pool: ConnectionPool, batch_size: int = 5000) -> None:
+        self.pool = pool
+        self.batch_size = batch_size
+
+    def load(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Завантажити записи; :return: кількість вставлених рядків."""
+        grouped = partitions(records)
+        if not grouped:
+            return 0
+        loaded_at = datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
+        with self.pool.connection() as conn:
+            total = self._replace_partitions(conn, grouped, loaded_at)
+        RECORDS_WRITTEN.inc(total, zone="db")
+        logger.info(
+            "✅ %d sales rows loaded into %s (%s)",
+            total,
+            type(self).__name__,
+            ", ".join(sorted(grouped)),
+        )
+        return total
+
+    def close(self) -> None:
+        self.pool.close()
+
+    @abstractmethod
+    def _replace_partitions(
+        self, conn: Any, grouped: Dict[str, List[Row]], loaded_at: str
+    ) -> int:
+        """Замінити партиції grouped в одній транзакції; :return: кількість рядків."""
+
+
+class SQLiteSalesSink(SalesSink):
+    """
+    Локальний SQLite (стенд для тестів і BI без сервера): executemany
+    пакетами batch_size в одній транзакції BEGIN IMMEDIATE.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sales (
+        purchase_date TEXT NOT NULL,
+        client TEXT NOT NULL,
+        product TEXT NOT NULL,
+        price REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sales_purchase_date ON sales (purchase_date);
+    CREATE TABLE IF NOT EXISTS sales_partitions (
+        purchase_date TEXT PRIMARY KEY,
+        rows INTEGER NOT NULL,
+        loaded_at TEXT NOT NULL
+    );
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 5000,
+        pool_size: int = 4,
+        pool_timeout: float = 30.0,
+    ) -> None:
+        self.path = str(path)
+        super().__init__(
+            ConnectionPool(self._connect, pool_size, pool_timeout), batch_size
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            self.path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # у WAL: надійно і без fsync на коміт
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    def _replace_partitions(
+        self, conn: sqlite3.Connection, grouped: Dict[str, List[Row]], loaded_at: str
+    ) -> int:
+        insert = f"INSERT INTO sales ({', '.join(COLUMNS)}) VALUES (?, ?, ?, ?)"
+        total = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for purchase_date, rows in grouped.items():
+                conn.execute(
+                    "DELETE FROM sales WHERE purchase_date = ?", (purchase_date,)
+                )
+                for batch in _batches(rows, self.batch_size):
+                    conn.executemany(insert, batch)
+                conn.execute(
+                    "INSERT INTO sales_partitions (purchase_date, rows, loaded_at) "
+                    "VALUES (?, ?, ?) ON CONFLICT (purchase_date) DO UPDATE "
+                    "SET rows = excluded.rows, loaded_at = excluded.loaded_at",
+                    (purchase_date, len(rows), loaded_at),
+                )
+                total += len(rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return total
+
+
+class PostgresSalesSink(SalesSink):
+    """
+    PostgreSQL через psycopg 3 (опційна залежність: pip install "psycopg[binary]"):
+    COPY рядків у тимчасову таблицю, далі в одній транзакції
+    DELETE партицій + INSERT ... SELECT і upsert у sales_partitions.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS sales (
+        purchase_date DATE NOT NULL,
+        client TEXT NOT NULL,
+        product TEXT NOT NULL,
+        price DOUBLE PRECISION NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sales_purchase_date ON sales (purchase_date);
+    CREATE TABLE IF NOT EXISTS sales_partitions (
+        purchase_date DATE PRIMARY KEY,
+        rows INTEGER NOT NULL,
+        loaded_at TIMESTAMPTZ NOT NULL
+    );
+    """
+
+    def __init__(
+        self,
+        conninfo: str,
+        batch_size: int = 5000,
+        pool_size: int = 4,
+        pool_timeout: float = 30.0,
+    ) -> None:
+        self.conninfo = conninfo
+        super().__init__(
+            ConnectionPool(self._connect, pool_size, pool_timeout), batch_size
+        )
+
+    def _connect(self) -> Any:
+        import psycopg  # опційна залежність, потрібна лише для DB_SINK=postgres
+
+        conn = psycopg.connect(self.conninfo)
+        with conn.transaction():
+            conn.execute(self.SCHEMA)
+        return conn
+
+    def _replace_partitions(
+        self, conn: Any, grouped: Dict[str, List[Row]], loaded_at: str
+    ) -> int:
+        columns = ", ".join(COLUMNS)
+        dates = list(grouped)
+        total = sum(len(rows) for rows in grouped.values())
+        with conn.transaction(), conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE sales_stage (LIKE sales) ON COMMIT DROP")
+            with cur.copy(f"COPY sales_stage ({columns}) FROM STDIN") as copy:
+                for rows in grouped.values():
+                    for row in rows:
+                        copy.write_row(row)
+            cur.execute(
+                "DELETE FROM sales WHERE purchase_date = ANY(%s::date[])", (dates,)
+            )
+            cur.execute(
+                f"INSERT INTO sales ({columns}) SELECT {columns} FROM sales_stage"
+            )
+            cur.executemany(
+                "INSERT INTO sales_partitions (purchase_date, rows, loaded_at) "
+                "VALUES (%s, %s, %s) ON CONFLICT (purchase_date) DO UPDATE "
+                "SET rows = EXCLUDED.rows, loaded_at = EXCLUDED.loaded_at",
+                [(day, len(rows), loaded_at) for day, rows in grouped.items()],
+            )
+        return total
+
+
+# ---------- sink за замовчуванням (налаштування з config) ----------
+
+_sink: Optional[SalesSink] = None
+
+
+def postgres_conninfo() -> str:
+    return (
+        f"host={POSTGRES_HOST} port={POSTGRES_PORT} dbname={POSTGRES_DB} "
+        f"user={POSTGRES_USER} password={POSTGRES_PASSWORD}"
+    )
+
+
+def get_sales_sink() -> Optional[SalesSink]:
+    """DB-стадія процесу за DB_SINK ("" — вимкнено, "sqlite", "postgres")."""
+    global _sink
+    if _sink is not None or not DB_SINK:
+        return _sink
+    if DB_SINK == "sqlite":
+        _sink = SQLiteSalesSink(
+            DB_SINK_SQLITE_PATH or Path(FILE_STORAGE) / "sales.sqlite3",
+            batch_size=DB_SINK_BATCH_SIZE,
+            pool_size=DB_SINK_POOL_SIZE,
+            pool_timeout=DB_SINK_POOL_TIMEOUT,
+        )
+    elif DB_SINK == "postgres":
+        _sink = PostgresSalesSink(
+            postgres_conninfo(),
+            batch_size=DB_SINK_BATCH_SIZE,
+            pool_size=DB_SINK_POOL_SIZE,
+            pool_timeout=DB_SINK_POOL_TIMEOUT,
+        )
+    else:
+        raise ValueError(f"DB_SINK must be '', 'sqlite' or 'postgres', got {DB_SINK!r}")
+    return _sink
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo: завантажити тестові записи двічі (ідемпотентно) у SQLite."""
+    from src.services.jobs.job_1_and_2.ex_data import api_data
+
+    demo = SQLiteSalesSink(Path(FILE_STORAGE) / "sales_demo.sqlite3")
+    print(demo.load(api_data), demo.load(api_data))
+    with demo.pool.connection() as demo_conn:
+        print(demo_conn.execute("SELECT COUNT(*) FROM sales").fetchone())
@@ -1,25 +1,142 @@
+import os
+import threading
 import time
 from datetime import date
 from typing import Any, Dict, List, Optional
 
-import requests
-
-from src.config import AUTH_TOKEN
+from src.config import (
+    AUTH_TOKEN,
+    HTTP_POOL_SIZE,
+    HTTP_TIMEOUT,
+    LOG_RATE_INTERVAL,
+    LOG_RATE_LIMIT,
+    LOG_SAMPLE_EVERY_N,
+    LOG_WARNING_RATE_LIMIT,
+    SALES_API_HOST,
+)
+from src.services import fast_json
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
+from src.services.lazy_import import lazy_import
 from src.services.loggers.py_logger import get_logger
+from src.services.loggers.sampling import SamplingFilter
+from src.services.metrics.app_metrics import UPSTREAM_ERRORS, UPSTREAM_PAGE_LATENCY
+from src.services.metrics.timings import record_stage
+
+requests = lazy_import("requests")
 
 logger = get_logger(__name__)
+# посторінкові debug-и і помилки апстріму не мають залити лог під час backfill/збою
+logger.addFilter(
+    SamplingFilter(
+        every_n=LOG_SAMPLE_EVERY_N,
+        max_per_interval=LOG_RATE_LIMIT,
+        interval=LOG_RATE_INTERVAL,
+        warning_per_interval=LOG_WARNING_RATE_LIMIT,
+    )
+)
+
+# одна HTTP-сесія (пул keep-alive з'єднань) на процес
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Спільна для потоків процесу requests.Session з пулом з'єднань."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _json_adapter_class()(
+                    pool_connections=4, pool_maxsize=HTTP_POOL_SIZE
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _json_adapter_class() -> type:
+    """
+    HTTPAdapter, чиї відповіді декодують resp.json() через fast_json (orjson,
+    якщо встановлено). Клас створюється при першій сесії: requests лишається
+    відкладеним імпортом.
+    """
+
+    class FastJSONAdapter(requests.adapters.HTTPAdapter):
+        def build_response(self, req: Any, resp: Any) -> Any:
+            response = super().build_response(req, resp)
+            response.json = lambda **_: fast_json.loads(response.content)
+            return response
+
+    return FastJSONAdapter
+
+
+def warm_session(host: str = SALES_API_HOST) -> None:
+    """Відкрити (TLS) з'єднання з апстрімом заздалегідь, до першого запиту."""
+    try:
+        get_session().head(host, timeout=3)
+    except Exception as err:
+        logger.warning("HTTP warm-up failed: %s", err)
+
+
+def _reset_session() -> None:
+    # сокети батьківського процесу не можна ділити з дочірнім (gunicorn preload)
+    global _session, _session_lock
+    _session, _session_lock = None, threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_session)
+
+# скільки сторінок максимум тягнемо за дату (захист від нескінченної пагінації)
+MAX_PAGES = 1000
+
+
+class IncompleteFetchError(RuntimeError):
+    """
+    Пагінацію обірвала помилка апстріму (таймаут, 5xx, битий JSON) або ліміт
+    сторінок: частина записів дня не отримана, експорт не можна вважати повним.
+    """
+
+    def __init__(self, date_: date, page: int, fetched: int, reason: Any) -> None:
+        super().__init__(
+            f"fetch of {date_} stopped at page {page} "
+            f"after {fetched} records: {reason}"
+        )
+        self.date = date_
+        self.page = page
+        self.fetched = fetched
 
 
 class APITool:
-    def __init__(self):
-        self.host = "https://fake-api-vycpfa6oca-uc.a.run.app"
+    def __init__(self, session=None):
+        self.host = SALES_API_HOST
         self.headers = {"Authorization": AUTH_TOKEN}
+        self.session = session or get_session()
 
     def _get(self, endpoint: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
         url = f"{self.host}/{endpoint}"
-        resp = requests.get(url=url, headers=self.headers, params=params)
-        resp.raise_for_status()
-        return resp.json()
+        started = time.perf_counter()
+        try:
+            resp = self.session.get(
+                url=url, headers=self.headers, params=params, timeout=HTTP_TIMEOUT
+            )
+            resp.raise_for_status()
+            return resp.json()
+        except requests.exceptions.HTTPError:
+            UPSTREAM_ERRORS.inc(client="sync", kind="http")
+            raise
+        except requests.exceptions.RequestException:
+            UPSTREAM_ERRORS.inc(client="sync", kind="connection")
+            raise
+        except Exception:
+            UPSTREAM_ERRORS.inc(client="sync", kind="other")
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            UPSTREAM_PAGE_LATENCY.observe(elapsed, client="sync")
+            record_stage("page", elapsed)
 
     def get_one_page(self, date_: date, page: int = 1) -> List[Dict[str, Any]]:
         """Get sales data from the API."""
@@ -29,28 +146,48 @@ class APITool:
         }
         return self._get(endpoint="sales", params=params)
 
-    def get_sales(self, date_: date) -> List[Dict[str, Any]]:
-        """Get all sales data from the API for a specific date."""
+    def get_sales(
+        self, date_: date, deduplicator: Optional[RecordDeduplicator] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get all sales data from the API for a specific date.
+        If a deduplicator is given, repeated records are dropped page by page.
+        Pagination ends on an empty (or non-list) page or a 404; any other
+        error raises IncompleteFetchError instead of returning partial data.
+        """
         all_data = []
         page = 1
-        while page <= 1000:  # Limit to avoid infinite loop
+        while page <= MAX_PAGES:
             try:
-                logger.debug(f"Fetching page {page} for date {date_}")
+                logger.debug("Fetching page %s for date %s", page, date_)
                 data = self.get_one_page(date_=date_, page=page)
-            except requests.exceptions.RequestException as err:
-                logger.error(f"Error fetching data from API: {err}")
-                break
+            except requests.exceptions.HTTPError as err:
+                if _status_of(err) == 404:
+                    break  # сторінки скінчились
+                logger.error("Error fetching data from API: %s", err)
+                raise IncompleteFetchError(date_, page, len(all_data), err) from err
             except Exception as err:
-                logger.error(f"Unexpected error: {err}")
-                break
+                logger.error("Error fetching data from API: %s", err)
+                raise IncompleteFetchError(date_, page, len(all_data), err) from err
             if not data or not isinstance(data, list):
                 break
+            if deduplicator is not None:
+                data = deduplicator.filter(data)
             all_data.extend(data)
             page += 1
             time.sleep(0.2)  # To avoid hitting rate limits
+        else:
+            raise IncompleteFetchError(
+                date_, page, len(all_data), f"more than {MAX_PAGES} pages"
+            )
         return all_data
 
 
+def _status_of(err: Any) -> Optional[int]:
+    response = getattr(err, "response", None)
+    return getattr(response, "status_code", None)
+
+
 def _demo():
     """Demo function to show how to use the APITool class."""
     api_tool = APITool()
@@ -0,0 +1,404 @@
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from src.config import (
+    FILE_STORAGE,
+    JOB_MAX_ATTEMPTS,
+    JOB_QUEUE_DB,
+    JOB_QUEUE_WORKERS,
+    JOB_RETRY_BACKOFF,
+    JOB_VISIBILITY_TIMEOUT,
+)
+from src.services.jobs.job_1_and_2.save_sales import save_sales_to_local_disk
+from src.services.loggers.py_logger import get_logger
+from src.services.sqlite_store import SQLiteStore
+
+logger = get_logger(__name__)
+
+# стани джоби: queued -> running -> done | (queued для повтору) | failed
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE = (QUEUED, RUNNING)
+# найдовша пауза між повторами, хоч би скільки було спроб
+MAX_BACKOFF = 600.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    for_date TEXT NOT NULL,
+    to_stg INTEGER NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+-- одна активна джоба на (date, to_stg): повторний enqueue повертає її id
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active
+    ON jobs (for_date, to_stg) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority, available_at);
+"""
+
+
+class SalesJobQueue:
+    """
+    Черга джоб експорту продажів у локальному SQLite (за замовчуванням
+    FILE_STORAGE/jobs.sqlite3), спільна для всіх воркерів і CLI:
+    - пріоритети: більший priority забирається раніше, далі FIFO;
+    - дедуплікація: на (date, to_stg) не більше однієї активної джоби;
+    - visibility timeout: джобу, чий воркер не продовжив lease (впав, завис),
+      забирає інший воркер;
+    - повтори з експоненційною паузою backoff * 2^(спроба-1), до max_attempts.
+    """
+
+    FILE_NAME = "jobs.sqlite3"
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3,
+        backoff: float = 5.0,
+    ) -> None:
+        self.store = SQLiteStore(path, _SCHEMA)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+    @property
+    def path(self) -> str:
+        return self.store.path
+
+    @path.setter
+    def path(self, value: Union[str, Path]) -> None:
+        self.store.path = str(value)
+
+    # ---------- публічний API ----------
+
+    def enqueue(self, for_date: date, to_stg: bool = False, priority: int = 0) -> int:
+        """
+        Поставити джобу в чергу. Якщо така (date, to_stg) вже чекає чи виконується,
+        нова не створюється: повертається id наявної (пріоритет піднімається).
+        """
+        key = (for_date.isoformat(), int(bool(to_stg)))
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT id, priority FROM jobs "
+                "WHERE for_date = ? AND to_stg = ? AND status IN (?, ?)",
+                (*key, *ACTIVE),
+            ).fetchone()
+            if row is not None:
+                if priority > row["priority"]:
+                    conn.execute(
+                        "UPDATE jobs SET priority = ?, updated_at = ? WHERE id = ?",
+                        (priority, now, row["id"]),
+                    )
+                return row["id"]
+            job_id = conn.execute(
+                "INSERT INTO jobs (for_date, to_stg, priority, status, max_attempts, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*key, priority, QUEUED, self.max_attempts, now, now, now),
+            ).lastrowid
+        logger.info("Job %s queued: %s to_stg=%s", job_id, key[0], bool(to_stg))
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Забрати найпріоритетнішу готову джобу (або ту, чий lease прострочено)
+        і взяти lease на visibility_timeout. None, якщо черга порожня.
+        """
+        now = time.time()
+        with self.store.transaction() as conn:
+            while True:
+                row = conn.execute(
+                    "SELECT * FROM jobs "
+                    "WHERE (status = ? AND available_at <= ?) "
+                    "OR (status = ? AND lease_until < ?) "
+                    "ORDER BY priority DESC, id LIMIT 1",
+                    (QUEUED, now, RUNNING, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["status"] == RUNNING and row["attempts"] >= row["max_attempts"]:
+                    # воркер втратив lease на останній спробі: більше не пробуємо
+                    self._finish(conn, row["id"], FAILED, error="visibility timeout")
+                    continue
+                conn.execute(
+                    "UPDATE jobs SET status = ?, worker = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    (RUNNING, worker, now + self.visibility_timeout, now, row["id"]),
+                )
+                job = dict(row)
+                job.update(status=RUNNING, worker=worker, attempts=row["attempts"] + 1)
+                return _public(job)
+
+    def extend(self, job_id: int, worker: str) -> bool:
+        """Продовжити lease джоби, яку виконує worker (heartbeat)."""
+        now = time.time()
+        with self.store.transaction() as conn:
+            return bool(
+                conn.execute(
+                    "UPDATE jobs SET lease_until = ?, updated_at = ? "
+                    "WHERE id = ? AND worker = ? AND status = ?",
+                    (now + self.visibility_timeout, now, job_id, worker, RUNNING),
+                ).rowcount
+            )
+
+    def complete(self, job_id: int, worker: str, result: Optional[str]) -> bool:
+        """Позначити джобу виконаною. False, якщо lease уже втрачено."""
+        with self.store.transaction() as conn:
+            if not self._owns(conn, job_id, worker):
+                return False
+            self._finish(conn, job_id, DONE, result=result)
+        return True
+
+    def fail(self, job_id: int, worker: str, error: str) -> Optional[str]:
+        """
+        Зафіксувати невдалу спробу: повтор через backoff або failed після
+        max_attempts. :return: новий стан або None, якщо lease уже втрачено.
+        """
+        now = time.time()
+        with self.store.transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                self._finish(conn, job_id, FAILED, error=error)
+                return FAILED
+            delay = min(self.backoff * 2 ** (row["attempts"] - 1), MAX_BACKOFF)
+            conn.execute(
+                "UPDATE jobs SET status = ?, available_at = ?, lease_until = NULL, "
+                "worker = NULL, error = ?, updated_at = ? WHERE id = ?",
+                (QUEUED, now + delay, error, now, job_id),
+            )
+        logger.warning("Job %s failed, retry in %.0fs: %s", job_id, delay, error)
+        return QUEUED
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        row = (
+            self.store.connection()
+            .execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            .fetchone()
+        )
+        return _public(dict(row)) if row else None
+
+    def counts(self) -> Dict[str, int]:
+        """Кількість джоб по станах."""
+        rows = self.store.connection().execute(
+            "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+        )
+        return {row["status"]: row["n"] for row in rows}
+
+    def purge(self, older_than: float = 7 * 24 * 3600) -> int:
+        """Видалити завершені (done/failed) джоби, старші за older_than секунд."""
+        with self.store.transaction() as conn:
+            return conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, FAILED, time.time() - older_than),
+            ).rowcount
+
+    # ---------- приватні методи ----------
+
+    @staticmethod
+    def _owns(conn, job_id: int, worker: str) -> bool:
+        return (
+            conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND worker = ? AND status = ?",
+                (job_id, worker, RUNNING),
+            ).fetchone()
+            is not None
+        )
+
+    @staticmethod
+    def _finish(conn, job_id: int, status: str, **fields: Optional[str]) -> None:
+        conn.execute(
+            "UPDATE jobs SET status = ?, lease_until = NULL, result = ?, "
+            "error = ?, updated_at = ? WHERE id = ?",
+            (status, fields.get("result"), fields.get("error"), time.time(), job_id),
+        )
+
+
+def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Рядок таблиці -> відповідь API (без службових полів lease)."""
+    return {
+        "id": job["id"],
+        "date": job["for_date"],
+        "to_stg": bool(job["to_stg"]),
+        "priority": job["priority"],
+        "status": job["status"],
+        "attempts": job["attempts"],
+        "result": job["result"],
+        "error": job["error"],
+        "worker": job["worker"],
+    }
+
+
+class JobQueueWorker:
+    """
+    Споживачі черги: threads потоків, кожен забирає джобу, виконує експорт
+    (SalesExporter.export через save_sales_to_local_disk) і фіксує результат.
+    Окремий потік продовжує lease активних джоб кожну третину visibility_timeout.
+    Кілька процесів = кілька JobQueueWorker (gunicorn-воркери або CLI).
+    """
+
+    def __init__(
+        self,
+        queue: SalesJobQueue,
+        threads: int = 1,
+        poll_interval: float = 1.0,
+        export: Callable[..., Optional[str]] = save_sales_to_local_disk,
+    ) -> None:
+        self.queue = queue
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.export = export
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._running: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self.queue.purge()
+        for index in range(self.threads):
+            self._spawn(self._consume, f"job-consumer-{index}", f"{self.name}:{index}")
+        self._spawn(self._heartbeat, "job-heartbeat")
+        logger.info("Job queue worker %s started (%d threads)", self.name, self.threads)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Дочекатись поточних джоб (нові не забираються) і зупинити потоки."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def run_once(self, worker: str) -> bool:
+        """Виконати одну джобу, якщо вона є. :return: чи була джоба."""
+        job = self.queue.claim(worker)
+        if job is None:
+            return False
+        with self._lock:
+            self._running[job["id"]] = worker
+        try:
+            result = self.export(
+                date_=date.fromisoformat(job["date"]), to_stg=job["to_stg"]
+            )
+        except Exception as e:
+            logger.error("Job %s (%s) failed: %s", job["id"], job["date"], e)
+            self.queue.fail(job["id"], worker, str(e))
+        else:
+            if not self.queue.complete(job["id"], worker, result):
+                logger.warning("Job %s finished after its lease expired", job["id"])
+        finally:
+            with self._lock:
+                self._running.pop(job["id"], None)
+        return True
+
+    # ---------- приватні методи ----------
+
+    def _spawn(self, target: Callable, name: str, *args: Any) -> None:
+        thread = threading.Thread(target=target, args=args, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _consume(self, worker: str) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.run_once(worker):
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:  # сховище недоступне: не вбиваємо потік
+                logger.error("Job consumer %s error: %s", worker, e)
+                self._stop.wait(self.poll_interval)
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(self.queue.visibility_timeout / 3):
+            with self._lock:
+                running = list(self._running.items())
+            for job_id, worker in running:
+                try:
+                    self.queue.extend(job_id, worker)
+                except Exception as e:
+                    logger.warning("Failed to extend lease of job %s: %s", job_id, e)
+
+
+# ---------- черга за замовчуванням (налаштування з config) ----------
+
+_queue: Optional[SalesJobQueue] = None
+_worker: Optional[JobQueueWorker] = None
+
+
+def get_job_queue() -> SalesJobQueue:
+    """Черга процесу: JOB_QUEUE_DB або FILE_STORAGE/jobs.sqlite3."""
+    global _queue
+    if _queue is None:
+        _queue = SalesJobQueue(
+            JOB_QUEUE_DB or os.path.join(FILE_STORAGE, SalesJobQueue.FILE_NAME),
+            visibility_timeout=JOB_VISIBILITY_TIMEOUT,
+            max_attempts=JOB_MAX_ATTEMPTS,
+            backoff=JOB_RETRY_BACKOFF,
+        )
+    return _queue
+
+
+def start_queue_workers(threads: int = JOB_QUEUE_WORKERS) -> Optional[JobQueueWorker]:
+    """Запустити споживачів у цьому процесі (0 потоків — не запускати)."""
+    global _worker
+    if threads <= 0:
+        logger.warning(
+            "JOB_QUEUE_WORKERS=0: queued jobs wait for a separate"
+            " `queue_worker.py work` process"
+        )
+        return _worker
+    if _worker is not None:
+        return _worker
+    _worker = JobQueueWorker(get_job_queue(), threads=threads)
+    _worker.start()
+    return _worker
+
+
+def stop_queue_workers(timeout: Optional[float] = None) -> None:
+    global _worker
+    if _worker is not None:
+        _worker.stop(timeout)
+        _worker = None
+
+
+def enqueue_range(
+    start: date, end: date, to_stg: bool = False, priority: int = -1
+) -> List[int]:
+    """Бекфіл: по джобі на кожен день [start, end]; нижчий пріоритет за веб-запити."""
+    queue = get_job_queue()
+    days = (end - start).days + 1
+    return [
+        queue.enqueue(start + timedelta(days=offset), to_stg, priority)
+        for offset in range(days)
+    ]
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo: бекфіл трьох днів і один споживач, доки черга не спорожніє."""
+    ids = enqueue_range(date(2022, 8, 9), date(2022, 8, 11), to_stg=True)
+    consumer = JobQueueWorker(get_job_queue())
+    while consumer.run_once(consumer.name):
+        pass
+    for job_id in ids:
+        print(get_job_queue().get(job_id))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from src.services.loggers.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SalesManifest:
+    """
+    Маніфест сховища продажів: file_storage/manifest.json
+    {
+      "sales": {
+        "2022-08-09": {
+          "raw": {"path": "raw/sales/2022-08-09/sales_2022-08-09.json", ...},
+          "stg": {"path": "stg/sales/2022-08-09/sales_2022-08-09.avro", ...}
+        }
+      },
+      "ingestion": {"watermark": "2022-08-08", "dates": {...}}  # scheduler.py
+    }
+    Записи робляться під файловим локом (fcntl) і атомарною заміною файлу,
+    тому маніфест можна оновлювати з кількох gunicorn-воркерів одночасно.
+    """
+
+    FILE_NAME = "manifest.json"
+
+    def __init__(self, file_storage: Union[str, Path]) -> None:
+        self.file_storage = Path(file_storage).resolve()
+        self.path = self.file_storage / self.FILE_NAME
+        self.lock_path = self.file_storage / f"{self.FILE_NAME}.lock"
+
+    # ---------- публічний API ----------
+
+    def load(self) -> Dict[str, Any]:
+        """Прочитати маніфест цілком (порожній, якщо файлу ще нема)."""
+        if not self.path.exists():
+            return {"sales": {}}
+        with self.path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, for_date: Union[date, str], zone: str) -> Optional[Dict[str, Any]]:
+        """Запис зони (raw/stg/...) за дату або None."""
+        key = _date_key(for_date)
+        return self.load()["sales"].get(key, {}).get(zone)
+
+    def dates(self, zone: str) -> List[str]:
+        """Відсортований список дат, для яких є запис у зоні."""
+        sales = self.load()["sales"]
+        return sorted(key for key, zones in sales.items() if zone in zones)
+
+    def update(self, for_date: Union[date, str], zone: str, **entry: Any) -> None:
+        """Додати/перезаписати запис зони за одну дату."""
+        self.update_many(zone=zone, entries={_date_key(for_date): entry})
+
+    def update_many(self, zone: str, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Оновити записи зони для кількох дат однією транзакцією."""
+        updated_at = datetime.now(tz=timezone.utc).isoformat(timespec="seconds")
+        with self._locked():
+            manifest = self.load()
+            for key, entry in entries.items():
+                zones = manifest["sales"].setdefault(_date_key(key), {})
+                zones[zone] = {**entry, "updated_at": updated_at}
+            self._save(manifest)
+
+    def state(self, section: str) -> Dict[str, Any]:
+        """Службовий розділ маніфесту поруч із "sales" (напр. "ingestion"), {} якщо нема."""
+        return self.load().get(section, {})
+
+    def set_state(self, section: str, value: Dict[str, Any]) -> None:
+        """Перезаписати службовий розділ під тим самим локом, що й записи продажів."""
+        if section == "sales":
+            raise ValueError("'sales' is not a state section")
+        with self._locked():
+            manifest = self.load()
+            manifest[section] = value
+            self._save(manifest)
+
+    def relative(self, path: Union[str, Path]) -> str:
+        """Шлях відносно file_storage (у маніфесті не зберігаємо абсолютні)."""
+        return Path(path).resolve().relative_to(self.file_storage).as_posix()
+
+    def resolve(self, entry: Dict[str, Any]) -> Path:
+        """Абсолютний шлях до файлу з запису маніфесту."""
+        return self.file_storage / entry["path"]
+
+    # ---------- приватні методи ----------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.file_storage.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _save(self, manifest: Dict[str, Any]) -> None:
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _date_key(value: Union[date, str]) -> str:
+    return value.isoformat() if isinstance(value, date) else str(value)
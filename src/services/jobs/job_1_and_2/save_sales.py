@@ -1,24 +1,54 @@
 from __future__ import annotations
 
 import json
+import math
 from datetime import date
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
-import fastavro
-
-from src.config import FILE_STORAGE
+from src.config import FILE_STORAGE, SALES_DEDUP, SALES_DEDUP_KEY
+from src.services import fast_json
+from src.services.cache.day_cache import CachedDay, DayCache, get_day_cache
+from src.services.jobs.job_1_and_2.db_sink import SalesSink, get_sales_sink
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
 from src.services.jobs.job_1_and_2.fake_api_tool import APITool
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.validation import RecordValidator
+from src.services.lazy_import import lazy_import
 from src.services.loggers.py_logger import get_logger
+from src.services.metrics.app_metrics import (
+    BYTES_WRITTEN,
+    CACHE_REQUESTS,
+    JOBS_IN_FLIGHT,
+    RECORDS_WRITTEN,
+)
+from src.services.metrics.timings import stage
+from src.services.storage.json_stream import iter_json_array
+from src.services.storage.object_storage import (
+    LocalStorage,
+    Location,
+    Storage,
+    get_storage,
+)
+
+fastavro = lazy_import("fastavro")
 
 logger = get_logger(__name__)
 
+# .avsc за замовчуванням: поруч із цим модулем у підпапці schemas/
+SCHEMA_FILE = Path(__file__).resolve().parent / "schemas" / "sales_schema.avsc"
+
 
 class SalesExporter:
     """
-    Експортер продажів у локальне сховище:
+    Експортер продажів у сховище (storage: локальний каталог file_storage
+    за замовчуванням або S3, див. object_storage):
     - запис JSON у .../raw/sales/YYYY-MM-DD/
-    - опційно конвертує у AVRO (STG) у .../stg/sales/YYYY-MM-DD/
+    - записи звіряються з AVRO-схемою до всіх наступних стадій; ті, що не
+      проходять, йдуть у .../quarantine/sales/YYYY-MM-DD/ (NDJSON)
+    - опційно конвертує валідні записи у AVRO (STG) у .../stg/sales/YYYY-MM-DD/
+    - опційно завантажує валідні записи в БД (sink, див. db_sink)
+    - опційно кладе JSON і підсумок дня у спільний кеш (cache, див. day_cache)
     """
 
     # ✅ Базова схема, якщо .avsc ще не поклали у репозиторій
@@ -33,41 +63,121 @@ class SalesExporter:
         ],
     }
 
+    # кеш схем на процес: шлях -> (mtime_ns, схема, розібрана fastavro-схема)
+    _schema_cache: Dict[Path, Tuple[int, Dict[str, Any], Any]] = {}
+
     def __init__(
         self,
         file_storage: Union[str, Path],
         schema_file: Optional[Union[str, Path]] = None,
         api_tool: Optional[APITool] = None,
+        manifest: Optional[SalesManifest] = None,
+        dedup: bool = False,
+        sink: Optional[SalesSink] = None,
+        storage: Optional[Storage] = None,
+        cache: Optional[DayCache] = None,
     ) -> None:
         self.file_storage = Path(file_storage).resolve()
+        self.storage = storage or LocalStorage(self.file_storage)
+        # розміри щойно записаних ключів (для маніфесту без повторного stat/HEAD)
+        self._sizes: Dict[str, int] = {}
         self.api = api_tool or APITool()
-        # шлях до .avsc: за замовчуванням поруч із цим модулем у підпапці schemas/
-        self.schema_file = (
-            Path(schema_file).resolve()
-            if schema_file
-            else Path(__file__).resolve().parent / "schemas" / "sales_schema.avsc"
-        )
+        self.manifest = manifest or SalesManifest(self.file_storage)
+        self.sink = sink
+        self.cache = cache
+        # опційна потокова дедуплікація сторінок API
+        self.dedup = dedup
+        self.last_duplicates_dropped = 0
+        # скільки записів потрапило в STG і в карантин при останньому записі AVRO
+        self.last_stg_records = 0
+        self.last_quarantined = 0
+        # шлях до .avsc (за замовчуванням SCHEMA_FILE)
+        self.schema_file = Path(schema_file).resolve() if schema_file else SCHEMA_FILE
 
     # ---------- публічний API ----------
 
-    def export(self, for_date: date, to_stg: bool = False) -> Optional[Path]:
+    def export(self, for_date: date, to_stg: bool = False) -> Optional[Location]:
         """
         Отримати sales за дату і зберегти як JSON (+ опц. AVRO/STG).
-        :return: шлях до створеного файлу (JSON або AVRO), або None якщо даних нема.
+        :return: шлях до створеного файлу (JSON або AVRO; Path для локального
+                 сховища, s3://... для S3), або None якщо даних нема.
+        """
+        with stage("fetch"):
+            sales_data = self._fetch(for_date)
+        return self.save(for_date, sales_data, to_stg=to_stg)
+
+    def save(
+        self, for_date: date, sales_data: Any, to_stg: bool = False
+    ) -> Optional[Location]:
+        """
+        Зберегти вже отримані записи як JSON (+ опц. AVRO/STG, БД) і внести в маніфест.
+        Без API (лише CPU і запис у сховище): async-джоба викликає це в executor-потоці.
         """
-        sales_data = self.api.get_sales(date_=for_date)
         if not sales_data:
             logger.warning("No sales data found for date %s", for_date)
             return None
 
-        json_path = self._write_json(for_date, sales_data)
+        # схема перевіряється один раз, до всіх наступних стадій: raw лишається
+        # повною копією відповіді API, а БД, підсумок кешу і STG бачать лише
+        # валідні (зведені) записи; невалідні — у карантині
+        valid, rejected = self._validate(sales_data)
+        json_path = self._write_json(for_date, sales_data, valid)
+        self._register(for_date, "raw", json_path, records=len(sales_data))
+        self._quarantine(for_date, rejected)
+        if self.sink is not None:
+            with stage("db"):
+                self.sink.load(valid)
         if not to_stg:
             return json_path
 
-        return self._json_to_avro(json_path=json_path, for_date=for_date)
+        avro_path = self._write_avro(for_date, valid, validated=True)
+        self._register(for_date, "stg", avro_path, records=self.last_stg_records)
+        return avro_path
+
+    def rebuild_stg(self, for_date: date) -> Location:
+        """
+        Перебудувати STG дня з уже збереженого raw (без API, потоково) і
+        оновити маніфест — для історичних днів після зміни схеми тощо.
+        """
+        with self.storage.open_read(raw_key(for_date)) as f:
+            avro_path = self._write_avro(for_date, iter_json_array(f))
+        self._register(for_date, "stg", avro_path, records=self.last_stg_records)
+        return avro_path
+
+    def report_duplicates(
+        self, for_date: date, deduplicator: RecordDeduplicator
+    ) -> None:
+        """Запам'ятати і залогувати, скільки дублікатів відкинуто за дату."""
+        self.last_duplicates_dropped = deduplicator.dropped
+        if deduplicator.dropped:
+            logger.warning(
+                "Dropped %d duplicate sales records for date %s",
+                deduplicator.dropped,
+                for_date,
+            )
 
     # ---------- приватні методи ----------
 
+    def _fetch(self, for_date: date) -> Any:
+        """Отримати дані з API (з дедуплікацією, якщо вона увімкнена)."""
+        if not self.dedup:
+            return self.api.get_sales(date_=for_date)
+
+        deduplicator = RecordDeduplicator(key=SALES_DEDUP_KEY)
+        sales_data = self.api.get_sales(date_=for_date, deduplicator=deduplicator)
+        self.report_duplicates(for_date, deduplicator)
+        return sales_data
+
+    def _register(
+        self, for_date: date, zone: str, location: Location, records: int
+    ) -> None:
+        """Записати створений файл у маніфест сховища (шлях = ключ у сховищі)."""
+        key = self.storage.key_of(location)
+        size = self._sizes.pop(key)
+        self.manifest.update(for_date, zone, path=key, records=records, bytes=size)
+        RECORDS_WRITTEN.inc(records, zone=zone)
+        BYTES_WRITTEN.inc(size, zone=zone)
+
     def _ensure_schema(self) -> Dict[str, Any]:
         """Прочитати схему з файлу, створити дефолтну якщо її немає."""
         self.schema_file.parent.mkdir(parents=True, exist_ok=True)
@@ -78,48 +188,210 @@ class SalesExporter:
                 "AVRO schema missing. Created default at: %s", self.schema_file
             )
 
+        return self._cached_schema()[0]
+
+    def _cached_schema(self) -> Tuple[Dict[str, Any], Any]:
+        """Схема і її розібрана fastavro-версія; файл перечитується лише при зміні."""
+        mtime_ns = self.schema_file.stat().st_mtime_ns
+        cached = self._schema_cache.get(self.schema_file)
+        if cached and cached[0] == mtime_ns:
+            CACHE_REQUESTS.inc(cache="avro_schema", result="hit")
+            return cached[1], cached[2]
+        CACHE_REQUESTS.inc(cache="avro_schema", result="miss")
+
         with self.schema_file.open("r", encoding="utf-8") as f:
-            return json.load(f)
+            schema = json.load(f)
+        parsed = fastavro.parse_schema(schema)
+        self._schema_cache[self.schema_file] = (mtime_ns, schema, parsed)
+        return schema, parsed
 
-    def _write_json(self, for_date: date, records: Any) -> Path:
-        """Записати JSON у .../raw/sales/YYYY-MM-DD/sales_YYYY-MM-DD.json"""
-        raw_dir = self.file_storage / "raw" / "sales" / for_date.isoformat()
-        raw_dir.mkdir(parents=True, exist_ok=True)
+    def _validate(self, records: Any) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Звірити записи зі схемою: (валідні зведені записи, відхилені з причинами)."""
+        with stage("schema"):
+            schema = self._ensure_schema()
+        with stage("validate"):
+            valid, rejected = validate_sales(records, schema)
+        self.last_stg_records = len(valid)
+        self.last_quarantined = len(rejected)
+        return valid, rejected
 
-        json_path = raw_dir / f"sales_{for_date.isoformat()}.json"
-        with json_path.open("w", encoding="utf-8") as f:
-            json.dump(records, f, ensure_ascii=False, indent=4)
+    def _write_json(
+        self, for_date: date, records: Any, valid: Optional[List[Any]] = None
+    ) -> Location:
+        """
+        Записати JSON у .../raw/sales/YYYY-MM-DD/sales_YYYY-MM-DD.json
+        (підсумок дня в кеші рахується лише з valid, якщо їх передано).
+        """
+        key = raw_key(for_date)
+        # серіалізація (CPU) і запис (диск/мережа) окремо — різні стадії в Server-Timing
+        with stage("serialize"):
+            data = fast_json.dumps(records, indent=True)
+        # той самий вміст уже в об'єктному сховищі — повторно не вантажиться
+        with stage("write"):
+            self.storage.write_bytes(key, data)
+        self._sizes[key] = len(data)
+        if self.cache is not None:
+            # ті самі байти, вже без повторного читання/розбору файлу
+            with stage("cache"):
+                self._cache_day(for_date, data, records if valid is None else valid)
 
+        json_path = self.storage.location(key)
         logger.info("✅ JSON-файл створено: %s", json_path)
         return json_path
 
-    def _json_to_avro(self, json_path: Path, for_date: date) -> Path:
+    def _cache_day(self, for_date: date, data: bytes, records: Any) -> None:
+        try:
+            self.cache.put(for_date, data, summarize_sales(records))
+        except Exception as err:  # кеш — не причина провалити експорт
+            logger.warning("day cache: put of %s failed: %s", for_date, err)
+
+    def _json_to_avro(self, json_path: Location, for_date: date) -> Location:
+        """
+        Конвертувати вже записаний JSON -> AVRO (STG)
+        у .../stg/sales/YYYY-MM-DD/sales_YYYY-MM-DD.avro
+        (JSON, перенесений у холодний шар, розпаковується потоково).
+        Записи читаються по одному (iter_json_array) і одразу йдуть у writer:
+        пік пам'яті не залежить від розміру дня.
+        """
+        with self.storage.open_read(self.storage.key_of(json_path)) as f:
+            return self._write_avro(for_date, iter_json_array(f))
+
+    def _write_avro(
+        self, for_date: date, records: Any, validated: bool = False
+    ) -> Location:
         """
-        Конвертувати JSON -> AVRO (STG) у .../stg/sales/YYYY-MM-DD/sales_YYYY-MM-DD.avro
+        Записати записи як AVRO (STG) потоково, без проміжного файлу.
+        Якщо записи ще не перевірені (validated=False, потокове читання raw),
+        перед writer-ом вони батчами звіряються зі схемою (RecordValidator):
+        невалідні не валять експорт, а йдуть у карантин (_quarantine).
         """
-        schema = self._ensure_schema()
+        with stage("schema"):
+            schema_dict = self._ensure_schema()
+            _, schema = self._cached_schema()
+            validator = None if validated else RecordValidator(schema_dict)
 
-        # читаємо дані
-        with json_path.open("r", encoding="utf-8") as f:
-            records = json.load(f)
         if isinstance(records, dict):
             records = [records]
         assert isinstance(
             records, Iterable
         ), "Records must be iterable of dicts for Avro writer"
 
-        # куди писати .avro
-        stg_dir = self.file_storage / "stg" / "sales" / for_date.isoformat()
-        stg_dir.mkdir(parents=True, exist_ok=True)
-        avro_path = stg_dir / f"sales_{for_date.isoformat()}.avro"
-
-        # пишемо avro
-        with avro_path.open("wb") as out:
-            fastavro.writer(out, schema, records)
+        key = f"stg/sales/{for_date.isoformat()}/sales_{for_date.isoformat()}.avro"
+        with stage("avro"), self.storage.open_write(key) as out:
+            fastavro.writer(
+                out, schema, records if validator is None else validator.filter(records)
+            )
+            self._sizes[key] = out.tell()
+        if validator is not None:
+            self.last_stg_records = validator.valid
+            self.last_quarantined = len(validator.rejected)
+            self._quarantine(for_date, validator.rejected)
 
+        avro_path = self.storage.location(key)
         logger.info("✅ STG-файл створено: %s", avro_path)
         return avro_path
 
+    def _quarantine(self, for_date: date, rejected: List[Dict[str, Any]]) -> None:
+        """
+        Невалідні записи дня з причинами — у .../quarantine/sales/YYYY-MM-DD/
+        як NDJSON ({"row", "errors", "record"} на рядок; AVRO не підходить —
+        записи якраз не відповідають схемі). Чистий перезапуск дня прибирає
+        карантин попереднього.
+        """
+        key = quarantine_key(for_date)
+        if not rejected:
+            entry = self.manifest.get(for_date, "quarantine")
+            if entry and not entry.get("deleted"):
+                self.storage.delete(key)
+                self.manifest.update(
+                    for_date, "quarantine", path=None, records=0, deleted=True
+                )
+            return
+
+        data = b"".join(fast_json.dumps(item) + b"\n" for item in rejected)
+        self.storage.write_bytes(key, data)
+        self._sizes[key] = len(data)
+        location = self.storage.location(key)
+        self._register(for_date, "quarantine", location, records=len(rejected))
+        logger.warning(
+            "⚠️ %d sales records for %s failed schema validation (e.g. %s), "
+            "quarantined: %s",
+            len(rejected),
+            for_date,
+            "; ".join(rejected[0]["errors"]),
+            location,
+        )
+
+
+def validate_sales(
+    records: Any, schema: Dict[str, Any]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(валідні зведені записи, відхилені з причинами) для AVRO-схеми продажів."""
+    if isinstance(records, dict):
+        records = [records]
+    validator = RecordValidator(schema)
+    return list(validator.filter(records)), validator.rejected
+
+
+def _read_schema(schema_file: Path) -> Dict[str, Any]:
+    """Схема з файлу або базова, якщо .avsc ще нема (без створення файлу)."""
+    try:
+        with schema_file.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return SalesExporter.DEFAULT_SALES_SCHEMA
+
+
+def raw_key(for_date: date) -> str:
+    """Ключ raw-JSON дня (стиснена копія холодного шару читається за ним же)."""
+    return f"raw/sales/{for_date.isoformat()}/sales_{for_date.isoformat()}.json"
+
+
+def quarantine_key(for_date: date) -> str:
+    """Ключ NDJSON із записами дня, що не пройшли AVRO-схему."""
+    return (
+        f"quarantine/sales/{for_date.isoformat()}/sales_{for_date.isoformat()}.ndjson"
+    )
+
+
+def summarize_sales(records: Any) -> Dict[str, Any]:
+    """
+    Підсумок дня для кешу і query-ендпоінтів. Не падає на кривих записах:
+    записи не-об'єкти і ціни, що не зводяться до числа, лише рахуються в invalid.
+    """
+    if isinstance(records, dict):
+        records = [records]
+    revenue = 0.0
+    invalid = 0
+    clients = set()
+    products = set()
+    for record in records:
+        if not isinstance(record, dict):
+            invalid += 1
+            continue
+        clients.add(_hashable(record.get("client")))
+        products.add(_hashable(record.get("product")))
+        try:
+            price = float(record.get("price") or 0)
+        except (TypeError, ValueError):
+            invalid += 1
+            continue
+        if math.isfinite(price):
+            revenue += price
+        else:
+            invalid += 1
+    return {
+        "records": len(records),
+        "revenue": round(revenue, 2),
+        "clients": len(clients),
+        "products": len(products),
+        "invalid": invalid,
+    }
+
+
+def _hashable(value: Any) -> Any:
+    return value if isinstance(value, (str, int, float, type(None))) else repr(value)
+
 
 # ---------- тонка функція-обгортка під існуючий інтерфейс ----------
 
@@ -132,11 +404,51 @@ def save_sales_to_local_disk(
     Отримати sales за дату і зберегти як JSON (+ опц. STG/Avro).
     Повертає str-шлях до створеного файлу або None.
     """
-    exporter = SalesExporter(file_storage=FILE_STORAGE)
-    result = exporter.export(for_date=date_, to_stg=to_stg)
+    exporter = SalesExporter(
+        file_storage=FILE_STORAGE,
+        dedup=SALES_DEDUP,
+        sink=get_sales_sink(),
+        storage=get_storage(FILE_STORAGE),
+        cache=get_day_cache(),
+    )
+    with JOBS_IN_FLIGHT.track_inprogress(mode="sync"):
+        result = exporter.export(for_date=date_, to_stg=to_stg)
     return str(result) if result else None
 
 
+def read_sales_day(date_: date) -> Optional[CachedDay]:
+    """
+    JSON і підсумок уже експортованого дня: зі спільного кешу, а при промаху —
+    зі сховища (raw за маніфестом, стиснена копія теж читається), після чого
+    день кладеться в кеш. None, якщо raw-файлу за дату нема.
+    """
+    cache = get_day_cache()
+    day = cache.get(date_) if cache else None
+    if day is not None:
+        return day
+    entry = SalesManifest(FILE_STORAGE).get(date_, "raw")
+    if not entry or entry.get("deleted"):
+        return None
+    with get_storage(FILE_STORAGE).open_read(raw_key(date_)) as f:
+        payload = f.read()
+    # підсумок — як при експорті: лише з записів, що проходять схему
+    valid, _ = validate_sales(fast_json.loads(payload), _read_schema(SCHEMA_FILE))
+    day = CachedDay(summarize_sales(valid), payload)
+    if cache is not None:
+        cache.put(date_, day.payload, day.summary)
+    return day
+
+
+def read_sales_summary(date_: date) -> Optional[Dict[str, Any]]:
+    """Лише підсумок дня: на хіті кешу payload не копіюється."""
+    cache = get_day_cache()
+    summary = cache.summary(date_) if cache else None
+    if summary is not None:
+        return summary
+    day = read_sales_day(date_)
+    return day.summary if day else None
+
+
 # ---------- demo ----------
 
 if __name__ == "__main__":
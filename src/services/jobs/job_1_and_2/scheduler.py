@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import fcntl
+import threading
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from src.config import (
+    FILE_STORAGE,
+    SCHEDULER_ENABLED,
+    SCHEDULER_GRACE,
+    SCHEDULER_INTERVAL,
+    SCHEDULER_MAX_IN_FLIGHT,
+    SCHEDULER_POLL_TODAY,
+    SCHEDULER_RETRY_BACKOFF,
+    SCHEDULER_START_DATE,
+    SCHEDULER_TO_STG,
+)
+from src.services.jobs.job_1_and_2.job_queue import (
+    ACTIVE,
+    DONE,
+    FAILED,
+    SalesJobQueue,
+    get_job_queue,
+)
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.loggers.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+SECTION = "ingestion"  # розділ маніфесту зі станом планувальника
+# найдовша пауза перед новою джобою для дати, що раз у раз провалюється
+MAX_RETRY_BACKOFF = 6 * 3600.0
+
+
+class IngestionScheduler:
+    """
+    Інкрементальне завантаження продажів через чергу джоб (job_queue):
+    - watermark у маніфесті: усі дати <= watermark закриті й заморожені,
+      їх більше ніколи не тягнемо з апстріму;
+    - дата закривається через grace секунд після кінця доби; закрита дата
+      завантажується ще раз (повні дані) і після успіху заморожується — DONE
+      означає повну вибірку: обрив пагінації (IncompleteFetchError) валить
+      джобу, і вона повторюється чергою, а не заморожує часткові дані;
+    - дата, чия джоба вичерпала спроби черги, ставиться знову не раніше ніж
+      через retry_backoff * 2^(провали-1) секунд (до MAX_RETRY_BACKOFF);
+    - відкриті дати (сьогодні) перезавантажуються не частіше за poll_today;
+    - після простою прогалини (watermark, сьогодні] добираються старшими першими,
+      не більше max_in_flight джоб планувальника одночасно.
+    Стан ("dates": дата -> job_id, enqueued_at, final [, failures, retry_at])
+    живе поруч із watermark,
+    тож планувальник можна перезапускати і переносити між процесами.
+    """
+
+    def __init__(
+        self,
+        queue: SalesJobQueue,
+        manifest: SalesManifest,
+        start_date: date,
+        to_stg: bool = True,
+        grace: float = 3600.0,
+        poll_today: float = 900.0,
+        max_in_flight: int = 2,
+        clock: Callable[[], datetime] = datetime.now,
+        retry_backoff: float = 300.0,
+    ) -> None:
+        self.queue = queue
+        self.manifest = manifest
+        self.start_date = start_date
+        self.to_stg = to_stg
+        self.grace = timedelta(seconds=grace)
+        self.poll_today = poll_today
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.retry_backoff = retry_backoff
+
+    # ---------- публічний API ----------
+
+    def watermark(self, state: Optional[Dict[str, Any]] = None) -> date:
+        """Остання заморожена дата (день перед start_date, якщо ще жодної)."""
+        if state is None:
+            state = self.manifest.state(SECTION)
+        if state.get("watermark"):
+            return date.fromisoformat(state["watermark"])
+        return self.start_date - timedelta(days=1)
+
+    def tick(self) -> Dict[str, int]:
+        """
+        Один прохід: заморозити завершені закриті дати, поставити в чергу
+        потрібні. :return: {"enqueued": N, "in_flight": M, "watermark_moved": K}
+        """
+        now = self.clock()
+        state = self.manifest.state(SECTION)
+        dates: Dict[str, Dict[str, Any]] = state.get("dates", {})
+        watermark = self.watermark(state)
+        jobs = {key: self.queue.get(entry["job_id"]) for key, entry in dates.items()}
+
+        # 1) watermark рухається лише по неперервному ряду заморожених дат
+        moved = 0
+        while True:
+            key = (watermark + timedelta(days=1)).isoformat()
+            entry, job = dates.get(key), jobs.get(key)
+            if not (entry and entry["final"] and job and job["status"] == DONE):
+                break
+            watermark += timedelta(days=1)
+            dates.pop(key)
+            moved += 1
+
+        # 2) що ставити в чергу: сьогодні першим, далі прогалини від найстарших
+        in_flight = sum(1 for job in jobs.values() if job and job["status"] in ACTIVE)
+        today = now.date()
+        candidates = [today] + [
+            watermark + timedelta(days=offset)
+            for offset in range(1, (today - watermark).days)
+        ]
+        enqueued = 0
+        for day in candidates:
+            if day <= watermark or in_flight >= self.max_in_flight:
+                continue
+            key = day.isoformat()
+            if not self._due(dates.get(key), jobs.get(key), day, now):
+                continue
+            final = self._closed(day, now)
+            job_id = self.queue.enqueue(day, to_stg=self.to_stg, priority=-1)
+            previous = dates.get(key)
+            dates[key] = {
+                "job_id": job_id,
+                "enqueued_at": now.isoformat(timespec="seconds"),
+                "final": final,
+            }
+            if previous and previous.get("failed_job") == previous["job_id"]:
+                # лічильник провалів живе, доки дата не завантажиться успішно
+                dates[key]["failures"] = previous["failures"]
+            in_flight += 1
+            enqueued += 1
+
+        self.manifest.set_state(
+            SECTION, {"watermark": watermark.isoformat(), "dates": dates}
+        )
+        if enqueued or moved:
+            logger.info(
+                "Scheduler: %d jobs queued, watermark %s (+%d), %d in flight",
+                enqueued,
+                watermark,
+                moved,
+                in_flight,
+            )
+        return {"enqueued": enqueued, "in_flight": in_flight, "watermark_moved": moved}
+
+    # ---------- приватні методи ----------
+
+    def _closed(self, day: date, now: datetime) -> bool:
+        """Доба day скінчилась щонайменше grace тому: дані за неї вже не зміняться."""
+        return now >= datetime.combine(day + timedelta(days=1), time()) + self.grace
+
+    def _due(
+        self,
+        entry: Optional[Dict[str, Any]],
+        job: Optional[Dict[str, Any]],
+        day: date,
+        now: datetime,
+    ) -> bool:
+        if entry is None or job is None:
+            return True  # ще не бачили дату або джоба вже прибрана з черги
+        if job["status"] in ACTIVE:
+            return False
+        if job["status"] == FAILED:
+            return self._retry_due(entry, job, day, now)
+        if self._closed(day, now):
+            # закрита дата: потрібне одне завантаження після закриття
+            return not entry["final"]
+        since = now - datetime.fromisoformat(entry["enqueued_at"])
+        return since.total_seconds() >= self.poll_today
+
+    def _retry_due(
+        self, entry: Dict[str, Any], job: Dict[str, Any], day: date, now: datetime
+    ) -> bool:
+        """
+        Джоба дати вичерпала спроби черги: нова — лише після паузи, що росте
+        з кожним провалом (entry змінюється на місці і зберігається тіком).
+        """
+        if entry.get("failed_job") != job["id"]:
+            failures = entry.get("failures", 0) + 1
+            delay = min(self.retry_backoff * 2 ** (failures - 1), MAX_RETRY_BACKOFF)
+            retry_at = now + timedelta(seconds=delay)
+            entry.update(
+                failed_job=job["id"],
+                failures=failures,
+                retry_at=retry_at.isoformat(timespec="seconds"),
+            )
+            logger.warning(
+                "Ingestion of %s failed %d time(s) (%s), retry after %s",
+                day,
+                failures,
+                job["error"],
+                entry["retry_at"],
+            )
+        return now >= datetime.fromisoformat(entry["retry_at"])
+
+
+class SchedulerRunner:
+    """
+    Фоновий потік із tick() кожні interval секунд. Серед кількох процесів
+    (gunicorn-воркери, queue_worker.py) тікає лише той, хто тримає
+    неблокуючий flock на lock_path; інші пробують перехопити його щотіку.
+    """
+
+    def __init__(
+        self,
+        scheduler: IngestionScheduler,
+        lock_path: Union[str, Path],
+        interval: float = 60.0,
+    ) -> None:
+        self.scheduler = scheduler
+        self.lock_path = Path(lock_path)
+        self.interval = interval
+        self._lock_file = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.run, name="ingestion-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._lock_file is not None:
+            self._lock_file.close()  # закриття файлу знімає flock
+            self._lock_file = None
+
+    def run(self) -> None:
+        """Тікати до stop() (для окремого процесу — викликати напряму)."""
+        while not self._stop.is_set():
+            if self.is_leader():
+                try:
+                    self.scheduler.tick()
+                except Exception as e:
+                    logger.error("Scheduler tick failed: %s", e)
+            self._stop.wait(self.interval)
+
+    def is_leader(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = self.lock_path.open("a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        logger.info("Scheduler leader: this process")
+        return True
+
+
+# ---------- планувальник за замовчуванням (налаштування з config) ----------
+
+_runner: Optional[SchedulerRunner] = None
+
+
+def build_scheduler_runner() -> SchedulerRunner:
+    """Планувальник над чергою і маніфестом FILE_STORAGE за налаштуваннями SCHEDULER_*."""
+    if not SCHEDULER_START_DATE:
+        raise ValueError("SCHEDULER_START_DATE must be set (YYYY-MM-DD)")
+    scheduler = IngestionScheduler(
+        queue=get_job_queue(),
+        manifest=SalesManifest(FILE_STORAGE),
+        start_date=date.fromisoformat(SCHEDULER_START_DATE),
+        to_stg=SCHEDULER_TO_STG,
+        grace=SCHEDULER_GRACE,
+        poll_today=SCHEDULER_POLL_TODAY,
+        max_in_flight=SCHEDULER_MAX_IN_FLIGHT,
+        retry_backoff=SCHEDULER_RETRY_BACKOFF,
+    )
+    return SchedulerRunner(
+        scheduler, Path(FILE_STORAGE) / "scheduler.lock", interval=SCHEDULER_INTERVAL
+    )
+
+
+def start_scheduler(enabled: bool = SCHEDULER_ENABLED) -> Optional[SchedulerRunner]:
+    """Запустити фоновий планувальник у цьому процесі, якщо SCHEDULER_ENABLED."""
+    global _runner
+    if not enabled or _runner is not None:
+        return _runner
+    _runner = build_scheduler_runner()
+    _runner.start()
+    return _runner
+
+
+def stop_scheduler(timeout: Optional[float] = None) -> None:
+    global _runner
+    if _runner is not None:
+        _runner.stop(timeout)
+        _runner = None
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo: один тік і стан у маніфесті (потрібен SCHEDULER_START_DATE)."""
+    runner = build_scheduler_runner()
+    print(runner.scheduler.tick())
+    print(runner.scheduler.manifest.state(SECTION))
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.config import (
+    FILE_STORAGE,
+    RAW_COLD_CODEC,
+    RAW_COLD_LEVEL,
+    RAW_COMPRESS_AFTER_DAYS,
+    RAW_DELETE_AFTER_DAYS,
+)
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.loggers.py_logger import get_logger
+from src.services.storage.codecs import CODECS, check_codec, compress_stream
+from src.services.storage.object_storage import Storage, get_storage
+
+logger = get_logger(__name__)
+
+
+class RawTiering:
+    """
+    Холодний шар raw/sales (JSON з indent=4 стискається в рази):
+    - дні, старші за compress_after_days, перестискаються потоково у
+      "<key>.zst" (або ".gz"), запис raw у маніфесті отримує новий path,
+      codec, bytes (стиснений розмір) і raw_bytes; оригінал видаляється;
+    - дні, старші за delete_after_days (0 — ніколи), видаляються зовсім, але
+      лише якщо для дати є STG-запис у маніфесті і сам STG-файл у сховищі;
+      запис raw лишається з deleted=True і path=None.
+    Читачі (SalesExporter._json_to_avro, віддача файлів) бачать стиснені
+    копії прозоро через Storage.open_read. Повторний запуск нічого не робить.
+    """
+
+    def __init__(
+        self,
+        storage: Storage,
+        manifest: SalesManifest,
+        compress_after_days: int = 30,
+        delete_after_days: int = 0,
+        codec: str = "zstd",
+        level: Optional[int] = None,
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        if compress_after_days < 1:
+            raise ValueError(
+                f"compress_after_days must be >= 1, got {compress_after_days}"
+            )
+        if delete_after_days < 0:
+            raise ValueError(f"delete_after_days must be >= 0, got {delete_after_days}")
+        self.storage = storage
+        self.manifest = manifest
+        self.compress_after_days = compress_after_days
+        self.delete_after_days = delete_after_days
+        self.codec = check_codec(codec)
+        self.level = level
+        self.today = today
+
+    # ---------- публічний API ----------
+
+    def run(self) -> Dict[str, int]:
+        """
+        Один прохід по записах raw у маніфесті.
+        :return: {"compressed", "deleted", "bytes_in", "bytes_out"}
+        """
+        today = self.today()
+        compress_before = (today - timedelta(days=self.compress_after_days)).isoformat()
+        delete_before = (
+            (today - timedelta(days=self.delete_after_days)).isoformat()
+            if self.delete_after_days
+            else None
+        )
+        counts = {"compressed": 0, "deleted": 0, "bytes_in": 0, "bytes_out": 0}
+        for key, zones in sorted(self.manifest.load()["sales"].items()):
+            entry = zones.get("raw")
+            if not entry or entry.get("deleted"):
+                continue
+            if delete_before and key < delete_before and self._has_stg(zones):
+                self._delete(key, entry)
+                counts["deleted"] += 1
+            elif key < compress_before and not entry.get("codec"):
+                compressed = self._compress(key, entry)
+                if compressed:
+                    counts["compressed"] += 1
+                    counts["bytes_in"] += compressed[0]
+                    counts["bytes_out"] += compressed[1]
+        logger.info("raw tiering: %s", counts)
+        return counts
+
+    # ---------- приватні методи ----------
+
+    def _has_stg(self, zones: Dict[str, Any]) -> bool:
+        stg = zones.get("stg")
+        return bool(stg and stg.get("path")) and self.storage.exists(stg["path"])
+
+    def _compress(self, key: str, entry: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+        src_key = entry["path"]
+        dst_key = src_key + CODECS[self.codec]
+        try:
+            with (
+                self.storage.open_read(src_key) as src,
+                self.storage.open_write(dst_key) as dst,
+            ):
+                bytes_in, bytes_out = compress_stream(src, dst, self.codec, self.level)
+        except FileNotFoundError:
+            logger.warning("raw tiering: %s is missing, skipped", src_key)
+            return None
+        # спершу маніфест, потім видалення: читач за старим шляхом теж знайде копію
+        self.manifest.update(
+            key,
+            "raw",
+            **{
+                **_without_updated_at(entry),
+                "path": dst_key,
+                "codec": self.codec,
+                "bytes": bytes_out,
+                "raw_bytes": bytes_in,
+            },
+        )
+        self.storage.delete(src_key)
+        logger.info(
+            "raw tiering: %s compressed %d -> %d bytes", src_key, bytes_in, bytes_out
+        )
+        return bytes_in, bytes_out
+
+    def _delete(self, key: str, entry: Dict[str, Any]) -> None:
+        for variant in _variants(entry["path"]):
+            self.storage.delete(variant)
+        self.manifest.update(
+            key, "raw", **{**_without_updated_at(entry), "path": None, "deleted": True}
+        )
+        logger.info("raw tiering: %s deleted (STG copy exists)", entry["path"])
+
+
+def _variants(path: str) -> List[str]:
+    """Ключ JSON і всі його стиснені копії."""
+    for suffix in CODECS.values():
+        if path.endswith(suffix):
+            path = path[: -len(suffix)]
+            break
+    return [path] + [path + suffix for suffix in CODECS.values()]
+
+
+def _without_updated_at(entry: Dict[str, Any]) -> Dict[str, Any]:
+    return {name: value for name, value in entry.items() if name != "updated_at"}
+
+
+def tier_raw_partitions() -> Dict[str, int]:
+    """Один прохід холодного шару для FILE_STORAGE з налаштуваннями з config."""
+    return RawTiering(
+        storage=get_storage(FILE_STORAGE),
+        manifest=SalesManifest(FILE_STORAGE),
+        compress_after_days=RAW_COMPRESS_AFTER_DAYS,
+        delete_after_days=RAW_DELETE_AFTER_DAYS,
+        codec=RAW_COLD_CODEC,
+        level=RAW_COLD_LEVEL,
+    ).run()
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo."""
+    print(tier_raw_partitions())
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import math
+from itertools import islice
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional
+
+from src.services.lazy_import import lazy_import
+
+fastavro = lazy_import("fastavro")
+
+_MISSING = object()
+
+# межі цілих Avro: int — 32 біти, long — 64
+_INT_BOUNDS = {"int": (-(2**31), 2**31 - 1), "long": (-(2**63), 2**63 - 1)}
+
+
+class InvalidValue(ValueError):
+    """Значення поля не відповідає схемі і не зводиться до її типу."""
+
+
+class _FieldRule:
+    """
+    Перевірка одного поля схеми:
+    - fast_types — типи Python, які проходять без змін (перевірка колонки
+      батча одним set-ом типів)
+    - coerce — зведення решти значень до типу схеми або InvalidValue
+    - bounds — межі цілих (перевіряються min/max колонки)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fast_types: FrozenSet[type],
+        coerce: Callable[[Any], Any],
+        default: Any = _MISSING,
+        bounds: Optional[tuple] = None,
+    ) -> None:
+        self.name = name
+        self.fast_types = fast_types
+        self.coerce = coerce
+        self.default = default
+        self.bounds = bounds
+
+    def column_ok(self, column: List[Any]) -> bool:
+        """Чи проходить уся колонка батча без перевірки по рядках."""
+        if not {type(value) for value in column} <= self.fast_types:
+            return False
+        if self.bounds is None:
+            return True
+        ints = [value for value in column if type(value) is int]
+        return not ints or (self.bounds[0] <= min(ints) and max(ints) <= self.bounds[1])
+
+    def check(self, value: Any) -> Any:
+        """Значення для запису в AVRO або InvalidValue з причиною."""
+        if value is _MISSING:
+            if self.default is _MISSING:
+                raise InvalidValue(f"{self.name}: missing")
+            return self.default
+        try:
+            value = self.coerce(value)
+        except InvalidValue as err:
+            raise InvalidValue(f"{self.name}: {err}") from None
+        if self.bounds and type(value) is int:
+            low, high = self.bounds
+            if not low <= value <= high:
+                raise InvalidValue(f"{self.name}: {value} out of range")
+        return value
+
+
+class RecordValidator:
+    """
+    Батчева валідація і зведення записів до AVRO-схеми перед fastavro.writer:
+    - записи обробляються батчами по batch_size; кожне поле перевіряється
+      для всього батча разом (типи колонки), по рядках — лише колонки з
+      відхиленнями
+    - зводиться те, що однозначно: "12.5" -> 12.5 для double, 3.0 -> 3 для
+      long, відсутнє поле з default у схемі -> default
+    - решта записів не йде у writer, а збирається в rejected з причинами
+      (карантин), щоб один поганий запис не валив експорт дня
+    Підтримуються примітивні типи і union з null; поля інших типів
+    перевіряє fastavro.validation по рядках.
+    """
+
+    def __init__(self, schema: Dict[str, Any], batch_size: int = 1000) -> None:
+        self.batch_size = batch_size
+        self.fields = [_field_rule(field) for field in schema["fields"]]
+        self.valid = 0
+        self.rejected: List[Dict[str, Any]] = []
+
+    # ---------- публічний API ----------
+
+    def filter(self, records: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """Пропустити у writer лише валідні (зведені) записи, решту — в rejected."""
+        records = iter(records)
+        row = 0
+        while True:
+            batch = list(islice(records, self.batch_size))
+            if not batch:
+                return
+            yield from self._check_batch(batch, row)
+            row += len(batch)
+
+    # ---------- приватні методи ----------
+
+    def _check_batch(self, batch: List[Any], row: int) -> List[Dict[str, Any]]:
+        errors: Dict[int, List[str]] = {}
+        fixes: Dict[int, Dict[str, Any]] = {}
+        for index, record in enumerate(batch):
+            if not isinstance(record, dict):
+                errors[index] = [f"expected an object, got {type(record).__name__}"]
+        rows = [i for i in range(len(batch)) if i not in errors]
+
+        for rule in self.fields:
+            column = [batch[i].get(rule.name, _MISSING) for i in rows]
+            if rule.column_ok(column):
+                continue
+            for index, value in zip(rows, column):
+                if type(value) in rule.fast_types and rule.bounds is None:
+                    continue
+                try:
+                    fixed = rule.check(value)
+                except InvalidValue as err:
+                    errors.setdefault(index, []).append(str(err))
+                    continue
+                if fixed is not value:
+                    fixes.setdefault(index, {})[rule.name] = fixed
+
+        valid = []
+        for index, record in enumerate(batch):
+            if index in errors:
+                self.rejected.append(
+                    {"row": row + index, "errors": errors[index], "record": record}
+                )
+            elif index in fixes:
+                # вхідний запис не змінюємо: він уже у raw-файлі і в кеші дня
+                valid.append({**record, **fixes[index]})
+            else:
+                valid.append(record)
+        self.valid += len(valid)
+        return valid
+
+
+def _field_rule(field: Dict[str, Any]) -> _FieldRule:
+    fast_types, coerce, bounds = _type_rule(field["type"])
+    return _FieldRule(
+        field["name"], fast_types, coerce, field.get("default", _MISSING), bounds
+    )
+
+
+def _type_rule(avro_type: Any) -> tuple:
+    """(fast_types, coerce, bounds) для типу поля схеми."""
+    if isinstance(avro_type, dict) and avro_type.get("type") in _PRIMITIVES:
+        avro_type = avro_type["type"]  # logicalType поверх примітива
+    if isinstance(avro_type, str) and avro_type in _PRIMITIVES:
+        fast_types, coerce = _PRIMITIVES[avro_type]
+        return fast_types, coerce, _INT_BOUNDS.get(avro_type)
+    if isinstance(avro_type, list) and all(
+        isinstance(member, str) and member in _PRIMITIVES for member in avro_type
+    ):
+        return _union_rule(avro_type)
+    return frozenset(), _generic_coerce(avro_type), None
+
+
+def _union_rule(members: List[str]) -> tuple:
+    rules = [_PRIMITIVES[member] for member in members]
+    fast_types = frozenset().union(*(types for types, _ in rules))
+    bounds = [_INT_BOUNDS[m] for m in members if m in _INT_BOUNDS]
+
+    def coerce(value: Any) -> Any:
+        if type(value) in fast_types:
+            return value
+        reasons = []
+        for member, (_, member_coerce) in zip(members, rules):
+            try:
+                return member_coerce(value)
+            except InvalidValue as err:
+                reasons.append(f"{member}: {err}")
+        raise InvalidValue("; ".join(reasons))
+
+    return fast_types, coerce, min(bounds) if bounds else None
+
+
+def _generic_coerce(avro_type: Any) -> Callable[[Any], Any]:
+    parsed = fastavro.parse_schema(avro_type)
+
+    def coerce(value: Any) -> Any:
+        if not fastavro.validation.validate(value, parsed, raise_errors=False):
+            raise InvalidValue(f"{_describe(value)} does not match the schema")
+        return value
+
+    return coerce
+
+
+def _describe(value: Any) -> str:
+    text = repr(value)
+    return f"{type(value).__name__} {text[:40]}{'...' if len(text) > 40 else ''}"
+
+
+def _reject(expected: str) -> Callable[[Any], Any]:
+    def coerce(value: Any) -> Any:
+        raise InvalidValue(f"expected {expected}, got {_describe(value)}")
+
+    return coerce
+
+
+def _to_float(value: Any) -> float:
+    if type(value) in (int, float):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise InvalidValue(f"expected a number, got {_describe(value)}")
+
+
+def _to_int(value: Any) -> int:
+    if type(value) is int:
+        return value
+    if type(value) is float and math.isfinite(value) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise InvalidValue(f"expected an integer, got {_describe(value)}")
+
+
+# тип Avro -> (типи Python без змін, зведення решти)
+_PRIMITIVES: Dict[str, tuple] = {
+    "null": (frozenset({type(None)}), _reject("null")),
+    "boolean": (frozenset({bool}), _reject("a boolean")),
+    "int": (frozenset({int}), _to_int),
+    "long": (frozenset({int}), _to_int),
+    "float": (frozenset({int, float}), _to_float),
+    "double": (frozenset({int, float}), _to_float),
+    "string": (frozenset({str}), _reject("a string")),
+    "bytes": (frozenset({bytes}), _reject("bytes")),
+}
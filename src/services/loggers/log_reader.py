@@ -0,0 +1,229 @@
+import gzip
+import logging
+import os
+import re
+import zlib
+from collections import deque
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+# початок запису: текстовий формат або JSON lines (див. time_formatter.py)
+_TEXT_HEAD = re.compile(rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \[(\w+)\]")
+_JSON_HEAD = re.compile(rb'^\{"time": "([^"]+)", "level": "(\w+)"')
+
+# запис логу: (time, level, text); time/level None — рядки без заголовка
+Record = Tuple[Optional[str], Optional[str], bytes]
+
+
+def iter_lines_reversed(path: str, block_size: int = 64 * 1024) -> Iterator[bytes]:
+    """Рядки файлу з кінця до початку; читаємо блоками, не весь файл."""
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            block = f.read(step) + remainder
+            lines = block.split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line:
+                    yield line + b"\n"
+        if remainder:
+            yield remainder + b"\n"
+
+
+def iter_records_reversed(path: str) -> Iterator[Record]:
+    """
+    Записи логу з кінця: (time, level, text).
+    Рядки без заголовка (traceback) приклеюються до попереднього запису.
+    """
+    continuation: List[bytes] = []
+    for line in iter_lines_reversed(path):
+        head = _TEXT_HEAD.match(line) or _JSON_HEAD.match(line)
+        if not head:
+            continuation.append(line)
+            continue
+        text = line + b"".join(reversed(continuation))
+        continuation = []
+        yield head.group(1).decode(), head.group(2).decode(), text
+    if continuation:
+        yield None, None, b"".join(reversed(continuation))
+
+
+def iter_records(lines: Iterable[bytes]) -> Iterator[Record]:
+    """Записи логу в порядку запису: (time, level, text), як iter_records_reversed."""
+    head: Tuple[Optional[str], Optional[str]] = (None, None)
+    parts: List[bytes] = []
+    for line in lines:
+        if line == b"\n":
+            continue
+        if not line.endswith(b"\n"):
+            line += b"\n"
+        match = _TEXT_HEAD.match(line) or _JSON_HEAD.match(line)
+        if not match:
+            parts.append(line)
+            continue
+        if parts:
+            yield head[0], head[1], b"".join(parts)
+        head = (match.group(1).decode(), match.group(2).decode())
+        parts = [line]
+    if parts:
+        yield head[0], head[1], b"".join(parts)
+
+
+def log_files(path: str) -> List[str]:
+    """
+    Поточний файл логу і його ротовані копії (app.log.1.gz, app.log.2022-08-09.gz,
+    ...) від новіших до старших. Архів отримує mtime у момент ротації, а
+    перейменування .1.gz -> .2.gz його не змінює, тож порядок за mtime
+    однаковий для ротації за розміром і за часом.
+    """
+    directory, base = os.path.split(os.path.abspath(path))
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    archives = []
+    for name in names:
+        # .lock — файл локу ротації, .tmp — архів, який саме стискається
+        if name.startswith(f"{base}.") and not name.endswith((".lock", ".tmp")):
+            full = os.path.join(directory, name)
+            try:
+                archives.append((os.stat(full).st_mtime, full))
+            except FileNotFoundError:
+                continue
+    archives.sort(reverse=True)
+    current = [path] if os.path.exists(path) else []
+    return current + [full for _, full in archives]
+
+
+def read_log(
+    path: str,
+    tail: Optional[int] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    level: Optional[str] = None,
+) -> Iterator[bytes]:
+    """
+    Вибірка з логу в хронологічному порядку, разом із ротованими копіями
+    (зокрема .gz), що потрапляють у вікно:
+    - tail: останні N записів (після фільтрів)
+    - since/until: межі часу 'YYYY-MM-DD[ HH:MM[:SS]]' (until включно)
+    - level: мінімальний рівень (WARNING -> WARNING, ERROR, CRITICAL)
+    Генератор: без tail записи віддаються одразу, по мірі читання файлів
+    (від найстаршого потрібного), в пам'яті не накопичуються; з tail у
+    пам'яті не більше N записів, а поточний файл читається з кінця.
+    Читання зупиняється, щойно записи вийшли за межі вікна.
+    """
+    since = _normalize(since)
+    until = _normalize(until)
+    min_level = logging.getLevelName(level.upper()) if level else None
+    if not isinstance(min_level, int):
+        min_level = None
+
+    def level_ok(level_: Optional[str]) -> bool:
+        if min_level is None:
+            return True
+        levelno = logging.getLevelName(level_) if level_ else None
+        return isinstance(levelno, int) and levelno >= min_level
+
+    files = _files_in_window(log_files(path), since)
+    if tail:
+        yield from _tail(files, tail, since, until, level_ok)
+        return
+    for file in reversed(files):
+        for time_, level_, text in _iter_file(file):
+            if time_ is not None:
+                if since and time_ < since:
+                    continue
+                if until and time_[: len(until)] > until:
+                    return
+            if level_ok(level_):
+                yield text
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Стиснути потік байтів у gzip на льоту."""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _tail(
+    files: List[str],
+    tail: int,
+    since: Optional[str],
+    until: Optional[str],
+    level_ok: Callable[[Optional[str]], bool],
+) -> Iterator[bytes]:
+    """Останні tail записів вікна: файли від новішого, не більше tail у пам'яті."""
+    selected: List[bytes] = []  # від новіших до старших
+    for file in files:
+        remaining = tail - len(selected)
+        if file.endswith(".gz"):
+            # архів не прочитати з кінця: прохід уперед, тримаємо останні remaining
+            found: Deque[bytes] = deque(maxlen=remaining)
+            for time_, level_, text in _iter_file(file):
+                if time_ is not None:
+                    if since and time_ < since:
+                        continue
+                    if until and time_[: len(until)] > until:
+                        break
+                if level_ok(level_):
+                    found.append(text)
+            selected.extend(reversed(found))
+        else:
+            for time_, level_, text in iter_records_reversed(file):
+                if time_ is not None:
+                    if since and time_ < since:
+                        break
+                    if until and time_[: len(until)] > until:
+                        continue
+                if level_ok(level_):
+                    selected.append(text)
+                    if len(selected) >= tail:
+                        break
+        if len(selected) >= tail:
+            break
+    yield from reversed(selected)
+
+
+def _files_in_window(files: List[str], since: Optional[str]) -> List[str]:
+    """
+    Файли (від новіших), що можуть містити записи з since: старші за файл,
+    який почався раніше since, вже не потрібні.
+    """
+    if not since:
+        return files
+    needed = []
+    for file in files:
+        needed.append(file)
+        first = _first_time(file)
+        if first is not None and first < since:
+            break
+    return needed
+
+
+def _first_time(path: str) -> Optional[str]:
+    for time_, _, _ in _iter_file(path):
+        if time_ is not None:
+            return time_
+    return None
+
+
+def _iter_file(path: str) -> Iterator[Record]:
+    """Записи файлу (звичайного або .gz) в порядку запису; зниклий файл — порожній."""
+    opener = gzip.open if path.endswith(".gz") else open
+    try:
+        with opener(path, "rb") as f:
+            yield from iter_records(f)
+    except FileNotFoundError:
+        return
+
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    return value.strip().replace("T", " ") if value else None
@@ -1,25 +1,187 @@
+import atexit
+import copy
 import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 from src.config import FILE_LOG as filename
-from src.services.loggers.time_formatter import KyivTimeFormatter
+from src.config import (
+    LOG_BACKUP_COUNT,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_MAX_BYTES,
+    LOG_QUEUE_POLICY,
+    LOG_QUEUE_SIZE,
+    LOG_ROTATE_WHEN,
+)
+from src.services.loggers.request_context import RequestContextFilter
+from src.services.loggers.rotation import build_file_handler
+from src.services.loggers.time_formatter import JsonLinesFormatter, KyivTimeFormatter
 
 _format = (
     f"%(asctime)s [%(levelname)s] - %(name)s - %(funcName)s(%(lineno)d) - %(message)s"
 )
+# LOG_FORMAT=json -> один JSON-об'єкт на рядок
+_formatter_class = JsonLinesFormatter if LOG_FORMAT == "json" else KyivTimeFormatter
+
+# усі модулі застосунку — нащадки цього логера (імена src.*)
+APP_LOGGER = "src"
+
+
+# traceback у текст ще в потоці, що логує (див. BoundedQueueHandler.prepare)
+_exc_formatter = logging.Formatter()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    QueueHandler з обмеженою чергою.
+    policy="drop"  — якщо черга повна, запис відкидається (потік запиту не чекає);
+    policy="block" — чекаємо на місце не довше timeout секунд, потім відкидаємо.
+    Traceback не вклеюється в msg (як у QueueHandler.prepare), а йде в черзі
+    окремо, у exc_text: текстовий форматер допише його як звичайно, а JSON —
+    покладе в поле exc_info.
+    """
+
+    def __init__(self, log_queue: queue.Queue, policy: str = "drop", timeout=1.0):
+        super().__init__(log_queue)
+        self.policy = policy
+        self.timeout = timeout
+        self.dropped = 0
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = _exc_formatter.formatException(record.exc_info)
+            record.exc_info = None  # traceback-об'єкти не передаємо між потоками
+        return record
 
-file_handler = logging.FileHandler(filename=filename)
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+file_handler = build_file_handler(
+    filename=filename,
+    when=LOG_ROTATE_WHEN,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+)
 file_handler.setLevel(level=logging.INFO)
-file_handler.setFormatter(fmt=KyivTimeFormatter(_format))
+file_handler.setFormatter(fmt=_formatter_class(_format))
 
 stream_handler = logging.StreamHandler()
 stream_handler.setLevel(level=logging.DEBUG)
-stream_handler.setFormatter(fmt=KyivTimeFormatter(_format))
+stream_handler.setFormatter(fmt=_formatter_class(_format))
+
+# Логери пишуть лише в чергу, а диск/stdout обслуговує окремий потік listener-а
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+queue_handler = BoundedQueueHandler(log_queue, policy=LOG_QUEUE_POLICY)
+queue_handler.addFilter(RequestContextFilter())
+# маркер: за ним setup_logging впізнає вже налаштований логер,
+# навіть якщо py_logger імпортовано вдруге під іншим ім'ям модуля
+queue_handler.is_app_queue_handler = True
+listener = QueueListener(
+    log_queue, file_handler, stream_handler, respect_handler_level=True
+)
+
+
+def start_logging() -> None:
+    """Запустити потік listener-а (ідемпотентно)."""
+    if listener._thread is None:
+        listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Дочекатися запису всього, що лишилось у черзі, і зупинити listener.
+    Викликається з atexit і з gunicorn-хука worker_exit.
+    """
+    if listener._thread is None:
+        return
+    listener.stop()
+    if queue_handler.dropped:
+        record = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"{queue_handler.dropped} log records dropped (queue full)",
+            }
+        )
+        listener.handle(record)
+
+
+def _reinit_after_fork() -> None:
+    """
+    Після fork (gunicorn preload_app) потоку listener-а в дочірньому процесі нема,
+    а lock черги міг бути захоплений. Даємо дитині свою чергу і свій listener;
+    записи батька, що не встигли записатися, лишаються батькові.
+    """
+    if listener._thread is None:
+        return
+    fresh_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler.queue = fresh_queue
+    listener.queue = fresh_queue
+    listener._thread = None
+    listener.start()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_after_fork)
+
+
+def parse_levels(value: str) -> dict:
+    """'src.services=INFO,src.flask_app.routes=WARNING' -> {name: level}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _app_handler(logger: logging.Logger):
+    for handler in logger.handlers:
+        if getattr(handler, "is_app_queue_handler", False):
+            return handler
+    return None
+
+
+def setup_logging() -> logging.Logger:
+    """
+    Одноразове налаштування логування: єдиний QueueHandler на логері "src",
+    рівень LOG_LEVEL і перевизначення рівнів модулів з LOG_LEVELS.
+    Дочірні логери нічого не додають, а лише передають записи вгору,
+    тому кожен запис форматується і пишеться рівно один раз.
+    """
+    app_logger = logging.getLogger(APP_LOGGER)
+    if _app_handler(app_logger):
+        return app_logger
+    app_logger.setLevel(LOG_LEVEL)
+    app_logger.addHandler(queue_handler)
+    for name, level in parse_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    start_logging()
+    atexit.register(stop_logging)
+    return app_logger
 
 
 def get_logger(name):
+    app_logger = setup_logging()
     logger = logging.getLogger(name=name)
-    logger.setLevel(level=logging.DEBUG)
-    logger.addHandler(hdlr=file_handler)
-    logger.addHandler(hdlr=stream_handler)
+    if name != APP_LOGGER and not name.startswith(f"{APP_LOGGER}."):
+        # логери поза src.* (наприклад __main__) отримують той самий handler
+        if not _app_handler(logger):
+            logger.addHandler(hdlr=_app_handler(app_logger))
+        if logger.level == logging.NOTSET:
+            logger.setLevel(level=app_logger.level)
     return logger
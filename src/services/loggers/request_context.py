@@ -0,0 +1,21 @@
+import logging
+import sys
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Додає request_id і route поточного Flask-запиту до кожного запису.
+    Працює в потоці запиту (фільтр висить на QueueHandler), тому контекст ще живий.
+    Flask не імпортується: якщо його нема в sys.modules, то й запиту нема.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        flask = sys.modules.get("flask")
+        if flask is None or not flask.has_request_context():
+            return True
+        request = flask.request
+        if not hasattr(record, "request_id"):
+            record.request_id = getattr(flask.g, "request_id", None)
+        if not hasattr(record, "route"):
+            record.route = request.url_rule.rule if request.url_rule else request.path
+        return True
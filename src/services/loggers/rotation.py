@@ -0,0 +1,105 @@
+import fcntl
+import gzip
+import logging
+import os
+import shutil
+import time
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+
+
+def gzip_namer(name: str) -> str:
+    """app.log.1 -> app.log.1.gz"""
+    return f"{name}.gz"
+
+
+def gzip_rotator(source: str, dest: str) -> None:
+    """Перейменувати поточний файл і стиснути його в архів."""
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    os.rename(source, tmp)
+    with open(tmp, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(tmp)
+
+
+class _SharedRolloverMixin:
+    """
+    Ротація, безпечна для кількох процесів (gunicorn-воркерів), що пишуть в один файл:
+    - перед записом перевіряємо, чи файл не перейменував інший процес (як WatchedFileHandler)
+    - сама ротація — під fcntl-локом; якщо інший процес уже повернув файл, лише перевідкриваємо
+    """
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._reopen_if_moved()
+        super().emit(record)
+
+    def doRollover(self) -> None:
+        with open(f"{self.baseFilename}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                if self._reopen_if_moved() or self._already_rotated():
+                    self._skip_rollover()
+                    return
+                super().doRollover()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _reopen_if_moved(self) -> bool:
+        if self.stream is None:
+            return False
+        try:
+            disk = os.stat(self.baseFilename)
+            opened = os.fstat(self.stream.fileno())
+            if (disk.st_dev, disk.st_ino) == (opened.st_dev, opened.st_ino):
+                return False
+        except FileNotFoundError:
+            pass
+        self.stream.close()
+        self.stream = self._open()
+        return True
+
+    def _already_rotated(self) -> bool:
+        return False
+
+    def _skip_rollover(self) -> None:
+        pass
+
+
+class SharedRotatingFileHandler(_SharedRolloverMixin, RotatingFileHandler):
+    """Ротація за розміром (maxBytes) з gzip-архівами."""
+
+
+class SharedTimedRotatingFileHandler(_SharedRolloverMixin, TimedRotatingFileHandler):
+    """Ротація за часом (when/interval) з gzip-архівами."""
+
+    def _already_rotated(self) -> bool:
+        period_start = self.rolloverAt - self.interval
+        time_tuple = (
+            time.gmtime(period_start) if self.utc else time.localtime(period_start)
+        )
+        dfn = self.rotation_filename(
+            f"{self.baseFilename}.{time.strftime(self.suffix, time_tuple)}"
+        )
+        return os.path.exists(dfn)
+
+    def _skip_rollover(self) -> None:
+        self.rolloverAt = self.computeRollover(int(time.time()))
+
+
+def build_file_handler(
+    filename: str, when: str = "size", max_bytes: int = 0, backup_count: int = 0
+) -> logging.FileHandler:
+    """
+    when="size" -> ротація за розміром max_bytes;
+    інакше — за часом ('midnight', 'H', 'D', 'W0'...), як у TimedRotatingFileHandler.
+    """
+    if when == "size":
+        handler = SharedRotatingFileHandler(
+            filename, maxBytes=max_bytes, backupCount=backup_count, delay=True
+        )
+    else:
+        handler = SharedTimedRotatingFileHandler(
+            filename, when=when, backupCount=backup_count, delay=True
+        )
+    handler.namer = gzip_namer
+    handler.rotator = gzip_rotator
+    return handler
@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Обмеження повторюваних повідомлень для "гарячих" циклів і збоїв апстріму:
+    - every_n: пропускаємо 1 з N однакових повідомлень (перше — завжди);
+    - max_per_interval: не більше K однакових повідомлень за interval секунд.
+    Однаковість — за (logger, level, шаблон msg) до підстановки аргументів,
+    тому виклики мають бути ліниві: logger.debug("page %s", page), не f-рядок.
+    Кількість пригнічених записів дописується до наступного пропущеного.
+    Записи вище max_level (WARNING+) не проріджуються 1 з N, але теж обмежені:
+    не більше warning_per_interval однакових за interval (None — той самий
+    max_per_interval), щоб збій апстріму не заливав лог; перші з них
+    проходять завжди, решта — підсумком "N similar suppressed".
+    """
+
+    def __init__(
+        self,
+        every_n: int = 1,
+        max_per_interval: Optional[int] = None,
+        interval: float = 60.0,
+        max_keys: int = 1024,
+        max_level: int = logging.INFO,
+        warning_per_interval: Optional[int] = None,
+    ) -> None:
+        super().__init__()
+        self.every_n = max(1, every_n)
+        self.max_per_interval = max_per_interval
+        self.interval = interval
+        self.max_keys = max_keys
+        self.max_level = max_level
+        self.warning_per_interval = (
+            max_per_interval if warning_per_interval is None else warning_per_interval
+        )
+        self._lock = threading.Lock()
+        # key -> [seen, window_start, passed_in_window, suppressed]
+        self._state: "OrderedDict[tuple, list]" = OrderedDict()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        severe = record.levelno > self.max_level
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [0, now, 0, 0]
+                if len(self._state) > self.max_keys:
+                    self._state.popitem(last=False)
+            else:
+                self._state.move_to_end(key)
+            seen = state[0]
+            state[0] += 1
+            if now - state[1] >= self.interval:
+                state[1], state[2] = now, 0
+
+            limit = self.warning_per_interval if severe else self.max_per_interval
+            allowed = severe or seen % self.every_n == 0
+            if allowed and limit is not None:
+                allowed = state[2] < limit
+            if not allowed:
+                state[3] += 1
+                return False
+            state[2] += 1
+            suppressed, state[3] = state[3], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.getMessage()} [{suppressed} similar suppressed]"
+            record.args = None
+        return True
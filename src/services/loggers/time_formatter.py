@@ -1,14 +1,58 @@
+import json
 from datetime import datetime
-from logging import Formatter
-
-import pytz
+from logging import Formatter, LogRecord
+from zoneinfo import ZoneInfo
 
 ZONE = "Europe/Kyiv"
+KYIV_TZ = ZoneInfo(ZONE)
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# поля запиту, які додає RequestContextFilter / after_request
+REQUEST_FIELDS = ("request_id", "route", "method", "status", "duration_ms", "timings")
 
 
 class KyivTimeFormatter(Formatter):
-    """Setting Kyiv time."""
+    """
+    Setting Kyiv time.
+    Час береться з record.created (а не з моменту форматування), тож записи,
+    що полежали в черзі, мають правильний timestamp. Відформатована секунда
+    кешується: у секунді зазвичай багато записів.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._cached = (None, "")
+
+    def formatTime(self, record: LogRecord, datefmt=None) -> str:
+        second = int(record.created)
+        cached_second, cached_text = self._cached
+        if second != cached_second or datefmt:
+            kyiv_time = datetime.fromtimestamp(second, tz=KYIV_TZ)
+            cached_text = kyiv_time.strftime(datefmt or DATE_FORMAT)
+            if not datefmt:
+                self._cached = (second, cached_text)
+        return cached_text
+
+
+class JsonLinesFormatter(KyivTimeFormatter):
+    """Один JSON-об'єкт на рядок (для машинного розбору логів)."""
 
-    def formatTime(self, record, datefmt=None) -> str:
-        kyiv_time = datetime.now(tz=pytz.timezone(zone=ZONE)).replace(tzinfo=None)
-        return kyiv_time.strftime("%Y-%m-%d %H:%M:%S")
+    def format(self, record: LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "func": record.funcName,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        for field in REQUEST_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        # з черги (BoundedQueueHandler.prepare) traceback приходить уже в exc_text
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
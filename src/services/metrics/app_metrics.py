@@ -0,0 +1,95 @@
+import hashlib
+import os
+import tempfile
+
+from src.config import FILE_STORAGE, METRICS_DIR, METRICS_FLUSH_INTERVAL
+from src.services.metrics.registry import MetricsRegistry
+
+
+def default_directory(file_storage: str = FILE_STORAGE) -> str:
+    """
+    <tmp>/robotdreams_metrics_<хеш FILE_STORAGE>: свій каталог на інстанс, бо
+    master при старті чистить його (registry.clear) і зливає файли мертвих pid.
+    """
+    digest = hashlib.md5(os.path.realpath(file_storage).encode()).hexdigest()
+    return os.path.join(tempfile.gettempdir(), f"robotdreams_metrics_{digest[:8]}")
+
+
+# один реєстр на процес; файли значень спільні для всіх воркерів (METRICS_DIR)
+registry = MetricsRegistry(
+    METRICS_DIR or default_directory(), flush_interval=METRICS_FLUSH_INTERVAL
+)
+
+# ---------- HTTP (Flask і ASGI) ----------
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template, method and status.",
+    labels=("route", "method", "status"),
+)
+JOBS_REJECTED = registry.counter(
+    "sales_jobs_rejected_total",
+    "Job requests answered with 429 by reason (rate, concurrency).",
+    labels=("reason",),
+)
+
+# ---------- апстрім API продажів (APITool._get / AsyncAPITool._get) ----------
+
+UPSTREAM_PAGE_LATENCY = registry.histogram(
+    "sales_api_page_duration_seconds",
+    "Latency of one upstream /sales page request.",
+    labels=("client",),
+)
+UPSTREAM_ERRORS = registry.counter(
+    "sales_api_errors_total",
+    "Failed upstream page requests by error kind (http, connection, other).",
+    labels=("client", "kind"),
+)
+
+# ---------- джоби і сховище (SalesExporter) ----------
+
+JOB_STAGE_LATENCY = registry.histogram(
+    "sales_job_stage_duration_seconds",
+    "Duration of job stages: fetch, serialize, write, db, schema, avro.",
+    labels=("stage",),
+)
+JOBS_IN_FLIGHT = registry.gauge(
+    "sales_jobs_in_flight",
+    "Sales export jobs currently running, summed over live workers.",
+    labels=("mode",),
+)
+RECORDS_WRITTEN = registry.counter(
+    "sales_records_written_total",
+    "Sales records written per storage zone (raw, stg, quarantine, db).",
+    labels=("zone",),
+)
+BYTES_WRITTEN = registry.counter(
+    "sales_bytes_written_total",
+    "Bytes written per storage zone.",
+    labels=("zone",),
+)
+CACHE_REQUESTS = registry.counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit, miss); "
+    "hit ratio = hit / (hit + miss).",
+    labels=("cache", "result"),
+)
+
+
+def render_metrics() -> str:
+    """Текст /metrics: злиті значення всіх процесів + похідний hit ratio кешів."""
+    collected = registry.collect()
+    lookups = collected.get(CACHE_REQUESTS.name, {}).get("samples", {})
+    ratios = {}
+    for cache in {key[0] for key in lookups}:
+        hits = lookups.get((cache, "hit"), 0)
+        total = hits + lookups.get((cache, "miss"), 0)
+        ratios[(cache,)] = hits / total if total else 0.0
+    if ratios:
+        collected["cache_hit_ratio"] = {
+            "type": "gauge",
+            "help": "Cache hit ratio since start across all workers.",
+            "labels": ["cache"],
+            "samples": ratios,
+        }
+    return registry.render(collected)
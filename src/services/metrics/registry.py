@@ -0,0 +1,366 @@
+import atexit
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# файл, куди зливаються лічильники і гістограми завершених процесів
+AGGREGATE_FILE = "aggregate.json"
+# лок директорії: злиття (exclusive) проти читання при скрейпі (shared)
+LOCK_FILE = "registry.lock"
+
+# межі бакетів гістограм латентності, секунди
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        registry: "MetricsRegistry",
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+    ) -> None:
+        self.registry = registry
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _describe(self) -> Dict[str, Any]:
+        return {"type": self.kind, "help": self.help, "labels": list(self.labels)}
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+        self.registry.mark_dirty()
+
+
+class Gauge(Counter):
+    """Значення процесу; при агрегації сумуються лише живі процеси."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_inprogress(self, **labels: Any) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args: Any, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self.registry.lock:
+            state = self._values.get(key)
+            if state is None:
+                # [лічильники по бакетах (+Inf останній), сума, кількість]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+        self.registry.mark_dirty()
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _describe(self) -> Dict[str, Any]:
+        return {**super()._describe(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """
+    Метрики, безпечні для кількох gunicorn-воркерів:
+    - кожен процес оновлює лише свої значення в пам'яті (без I/O у запиті);
+    - фоновий потік раз на flush_interval скидає їх у <directory>/<pid>.json
+      (атомарною заміною файлу);
+    - при скрейпі /metrics файли всіх процесів зливаються: лічильники і
+      гістограми сумуються (включно з воркерами, що вже завершились, щоб
+      значення не "відкочувались"), gauge — лише по живих процесах;
+    - файл завершеного воркера master зливає в aggregate.json і видаляє
+      (mark_process_dead з child_exit), тож файлів не більше, ніж живих
+      процесів; процес, що отримав pid мертвого, перед першим записом
+      так само зливає його файл, а не перезаписує.
+    Директорію очищає master при старті (clear()), див. gunicorn.conf.py.
+    """
+
+    def __init__(self, directory: str, flush_interval: float = 1.0) -> None:
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.metrics: Dict[str, _Metric] = {}
+        self._flush_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # чи файл <pid>.json уже наш (а не лишений попереднім процесом із цим pid)
+        self._claimed = False
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+        atexit.register(self.flush)
+
+    # ---------- оголошення метрик ----------
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        return self._register(Counter(self, name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        return self._register(Gauge(self, name, help_text, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        return self._register(Histogram(self, name, help_text, labels, buckets=buckets))
+
+    # ---------- запис і читання ----------
+
+    def mark_dirty(self) -> None:
+        self._dirty.set()
+        if self._flusher is None:
+            with self.lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name="metrics-flush", daemon=True
+                    )
+                    self._flusher.start()
+
+    def flush(self) -> None:
+        """Записати значення поточного процесу у його файл."""
+        self._dirty.clear()
+        with self.lock:
+            snapshot = {
+                name: {
+                    **metric._describe(),
+                    "samples": [[list(k), v] for k, v in metric._values.items()],
+                }
+                for name, metric in self.metrics.items()
+                if metric._values
+            }
+        if not snapshot:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with self._flush_lock:
+            if not self._claimed:
+                # файл із нашим pid міг лишити мертвий процес (pid перевикористано)
+                self.mark_process_dead(os.getpid())
+                self._claimed = True
+            _write_json(self._path(os.getpid()), snapshot)
+
+    def mark_process_dead(self, pid: int) -> None:
+        """
+        Злити лічильники і гістограми завершеного процесу в aggregate.json і
+        видалити його файл (gauge мертвого процесу відкидаються).
+        Викликає master з child_exit, див. gunicorn.conf.py.
+        """
+        path = self._path(pid)
+        if not os.path.exists(path):
+            return
+        with self._directory_lock(fcntl.LOCK_EX):
+            snapshot = _read_json(path)
+            if snapshot:
+                aggregate_path = os.path.join(self.directory, AGGREGATE_FILE)
+                aggregate = _read_json(aggregate_path) or {}
+                for name, data in snapshot.items():
+                    if data["type"] == "gauge":
+                        continue
+                    target = aggregate.setdefault(name, {**data, "samples": []})
+                    samples = {tuple(key): value for key, value in target["samples"]}
+                    for key, value in data["samples"]:
+                        _merge(samples, tuple(key), value)
+                    target["samples"] = [[list(k), v] for k, v in samples.items()]
+                _write_json(aggregate_path, aggregate)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        """Злиті значення всіх процесів: name -> {type, help, ..., samples}."""
+        self.flush()
+        merged: Dict[str, Dict[str, Any]] = {}
+        with self._directory_lock(fcntl.LOCK_SH):
+            snapshots = []
+            for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+                stem = os.path.basename(path)[: -len(".json")]
+                if stem.isdigit():
+                    alive = _pid_alive(int(stem))
+                elif os.path.basename(path) == AGGREGATE_FILE:
+                    alive = False
+                else:
+                    continue
+                snapshot = _read_json(path)
+                if snapshot is not None:
+                    snapshots.append((alive, snapshot))
+        for alive, snapshot in snapshots:
+            for name, data in snapshot.items():
+                if data["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**data, "samples": {}})
+                for key, value in data["samples"]:
+                    _merge(target["samples"], tuple(key), value)
+        return merged
+
+    def render(self, collected: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """Текстовий формат Prometheus (exposition format 0.0.4)."""
+        lines: List[str] = []
+        if collected is None:
+            collected = self.collect()
+        for name, data in sorted(collected.items()):
+            lines.append(f"# HELP {name} {data['help']}")
+            lines.append(f"# TYPE {name} {data['type']}")
+            labels = data["labels"]
+            for key, value in sorted(data["samples"].items()):
+                pairs = list(zip(labels, key))
+                if data["type"] != "histogram":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                bounds = [_number(b) for b in data["buckets"]] + ["+Inf"]
+                for bound, bucket in zip(bounds, counts):
+                    cumulative += bucket
+                    le = _labels(pairs + [("le", bound)])
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(pairs)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Видалити файли попереднього запуску (викликає master до fork)."""
+        for path in glob.glob(os.path.join(self.directory, "*.json*")):
+            os.remove(path)
+
+    # ---------- приватні методи ----------
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}.json")
+
+    @contextmanager
+    def _directory_lock(self, mode: int) -> Iterator[None]:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _register(self, metric: _Metric) -> Any:
+        with self.lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+        return metric
+
+    def _flush_loop(self) -> None:
+        while True:
+            self._dirty.wait()
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except OSError:
+                pass
+
+    def _reset_after_fork(self) -> None:
+        # значення master-а лишаються в його файлі; потік flush у дитині не живе
+        self.lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._flusher = None
+        self._claimed = False
+        for metric in self.metrics.values():
+            metric._values = {}
+
+
+def _merge(samples: Dict[LabelValues, Any], key: LabelValues, value: Any) -> None:
+    current = samples.get(key)
+    if current is None:
+        samples[key] = value
+    elif isinstance(value, list):
+        counts = [a + b for a, b in zip(current[0], value[0])]
+        samples[key] = [counts, current[1] + value[1], current[2] + value[2]]
+    else:
+        samples[key] = current + value
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict[str, Any]) -> None:
+    """Атомарна заміна файлу: читачі бачать або старий, або новий вміст."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
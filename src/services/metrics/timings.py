@@ -0,0 +1,82 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from src.services.metrics.app_metrics import JOB_STAGE_LATENCY
+
+# порядок стадій у Server-Timing / логах, якщо вони траплялись у запиті
+STAGE_ORDER = ("fetch", "page", "serialize", "write", "db", "schema", "avro")
+
+
+class StageTimings:
+    """
+    Тривалості стадій одного запиту: стадія -> [сума секунд, кількість].
+    Повторювані стадії (page) сумуються, кількість іде в desc Server-Timing.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        entry = self.stages.setdefault(stage, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def as_dict(self) -> Dict[str, float]:
+        """{стадія: мс} + total, для JSON-відповіді і структурованого логу."""
+        result = {name: round(self.stages[name][0] * 1000, 2) for name in self._names()}
+        result["total"] = round((time.perf_counter() - self.started) * 1000, 2)
+        return result
+
+    def server_timing(self) -> str:
+        """Значення заголовка Server-Timing (W3C): 'fetch;dur=812.3, page;dur=...'."""
+        parts = []
+        for name, duration in self.as_dict().items():
+            part = f"{name};dur={duration}"
+            count = self.stages.get(name, [0, 0])[1]
+            if count > 1:
+                part += f';desc="{count}x"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def _names(self) -> List[str]:
+        known = [name for name in STAGE_ORDER if name in self.stages]
+        return known + [name for name in self.stages if name not in STAGE_ORDER]
+
+
+_current: ContextVar[Optional[StageTimings]] = ContextVar("stage_timings", default=None)
+
+
+@contextmanager
+def collect_timings() -> Iterator[StageTimings]:
+    """
+    Збирати стадії всього, що виконується всередині (у цьому потоці/таску
+    і в executor-потоках, запущених зі скопійованим контекстом).
+    """
+    timings = StageTimings()
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Додати вже виміряну тривалість до поточного запиту (якщо він збирає)."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Виміряти стадію: у таймінги поточного запиту і в гістограму /metrics."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        record_stage(name, elapsed)
+        JOB_STAGE_LATENCY.observe(elapsed, stage=name)
@@ -0,0 +1,191 @@
+import cProfile
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from src.services.loggers.py_logger import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("cprofile", "sample")
+# профіль запиту може записуватись лише один за раз (cProfile не вкладається)
+_busy = threading.Lock()
+
+
+class StackSampler:
+    """
+    Семплінговий профайлер одного потоку: раз на interval секунд знімає стек
+    цільового потоку (sys._current_frames) і рахує однакові стеки.
+    Результат — collapsed stacks ("a;b;c N"), вхід для flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.items())
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                module = frame.f_globals.get("__name__", "?")
+                stack.append(f"{module}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class ProfileStore:
+    """
+    Директорія з профілями: <id>.prof (pstats, cProfile) і <id>.folded
+    (collapsed stacks). Зберігаються лише останні keep профілів.
+    """
+
+    SUFFIXES = (".prof", ".folded")
+
+    def __init__(self, directory: Union[str, Path], keep: int = 20) -> None:
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def new_id(self, label: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", label).strip("-")[:40] or "root"
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return f"{stamp}_{slug}_{uuid.uuid4().hex[:6]}"
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Файли профілів, новіші першими."""
+        if not self.directory.exists():
+            return []
+        files = [p for p in self.directory.iterdir() if p.suffix in self.SUFFIXES]
+        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        return [{"name": p.name, "bytes": p.stat().st_size} for p in files]
+
+    def path(self, name: str) -> Optional[Path]:
+        """Шлях до файлу профілю за іменем або None (без виходу за директорію)."""
+        candidate = self.directory / Path(name).name
+        if candidate.suffix in self.SUFFIXES and candidate.is_file():
+            return candidate
+        return None
+
+    def prune(self) -> None:
+        ids = sorted(
+            {p.stem for p in self.directory.iterdir() if p.suffix in self.SUFFIXES},
+            reverse=True,
+        )
+        for stale in ids[self.keep :]:
+            for suffix in self.SUFFIXES:
+                (self.directory / f"{stale}{suffix}").unlink(missing_ok=True)
+
+
+def profile_call(
+    func: Callable[[], Any],
+    store: ProfileStore,
+    label: str,
+    mode: str = "cprofile",
+    interval: float = 0.005,
+) -> Tuple[Any, Optional[str]]:
+    """
+    Виконати func() під профайлером і записати файли у store.
+    mode="cprofile": .prof (детерміновано, з оверхедом) + .folded від семплера;
+    mode="sample": лише .folded (малий оверхед, для "живих" інстансів).
+    :return: (результат func, id профілю або None, якщо профайлер уже зайнятий)
+    """
+    if not _busy.acquire(blocking=False):
+        logger.warning("Profiler busy, request %s runs unprofiled", label)
+        return func(), None
+    try:
+        run = _ProfileRun(mode, interval)
+        try:
+            result = func()
+        finally:
+            run.stop()
+        return result, run.save(store, label)
+    finally:
+        _busy.release()
+
+
+async def profile_call_async(
+    func: Callable[[], Awaitable[Any]],
+    store: ProfileStore,
+    label: str,
+    mode: str = "cprofile",
+    interval: float = 0.005,
+) -> Tuple[Any, Optional[str]]:
+    """
+    Те саме, що profile_call, для корутини: профілюється потік event loop-а,
+    поки вона виконується. Тому в профіль потрапляють і інші корутини цього
+    loop-а, а робота в executor-потоках (asyncio.to_thread) — ні.
+    """
+    if not _busy.acquire(blocking=False):
+        logger.warning("Profiler busy, request %s runs unprofiled", label)
+        return await func(), None
+    try:
+        run = _ProfileRun(mode, interval)
+        try:
+            result = await func()
+        finally:
+            run.stop()
+        return result, run.save(store, label)
+    finally:
+        _busy.release()
+
+
+class _ProfileRun:
+    """Профайлер і семплер поточного потоку: старт у конструкторі, stop, save."""
+
+    def __init__(self, mode: str, interval: float) -> None:
+        self.mode = mode
+        self.sampler = StackSampler(threading.get_ident(), interval=interval)
+        self.profiler = cProfile.Profile() if mode == "cprofile" else None
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.sampler.start()
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+
+    def save(self, store: ProfileStore, label: str) -> str:
+        profile_id = store.new_id(label)
+        store.directory.mkdir(parents=True, exist_ok=True)
+        if self.profiler is not None:
+            self.profiler.dump_stats(str(store.directory / f"{profile_id}.prof"))
+        (store.directory / f"{profile_id}.folded").write_text(
+            self.sampler.folded(), encoding="utf-8"
+        )
+        store.prune()
+        logger.info(
+            "Profiled %s (%s, %.1f ms): %s",
+            label,
+            self.mode,
+            self.elapsed * 1000,
+            profile_id,
+        )
+        return profile_id
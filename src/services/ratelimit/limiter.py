@@ -0,0 +1,189 @@
+import math
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from src.config import TRUSTED_PROXIES
+from src.services.loggers.py_logger import get_logger
+from src.services.sqlite_store import SQLiteStore
+
+logger = get_logger(__name__)
+
+# через скільки секунд радити повтор, коли зайняті всі слоти джоб
+SLOT_RETRY_AFTER = 5
+# раз на стільки перевірок видаляємо відновлені (повні) бакети
+PRUNE_EVERY = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    client TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_slots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pid INTEGER NOT NULL,
+    started REAL NOT NULL
+);
+"""
+
+
+def client_address(
+    forwarded_for: Optional[str],
+    remote_addr: Optional[str],
+    trusted_proxies: Optional[int] = None,
+) -> str:
+    """
+    Ключ клієнта, як werkzeug ProxyFix(x_for=trusted_proxies): X-Forwarded-For
+    може підробити сам клієнт, тож беремо адресу, дописану N-м проксі з кінця
+    (кожен довірений проксі дописує рівно одну). Без довірених проксі
+    (TRUSTED_PROXIES=0) або з коротшим ланцюжком — адреса з'єднання.
+    """
+    if trusted_proxies is None:
+        trusted_proxies = TRUSTED_PROXIES
+    if trusted_proxies > 0 and forwarded_for:
+        chain = [part.strip() for part in forwarded_for.split(",")]
+        if len(chain) >= trusted_proxies and chain[-trusted_proxies]:
+            return chain[-trusted_proxies]
+    return remote_addr or "unknown"
+
+
+class Admission:
+    """Рішення лімітера: allowed, або причина відмови і Retry-After (секунди)."""
+
+    __slots__ = ("allowed", "reason", "retry_after")
+
+    def __init__(
+        self, allowed: bool, reason: Optional[str] = None, retry_after: int = 0
+    ) -> None:
+        self.allowed = allowed
+        self.reason = reason  # "rate" | "concurrency"
+        self.retry_after = retry_after
+
+
+class JobLimiter:
+    """
+    Ліміти для джоб-ендпоінтів, спільні для всіх воркерів (файл SQLite):
+    - token bucket на клієнта: burst запитів одразу, далі rate_per_minute;
+    - глобальна стеля одночасних джоб (max_jobs, 0 — без стелі); слоти
+      процесів, що впали, звільняються за перевіркою pid.
+    Якщо файл недоступний, лімітер пропускає запит (fail open) з попередженням.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        rate_per_minute: float = 30.0,
+        burst: int = 10,
+        max_jobs: int = 4,
+    ) -> None:
+        self.store = SQLiteStore(path, _SCHEMA)
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_jobs = max_jobs
+        self._checks = 0
+
+    @property
+    def path(self) -> str:
+        return self.store.path
+
+    @path.setter
+    def path(self, value: Union[str, Path]) -> None:
+        self.store.path = str(value)
+
+    # ---------- публічний API ----------
+
+    def check_rate(self, client: str) -> Admission:
+        """Списати один токен клієнта або сказати, через скільки він з'явиться."""
+        if self.rate <= 0:
+            return Admission(True)
+        now = time.time()
+        try:
+            with self.store.transaction() as conn:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE client = ?", (client,)
+                ).fetchone()
+                tokens = float(self.burst)
+                if row is not None:
+                    tokens = min(tokens, row[0] + (now - row[1]) * self.rate)
+                allowed = tokens >= 1.0
+                if allowed:
+                    tokens -= 1.0
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (client, tokens, updated) "
+                    "VALUES (?, ?, ?)",
+                    (client, tokens, now),
+                )
+                self._maybe_prune(conn, now)
+        except sqlite3.Error as e:
+            logger.warning("Rate limiter unavailable, request allowed: %s", e)
+            return Admission(True)
+        if allowed:
+            return Admission(True)
+        return Admission(False, "rate", math.ceil((1.0 - tokens) / self.rate))
+
+    @contextmanager
+    def job_slot(self) -> Iterator[Admission]:
+        """Зайняти слот джоби на час блоку; якщо слотів немає — allowed=False."""
+        if self.max_jobs <= 0:
+            yield Admission(True)
+            return
+        slot_id = self._acquire_slot()
+        if slot_id == 0:
+            yield Admission(False, "concurrency", SLOT_RETRY_AFTER)
+            return
+        try:
+            yield Admission(True)
+        finally:
+            self._release_slot(slot_id)
+
+    # ---------- приватні методи ----------
+
+    def _acquire_slot(self) -> Optional[int]:
+        """id слоту, 0 якщо всі зайняті, None якщо сховище недоступне."""
+        try:
+            with self.store.transaction() as conn:
+                for slot_id, pid in conn.execute(
+                    "SELECT id, pid FROM job_slots"
+                ).fetchall():
+                    if not _pid_alive(pid):
+                        conn.execute("DELETE FROM job_slots WHERE id = ?", (slot_id,))
+                (busy,) = conn.execute("SELECT COUNT(*) FROM job_slots").fetchone()
+                if busy >= self.max_jobs:
+                    return 0
+                return conn.execute(
+                    "INSERT INTO job_slots (pid, started) VALUES (?, ?)",
+                    (os.getpid(), time.time()),
+                ).lastrowid
+        except sqlite3.Error as e:
+            logger.warning("Job limiter unavailable, job allowed: %s", e)
+            return None
+
+    def _release_slot(self, slot_id: Optional[int]) -> None:
+        if slot_id is None:
+            return
+        try:
+            with self.store.transaction() as conn:
+                conn.execute("DELETE FROM job_slots WHERE id = ?", (slot_id,))
+        except sqlite3.Error as e:
+            logger.warning("Failed to release job slot %s: %s", slot_id, e)
+
+    def _maybe_prune(self, conn: sqlite3.Connection, now: float) -> None:
+        # бакет, що простояв повний час відновлення, не відрізняється від нового
+        self._checks += 1
+        if self._checks % PRUNE_EVERY == 0:
+            refill = self.burst / self.rate
+            conn.execute("DELETE FROM buckets WHERE updated < ?", (now - refill,))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
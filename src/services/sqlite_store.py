@@ -0,0 +1,44 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+
+class SQLiteStore:
+    """
+    Локальний файл SQLite, спільний для процесів (gunicorn-воркери, CLI):
+    - одне з'єднання на потік; після fork або зміни path відкривається нове;
+    - WAL, щоб читачі не чекали на писача;
+    - transaction(): BEGIN IMMEDIATE, тобто читання-зміна-запис атомарні між процесами.
+    Файл і схема створюються при першому зверненні, не в конструкторі.
+    """
+
+    def __init__(self, path: Union[str, Path], schema: str) -> None:
+        self.path = str(path)
+        self.schema = schema
+        self._local = threading.local()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "key", None) != (os.getpid(), self.path):
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.schema)
+            local.conn = conn
+            local.key = (os.getpid(), self.path)
+        return local.conn
@@ -0,0 +1,57 @@
+import gzip
+import shutil
+from typing import BinaryIO, Optional, Tuple
+
+from src.services.lazy_import import lazy_import
+
+zstandard = lazy_import("zstandard")
+
+# кодек -> суфікс стисненого файлу (sales_2022-08-09.json -> sales_2022-08-09.json.zst)
+CODECS = {"zstd": ".zst", "gzip": ".gz"}
+DEFAULT_LEVELS = {"zstd": 10, "gzip": 6}
+
+
+def check_codec(codec: str) -> str:
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {sorted(CODECS)}, got {codec!r}")
+    return codec
+
+
+def compress_stream(
+    src: BinaryIO, dst: BinaryIO, codec: str, level: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Стиснути src у dst потоково (пам'ять не залежить від розміру файлу).
+    :return: (байтів прочитано, байтів записано)
+    """
+    level = DEFAULT_LEVELS[check_codec(codec)] if level is None else level
+    start = dst.tell()
+    if codec == "zstd":
+        read, _ = zstandard.ZstdCompressor(level=level).copy_stream(src, dst)
+    else:
+        counter = _CountingReader(src)
+        # mtime=0: однаковий вміст -> однакові байти (і ETag) при повторному стисненні
+        with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=level, mtime=0) as gz:
+            shutil.copyfileobj(counter, gz, 1 << 20)
+        read = counter.count
+    return read, dst.tell() - start
+
+
+def decompressing_reader(src: BinaryIO, codec: str) -> BinaryIO:
+    """Файлоподібний потік розпакованих байтів; закриває src при close()."""
+    if check_codec(codec) == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(src, closefd=True)
+    reader = gzip.GzipFile(fileobj=src, mode="rb")
+    reader.myfileobj = src  # GzipFile.close() закриває лише "власний" файл
+    return reader
+
+
+class _CountingReader:
+    def __init__(self, src: BinaryIO) -> None:
+        self.src = src
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.src.read(size)
+        self.count += len(data)
+        return data
@@ -0,0 +1,126 @@
+import codecs
+import io
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, Union
+
+# скільки байтів декодується за раз: пік пам'яті ~ CHUNK_SIZE + найбільший запис
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(src: Union[BinaryIO, str, Path]) -> Iterator[Any]:
+    """
+    Елементи JSON-масиву верхнього рівня по одному, без читання файлу цілком:
+    текст декодується шматками, кожен елемент розбирається
+    JSONDecoder.raw_decode, а розібрана частина буфера відкидається.
+    Один об'єкт на верхньому рівні дає один елемент (як records=dict в експорті).
+    src — шлях або бінарний потік (звичайний файл читається через mmap,
+    інші потоки, напр. розпаковка холодного шару, — шматками read()).
+    """
+    if isinstance(src, (str, Path)):
+        with open(src, "rb") as f:
+            yield from iter_json_array(f)
+        return
+    yield from _parse_array(_text_chunks(src))
+
+
+def _text_chunks(src: BinaryIO) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    for chunk in _byte_chunks(src):
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _byte_chunks(src: BinaryIO) -> Iterator[bytes]:
+    # звичайний файл: mmap (сторінки з page cache без копії в буфер read()) і
+    # послідовне читання наперед; обгортки на кшталт GzipFile мають fileno()
+    # стисненого файлу, тому mmap лише для "голого" BufferedReader
+    if type(src) is io.BufferedReader and os.fstat(src.fileno()).st_size:
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for start in range(0, len(mm), CHUNK_SIZE):
+                yield mm[start : start + CHUNK_SIZE]
+        return
+    for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+        yield chunk
+
+
+def _parse_array(chunks: Iterator[str]) -> Iterator[Any]:
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def more() -> bool:
+        """Дочитати шматок; відкинути вже розібране."""
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> bool:
+        """Перейти до першого значущого символу; False — кінець тексту."""
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or not more():
+                return pos < len(buffer)
+
+    def decode() -> Any:
+        nonlocal pos
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if more():  # елемент обрізаний межею шматка
+                    continue
+                raise
+            # число на межі шматка ("12|3") розбирається "успішно" — дочитуємо
+            if end == len(buffer) and more():
+                continue
+            pos = end
+            return value
+
+    if not skip_whitespace() or buffer[pos] not in "[{":
+        raise ValueError("expected a JSON array at the top level")
+    if buffer[pos] == "{":
+        yield decode()
+        if skip_whitespace():
+            raise ValueError("extra data after the JSON object")
+        return
+    pos += 1
+    first = True
+    while True:
+        if not skip_whitespace():
+            raise ValueError("unexpected end of JSON array")
+        if buffer[pos] == "]":
+            pos += 1
+            break
+        if not first:
+            if buffer[pos] != ",":
+                raise ValueError(
+                    f"expected ',' or ']' in JSON array, got {buffer[pos]!r}"
+                )
+            pos += 1
+            if not skip_whitespace():
+                raise ValueError("unexpected end of JSON array")
+        first = False
+        yield decode()
+    if skip_whitespace():
+        raise ValueError("extra data after the JSON array")
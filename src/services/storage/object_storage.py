@@ -0,0 +1,625 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Union
+from urllib.parse import parse_qsl, quote, urlsplit
+from xml.etree import ElementTree
+
+from src.config import (
+    AWS_ACCESS_KEY_ID,
+    AWS_SECRET_ACCESS_KEY,
+    FILE_STORAGE,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_MAX_CONCURRENCY,
+    S3_PART_SIZE,
+    S3_PREFIX,
+    S3_REGION,
+    STORAGE_BACKEND,
+)
+from src.services.lazy_import import lazy_import
+from src.services.loggers.py_logger import get_logger
+from src.services.storage.codecs import CODECS, decompressing_reader
+
+requests = lazy_import("requests")
+
+logger = get_logger(__name__)
+
+Location = Union[Path, str]
+
+
+class StorageError(Exception):
+    """Помилка бекенду сховища (неочікувана відповідь об'єктного сховища)."""
+
+
+class ObjectNotFound(StorageError, FileNotFoundError):
+    """Об'єкта нема (ні як є, ні стисненої копії)."""
+
+
+class ObjectInfo:
+    """Метадані об'єкта: розмір і ETag (без лапок)."""
+
+    __slots__ = ("size", "etag")
+
+    def __init__(self, size: int, etag: str) -> None:
+        self.size = size
+        self.etag = etag
+
+    def __repr__(self) -> str:
+        return f"ObjectInfo(size={self.size}, etag={self.etag!r})"
+
+
+class Storage:
+    """
+    Сховище файлів продажів за ключами "raw/sales/2022-08-09/sales_2022-08-09.json".
+    Бекенди: LocalStorage (каталог на диску) і S3Storage (S3-сумісне сховище).
+    write_bytes/put_file пропускають запис, якщо об'єкт з тим самим ETag уже є
+    (лише там, де перевірка дешевша за запис — skip_unchanged).
+    open_read/read_bytes читають і стиснені копії "<key>.zst"/"<key>.gz"
+    (холодний шар, див. tiering), розпаковуючи потоково.
+    """
+
+    skip_unchanged = False
+
+    # ---------- публічний API ----------
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[Any]:
+        """Потоковий запис: файлоподібний об'єкт (write/tell); видимий після виходу."""
+        raise NotImplementedError
+        yield
+
+    def open_read(self, key: str) -> BinaryIO:
+        """Потокове читання key або його стисненої копії (розпаковується на льоту)."""
+        src = self._open(key)
+        if src is not None:
+            return src
+        for codec, suffix in CODECS.items():
+            src = self._open(key + suffix)
+            if src is not None:
+                return decompressing_reader(src, codec)
+        raise ObjectNotFound(key)
+
+    def read_bytes(self, key: str) -> bytes:
+        with self.open_read(key) as f:
+            return f.read()
+
+    def delete(self, key: str) -> None:
+        """Видалити об'єкт (відсутній — не помилка)."""
+        raise NotImplementedError
+
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        """Розмір і ETag об'єкта або None, якщо його нема."""
+        raise NotImplementedError
+
+    def location(self, key: str) -> Location:
+        """Що повертати назовні як "шлях" файлу (Path або s3://...)."""
+        raise NotImplementedError
+
+    def key_of(self, location: Location) -> str:
+        """Зворотне до location()."""
+        raise NotImplementedError
+
+    def etag_of(self, data: bytes) -> str:
+        """ETag, який бекенд дасть об'єкту з такими байтами."""
+        return hashlib.md5(data).hexdigest()
+
+    def etag_of_file(self, path: Union[str, Path]) -> str:
+        digest = hashlib.md5()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def exists(self, key: str) -> bool:
+        return self.head(key) is not None
+
+    def write_bytes(self, key: str, data: bytes) -> bool:
+        """Записати байти; :return: False, якщо такий самий об'єкт уже був."""
+        if self.skip_unchanged and self._unchanged(key, self.etag_of(data)):
+            logger.info("storage: %s unchanged, upload skipped", key)
+            return False
+        with self.open_write(key) as out:
+            out.write(data)
+        return True
+
+    def put_file(self, key: str, path: Union[str, Path]) -> bool:
+        """Записати локальний файл; :return: False, якщо такий самий об'єкт уже був."""
+        if self.skip_unchanged and self._unchanged(key, self.etag_of_file(path)):
+            logger.info("storage: %s unchanged, upload skipped", key)
+            return False
+        with open(path, "rb") as src, self.open_write(key) as out:
+            shutil.copyfileobj(src, out, 1 << 20)
+        return True
+
+    # ---------- приватні методи ----------
+
+    def _open(self, key: str) -> Optional[BinaryIO]:
+        """Сирий потік об'єкта або None, якщо його нема."""
+        raise NotImplementedError
+
+    def _unchanged(self, key: str, etag: str) -> bool:
+        info = self.head(key)
+        return info is not None and info.etag == etag
+
+
+class LocalStorage(Storage):
+    """Каталог на локальному диску (поведінка до появи бекендів: FILE_STORAGE)."""
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root).resolve()
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[Any]:
+        # тимчасовий файл поруч + атомарна заміна: читач не побачить половину файлу
+        path = self.location(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(
+            f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        try:
+            with tmp_path.open("wb") as out:
+                yield out
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def delete(self, key: str) -> None:
+        self.location(key).unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return self.location(key).is_file()
+
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        path = self.location(key)
+        if not path.is_file():
+            return None
+        return ObjectInfo(path.stat().st_size, self.etag_of_file(path))
+
+    def location(self, key: str) -> Path:
+        return self.root / key
+
+    def key_of(self, location: Location) -> str:
+        return Path(location).resolve().relative_to(self.root).as_posix()
+
+    def _open(self, key: str) -> Optional[BinaryIO]:
+        # без окремого exists(): файл може зникнути між перевіркою і open
+        try:
+            return self.location(key).open("rb")
+        except FileNotFoundError:
+            return None
+
+
+class S3Storage(Storage):
+    """
+    S3-сумісне сховище (AWS S3, MinIO, Ceph...) через REST + підпис SigV4,
+    без boto3: path-style адреси {endpoint}/{bucket}/{prefix}{key}.
+    - open_write: потоковий запис; до part_size байтів — один PUT, більше —
+      multipart upload, частини вантажаться паралельно (до max_concurrency,
+      у пам'яті не більше max_concurrency + 1 частин);
+    - put_file: паралельний multipart для великих файлів (кожна частина
+      читається з диска у своєму потоці);
+    - повторний запис того самого вмісту пропускається за ETag (HEAD):
+      md5 для одного PUT, md5(md5 частин)-N для multipart. Об'єкти з
+      іншим ETag (SSE-KMS тощо) просто перезаписуються.
+    S3 вимагає частини від 5 MiB (крім останньої).
+    """
+
+    skip_unchanged = True
+    retries = 3
+
+    def __init__(
+        self,
+        endpoint_url: str,
+        bucket: str,
+        prefix: str = "",
+        region: str = "us-east-1",
+        access_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        part_size: int = 8 * 1024 * 1024,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+    ) -> None:
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.region = region
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.part_size = part_size
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    # ---------- публічний API ----------
+
+    @contextmanager
+    def open_write(self, key: str) -> Iterator[Any]:
+        upload = _StreamingUpload(self, key)
+        try:
+            yield upload
+            upload.commit()
+        except BaseException:
+            upload.abort()
+            raise
+
+    def delete(self, key: str) -> None:
+        self._request("DELETE", key, ok=(200, 204, 404))
+
+    def head(self, key: str) -> Optional[ObjectInfo]:
+        response = self._request("HEAD", key, ok=(200, 404))
+        if response.status_code == 404:
+            return None
+        return ObjectInfo(
+            int(response.headers.get("Content-Length", 0)),
+            response.headers.get("ETag", "").strip('"'),
+        )
+
+    def location(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    def key_of(self, location: Location) -> str:
+        base = f"s3://{self.bucket}/{self.prefix}"
+        location = str(location)
+        if not location.startswith(base):
+            raise ValueError(f"{location} is outside {base}")
+        return location[len(base) :]
+
+    def etag_of(self, data: bytes) -> str:
+        if len(data) <= self.part_size:
+            return hashlib.md5(data).hexdigest()
+        return _multipart_etag(
+            hashlib.md5(data[start : start + self.part_size]).digest()
+            for start in range(0, len(data), self.part_size)
+        )
+
+    def etag_of_file(self, path: Union[str, Path]) -> str:
+        if os.path.getsize(path) <= self.part_size:
+            return super().etag_of_file(path)
+        with open(path, "rb") as f:
+            return _multipart_etag(
+                hashlib.md5(chunk).digest()
+                for chunk in iter(lambda: f.read(self.part_size), b"")
+            )
+
+    def put_file(self, key: str, path: Union[str, Path]) -> bool:
+        size = os.path.getsize(path)
+        if size <= self.part_size:
+            return super().put_file(key, path)
+        if self._unchanged(key, self.etag_of_file(path)):
+            logger.info("storage: %s unchanged, upload skipped", key)
+            return False
+
+        def upload_part(number: int) -> str:
+            with open(path, "rb") as f:
+                f.seek((number - 1) * self.part_size)
+                return self._upload_part(key, upload_id, number, f.read(self.part_size))
+
+        started = time.perf_counter()
+        upload_id = self._create_multipart(key)
+        numbers = range(1, -(-size // self.part_size) + 1)
+        try:
+            with ThreadPoolExecutor(self.max_concurrency) as pool:
+                etags = list(pool.map(upload_part, numbers))
+            self._complete_multipart(key, upload_id, etags)
+        except BaseException:
+            self._abort_multipart(key, upload_id)
+            raise
+        logger.info(
+            "storage: %s uploaded in %d parts (%.1f MiB/s)",
+            key,
+            len(etags),
+            size / (1 << 20) / max(time.perf_counter() - started, 1e-9),
+        )
+        return True
+
+    # ---------- приватні методи ----------
+
+    def _session(self) -> Any:
+        # своя сесія на потік (частини йдуть паралельно) і на процес (fork)
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            local.session = requests.Session()
+            local.pid = os.getpid()
+        return local.session
+
+    def _open(self, key: str) -> Optional[BinaryIO]:
+        response = self._request("GET", key, ok=(200, 404), stream=True)
+        if response.status_code == 404:
+            response.close()
+            return None
+        response.raw.decode_content = True  # Content-Encoding від сервера
+        return response.raw
+
+    def _url(self, key: str) -> str:
+        return (
+            f"{self.endpoint_url}/{self.bucket}/{quote(self.prefix + key, safe='/~')}"
+        )
+
+    def _request(
+        self,
+        method: str,
+        key: str,
+        params: Optional[Dict[str, str]] = None,
+        data: bytes = b"",
+        ok: Iterable[int] = (200,),
+        stream: bool = False,
+    ) -> Any:
+        """Підписаний запит з повторами на мережеві помилки і 5xx."""
+        url = self._url(key)
+        if params:
+            url += "?" + "&".join(
+                f"{quote(name, safe='~')}={quote(value, safe='~')}"
+                for name, value in sorted(params.items())
+            )
+        for attempt in range(1, self.retries + 1):
+            headers = self._sign(method, url)
+            try:
+                response = self._session().request(
+                    method,
+                    url,
+                    data=data,
+                    headers=headers,
+                    timeout=self.timeout,
+                    stream=stream,
+                )
+            except requests.exceptions.RequestException as err:
+                if attempt == self.retries:
+                    raise StorageError(f"{method} {key}: {err}") from err
+            else:
+                if response.status_code in ok:
+                    return response
+                if response.status_code < 500 or attempt == self.retries:
+                    raise StorageError(
+                        f"{method} {key}: HTTP {response.status_code} "
+                        f"{response.text[:200]}"
+                    )
+            time.sleep(0.2 * 2 ** (attempt - 1))
+
+    def _sign(self, method: str, url: str) -> Dict[str, str]:
+        """Заголовки AWS Signature V4 (тіло не підписується: UNSIGNED-PAYLOAD)."""
+        now = datetime.now(tz=timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        headers = {
+            "host": urlsplit(url).netloc,
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+            "x-amz-date": amz_date,
+        }
+        if not (self.access_key and self.secret_key):
+            return headers  # анонімний доступ (локальний стенд)
+        parts = urlsplit(url)
+        query = "&".join(
+            f"{quote(name, safe='~')}={quote(value, safe='~')}"
+            for name, value in sorted(parse_qsl(parts.query, keep_blank_values=True))
+        )
+        signed = ";".join(sorted(headers))
+        canonical = "\n".join(
+            [
+                method,
+                parts.path or "/",
+                query,
+                "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+                signed,
+                "UNSIGNED-PAYLOAD",
+            ]
+        )
+        scope = f"{now:%Y%m%d}/{self.region}/s3/aws4_request"
+        to_sign = "\n".join(
+            [
+                "AWS4-HMAC-SHA256",
+                amz_date,
+                scope,
+                hashlib.sha256(canonical.encode()).hexdigest(),
+            ]
+        )
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (f"{now:%Y%m%d}", self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["Authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed}, Signature={signature}"
+        )
+        return headers
+
+    def _put_object(self, key: str, data: bytes) -> None:
+        self._request("PUT", key, data=data)
+
+    def _create_multipart(self, key: str) -> str:
+        response = self._request("POST", key, params={"uploads": ""})
+        return _xml_text(response.content, "UploadId")
+
+    def _upload_part(self, key: str, upload_id: str, number: int, data: bytes) -> str:
+        response = self._request(
+            "PUT",
+            key,
+            params={"partNumber": str(number), "uploadId": upload_id},
+            data=data,
+        )
+        return response.headers["ETag"].strip('"')
+
+    def _complete_multipart(self, key: str, upload_id: str, etags: List[str]) -> None:
+        body = "".join(
+            f'<Part><PartNumber>{number}</PartNumber><ETag>"{etag}"</ETag></Part>'
+            for number, etag in enumerate(etags, start=1)
+        )
+        response = self._request(
+            "POST",
+            key,
+            params={"uploadId": upload_id},
+            data=f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode(),
+        )
+        # S3 може відповісти 200 з <Error> у тілі
+        if b"<Error>" in response.content:
+            raise StorageError(f"complete {key}: {response.text[:200]}")
+
+    def _abort_multipart(self, key: str, upload_id: str) -> None:
+        try:
+            self._request(
+                "DELETE", key, params={"uploadId": upload_id}, ok=(200, 204, 404)
+            )
+        except StorageError as err:
+            logger.warning("storage: abort of %s failed: %s", key, err)
+
+
+class _StreamingUpload:
+    """Файлоподібний запис у S3Storage: буфер до part_size, далі multipart."""
+
+    def __init__(self, storage: S3Storage, key: str) -> None:
+        self.storage = storage
+        self.key = key
+        self.size = 0
+        self._buffer = bytearray()
+        self._upload_id: Optional[str] = None
+        self._parts: List[Future] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(storage.max_concurrency)
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self.size += len(data)
+        part_size = self.storage.part_size
+        while len(self._buffer) > part_size:
+            chunk = bytes(self._buffer[:part_size])
+            del self._buffer[:part_size]
+            self._submit(chunk)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.size
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False  # fastavro перевіряє, чи дописувати в наявний файл
+
+    def flush(self) -> None:
+        pass
+
+    def commit(self) -> None:
+        if self._upload_id is None:
+            self.storage._put_object(self.key, bytes(self._buffer))
+            return
+        self._submit(bytes(self._buffer))
+        try:
+            etags = [part.result() for part in self._parts]
+        finally:
+            self._pool.shutdown()
+        self.storage._complete_multipart(self.key, self._upload_id, etags)
+
+    def abort(self) -> None:
+        if self._upload_id is None:
+            return
+        self._pool.shutdown(cancel_futures=True)
+        self.storage._abort_multipart(self.key, self._upload_id)
+
+    def _submit(self, chunk: bytes) -> None:
+        if self._upload_id is None:
+            self._upload_id = self.storage._create_multipart(self.key)
+            self._pool = ThreadPoolExecutor(self.storage.max_concurrency)
+        # не більше max_concurrency частин у польоті: пам'ять обмежена
+        self._slots.acquire()
+        part = self._pool.submit(
+            self.storage._upload_part,
+            self.key,
+            self._upload_id,
+            len(self._parts) + 1,
+            chunk,
+        )
+        part.add_done_callback(lambda _: self._slots.release())
+        self._parts.append(part)
+
+
+def _multipart_etag(digests: Iterable[bytes]) -> str:
+    digests = list(digests)
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def _xml_text(content: bytes, tag: str) -> str:
+    for element in ElementTree.fromstring(content).iter():
+        if re.sub(r"^\{.*\}", "", element.tag) == tag:
+            return element.text or ""
+    raise StorageError(f"no <{tag}> in response: {content[:200]!r}")
+
+
+def upload_tree(
+    storage: Storage, root: Union[str, Path], prefixes: Iterable[str] = ("raw", "stg")
+) -> Dict[str, int]:
+    """Перенести файли з локального каталогу в сховище (незмінені пропускаються)."""
+    root = Path(root)
+    counts = {"uploaded": 0, "skipped": 0}
+    for prefix in prefixes:
+        if not (root / prefix).exists():
+            continue
+        for path in sorted((root / prefix).rglob("*")):
+            if path.is_file() and not path.name.endswith(".tmp"):
+                uploaded = storage.put_file(path.relative_to(root).as_posix(), path)
+                counts["uploaded" if uploaded else "skipped"] += 1
+    return counts
+
+
+def open_location(location: Location) -> BinaryIO:
+    """
+    Відкрити файл за тим, що повернув експорт (Path/str або s3://...), для
+    віддачі назовні: стиснена копія в холодному шарі розпаковується потоково.
+    """
+    location = str(location)
+    if location.startswith("s3://"):
+        storage = get_storage()
+        return storage.open_read(storage.key_of(location))
+    path = Path(location)
+    return LocalStorage(path.parent).open_read(path.name)
+
+
+# ---------- сховище за замовчуванням (налаштування з config) ----------
+
+_storage: Optional[S3Storage] = None
+
+
+def get_storage(file_storage: Union[str, Path] = FILE_STORAGE) -> Storage:
+    """
+    Сховище за STORAGE_BACKEND: "local" — каталог file_storage,
+    "s3" — один S3Storage на процес (пул HTTP-сесій спільний).
+    """
+    global _storage
+    if STORAGE_BACKEND == "local":
+        return LocalStorage(file_storage)
+    if STORAGE_BACKEND == "s3":
+        if _storage is None:
+            if not (S3_ENDPOINT_URL and S3_BUCKET):
+                raise ValueError(
+                    "STORAGE_BACKEND=s3 needs S3_ENDPOINT_URL and S3_BUCKET"
+                )
+            _storage = S3Storage(
+                S3_ENDPOINT_URL,
+                S3_BUCKET,
+                prefix=S3_PREFIX,
+                region=S3_REGION,
+                access_key=AWS_ACCESS_KEY_ID,
+                secret_key=AWS_SECRET_ACCESS_KEY,
+                part_size=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+            )
+        return _storage
+    raise ValueError(
+        f"STORAGE_BACKEND must be 'local' or 's3', got {STORAGE_BACKEND!r}"
+    )
+
+
+# ---------- demo ----------
+
+if __name__ == "__main__":
+    """Test/demo: перенести raw/ і stg/ з FILE_STORAGE у налаштоване сховище."""
+    print(upload_tree(get_storage(), FILE_STORAGE))
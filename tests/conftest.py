@@ -79,3 +79,34 @@ def mock_auth_token(monkeypatch):
 def mock_log_key(monkeypatch):
     """Mock LOG_KEY environment variable."""
     monkeypatch.setenv("LOG_KEY", "test-log-key")
+
+
+@pytest.fixture(autouse=True)
+def job_limiter(tmp_path, monkeypatch):
+    """Give every test its own rate-limit store, so earlier job calls never count."""
+    limiter = api_routes.job_limiter
+    monkeypatch.setattr(limiter, "path", str(tmp_path / "ratelimit.sqlite3"))
+    # tests may tune the limits directly; restore them afterwards
+    for name in ("rate", "burst", "max_jobs"):
+        monkeypatch.setattr(limiter, name, getattr(limiter, name))
+    return limiter
+
+
+@pytest.fixture(autouse=True)
+def job_queue(tmp_path, monkeypatch):
+    """Point the default job queue at a per-test SQLite file."""
+    from src.services.jobs.job_1_and_2 import job_queue as queue_module
+
+    queue = queue_module.SalesJobQueue(tmp_path / "jobs.sqlite3", backoff=0.0)
+    monkeypatch.setattr(queue_module, "_queue", queue)
+    return queue
+
+
+@pytest.fixture(autouse=True)
+def day_cache(tmp_path, monkeypatch):
+    """Keep the shared day cache of every test in its own directory (not /dev/shm)."""
+    from src.services.cache import day_cache as cache_module
+
+    cache = cache_module.DayCache(tmp_path / "day_cache", max_bytes=64 * 1024 * 1024)
+    monkeypatch.setattr(cache_module, "_cache", cache)
+    return cache
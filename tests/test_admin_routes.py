@@ -1,5 +1,6 @@
 """Tests for admin routes."""
 
+import gzip
 from pathlib import Path
 from unittest.mock import patch
 
@@ -80,3 +81,131 @@ class TestLogRoute:
                     response = client.post("/log", data={"log_key": "correct-key"})
                     # Check that info was logged
                     mock_logger.info.assert_called()
+
+
+class TestLogRouteFilters:
+    """Test /log tail/range/level filters."""
+
+    LOG_LINES = (
+        "2022-08-09 10:00:00 [INFO] - app - f(1) - first\n"
+        "2022-08-09 11:00:00 [ERROR] - app - f(2) - second\n"
+        "Traceback line\n"
+        "2022-08-10 09:00:00 [INFO] - app - f(3) - third\n"
+    )
+
+    def _post(self, client: FlaskClient, tmp_path: Path, headers=None, **data):
+        log_file = tmp_path / "app.log"
+        log_file.write_text(self.LOG_LINES)
+        with patch("src.flask_app.routes.admin_routers.FILE_LOG", str(log_file)):
+            with patch("src.flask_app.routes.admin_routers.LOG_KEY", "correct-key"):
+                return client.post(
+                    "/log", data={"log_key": "correct-key", **data}, headers=headers
+                )
+
+    def test_log_tail(self, client: FlaskClient, tmp_path: Path):
+        """Test that tail returns the last N records."""
+        response = self._post(client, tmp_path, tail="1")
+        assert response.status_code == 200
+        assert response.get_data(as_text=True).endswith("third\n")
+        assert "second" not in response.get_data(as_text=True)
+
+    def test_log_level_filter_keeps_traceback(
+        self, client: FlaskClient, tmp_path: Path
+    ):
+        """Test that level filtering keeps continuation lines of a record."""
+        response = self._post(client, tmp_path, level="ERROR")
+        assert response.get_data(as_text=True) == (
+            "2022-08-09 11:00:00 [ERROR] - app - f(2) - second\nTraceback line\n"
+        )
+
+    def test_log_time_window(self, client: FlaskClient, tmp_path: Path):
+        """Test since/until time window."""
+        response = self._post(
+            client, tmp_path, since="2022-08-09T10:30", until="2022-08-09"
+        )
+        body = response.get_data(as_text=True)
+        assert "second" in body
+        assert "first" not in body
+        assert "third" not in body
+
+    def test_log_gzip_response(self, client: FlaskClient, tmp_path: Path):
+        """Test that the filtered log is gzip-compressed when accepted."""
+        response = self._post(
+            client, tmp_path, headers={"Accept-Encoding": "gzip"}, tail="2"
+        )
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert gzip.decompress(response.data).decode().endswith("third\n")
+
+
+class TestProfiling:
+    """Test on-demand request profiling and the /profiles admin routes."""
+
+    @pytest.fixture(autouse=True)
+    def profiling(self, app, tmp_path, monkeypatch):
+        """Enable the profiling key and keep profiles in a temp dir."""
+        from src.flask_app.create_app import profile_store
+
+        monkeypatch.setattr(app.wsgi_app, "key", "correct-key")
+        monkeypatch.setattr(profile_store, "directory", tmp_path)
+        monkeypatch.setattr("src.flask_app.routes.admin_routers.LOG_KEY", "correct-key")
+
+    def test_request_without_header_not_profiled(self, client: FlaskClient, tmp_path):
+        """Test that ordinary requests are untouched."""
+        response = client.get("/health")
+        assert "X-Profile-Id" not in response.headers
+        assert list(tmp_path.iterdir()) == []
+
+    def test_wrong_key_not_profiled(self, client: FlaskClient):
+        """Test that a wrong key silently disables profiling."""
+        response = client.get("/health", headers={"X-Profile": "wrong-key"})
+        assert response.status_code == 200
+        assert "X-Profile-Id" not in response.headers
+
+    def test_cprofile_writes_prof_and_folded(self, client: FlaskClient, tmp_path):
+        """Test that a profiled request writes both files and returns the id."""
+        response = client.get("/health", headers={"X-Profile": "correct-key"})
+
+        profile_id = response.headers["X-Profile-Id"]
+        assert response.get_json() == {"status": "ok"}
+        assert (tmp_path / f"{profile_id}.prof").exists()
+        assert (tmp_path / f"{profile_id}.folded").exists()
+
+    def test_sample_mode_writes_only_folded(self, client: FlaskClient, tmp_path):
+        """Test the low-overhead sampling mode."""
+        response = client.get(
+            "/health",
+            headers={"X-Profile": "correct-key", "X-Profile-Mode": "sample"},
+        )
+
+        profile_id = response.headers["X-Profile-Id"]
+        assert not (tmp_path / f"{profile_id}.prof").exists()
+        assert (tmp_path / f"{profile_id}.folded").exists()
+
+    def test_list_and_download(self, client: FlaskClient):
+        """Test listing profiles and downloading one by name."""
+        profile_id = client.get(
+            "/health", headers={"X-Profile": "correct-key"}
+        ).headers["X-Profile-Id"]
+
+        listing = client.post("/profiles", headers={"X-Log-Key": "correct-key"})
+        names = [p["name"] for p in listing.get_json()["profiles"]]
+        assert f"{profile_id}.prof" in names
+
+        download = client.post(
+            f"/profiles/{profile_id}.prof", data={"log_key": "correct-key"}
+        )
+        assert download.status_code == 200
+        assert download.headers["Content-Disposition"].startswith("attachment")
+
+    def test_profiles_require_key(self, client: FlaskClient):
+        """Test that listing and downloading need the admin key."""
+        assert client.post("/profiles").status_code == 403
+        assert (
+            client.post("/profiles/x.prof", data={"log_key": "bad"}).status_code == 403
+        )
+
+    def test_download_unknown_profile(self, client: FlaskClient):
+        """Test that unknown or non-profile names return 404."""
+        headers = {"X-Log-Key": "correct-key"}
+        assert client.post("/profiles/missing.prof", headers=headers).status_code == 404
+        assert client.post("/profiles/app.log", headers=headers).status_code == 404
@@ -148,3 +148,167 @@ class TestJobAPIRoute:
         assert response.status_code == 400
         data = response.get_json()
         assert "date parameter missed" in data["message"]
+
+
+def _save_with_stages(date_, to_stg):
+    """Fake save_sales_to_local_disk that reports two stages."""
+    from src.services.metrics.timings import record_stage
+
+    record_stage("fetch", 0.25)
+    record_stage("write", 0.002)
+    return "/file_storage/raw/sales/2022-08-09/sales_2022-08-09.json"
+
+
+class TestJobTimings:
+    """Test Server-Timing and the optional timings field of /v1/api/job."""
+
+    @patch(
+        "src.flask_app.routes.api_routes.save_sales_to_local_disk",
+        side_effect=_save_with_stages,
+    )
+    def test_server_timing_header(self, mock_save_sales, client: FlaskClient):
+        """Test that stage durations are returned in Server-Timing."""
+        response = client.post("/v1/api/job", json={"date": "2022-08-09"})
+
+        header = response.headers["Server-Timing"]
+        assert "fetch;dur=250.0" in header
+        assert "write;dur=2.0" in header
+        assert "timings" not in response.get_json()
+
+    @patch(
+        "src.flask_app.routes.api_routes.save_sales_to_local_disk",
+        side_effect=_save_with_stages,
+    )
+    def test_timings_field_on_request(self, mock_save_sales, client: FlaskClient):
+        """Test that timings=true adds the breakdown to the JSON body."""
+        response = client.post(
+            "/v1/api/job", json={"date": "2022-08-09", "timings": True}
+        )
+
+        timings = response.get_json()["timings"]
+        assert timings["fetch"] == 250.0
+        assert "total" in timings
+        mock_save_sales.assert_called_once_with(date_=date(2022, 8, 9), to_stg=False)
+
+    @patch(
+        "src.flask_app.routes.api_routes.save_sales_to_local_disk",
+        side_effect=_save_with_stages,
+    )
+    def test_timings_logged_as_one_line(self, mock_save_sales, client: FlaskClient):
+        """Test that the stages are logged once with a structured extra."""
+        with patch("src.flask_app.routes.api_routes.logger") as mock_logger:
+            client.post("/v1/api/job", json={"date": "2022-08-09"})
+
+        mock_logger.info.assert_called_once()
+        assert mock_logger.info.call_args[1]["extra"]["timings"]["fetch"] == 250.0
+
+
+class TestJobLimits:
+    """Test rate limits and the concurrency cap on /v1/api/job."""
+
+    @patch("src.flask_app.routes.api_routes.save_sales_to_local_disk")
+    def test_rate_limit_returns_429(self, mock_save_sales, client, job_limiter):
+        """Test that a client over its burst gets 429 with Retry-After."""
+        job_limiter.burst = 2
+        mock_save_sales.return_value = None
+        for _ in range(2):
+            client.post("/v1/api/job", json={"date": "2022-08-09"})
+
+        response = client.post("/v1/api/job", json={"date": "2022-08-09"})
+
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        assert mock_save_sales.call_count == 2
+
+    @patch("src.flask_app.routes.api_routes.save_sales_to_local_disk")
+    def test_forwarded_clients_limited_separately(
+        self, mock_save_sales, client, job_limiter, monkeypatch
+    ):
+        """Test that clients behind a trusted proxy are told apart by XFF."""
+        monkeypatch.setattr("src.services.ratelimit.limiter.TRUSTED_PROXIES", 1)
+        job_limiter.burst = 1
+        mock_save_sales.return_value = None
+        first = client.post(
+            "/v1/api/job",
+            json={"date": "2022-08-09"},
+            headers={"X-Forwarded-For": "10.0.0.1"},
+        )
+        second = client.post(
+            "/v1/api/job",
+            json={"date": "2022-08-09"},
+            headers={"X-Forwarded-For": "10.0.0.2"},
+        )
+
+        assert first.status_code == 204
+        assert second.status_code == 204
+
+    @patch("src.flask_app.routes.api_routes.save_sales_to_local_disk")
+    def test_spoofed_forwarded_for_does_not_bypass_limit(
+        self, mock_save_sales, client, job_limiter
+    ):
+        """Test that without trusted proxies a rotating X-Forwarded-For is ignored."""
+        job_limiter.burst = 1
+        mock_save_sales.return_value = None
+        statuses = [
+            client.post(
+                "/v1/api/job",
+                json={"date": "2022-08-09"},
+                headers={"X-Forwarded-For": f"10.0.0.{i}"},
+            ).status_code
+            for i in (1, 2)
+        ]
+
+        assert statuses == [204, 429]
+
+    @patch("src.flask_app.routes.api_routes.save_sales_to_local_disk")
+    def test_concurrency_cap_returns_429(self, mock_save_sales, client, job_limiter):
+        """Test that a job over the global cap is rejected without running."""
+        job_limiter.max_jobs = 1
+        with job_limiter.job_slot():
+            response = client.post("/v1/api/job", json={"date": "2022-08-09"})
+
+        assert response.status_code == 429
+        assert response.get_json()["message"] == "too many jobs in progress"
+        assert "Retry-After" in response.headers
+        mock_save_sales.assert_not_called()
+
+
+class TestJobQueueRoutes:
+    """Test /v1/api/jobs enqueue and status endpoints."""
+
+    def test_enqueue_returns_202(self, client, job_queue):
+        """Test that a job is queued and its status URL returned."""
+        response = client.post(
+            "/v1/api/jobs", json={"date": "2022-08-09", "to_stg": True, "priority": 3}
+        )
+
+        assert response.status_code == 202
+        data = response.get_json()
+        assert data["status"] == "queued"
+        assert response.headers["Location"] == data["status_url"]
+        assert job_queue.get(data["job_id"])["priority"] == 3
+
+    def test_enqueue_deduplicates(self, client):
+        """Test that the same active (date, to_stg) returns the same job id."""
+        first = client.post("/v1/api/jobs", json={"date": "2022-08-09"})
+        second = client.post("/v1/api/jobs", json={"date": "2022-08-09"})
+
+        assert first.get_json()["job_id"] == second.get_json()["job_id"]
+
+    def test_enqueue_validates_payload(self, client):
+        """Test the same date validation as /v1/api/job and a priority check."""
+        assert client.post("/v1/api/jobs", json={}).status_code == 400
+        response = client.post(
+            "/v1/api/jobs", json={"date": "2022-08-09", "priority": "high"}
+        )
+        assert response.status_code == 400
+
+    def test_job_status(self, client, job_queue):
+        """Test the status endpoint for existing and unknown jobs."""
+        job_id = job_queue.enqueue(date(2022, 8, 9))
+
+        response = client.get(f"/v1/api/jobs/{job_id}")
+
+        assert response.status_code == 200
+        assert response.get_json()["date"] == "2022-08-09"
+        assert client.get("/v1/api/jobs/999").status_code == 404
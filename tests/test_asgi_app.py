@@ -0,0 +1,298 @@
+"""Tests for asgi_app.py - native async job endpoint and WSGI fallback."""
+
+import asyncio
+import json
+import threading
+from datetime import date
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.flask_app.asgi_app import AsyncJobApp
+
+SAVE_ASYNC = (
+    "src.services.jobs.job_1_and_2.async_save_sales.save_sales_to_local_disk_async"
+)
+
+
+def _call(app, method, path, body=b"", headers=()):
+    """Run one HTTP request through the ASGI app and collect the response."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"testserver"), *headers],
+        "client": ("127.0.0.1", 12345),
+        "server": ("testserver", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    body = b"".join(
+        m.get("body", b"") for m in sent if m["type"] == "http.response.body"
+    )
+    return start["status"], dict(start["headers"]), body
+
+
+@pytest.fixture
+def asgi_app(app):
+    """ASGI wrapper around the test-configured Flask app."""
+    return AsyncJobApp(app)
+
+
+def _job(asgi_app, payload):
+    return _call(asgi_app, "POST", "/v1/api/job", body=json.dumps(payload).encode())
+
+
+class TestAsyncJobEndpoint:
+    """Test POST /v1/api/job served natively by the ASGI app."""
+
+    def test_missing_date(self, asgi_app):
+        """Test that a missing date returns 400 like the Flask route."""
+        status, _, body = _job(asgi_app, {})
+        assert status == 400
+        assert json.loads(body)["message"] == "date parameter missed"
+
+    def test_invalid_date(self, asgi_app):
+        """Test that a malformed date returns 400."""
+        status, _, body = _job(asgi_app, {"date": "2022/08/09"})
+        assert status == 400
+        assert "format YYYY-MM-DD" in json.loads(body)["message"]
+
+    def test_invalid_json_body(self, asgi_app):
+        """Test that a non-JSON body is treated as an empty payload."""
+        status, _, _ = _call(asgi_app, "POST", "/v1/api/job", body=b"not json")
+        assert status == 400
+
+    def test_success(self, asgi_app):
+        """Test that the async service is awaited and 201 is returned."""
+        save = AsyncMock(return_value="/file_storage/raw/sales/x.json")
+        with patch(SAVE_ASYNC, save):
+            status, headers, body = _job(
+                asgi_app, {"date": "2022-08-09", "to_stg": True}
+            )
+
+        assert status == 201
+        assert json.loads(body)["file_path"] == "/file_storage/raw/sales/x.json"
+        assert headers[b"content-type"] == b"application/json"
+        save.assert_awaited_once_with(date_=date(2022, 8, 9), to_stg=True)
+
+    def test_server_timing_header(self, asgi_app):
+        """Test that stage timings are returned like in the Flask route."""
+
+        async def save(date_, to_stg):
+            from src.services.metrics.timings import record_stage
+
+            record_stage("fetch", 0.1)
+            return "/file_storage/raw/sales/x.json"
+
+        with patch(SAVE_ASYNC, save):
+            status, headers, body = _job(
+                asgi_app, {"date": "2022-08-09", "timings": True}
+            )
+
+        assert status == 201
+        assert b"fetch;dur=100.0" in headers[b"server-timing"]
+        assert json.loads(body)["timings"]["fetch"] == 100.0
+
+    def test_no_data(self, asgi_app):
+        """Test that an empty result returns 204 without a body."""
+        with patch(SAVE_ASYNC, AsyncMock(return_value=None)):
+            status, _, body = _job(asgi_app, {"date": "2022-08-09"})
+
+        assert status == 204
+        assert body == b""
+
+    def test_failure(self, asgi_app):
+        """Test that service errors are reported as 500."""
+        with patch(SAVE_ASYNC, AsyncMock(side_effect=RuntimeError("boom"))):
+            status, _, body = _job(asgi_app, {"date": "2022-08-09"})
+
+        assert status == 500
+        assert json.loads(body)["error"] == "boom"
+
+    def test_request_id_echoed(self, asgi_app):
+        """Test that X-Request-ID is propagated to the response."""
+        status, headers, _ = _call(
+            asgi_app,
+            "POST",
+            "/v1/api/job",
+            body=b"{}",
+            headers=[(b"x-request-id", b"abc123")],
+        )
+        assert headers[b"x-request-id"] == b"abc123"
+
+
+class TestAsyncJobProfiling:
+    """Test X-Profile on the natively served job route."""
+
+    @pytest.fixture
+    def profiles(self, tmp_path):
+        """Empty directory for the profiles."""
+        path = tmp_path / "profiles"
+        path.mkdir()
+        return path
+
+    @pytest.fixture
+    def profiled_app(self, app, profiles):
+        """ASGI app with a profiling key and a temp profile store."""
+        from src.services.profiling.profiler import ProfileStore
+
+        return AsyncJobApp(app, ProfileStore(profiles), profile_key="correct-key")
+
+    def _profiled_job(self, app, key, mode=b"cprofile"):
+        with patch(SAVE_ASYNC, AsyncMock(return_value=None)):
+            return _call(
+                app,
+                "POST",
+                "/v1/api/job",
+                body=b'{"date": "2022-08-09"}',
+                headers=[(b"x-profile", key), (b"x-profile-mode", mode)],
+            )
+
+    def test_profile_written_and_id_returned(self, profiled_app, profiles):
+        """Test that a profiled job writes both files and returns the id."""
+        status, headers, _ = self._profiled_job(profiled_app, b"correct-key")
+
+        profile_id = headers[b"x-profile-id"].decode()
+        assert status == 204
+        assert "POST-v1-api-job" in profile_id
+        assert (profiles / f"{profile_id}.prof").exists()
+        assert (profiles / f"{profile_id}.folded").exists()
+
+    def test_sample_mode(self, profiled_app, profiles):
+        """Test that the sampling mode writes only the folded stacks."""
+        _, headers, _ = self._profiled_job(profiled_app, b"correct-key", b"sample")
+
+        profile_id = headers[b"x-profile-id"].decode()
+        assert [p.name for p in profiles.iterdir()] == [f"{profile_id}.folded"]
+
+    def test_wrong_key_not_profiled(self, profiled_app, profiles):
+        """Test that a wrong key leaves the request unprofiled."""
+        status, headers, _ = self._profiled_job(profiled_app, b"wrong-key")
+
+        assert status == 204
+        assert b"x-profile-id" not in headers
+        assert list(profiles.iterdir()) == []
+
+
+class TestWsgiFallback:
+    """Test that other routes are served by Flask through WsgiToAsgi."""
+
+    def test_health_route(self, asgi_app):
+        """Test that /health is answered by the Flask app."""
+        status, _, body = _call(asgi_app, "GET", "/health")
+        assert status == 200
+        assert json.loads(body)["status"] == "ok"
+
+    def test_get_job_not_intercepted(self, asgi_app):
+        """Test that only POST /v1/api/job is handled natively."""
+        status, _, _ = _call(asgi_app, "GET", "/v1/api/job")
+        assert status == 405
+
+
+class TestLifespan:
+    """Test ASGI lifespan handling."""
+
+    def test_startup_and_shutdown(self, asgi_app):
+        """Test that startup and shutdown are acknowledged."""
+        incoming = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+class TestAsyncJobLimits:
+    """Test that the native endpoint shares the job limits."""
+
+    def test_concurrency_cap(self, asgi_app, job_limiter):
+        """Test 429 with Retry-After when all job slots are busy."""
+        job_limiter.max_jobs = 1
+        with patch(SAVE_ASYNC, new=AsyncMock()) as mock_save:
+            with job_limiter.job_slot():
+                status, headers, body = _job(asgi_app, {"date": "2022-08-09"})
+
+        assert status == 429
+        assert headers[b"retry-after"] == b"5"
+        assert json.loads(body)["message"] == "too many jobs in progress"
+        mock_save.assert_not_called()
+
+    def test_rate_limit_by_forwarded_for(self, asgi_app, job_limiter, monkeypatch):
+        """Test that behind a trusted proxy the client key comes from XFF."""
+        monkeypatch.setattr("src.services.ratelimit.limiter.TRUSTED_PROXIES", 1)
+        job_limiter.burst = 1
+        headers = [(b"x-forwarded-for", b"10.0.0.9")]
+        with patch(SAVE_ASYNC, new=AsyncMock(return_value=None)):
+            first, _, _ = _call(
+                asgi_app, "POST", "/v1/api/job", b'{"date": "2022-08-09"}', headers
+            )
+            second, _, _ = _call(
+                asgi_app, "POST", "/v1/api/job", b'{"date": "2022-08-09"}', headers
+            )
+
+        assert (first, second) == (204, 429)
+
+    def test_blocking_calls_run_off_the_event_loop(self, asgi_app, job_limiter):
+        """Test that SQLite limits and the day summary never block the loop."""
+        threads = {}
+
+        def on_thread(name, func):
+            def wrapper(*args, **kwargs):
+                threads[name] = threading.current_thread()
+                return func(*args, **kwargs)
+
+            return wrapper
+
+        job_limiter.max_jobs = 1
+        with (
+            patch.object(
+                job_limiter,
+                "check_rate",
+                new=on_thread("check_rate", job_limiter.check_rate),
+            ),
+            patch.object(
+                job_limiter,
+                "_acquire_slot",
+                new=on_thread("acquire", job_limiter._acquire_slot),
+            ),
+            patch.object(
+                job_limiter,
+                "_release_slot",
+                new=on_thread("release", job_limiter._release_slot),
+            ),
+            patch(
+                "src.flask_app.asgi_app.day_summary",
+                new=on_thread("summary", lambda date_: {"records": 1}),
+            ),
+            patch(SAVE_ASYNC, new=AsyncMock(return_value="/tmp/file.json")),
+        ):
+            status, _, body = _job(asgi_app, {"date": "2022-08-09"})
+
+        assert status == 201
+        assert json.loads(body)["summary"] == {"records": 1}
+        assert set(threads) == {"check_rate", "acquire", "release", "summary"}
+        assert threading.main_thread() not in threads.values()
@@ -0,0 +1,268 @@
+"""Tests for async_api_tool.py and async_save_sales.py - non-blocking sales fetch."""
+
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from src.services.jobs.job_1_and_2.async_api_tool import AsyncAPITool, new_async_client
+from src.services.jobs.job_1_and_2.async_save_sales import (
+    save_sales_to_local_disk_async,
+)
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
+from src.services.jobs.job_1_and_2.fake_api_tool import IncompleteFetchError
+
+
+class _SalesHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = 2
+    latency = 0.0
+    chunked = False
+    status = 200
+    fail_page = 0  # this page answers 503 (mid-crawl upstream failure)
+    end_status = 200  # status of the first page past the data (404 = end marker)
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.path)
+        server.connections.add(self.client_address)
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query["page"][0])
+        time.sleep(self.latency)
+        data = []
+        if page <= self.pages:
+            data = [
+                {
+                    "client": f"Client {page}",
+                    "purchase_date": query["date"][0],
+                    "product": "Phone",
+                    "price": float(page),
+                }
+            ]
+        body = json.dumps(data).encode()
+
+        status = self.status
+        if page == self.fail_page:
+            status = 503
+        elif page > self.pages:
+            status = self.end_status
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if self.chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (body[:5], body[5:]):
+                self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sales_server():
+    """Local upstream stub; yields a factory taking handler overrides."""
+    servers = []
+
+    def start(**overrides):
+        handler = type("Handler", (_SalesHandler,), overrides)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler, bind_and_activate=False)
+        server.daemon_threads = True
+        server.request_queue_size = 64
+        server.server_bind()
+        server.server_activate()
+        server.requests, server.connections = [], set()
+        threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        ).start()
+        servers.append(server)
+        host, port = server.server_address
+        return server, f"http://{host}:{port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _run(coro_factory):
+    async def main():
+        return await coro_factory()
+
+    return asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit_sleep():
+    """Skip the 0.2 s pause between pages."""
+    sleep = asyncio.sleep
+
+    async def no_sleep(delay):
+        await sleep(0)
+
+    with patch(
+        "src.services.jobs.job_1_and_2.async_api_tool.asyncio.sleep", new=no_sleep
+    ):
+        yield
+
+
+class TestAsyncClient:
+    """Test the pooled httpx client used by AsyncAPITool."""
+
+    def test_reuses_keep_alive_connection(self, sales_server):
+        """Test that sequential requests share one pooled connection."""
+        server, url = sales_server()
+
+        async def fetch():
+            api = AsyncAPITool(client=new_async_client(url))
+            for page in (1, 2, 3):
+                await api.get_one_page(date(2022, 8, 9), page=page)
+            await api.aclose()
+
+        _run(fetch)
+
+        assert len(server.requests) == 3
+        assert len(server.connections) == 1
+
+    def test_reads_chunked_body(self, sales_server):
+        """Test that a chunked response body is reassembled."""
+        _, url = sales_server(chunked=True)
+
+        async def fetch():
+            api = AsyncAPITool(client=new_async_client(url))
+            try:
+                return await api.get_one_page(date(2022, 8, 9))
+            finally:
+                await api.aclose()
+
+        assert _run(fetch)[0]["client"] == "Client 1"
+
+    def test_error_status_raises(self, sales_server):
+        """Test that 4xx/5xx responses raise httpx.HTTPStatusError."""
+        _, url = sales_server(status=500)
+
+        async def fetch():
+            api = AsyncAPITool(client=new_async_client(url))
+            try:
+                return await api.get_one_page(date(2022, 8, 9))
+            finally:
+                await api.aclose()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            _run(fetch)
+
+
+class TestAsyncAPITool:
+    """Test AsyncAPITool pagination and concurrency."""
+
+    def test_get_sales_collects_pages(self, sales_server):
+        """Test that pages are fetched until an empty one."""
+        server, url = sales_server(pages=3)
+        api = AsyncAPITool(client=new_async_client(url))
+
+        result = _run(lambda: api.get_sales(date_=date(2022, 8, 9)))
+
+        assert [r["client"] for r in result] == ["Client 1", "Client 2", "Client 3"]
+        assert len(server.requests) == 4
+
+    def test_get_sales_raises_on_error(self, sales_server):
+        """Test that an upstream error mid-crawl raises instead of partial data."""
+        _, url = sales_server(pages=3, fail_page=2)
+        api = AsyncAPITool(client=new_async_client(url))
+
+        with pytest.raises(IncompleteFetchError) as exc_info:
+            _run(lambda: api.get_sales(date_=date(2022, 8, 9)))
+        assert exc_info.value.page == 2
+        assert exc_info.value.fetched == 1
+
+    def test_get_sales_404_ends_pagination(self, sales_server):
+        """Test that a 404 past the last page is the normal end of data."""
+        _, url = sales_server(pages=2, end_status=404)
+        api = AsyncAPITool(client=new_async_client(url))
+
+        assert len(_run(lambda: api.get_sales(date_=date(2022, 8, 9)))) == 2
+
+    def test_get_sales_applies_deduplicator(self, sales_server):
+        """Test that the deduplicator filters each page."""
+        _, url = sales_server(pages=2)
+        api = AsyncAPITool(client=new_async_client(url))
+        dedup = RecordDeduplicator()
+        # a previous page ending with the row upstream serves again on page 1
+        previous_page = {
+            "client": "Client 1",
+            "purchase_date": "2022-08-09",
+            "product": "Phone",
+            "price": 1.0,
+        }
+        list(dedup.filter([previous_page]))
+
+        result = _run(lambda: api.get_sales(date_=date(2022, 8, 9), deduplicator=dedup))
+
+        assert [r["client"] for r in result] == ["Client 2"]
+
+    def test_dates_fetched_concurrently(self, sales_server):
+        """Test that many dates overlap in one event loop instead of queueing."""
+        _, url = sales_server(pages=1, latency=0.1)
+        api = AsyncAPITool(client=new_async_client(url, pool_size=16))
+        dates = [date(2022, 8, day) for day in range(1, 17)]
+
+        async def fetch_all():
+            started = time.perf_counter()
+            results = await asyncio.gather(*(api.get_sales(d) for d in dates))
+            return results, time.perf_counter() - started
+
+        results, elapsed = _run(fetch_all)
+
+        assert all(len(r) == 1 for r in results)
+        # 16 dates x 2 requests x 0.1 s = 3.2 s if run one after another
+        assert elapsed < 1.0
+
+
+class TestSaveSalesAsync:
+    """Test save_sales_to_local_disk_async."""
+
+    def test_writes_files_via_exporter(self, sales_server, temp_file_storage):
+        """Test that fetched records are written to raw and stg zones."""
+        _, url = sales_server(pages=2)
+        api = AsyncAPITool(client=new_async_client(url))
+
+        with patch(
+            "src.services.jobs.job_1_and_2.async_save_sales.FILE_STORAGE",
+            str(temp_file_storage),
+        ):
+            result = _run(
+                lambda: save_sales_to_local_disk_async(
+                    date(2022, 8, 9), to_stg=True, api_tool=api
+                )
+            )
+
+        assert result.endswith("stg/sales/2022-08-09/sales_2022-08-09.avro")
+        raw = temp_file_storage / "raw/sales/2022-08-09/sales_2022-08-09.json"
+        assert len(json.loads(raw.read_text())) == 2
+
+    def test_returns_none_without_data(self, sales_server, temp_file_storage):
+        """Test that no file is written when the API has no data."""
+        _, url = sales_server(pages=0)
+        api = AsyncAPITool(client=new_async_client(url))
+
+        with patch(
+            "src.services.jobs.job_1_and_2.async_save_sales.FILE_STORAGE",
+            str(temp_file_storage),
+        ):
+            result = _run(
+                lambda: save_sales_to_local_disk_async(date(2022, 8, 9), api_tool=api)
+            )
+
+        assert result is None
+        assert not (temp_file_storage / "raw").exists()
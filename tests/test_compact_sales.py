@@ -0,0 +1,201 @@
+"""Tests for compact_sales.py - SalesCompactor and SalesManifest."""
+
+import json
+from datetime import date
+from unittest.mock import Mock
+
+import fastavro
+import pytest
+
+from src.services.jobs.job_1_and_2.compact_sales import SalesCompactor, _merge_ranges
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+
+def _records(for_date: date, count: int = 3):
+    return [
+        {
+            "client": f"Client {i}",
+            "purchase_date": for_date.isoformat(),
+            "product": f"Product {i}",
+            "price": float(i * 10),
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def daily_stg(temp_file_storage):
+    """Export three daily STG partitions (two in August, one in September)."""
+    dates = [date(2022, 8, 9), date(2022, 8, 10), date(2022, 9, 1)]
+    mock_api = Mock()
+    exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+    for i, for_date in enumerate(dates):
+        mock_api.get_sales.return_value = _records(for_date, count=i + 2)
+        exporter.export(for_date=for_date, to_stg=True)
+    return dates
+
+
+class TestSalesManifest:
+    """Test SalesManifest read/write."""
+
+    def test_export_registers_raw_and_stg(self, temp_file_storage, daily_stg):
+        """Test that SalesExporter records both zones in the manifest."""
+        manifest = SalesManifest(temp_file_storage)
+        entry = manifest.get(date(2022, 8, 9), "stg")
+        assert entry["path"] == "stg/sales/2022-08-09/sales_2022-08-09.avro"
+        assert entry["records"] == 2
+        assert manifest.get("2022-08-09", "raw")["records"] == 2
+        assert manifest.dates("stg") == ["2022-08-09", "2022-08-10", "2022-09-01"]
+
+    def test_get_missing_returns_none(self, temp_file_storage):
+        """Test that a missing date/zone resolves to None."""
+        manifest = SalesManifest(temp_file_storage)
+        assert manifest.get(date(2022, 8, 9), "stg") is None
+
+    def test_state_sections(self, temp_file_storage):
+        """Test that state sections are stored apart from sales entries."""
+        manifest = SalesManifest(temp_file_storage)
+        assert manifest.state("ingestion") == {}
+
+        manifest.set_state("ingestion", {"watermark": "2022-08-09"})
+
+        assert manifest.state("ingestion") == {"watermark": "2022-08-09"}
+        assert manifest.load()["sales"] == {}
+        with pytest.raises(ValueError):
+            manifest.set_state("sales", {})
+
+
+class TestSalesCompactor:
+    """Test SalesCompactor.compact and readers."""
+
+    def test_invalid_period(self, temp_file_storage):
+        """Test that an unknown period is rejected."""
+        with pytest.raises(ValueError):
+            SalesCompactor(file_storage=temp_file_storage, period="year")
+
+    def test_period_keys(self, temp_file_storage):
+        """Test month and ISO week period keys."""
+        monthly = SalesCompactor(file_storage=temp_file_storage)
+        weekly = SalesCompactor(file_storage=temp_file_storage, period="week")
+        assert monthly.period_key(date(2022, 8, 9)) == "2022-08"
+        assert weekly.period_key(date(2022, 8, 9)) == "2022-W32"
+
+    def test_compact_groups_by_month(self, temp_file_storage, daily_stg):
+        """Test that daily partitions are merged into one file per month."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        written = compactor.compact()
+
+        assert [path.name for path in written] == [
+            "sales_2022-08.avro",
+            "sales_2022-09.avro",
+        ]
+        with written[0].open("rb") as f:
+            records = list(fastavro.reader(f))
+        assert len(records) == 5
+        assert [r["purchase_date"] for r in records] == sorted(
+            r["purchase_date"] for r in records
+        )
+
+    def test_compact_writes_index_and_manifest(self, temp_file_storage, daily_stg):
+        """Test that each date is mapped to a byte range."""
+        SalesCompactor(file_storage=temp_file_storage).compact()
+
+        index_path = (
+            temp_file_storage
+            / "stg"
+            / "sales_compacted"
+            / "2022-08"
+            / "sales_2022-08.index.json"
+        )
+        index = json.loads(index_path.read_text())
+        assert set(index["dates"]) == {"2022-08-09", "2022-08-10"}
+
+        entry = SalesManifest(temp_file_storage).get(date(2022, 8, 10), "stg")
+        assert entry["compacted"] is True
+        assert entry["path"] == "stg/sales_compacted/2022-08/sales_2022-08.avro"
+        assert entry == {**index["dates"]["2022-08-10"], **entry}
+
+    def test_read_date_uses_byte_range(self, temp_file_storage, daily_stg):
+        """Test that a single date is read back from the compacted file."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        compactor.compact(remove_daily=True)
+
+        records = compactor.read_date(date(2022, 8, 10))
+        assert len(records) == 3
+        assert {r["purchase_date"] for r in records} == {"2022-08-10"}
+        daily_dir = temp_file_storage / "stg" / "sales"
+        assert not list(daily_dir.glob("2022-08-*/*.avro"))
+
+    def test_read_date_falls_back_to_daily(self, temp_file_storage, daily_stg):
+        """Test that uncompacted dates are read from the daily file."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        records = compactor.read_date(date(2022, 9, 1))
+        assert len(records) == 4
+
+    def test_iter_range_across_files(self, temp_file_storage, daily_stg):
+        """Test long-range scan over compacted and daily partitions."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        compactor.compact(end=date(2022, 8, 31))
+
+        records = list(compactor.iter_range(date(2022, 8, 10), date(2022, 9, 30)))
+        assert [r["purchase_date"] for r in records] == ["2022-08-10"] * 3 + [
+            "2022-09-01"
+        ] * 4
+
+    def test_recompaction_keeps_existing_days(self, temp_file_storage, daily_stg):
+        """Test that a re-run merges new days into an existing period file."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        compactor.compact(end=date(2022, 8, 9), remove_daily=True)
+
+        mock_api = Mock()
+        mock_api.get_sales.return_value = _records(date(2022, 8, 11), count=1)
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+        exporter.export(for_date=date(2022, 8, 11), to_stg=True)
+        compactor.compact(start=date(2022, 8, 10), end=date(2022, 8, 31))
+
+        assert len(compactor.read_date(date(2022, 8, 9))) == 2
+        assert len(compactor.read_date(date(2022, 8, 10))) == 3
+        assert len(compactor.read_date(date(2022, 8, 11))) == 1
+
+    def test_reexported_day_read_once(self, temp_file_storage, daily_stg):
+        """Test that a day re-exported after compaction is not yielded twice."""
+        mock_api = Mock()
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+        mock_api.get_sales.return_value = _records(date(2022, 8, 11), count=1)
+        exporter.export(for_date=date(2022, 8, 11), to_stg=True)
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        compactor.compact(end=date(2022, 8, 31), remove_daily=True)
+
+        # 2022-08-10 now lives in a daily file and as a stale block in the middle
+        mock_api.get_sales.return_value = _records(date(2022, 8, 10), count=5)
+        exporter.export(for_date=date(2022, 8, 10), to_stg=True)
+
+        august = (date(2022, 8, 1), date(2022, 8, 31))
+        dates = [r["purchase_date"] for r in compactor.iter_range(*august)]
+        assert dates.count("2022-08-10") == 5
+        assert len(dates) == 2 + 5 + 1
+
+        # recompaction drops the stale block and takes the new daily file
+        compactor.compact(end=date(2022, 8, 31), remove_daily=True)
+        assert len(compactor.read_date(date(2022, 8, 10))) == 5
+        assert len(list(compactor.iter_range(*august))) == 8
+
+    def test_iter_range_skips_gaps(self, temp_file_storage, daily_stg):
+        """Test that days outside the range inside one file are not decoded."""
+        compactor = SalesCompactor(file_storage=temp_file_storage)
+        compactor.compact()
+        index = json.loads(
+            (
+                temp_file_storage
+                / "stg/sales_compacted/2022-08/sales_2022-08.index.json"
+            ).read_text()
+        )["dates"]
+        entries = [dict(index["2022-08-09"]), dict(index["2022-08-10"])]
+        entries[0]["length"] -= 1  # a gap between the two days
+
+        assert len(_merge_ranges(entries)) == 2
+        assert len(_merge_ranges([index["2022-08-09"], index["2022-08-10"]])) == 1
+
+        records = list(compactor.iter_range(date(2022, 8, 10), date(2022, 8, 10)))
+        assert {r["purchase_date"] for r in records} == {"2022-08-10"}
@@ -0,0 +1,236 @@
+"""Tests for day_cache.py - the cross-worker cache of recently exported days."""
+
+import json
+import multiprocessing
+import os
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.services.cache.day_cache import DayCache
+from src.services.jobs.job_1_and_2 import save_sales as save_sales_module
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter, summarize_sales
+from src.services.storage.object_storage import LocalStorage
+
+DAY = date(2022, 8, 9)
+
+
+def _payload(records):
+    return json.dumps(records, indent=4).encode()
+
+
+def _age(cache, for_date, seconds):
+    """Move the LRU mark of an entry into the past."""
+    path = cache._path(for_date)
+    stamp = os.stat(path).st_mtime - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def _put_in_child(directory):
+    DayCache(directory, max_bytes=10_000).put(DAY, b"[1, 2]", {"records": 2})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DayCache(tmp_path / "cache", max_bytes=1000)
+
+
+class TestDayCache:
+    """Entries, LRU eviction and the byte budget."""
+
+    def test_round_trip(self, cache):
+        assert cache.get(DAY) is None
+        assert cache.put(DAY, b"[]", {"records": 0}) is True
+        day = cache.get(DAY)
+        assert day.payload == b"[]"
+        assert day.summary == {"records": 0}
+        assert cache.summary("2022-08-09") == {"records": 0}
+
+    def test_put_replaces_entry(self, cache):
+        cache.put(DAY, b"old", {"v": 1})
+        cache.put(DAY, b"new", {"v": 2})
+        assert cache.get(DAY).payload == b"new"
+        assert cache.stats()["entries"] == 1
+
+    def test_evicts_least_recently_used(self, cache):
+        for day in (1, 2, 3):
+            cache.put(f"2022-08-0{day}", b"x" * 300, {})
+            _age(cache, f"2022-08-0{day}", 100 - day)
+        _age(cache, "2022-08-01", -50)  # read recently
+        cache.put("2022-08-04", b"x" * 300, {})
+        assert cache.get("2022-08-01") is not None
+        assert cache.get("2022-08-02") is None
+        assert cache.stats()["bytes"] <= cache.max_bytes
+
+    def test_hit_refreshes_lru_mark(self, cache):
+        cache.put(DAY, b"x", {})
+        _age(cache, DAY, 100)
+        before = os.stat(cache._path(DAY)).st_mtime
+        cache.get(DAY)
+        assert os.stat(cache._path(DAY)).st_mtime > before
+
+    def test_entry_over_budget_is_skipped(self, cache):
+        assert cache.put(DAY, b"x" * 2000, {}) is False
+        assert cache.get(DAY) is None
+
+    def test_broken_entry_is_a_miss(self, cache):
+        cache.put(DAY, b"x", {})
+        cache._path(DAY).write_bytes(b"garbage")
+        assert cache.get(DAY) is None
+        assert not cache._path(DAY).exists()
+
+    def test_invalidate(self, cache):
+        cache.put(DAY, b"x", {})
+        cache.invalidate(DAY)
+        cache.invalidate(DAY)
+        assert cache.get(DAY) is None
+
+    def test_key_must_be_a_date(self, cache):
+        with pytest.raises(ValueError):
+            cache.get("../etc")
+
+    def test_shared_between_processes(self, tmp_path):
+        directory = tmp_path / "shared"
+        process = multiprocessing.get_context("fork").Process(
+            target=_put_in_child, args=(directory,)
+        )
+        process.start()
+        process.join()
+        assert DayCache(directory, max_bytes=10_000).get(DAY).payload == b"[1, 2]"
+
+
+class TestExporterFillsCache:
+    """SalesExporter puts the JSON it just wrote into the cache."""
+
+    def test_save_puts_payload_and_summary(self, tmp_path, cache, sample_sales_data):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock(), cache=cache)
+        json_path = exporter.save(DAY, sample_sales_data)
+        day = cache.get(DAY)
+        assert day.payload == json_path.read_bytes()
+        assert day.summary == summarize_sales(sample_sales_data)
+
+    def test_summary(self):
+        records = [
+            {"client": "A", "product": "TV", "price": 10.5},
+            {"client": "A", "product": "PC", "price": 1},
+            {"client": "B", "product": "TV", "price": 2},
+        ]
+        assert summarize_sales(records) == {
+            "records": 3,
+            "revenue": 13.5,
+            "clients": 2,
+            "products": 2,
+            "invalid": 0,
+        }
+
+    def test_summary_counts_unconvertible_rows(self):
+        records = [
+            {"client": "A", "price": "n/a"},
+            {"client": ["B"], "price": "2.5"},
+            "not a record",
+        ]
+        summary = summarize_sales(records)
+        assert summary["revenue"] == 2.5
+        assert summary["invalid"] == 2
+        assert summary["clients"] == 2
+
+    def test_summary_skips_quarantined_rows(self, tmp_path, cache, sample_sales_data):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock(), cache=cache)
+        bad = dict(sample_sales_data[0], price="n/a")
+        json_path = exporter.save(DAY, sample_sales_data + [bad])
+        day = cache.get(DAY)
+        assert day.payload == json_path.read_bytes()  # raw stays complete
+        assert day.summary == summarize_sales(sample_sales_data)
+
+    def test_broken_summary_does_not_fail_export(self, tmp_path, cache):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock(), cache=cache)
+        with patch.object(save_sales_module, "summarize_sales", side_effect=KeyError):
+            assert exporter.save(DAY, [{"client": "A"}]).exists()
+        assert cache.get(DAY) is None
+
+
+class TestSalesEndpoints:
+    """GET /v1/api/sales/<date>[/summary]."""
+
+    @pytest.fixture
+    def storage_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(save_sales_module, "FILE_STORAGE", str(tmp_path))
+        return tmp_path
+
+    def test_hot_day_served_from_cache(self, client, day_cache, storage_dir):
+        day_cache.put(DAY, b'[{"client": "A"}]', {"records": 1})
+        response = client.get("/v1/api/sales/2022-08-09")
+        assert response.status_code == 200
+        assert response.content_type == "application/json"
+        assert response.get_json() == [{"client": "A"}]
+
+    def test_miss_reads_storage_and_fills_cache(
+        self, client, day_cache, storage_dir, sample_sales_data
+    ):
+        SalesExporter(file_storage=storage_dir, api_tool=Mock()).save(
+            DAY, sample_sales_data
+        )
+        assert day_cache.get(DAY) is None
+
+        response = client.get("/v1/api/sales/2022-08-09")
+
+        assert response.get_json() == sample_sales_data
+        assert day_cache.summary(DAY) == summarize_sales(sample_sales_data)
+
+    def test_miss_summary_skips_invalid_rows(
+        self, client, day_cache, storage_dir, sample_sales_data
+    ):
+        SalesExporter(file_storage=storage_dir, api_tool=Mock()).save(
+            DAY, sample_sales_data + [{"client": "A"}]
+        )
+        response = client.get("/v1/api/sales/2022-08-09/summary")
+        assert response.get_json() == {
+            "date": "2022-08-09",
+            **summarize_sales(sample_sales_data),
+        }
+
+    def test_miss_reads_compressed_raw(self, client, storage_dir, sample_sales_data):
+        from src.services.jobs.job_1_and_2.tiering import RawTiering
+
+        SalesExporter(file_storage=storage_dir, api_tool=Mock()).save(
+            DAY, sample_sales_data
+        )
+        RawTiering(
+            LocalStorage(storage_dir),
+            SalesManifest(storage_dir),
+            codec="gzip",
+            today=lambda: date(2022, 12, 1),
+        ).run()
+        assert client.get("/v1/api/sales/2022-08-09").get_json() == sample_sales_data
+
+    def test_summary_endpoint(self, client, day_cache, storage_dir):
+        day_cache.put(DAY, b"[]", {"records": 0})
+        response = client.get("/v1/api/sales/2022-08-09/summary")
+        assert response.get_json() == {"date": "2022-08-09", "records": 0}
+
+    def test_unknown_day(self, client, storage_dir):
+        assert client.get("/v1/api/sales/2022-08-09").status_code == 404
+        assert client.get("/v1/api/sales/2022-08-09/summary").status_code == 404
+
+    def test_invalid_date(self, client):
+        assert client.get("/v1/api/sales/09.08.2022").status_code == 400
+
+    def test_job_response_has_summary(self, client, day_cache):
+        def export(date_, to_stg):
+            day_cache.put(date_, b"[]", {"records": 0})
+            return "/tmp/sales.json"
+
+        with patch("src.flask_app.routes.api_routes.save_sales_to_local_disk", export):
+            response = client.post("/v1/api/job", json={"date": "2022-08-09"})
+        assert response.status_code == 201
+        assert response.get_json()["summary"] == {"records": 0}
+
+    @patch("src.flask_app.routes.routers.save_sales_to_local_disk")
+    def test_home_form_served_from_cache(self, mock_save_sales, client, day_cache):
+        day_cache.put(DAY, _payload([{"client": "A"}]), {"records": 1})
+        mock_save_sales.return_value = "/nonexistent/sales_2022-08-09.json"
+        response = client.post("/", data={"sale_date": "2022-08-09"})
+        assert response.status_code == 200
+        assert json.loads(response.data) == [{"client": "A"}]
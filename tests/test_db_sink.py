@@ -0,0 +1,229 @@
+"""Tests for db_sink.py - bulk idempotent sales loading into a database."""
+
+import sqlite3
+import threading
+from datetime import date
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from src.services.jobs.job_1_and_2.db_sink import (
+    ConnectionPool,
+    PoolTimeout,
+    PostgresSalesSink,
+    SalesSink,
+    SQLiteSalesSink,
+    partitions,
+)
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+
+def _records(day="2022-08-10", count=3):
+    return [
+        {"client": f"C{i}", "purchase_date": day, "product": "P", "price": i}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def sink(tmp_path):
+    """A SQLite sink with tiny batches."""
+    sink = SQLiteSalesSink(tmp_path / "sales.sqlite3", batch_size=2, pool_size=2)
+    yield sink
+    sink.close()
+
+
+def _query(sink, sql):
+    conn = sqlite3.connect(sink.path)
+    try:
+        return conn.execute(sql).fetchall()
+    finally:
+        conn.close()
+
+
+class TestPartitions:
+    """Test grouping of records by purchase_date."""
+
+    def test_rows_in_column_order(self):
+        """Test that records become tuples keyed by purchase_date."""
+        grouped = partitions(_records(count=1) + _records("2022-08-11", 1))
+
+        assert grouped == {
+            "2022-08-10": [("2022-08-10", "C0", "P", 0.0)],
+            "2022-08-11": [("2022-08-11", "C0", "P", 0.0)],
+        }
+
+
+class TestSQLiteSalesSink:
+    """Test the SQLite stand-in sink."""
+
+    def test_load_in_batches(self, sink):
+        """Test that all rows arrive even when split over several batches."""
+        assert sink.load(_records(count=5)) == 5
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(5,)]
+
+    def test_reload_is_idempotent(self, sink):
+        """Test that loading the same day twice replaces the partition."""
+        sink.load(_records(count=5))
+        sink.load(_records(count=3))
+
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(3,)]
+        assert _query(sink, "SELECT purchase_date, rows FROM sales_partitions") == [
+            ("2022-08-10", 3)
+        ]
+
+    def test_other_partitions_untouched(self, sink):
+        """Test that only the loaded purchase dates are replaced."""
+        sink.load(_records("2022-08-09", 2))
+        sink.load(_records("2022-08-10", 4))
+
+        counts = _query(
+            sink,
+            "SELECT purchase_date, COUNT(*) FROM sales GROUP BY 1 ORDER BY 1",
+        )
+        assert counts == [("2022-08-09", 2), ("2022-08-10", 4)]
+
+    def test_failed_load_rolls_back(self, sink):
+        """Test that a bad record leaves the previous partition intact."""
+        sink.load(_records(count=2))
+        bad = _records(count=2) + [
+            {"client": None, "purchase_date": "2022-08-10", "product": "P", "price": 1}
+        ]
+
+        with pytest.raises(sqlite3.IntegrityError):
+            sink.load(bad)
+
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(2,)]
+
+    def test_empty_load(self, sink):
+        """Test that no records is a no-op."""
+        assert sink.load([]) == 0
+
+    def test_concurrent_loads(self, sink):
+        """Test that parallel loads of different days all land."""
+        days = [f"2022-08-{day:02d}" for day in range(1, 9)]
+        threads = [
+            threading.Thread(target=sink.load, args=(_records(day, 10),))
+            for day in days
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(80,)]
+
+
+class TestConnectionPool:
+    """Test connection reuse and limits."""
+
+    def test_connection_reused(self):
+        """Test that a returned connection is handed out again."""
+        connect = Mock(side_effect=lambda: Mock())
+        pool = ConnectionPool(connect, size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert connect.call_count == 1
+
+    def test_broken_connection_discarded(self):
+        """Test that a connection is closed and replaced after an error."""
+        pool = ConnectionPool(lambda: Mock(), size=1)
+        with pytest.raises(RuntimeError):
+            with pool.connection() as broken:
+                raise RuntimeError("boom")
+
+        with pool.connection() as fresh:
+            assert fresh is not broken
+        broken.close.assert_called_once()
+
+    def test_exhausted_pool_times_out(self):
+        """Test that waiting for a free connection fails instead of hanging."""
+        pool = ConnectionPool(lambda: Mock(), size=1, timeout=0.05)
+        with pool.connection():
+            with pytest.raises(PoolTimeout, match="all 1 in use"):
+                with pool.connection():
+                    pass
+
+        with pool.connection():
+            pass  # the held connection went back to the pool
+
+    def test_sink_is_abstract(self):
+        """Test that a sink without _replace_partitions cannot be created."""
+        with pytest.raises(TypeError):
+            SalesSink(ConnectionPool(Mock()))
+
+
+class TestPostgresSalesSink:
+    """Test the COPY-based PostgreSQL path with a fake psycopg connection."""
+
+    def test_copy_then_replace_partitions(self):
+        """Test COPY into a staging table, partition delete and upsert."""
+        conn = MagicMock()
+        cursor = conn.cursor.return_value.__enter__.return_value
+        copy = cursor.copy.return_value.__enter__.return_value
+        sink = PostgresSalesSink("dbname=test", batch_size=100)
+
+        with patch.object(sink.pool, "connect", return_value=conn):
+            assert sink.load(_records(count=3)) == 3
+
+        assert copy.write_row.call_count == 3
+        statements = [call.args[0] for call in cursor.execute.call_args_list]
+        assert statements[0].startswith("CREATE TEMP TABLE sales_stage")
+        assert statements[1].startswith("DELETE FROM sales")
+        assert cursor.execute.call_args_list[1].args[1] == (["2022-08-10"],)
+        assert "ON CONFLICT (purchase_date)" in cursor.executemany.call_args.args[0]
+
+
+class TestExporterSink:
+    """Test the DB stage inside SalesExporter."""
+
+    def test_export_loads_into_sink(self, temp_file_storage, sample_sales_data, sink):
+        """Test that export writes files and loads the day into the DB."""
+        api = Mock()
+        api.get_sales.return_value = sample_sales_data
+        exporter = SalesExporter(
+            file_storage=temp_file_storage, api_tool=api, sink=sink
+        )
+
+        exporter.export(for_date=date(2022, 8, 10))
+        exporter.export(for_date=date(2022, 8, 10), to_stg=True)
+
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(2,)]
+
+    def test_invalid_rows_not_loaded(self, temp_file_storage, sink):
+        """Test that rows failing the schema are quarantined, not loaded."""
+        records = _records() + [
+            {"client": "X", "purchase_date": "2022-08-10", "price": 1},
+            {
+                "client": "Y",
+                "purchase_date": "2022-08-10",
+                "product": "P",
+                "price": "x",
+            },
+        ]
+        exporter = SalesExporter(
+            file_storage=temp_file_storage, api_tool=Mock(), sink=sink
+        )
+
+        exporter.save(date(2022, 8, 10), records)
+
+        assert _query(sink, "SELECT COUNT(*) FROM sales") == [(3,)]
+        assert exporter.last_quarantined == 2
+
+    def test_no_data_skips_sink(self, temp_file_storage):
+        """Test that an empty day does not touch the DB."""
+        api = Mock()
+        api.get_sales.return_value = []
+        fake_sink = Mock()
+        exporter = SalesExporter(
+            file_storage=temp_file_storage, api_tool=api, sink=fake_sink
+        )
+
+        exporter.export(for_date=date(2022, 8, 10))
+
+        fake_sink.load.assert_not_called()
@@ -0,0 +1,122 @@
+"""Tests for dedup.py - RecordDeduplicator."""
+
+from datetime import date
+from unittest.mock import Mock, patch
+
+from src.services.jobs.job_1_and_2.dedup import RecordDeduplicator
+from src.services.jobs.job_1_and_2.fake_api_tool import APITool
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+
+def _pages(dedup, *pages):
+    return [list(dedup.filter(page)) for page in pages]
+
+
+class TestRecordDeduplicator:
+    """Test id-based and page-boundary de-duplication."""
+
+    def test_identical_rows_are_kept(self, sample_sales_data):
+        """Test that identical rows (repeat purchases) are not dropped."""
+        dedup = RecordDeduplicator()
+        repeat = dict(sample_sales_data[0])
+        records = [sample_sales_data[0], repeat, *sample_sales_data[1:]]
+
+        result = list(dedup.filter(records))
+
+        assert result == records
+        assert dedup.dropped == 0
+
+    def test_drops_repeated_ids(self):
+        """Test that a record whose upstream id was seen is dropped."""
+        dedup = RecordDeduplicator()
+        pages = _pages(
+            dedup,
+            [{"id": 1, "price": 1}, {"id": 2, "price": 1}],
+            [{"id": 3, "price": 1}, {"id": 1, "price": 1}],
+        )
+        assert pages == [
+            [{"id": 1, "price": 1}, {"id": 2, "price": 1}],
+            [{"id": 3, "price": 1}],
+        ]
+        assert dedup.dropped == 1
+
+    def test_custom_id_field(self):
+        """Test that the id field is configurable."""
+        dedup = RecordDeduplicator(key="sale_id")
+        pages = _pages(dedup, [{"sale_id": "a"}], [{"sale_id": "a"}, {"id": 1}])
+        assert pages == [[{"sale_id": "a"}], [{"id": 1}]]
+
+    def test_page_boundary_overlap_dropped(self):
+        """Test that rows repeating the previous page's tail are dropped."""
+        dedup = RecordDeduplicator()
+        a, b, c, d = ({"client": name} for name in "ABCD")
+        pages = _pages(dedup, [a, b, c], [b, c, d], [d])
+        assert pages == [[a, b, c], [d], []]
+        assert dedup.dropped == 3
+
+    def test_repeats_inside_a_page_are_kept(self):
+        """Test that only the boundary overlap counts for rows without ids."""
+        dedup = RecordDeduplicator()
+        a, b = {"client": "A"}, {"client": "B"}
+        pages = _pages(dedup, [a, b, a], [b, a, b])
+        assert pages == [[a, b, a], [b]]
+
+    def test_id_set_bounded_without_false_drops(self):
+        """Test that past max_exact ids nothing is dropped any more."""
+        dedup = RecordDeduplicator(max_exact=10)
+        records = [{"id": i} for i in range(50)]
+
+        first = list(dedup.filter(records))
+        second = list(dedup.filter(reversed(records)))
+
+        assert first == records
+        assert len(second) == 50
+        assert dedup.dropped == 0
+
+
+class TestDedupPipeline:
+    """Test dedup wiring into APITool and SalesExporter."""
+
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
+    def test_get_sales_dedups_page_boundaries(self, mock_sleep, mock_get):
+        """Test that a row repeated at the start of the next page is dropped."""
+        mock_response = Mock()
+        mock_response.json.side_effect = [
+            [{"client": "Client1"}, {"client": "Client2"}],
+            [{"client": "Client2"}, {"client": "Client3"}],
+            [],
+        ]
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        dedup = RecordDeduplicator()
+        result = APITool().get_sales(date_=date(2022, 8, 9), deduplicator=dedup)
+
+        assert [r["client"] for r in result] == ["Client1", "Client2", "Client3"]
+        assert dedup.dropped == 1
+
+    def test_exporter_reports_dropped(self, temp_file_storage, sample_sales_data):
+        """Test that SalesExporter passes a deduplicator and reports drops."""
+
+        def get_sales(date_, deduplicator):
+            pages = [sample_sales_data, sample_sales_data]
+            return [r for page in pages for r in deduplicator.filter(page)]
+
+        mock_api = Mock()
+        mock_api.get_sales.side_effect = get_sales
+        exporter = SalesExporter(
+            file_storage=temp_file_storage, api_tool=mock_api, dedup=True
+        )
+        exporter.export(for_date=date(2022, 8, 10))
+
+        assert exporter.last_duplicates_dropped == 2
+
+    def test_exporter_dedup_disabled_by_default(self, temp_file_storage):
+        """Test that dedup is opt-in."""
+        mock_api = Mock()
+        mock_api.get_sales.return_value = []
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+        exporter.export(for_date=date(2022, 8, 10))
+
+        mock_api.get_sales.assert_called_once_with(date_=date(2022, 8, 10))
@@ -6,7 +6,12 @@ from unittest.mock import MagicMock, Mock, patch
 import pytest
 import requests
 
-from src.services.jobs.job_1_and_2.fake_api_tool import APITool
+from src.services.jobs.job_1_and_2 import fake_api_tool
+from src.services.jobs.job_1_and_2.fake_api_tool import (
+    APITool,
+    IncompleteFetchError,
+    get_session,
+)
 
 
 class TestAPIToolInit:
@@ -28,7 +33,7 @@ class TestAPIToolInit:
 class TestAPIToolGetOnePage:
     """Test APITool.get_one_page method."""
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     def test_get_one_page_success(self, mock_get):
         """Test successful get_one_page request."""
         mock_response = Mock()
@@ -44,7 +49,7 @@ class TestAPIToolGetOnePage:
         assert "2022-08-09" in str(mock_get.call_args)
         assert "page" in str(mock_get.call_args)
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     def test_get_one_page_with_different_page(self, mock_get):
         """Test get_one_page with different page number."""
         mock_response = Mock()
@@ -60,7 +65,7 @@ class TestAPIToolGetOnePage:
         call_args = mock_get.call_args
         assert call_args[1]["params"]["page"] == "2"
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     def test_get_one_page_with_auth_header(self, mock_get):
         """Test that get_one_page includes auth header."""
         mock_response = Mock()
@@ -74,7 +79,7 @@ class TestAPIToolGetOnePage:
         call_args = mock_get.call_args
         assert "Authorization" in call_args[1]["headers"]
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     def test_get_one_page_raises_http_error(self, mock_get):
         """Test get_one_page when HTTP error occurs."""
         mock_response = Mock()
@@ -91,7 +96,7 @@ class TestAPIToolGetOnePage:
 class TestAPIToolGetSales:
     """Test APITool.get_sales method."""
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_single_page(self, mock_sleep, mock_get):
         """Test get_sales with single page of data."""
@@ -110,7 +115,7 @@ class TestAPIToolGetSales:
         assert result[0]["client"] == "Test"
         assert mock_get.call_count >= 1
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_multiple_pages(self, mock_sleep, mock_get):
         """Test get_sales with multiple pages of data."""
@@ -132,7 +137,7 @@ class TestAPIToolGetSales:
         assert result[1]["client"] == "Client2"
         assert result[2]["client"] == "Client3"
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_no_data(self, mock_sleep, mock_get):
         """Test get_sales when no data is available."""
@@ -146,10 +151,10 @@ class TestAPIToolGetSales:
 
         assert result == []
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
-    def test_get_sales_handles_request_exception(self, mock_sleep, mock_get):
-        """Test get_sales handles RequestException."""
+    def test_get_sales_raises_on_request_exception(self, mock_sleep, mock_get):
+        """Test get_sales raises instead of returning partial data."""
         mock_response = Mock()
         mock_response.raise_for_status.side_effect = (
             requests.exceptions.RequestException("Connection error")
@@ -157,27 +162,69 @@ class TestAPIToolGetSales:
         mock_get.return_value = mock_response
 
         api = APITool()
-        result = api.get_sales(date_=date(2022, 8, 9))
+        with pytest.raises(IncompleteFetchError) as exc_info:
+            api.get_sales(date_=date(2022, 8, 9))
 
-        # Should return empty list or partial data before error
-        assert isinstance(result, list)
+        assert exc_info.value.page == 1
+        assert isinstance(
+            exc_info.value.__cause__, requests.exceptions.RequestException
+        )
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
-    def test_get_sales_handles_unexpected_exception(self, mock_sleep, mock_get):
-        """Test get_sales handles unexpected exceptions."""
+    def test_get_sales_raises_on_mid_crawl_timeout(self, mock_sleep, mock_get):
+        """Test a timeout after some pages does not look like the end of data."""
+        page = Mock()
+        page.json.return_value = [{"client": "Client1"}]
+        mock_get.side_effect = [page, requests.exceptions.Timeout("read timed out")]
+
+        with pytest.raises(IncompleteFetchError) as exc_info:
+            APITool().get_sales(date_=date(2022, 8, 9))
+
+        assert exc_info.value.page == 2
+        assert exc_info.value.fetched == 1
+
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
+    def test_get_sales_404_ends_pagination(self, mock_sleep, mock_get):
+        """Test that a 404 past the last page is the normal end of data."""
+        page = Mock()
+        page.json.return_value = [{"client": "Client1"}]
+        end = Mock()
+        end.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            "404 Not Found", response=Mock(status_code=404)
+        )
+        mock_get.side_effect = [page, end]
+
+        assert APITool().get_sales(date_=date(2022, 8, 9)) == [{"client": "Client1"}]
+
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
+    def test_get_sales_raises_on_5xx(self, mock_sleep, mock_get):
+        """Test that a 5xx is an error, unlike the 404 end marker."""
+        mock_response = Mock()
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError(
+            "502 Bad Gateway", response=Mock(status_code=502)
+        )
+        mock_get.return_value = mock_response
+
+        with pytest.raises(IncompleteFetchError):
+            APITool().get_sales(date_=date(2022, 8, 9))
+
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
+    def test_get_sales_raises_on_unexpected_exception(self, mock_sleep, mock_get):
+        """Test get_sales raises on a broken page (e.g. invalid JSON)."""
         mock_response = Mock()
         mock_response.json.side_effect = ValueError("Invalid JSON")
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
         api = APITool()
-        result = api.get_sales(date_=date(2022, 8, 9))
-
-        # Should handle exception and return what was collected
-        assert isinstance(result, list)
+        with pytest.raises(IncompleteFetchError, match="Invalid JSON"):
+            api.get_sales(date_=date(2022, 8, 9))
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_stops_on_non_list_response(self, mock_sleep, mock_get):
         """Test get_sales stops when response is not a list."""
@@ -196,7 +243,7 @@ class TestAPIToolGetSales:
         assert len(result) == 1
         assert result[0]["client"] == "Client1"
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_rate_limiting(self, mock_sleep, mock_get):
         """Test that get_sales implements rate limiting."""
@@ -217,7 +264,7 @@ class TestAPIToolGetSales:
         # Check sleep duration is 0.2 seconds
         mock_sleep.assert_called_with(0.2)
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_logs_debug_info(self, mock_sleep, mock_get):
         """Test that get_sales logs debug information."""
@@ -233,7 +280,7 @@ class TestAPIToolGetSales:
             # Should log debug info about fetching pages
             mock_logger.debug.assert_called()
 
-    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.get")
+    @patch("src.services.jobs.job_1_and_2.fake_api_tool.requests.Session.get")
     @patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep")
     def test_get_sales_logs_errors(self, mock_sleep, mock_get):
         """Test that get_sales logs errors."""
@@ -245,7 +292,51 @@ class TestAPIToolGetSales:
 
         with patch("src.services.jobs.job_1_and_2.fake_api_tool.logger") as mock_logger:
             api = APITool()
-            api.get_sales(date_=date(2022, 8, 9))
+            with pytest.raises(IncompleteFetchError):
+                api.get_sales(date_=date(2022, 8, 9))
 
             # Should log error
             mock_logger.error.assert_called()
+
+
+class TestAPIToolSession:
+    """Test the shared per-process HTTP session."""
+
+    def test_session_is_shared(self):
+        """Test that APITool instances reuse one pooled session."""
+        assert APITool().session is APITool().session
+        assert APITool().session is get_session()
+
+    def test_session_reset_after_fork(self):
+        """Test that a forked child gets a fresh session."""
+        session = get_session()
+        fake_api_tool._reset_session()
+        assert get_session() is not session
+
+    def test_custom_session(self):
+        """Test that a session can be injected."""
+        session = Mock()
+        session.get.return_value.json.return_value = [{"page": 1}]
+        api = APITool(session=session)
+
+        assert api.get_one_page(date_=date(2022, 8, 9)) == [{"page": 1}]
+        assert "timeout" in session.get.call_args[1]
+
+    def test_upstream_errors_counted(self):
+        """Test that failed page requests increment the error counter."""
+        from src.services.metrics.app_metrics import UPSTREAM_ERRORS
+
+        session = Mock()
+        session.get.side_effect = requests.exceptions.ConnectionError("down")
+        key = ("sync", "connection")
+        before = UPSTREAM_ERRORS._values.get(key, 0)
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            APITool(session=session).get_one_page(date_=date(2022, 8, 9))
+
+        assert UPSTREAM_ERRORS._values[key] == before + 1
+
+    def test_warm_session_swallows_errors(self):
+        """Test that a failing warm-up does not break worker start."""
+        with patch.object(get_session(), "head", side_effect=OSError("down")):
+            fake_api_tool.warm_session()
@@ -0,0 +1,135 @@
+"""Tests for fast_json.py and the orjson-backed Flask JSON provider."""
+
+import json
+import threading
+from datetime import date, datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import jsonify
+
+from src.services import fast_json
+from src.services.jobs.job_1_and_2 import fake_api_tool
+
+RECORDS = [
+    {"client": "Тарас Шевченко", "purchase_date": "2022-08-09", "price": 123},
+    {"product": 'a "quoted" TV', "price": 1.5, "tags": [None, True, False]},
+    {"nested": {"b": 2, "a": [1, 2.25, -3]}, "empty": {}},
+]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Run a test against both backends (orjson only when installed)."""
+    if request.param == "json":
+        monkeypatch.setattr(fast_json, "_orjson", None)
+        monkeypatch.setattr(fast_json, "INDENT", 4)
+    elif fast_json._orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+
+class TestFastJson:
+    """Same JSON as the stdlib, whichever backend is active."""
+
+    def test_compact_is_byte_identical(self, backend):
+        expected = json.dumps(RECORDS, ensure_ascii=False, separators=(",", ":"))
+        assert fast_json.dumps(RECORDS) == expected.encode()
+
+    def test_sort_keys(self, backend):
+        expected = json.dumps(
+            RECORDS, ensure_ascii=False, separators=(",", ":"), sort_keys=True
+        )
+        assert fast_json.dumps(RECORDS, sort_keys=True) == expected.encode()
+
+    def test_indent_round_trips(self, backend):
+        data = fast_json.dumps(RECORDS, indent=True)
+        assert b"\n" + b" " * fast_json.INDENT + b"{" in data
+        assert json.loads(data) == RECORDS
+
+    @pytest.mark.parametrize("data", [b"[1, 2.5]", "[1, 2.5]", bytearray(b"[1,2.5]")])
+    def test_loads(self, backend, data):
+        assert fast_json.loads(data) == [1, 2.5]
+
+    def test_big_int_falls_back_to_stdlib(self, backend):
+        assert fast_json.dumps([2**64]) == b"[18446744073709551616]"
+
+    def test_nan_input_falls_back_to_stdlib(self, backend):
+        value = fast_json.loads(b'{"price": NaN}')["price"]
+        assert value != value
+
+    def test_default_and_non_str_keys(self, backend):
+        data = fast_json.dumps({1: {"x"}}, default=sorted)
+        assert json.loads(data) == {"1": ["x"]}
+
+    def test_invalid_json_raises_value_error(self, backend):
+        with pytest.raises(ValueError):
+            fast_json.loads(b"[1,")
+
+
+class TestBackendSelection:
+    """JSON_BACKEND=auto|orjson|json."""
+
+    def test_json_disables_orjson(self):
+        assert fast_json._load_orjson("json") is None
+
+    def test_invalid_backend(self):
+        with pytest.raises(ValueError):
+            fast_json._load_orjson("simplejson")
+
+    def test_auto_matches_installed(self):
+        try:
+            import orjson
+        except ImportError:
+            orjson = None
+        assert fast_json._load_orjson("auto") is orjson
+
+
+class TestFlaskProvider:
+    """jsonify keeps the DefaultJSONProvider format."""
+
+    def test_jsonify_sorts_keys_and_formats_dates(self, app, backend):
+        with app.app_context():
+            response = jsonify(
+                b=1, a=date(2022, 8, 9), when=datetime(2022, 8, 9, tzinfo=timezone.utc)
+            )
+        assert response.mimetype == "application/json"
+        assert response.get_data() == (
+            b'{"a":"Tue, 09 Aug 2022 00:00:00 GMT","b":1,'
+            b'"when":"Tue, 09 Aug 2022 00:00:00 GMT"}\n'
+        )
+
+    def test_request_json_round_trip(self, client, backend):
+        response = client.post("/v1/api/job", json={"date": "not-a-date"})
+        assert response.status_code == 400
+        assert response.get_json() == {"message": "date must be in format YYYY-MM-DD"}
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps(RECORDS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSessionAdapter:
+    """resp.json() of the shared session goes through fast_json."""
+
+    def test_response_json(self, backend):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _JSONHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        fake_api_tool._reset_session()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/sales"
+            assert fake_api_tool.get_session().get(url, timeout=5).json() == RECORDS
+        finally:
+            fake_api_tool._reset_session()
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,122 @@
+"""Tests for gunicorn.conf.py - production gunicorn profile."""
+
+import os
+import runpy
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+CONF_PATH = Path(__file__).resolve().parent.parent / "gunicorn.conf.py"
+
+
+@pytest.fixture
+def conf(monkeypatch):
+    """Load gunicorn.conf.py as a plain module namespace."""
+    for name in ("WEB_CONCURRENCY", "GUNICORN_THREADS", "GUNICORN_WORKER_CLASS"):
+        monkeypatch.delenv(name, raising=False)
+    return runpy.run_path(str(CONF_PATH))
+
+
+class TestGunicornConf:
+    """Test gunicorn settings and hooks."""
+
+    def test_preload_and_gthread(self, conf):
+        """Test that workers are threaded and the app is preloaded."""
+        assert conf["preload_app"] is True
+        assert conf["worker_class"] == "gthread"
+        assert conf["threads"] >= 2
+
+    def test_workers_sized_from_cpu(self, conf):
+        """Test that the default worker count follows the usable CPUs."""
+        assert conf["workers"] == conf["available_cpus"]() + 1
+        assert conf["available_cpus"]() <= len(os.sched_getaffinity(0))
+
+    @pytest.mark.parametrize(
+        "files, quota",
+        [
+            ({"cpu.max": "150000 100000\n"}, 1.5),
+            ({"cpu.max": "max 100000\n"}, None),
+            (
+                {"cpu/cpu.cfs_quota_us": "200000\n", "cpu/cpu.cfs_period_us": "100000"},
+                2.0,
+            ),
+            ({"cpu/cpu.cfs_quota_us": "-1\n", "cpu/cpu.cfs_period_us": "100000"}, None),
+            ({}, None),
+        ],
+    )
+    def test_cgroup_cpu_quota(self, conf, tmp_path, files, quota):
+        """Test cgroup v2 cpu.max and v1 cfs_quota_us parsing."""
+        for name, text in files.items():
+            (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (tmp_path / name).write_text(text)
+        assert conf["cgroup_cpu_quota"](str(tmp_path)) == quota
+
+    def test_quota_caps_affinity(self, conf, tmp_path):
+        """Test that a fractional quota rounds up and never exceeds affinity."""
+        (tmp_path / "cpu.max").write_text("150000 100000")
+        with patch("os.sched_getaffinity", return_value={0, 1, 2, 3}):
+            assert conf["available_cpus"](str(tmp_path)) == 2
+        (tmp_path / "cpu.max").write_text("800000 100000")
+        with patch("os.sched_getaffinity", return_value={0, 1}):
+            assert conf["available_cpus"](str(tmp_path)) == 2
+
+    def test_env_overrides(self, monkeypatch):
+        """Test that env variables override the defaults."""
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        monkeypatch.setenv("GUNICORN_THREADS", "4")
+        conf = runpy.run_path(str(CONF_PATH))
+        assert conf["workers"] == 3
+        assert conf["threads"] == 4
+
+    def test_post_fork_warms_session(self, conf):
+        """Test that post_fork warms the upstream HTTP session."""
+        with (
+            patch("src.services.jobs.job_1_and_2.fake_api_tool.warm_session") as warm,
+            patch("src.services.jobs.job_1_and_2.job_queue.start_queue_workers"),
+        ):
+            conf["post_fork"](None, None)
+        warm.assert_called_once()
+
+    def test_post_fork_starts_queue_consumers(self, conf):
+        """Test that each worker starts its job queue consumers."""
+        with (
+            patch(
+                "src.services.jobs.job_1_and_2.job_queue.start_queue_workers"
+            ) as start,
+            patch("src.services.jobs.job_1_and_2.fake_api_tool.warm_session"),
+        ):
+            conf["post_fork"](None, None)
+        start.assert_called_once()
+
+    def test_worker_exit_stops_queue_consumers(self, conf):
+        """Test that a worker waits for its running queue jobs on exit."""
+        with (
+            patch("src.services.jobs.job_1_and_2.job_queue.stop_queue_workers") as stop,
+            patch("src.services.loggers.py_logger.stop_logging"),
+        ):
+            conf["worker_exit"](None, None)
+        stop.assert_called_once_with(timeout=conf["graceful_timeout"])
+
+    def test_when_ready_loads_schema_cache(self, conf):
+        """Test that the master preloads the Avro schema cache."""
+        from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+        SalesExporter._schema_cache.clear()
+        conf["when_ready"](None)
+        assert SalesExporter._schema_cache
+
+    def test_on_starting_clears_metrics(self, conf):
+        """Test that the master removes metric files of the previous run."""
+        with patch("src.services.metrics.app_metrics.registry.clear") as clear:
+            conf["on_starting"](None)
+        clear.assert_called_once()
+
+    def test_child_exit_folds_worker_metrics(self, conf):
+        """Test that the master folds an exited worker's metric file."""
+        worker = Mock(pid=4242)
+        with patch(
+            "src.services.metrics.app_metrics.registry.mark_process_dead"
+        ) as mark_dead:
+            conf["child_exit"](None, worker)
+        mark_dead.assert_called_once_with(4242)
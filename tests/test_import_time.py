@@ -0,0 +1,79 @@
+"""Import-time budget for the application entry point (python -X importtime)."""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# бюджет на `import main` (мс); на повільних CI-машинах можна підняти через env
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 1500))
+# модулі, які не повинні виконуватися при старті (завантажуються при першому використанні);
+# dotenv сюди не входить: якщо .env є, його значення потрібні вже на імпорті
+# (SECRET_KEY, LOG_* тощо читаються модулями при старті), тож він вантажиться завжди
+DEFERRED_MODULES = ("fastavro._write", "requests.sessions", "httpx._client")
+EXAMPLE_ENV = str(PROJECT_ROOT / "example_env")
+
+
+def _run(
+    *args: str, dotenv_path: str = "/nonexistent/.env"
+) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "AUTH_TOKEN": "test-auth-token",
+        "LOG_LEVEL": "WARNING",
+        "DOTENV_PATH": dotenv_path,
+    }
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+class TestImportTime:
+    """Cold-start checks for `import main`."""
+
+    def test_import_main_within_budget(self):
+        """Test that `import main` stays within the import-time budget."""
+        result = _run("-X", "importtime", "-c", "import main")
+        assert result.returncode == 0, result.stderr
+
+        match = re.search(r"\|\s*(\d+)\s*\|\s*main$", result.stderr, re.MULTILINE)
+        assert match, result.stderr[-2000:]
+        cumulative_ms = int(match.group(1)) / 1000
+        assert cumulative_ms < IMPORT_TIME_BUDGET_MS
+
+    @pytest.mark.parametrize("dotenv_path", ["/nonexistent/.env", EXAMPLE_ENV])
+    @pytest.mark.parametrize("module", DEFERRED_MODULES)
+    def test_heavy_modules_are_deferred(self, module, dotenv_path):
+        """Test that heavy dependencies are not executed at import time."""
+        code = "import json, sys, main; print(json.dumps(sorted(sys.modules)))"
+        result = _run("-c", code, dotenv_path=dotenv_path)
+        assert result.returncode == 0, result.stderr
+        assert module not in json.loads(result.stdout.splitlines()[-1])
+
+    def test_dotenv_only_loaded_when_env_file_exists(self):
+        """Test that python-dotenv is imported only if there is a .env to read."""
+        code = "import json, sys, main; print(json.dumps('dotenv' in sys.modules))"
+        assert _run("-c", code).stdout.splitlines()[-1] == "false"
+        loaded = _run("-c", code, dotenv_path=EXAMPLE_ENV)
+        assert loaded.stdout.splitlines()[-1] == "true", loaded.stderr
+
+    def test_config_resolves_lazily(self, monkeypatch):
+        """Test that settings are read from the environment on first access."""
+        from src import config
+
+        monkeypatch.setenv("LOG_BACKUP_COUNT", "3")
+        settings = config.Settings(env_file="/nonexistent/.env")
+        assert settings.LOG_BACKUP_COUNT == 3
+        assert settings.SALES_DEDUP is False
+        with pytest.raises(AttributeError):
+            settings.UNKNOWN_SETTING
@@ -0,0 +1,268 @@
+"""Tests for job_queue.py - durable SQLite job queue and its consumers."""
+
+import multiprocessing
+import threading
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from src.services.jobs.job_1_and_2 import job_queue
+from src.services.jobs.job_1_and_2.fake_api_tool import APITool
+from src.services.jobs.job_1_and_2.job_queue import (
+    JobQueueWorker,
+    SalesJobQueue,
+    enqueue_range,
+)
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+
+DAY = date(2022, 8, 9)
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """A queue with short timeouts."""
+    return SalesJobQueue(
+        tmp_path / "jobs.sqlite3", visibility_timeout=30, max_attempts=2, backoff=10
+    )
+
+
+def _claim_all(path, results):
+    queue = SalesJobQueue(path)
+    claimed = []
+    while (job := queue.claim("child")) is not None:
+        claimed.append(job["id"])
+    results.put(claimed)
+
+
+class TestEnqueue:
+    """Test enqueueing and deduplication."""
+
+    def test_duplicate_active_job_reused(self, queue):
+        """Test that the same (date, to_stg) is queued only once while active."""
+        first = queue.enqueue(DAY, to_stg=True)
+        second = queue.enqueue(DAY, to_stg=True)
+        other = queue.enqueue(DAY, to_stg=False)
+
+        assert first == second
+        assert other != first
+        assert queue.counts() == {"queued": 2}
+
+    def test_duplicate_raises_priority(self, queue):
+        """Test that re-enqueueing with a higher priority bumps the job."""
+        job_id = queue.enqueue(DAY, priority=0)
+        queue.enqueue(DAY, priority=5)
+
+        assert queue.get(job_id)["priority"] == 5
+
+    def test_finished_job_can_be_queued_again(self, queue):
+        """Test that deduplication only covers queued and running jobs."""
+        first = queue.enqueue(DAY)
+        queue.claim("w")
+        queue.complete(first, "w", "path")
+
+        assert queue.enqueue(DAY) != first
+
+    def test_enqueue_range(self, job_queue):
+        """Test that a backfill creates one job per day, inclusive."""
+        ids = enqueue_range(date(2022, 8, 1), date(2022, 8, 3), to_stg=True)
+
+        assert len(set(ids)) == 3
+        assert job_queue.get(ids[-1])["date"] == "2022-08-03"
+
+
+class TestClaim:
+    """Test claiming, priorities and visibility timeouts."""
+
+    def test_priority_then_fifo(self, queue):
+        """Test that higher priority wins and ties keep insertion order."""
+        low = queue.enqueue(date(2022, 8, 1))
+        high = queue.enqueue(date(2022, 8, 2), priority=10)
+        low2 = queue.enqueue(date(2022, 8, 3))
+
+        order = [queue.claim("w")["id"] for _ in range(3)]
+
+        assert order == [high, low, low2]
+        assert queue.claim("w") is None
+
+    def test_expired_lease_is_reclaimed(self, queue):
+        """Test that a job whose worker vanished goes to another worker."""
+        job_id = queue.enqueue(DAY)
+        queue.claim("dead")
+        assert queue.claim("alive") is None
+
+        with patch("src.services.jobs.job_1_and_2.job_queue.time.time") as now:
+            now.return_value = 10**10
+            job = queue.claim("alive")
+
+        assert job["id"] == job_id
+        assert job["attempts"] == 2
+        assert not queue.complete(job_id, "dead", "late")
+
+    def test_extend_keeps_lease(self, queue):
+        """Test that a heartbeat pushes the lease forward."""
+        job_id = queue.enqueue(DAY)
+        queue.claim("w")
+
+        assert queue.extend(job_id, "w")
+        assert not queue.extend(job_id, "other")
+
+    def test_each_job_claimed_once_across_processes(self, tmp_path):
+        """Test that concurrent processes never receive the same job."""
+        path = str(tmp_path / "jobs.sqlite3")
+        queue = SalesJobQueue(path)
+        for day in range(1, 21):
+            queue.enqueue(date(2022, 8, day))
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=_claim_all, args=(path, results)) for _ in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+        claimed = [job_id for _ in workers for job_id in results.get(timeout=10)]
+        for worker in workers:
+            worker.join()
+
+        assert sorted(claimed) == list(range(1, 21))
+
+
+class TestRetries:
+    """Test failures, backoff and final failure."""
+
+    def test_retry_with_backoff_then_failed(self, queue):
+        """Test exponential backoff and failure after max_attempts."""
+        job_id = queue.enqueue(DAY)
+        queue.claim("w")
+
+        assert queue.fail(job_id, "w", "upstream 503") == "queued"
+        assert queue.claim("w") is None  # waits for the 10 s backoff
+
+        with patch("src.services.jobs.job_1_and_2.job_queue.time.time") as now:
+            now.return_value = 10**10
+            queue.claim("w")
+            assert queue.fail(job_id, "w", "upstream 503") == "failed"
+
+        job = queue.get(job_id)
+        assert job["status"] == "failed"
+        assert job["attempts"] == 2
+        assert job["error"] == "upstream 503"
+
+    def test_lost_lease_on_last_attempt_fails(self, queue):
+        """Test that a job is not retried forever after visibility timeouts."""
+        job_id = queue.enqueue(DAY)
+        with patch("src.services.jobs.job_1_and_2.job_queue.time.time") as now:
+            for moment in (1, 100, 200):
+                now.return_value = 10**10 + moment
+                queue.claim(f"w{moment}")
+
+        assert queue.get(job_id)["status"] == "failed"
+        assert queue.get(job_id)["error"] == "visibility timeout"
+
+    def test_purge_removes_old_finished_jobs(self, queue):
+        """Test that done jobs past the retention are deleted."""
+        job_id = queue.enqueue(DAY)
+        queue.complete(queue.claim("w")["id"], "w", "path")
+
+        assert queue.purge(older_than=-1) == 1
+        assert queue.get(job_id) is None
+
+
+class TestJobQueueWorker:
+    """Test the consumer threads."""
+
+    def test_run_once_completes_job(self, queue):
+        """Test that a consumer runs the export and stores the result."""
+        export = Mock(return_value="/storage/sales.avro")
+        job_id = queue.enqueue(DAY, to_stg=True)
+
+        assert JobQueueWorker(queue, export=export).run_once("w")
+
+        export.assert_called_once_with(date_=DAY, to_stg=True)
+        assert queue.get(job_id)["status"] == "done"
+        assert queue.get(job_id)["result"] == "/storage/sales.avro"
+
+    def test_run_once_records_failure(self, queue):
+        """Test that an export error schedules a retry."""
+        job_id = queue.enqueue(DAY)
+
+        JobQueueWorker(queue, export=Mock(side_effect=OSError("disk full"))).run_once(
+            "w"
+        )
+
+        assert queue.get(job_id)["status"] == "queued"
+        assert queue.get(job_id)["error"] == "disk full"
+
+    @pytest.mark.parametrize("failure", ["timeout", "5xx"])
+    def test_upstream_error_mid_crawl_is_retried(self, queue, tmp_path, failure):
+        """Test a timeout/5xx after some pages retries the job, not DONE."""
+        page = Mock()
+        page.json.return_value = [{"client": "A", "price": 1.0}]
+        if failure == "timeout":
+            second = requests.exceptions.Timeout("read timed out")
+        else:
+            second = Mock()
+            second.raise_for_status.side_effect = requests.exceptions.HTTPError(
+                "503 Service Unavailable", response=Mock(status_code=503)
+            )
+        session = Mock()
+        session.get.side_effect = [page, second]
+
+        def export(date_, to_stg):
+            exporter = SalesExporter(tmp_path, api_tool=APITool(session=session))
+            return exporter.export(for_date=date_, to_stg=to_stg)
+
+        job_id = queue.enqueue(DAY)
+        with patch("src.services.jobs.job_1_and_2.fake_api_tool.time.sleep"):
+            JobQueueWorker(queue, export=export).run_once("w")
+
+        job = queue.get(job_id)
+        assert job["status"] == "queued"
+        assert job["attempts"] == 1
+        assert "stopped at page 2 after 1 records" in job["error"]
+        assert SalesManifest(tmp_path).get(DAY, "raw") is None
+
+    def test_threads_drain_queue(self, queue):
+        """Test that started consumer threads execute all jobs."""
+        done = threading.Event()
+        calls = []
+
+        def export(date_, to_stg):
+            calls.append(date_)
+            if len(calls) == 3:
+                done.set()
+            return None
+
+        for day in (1, 2, 3):
+            queue.enqueue(date(2022, 8, day))
+        worker = JobQueueWorker(queue, threads=2, poll_interval=0.01, export=export)
+        worker.start()
+        try:
+            assert done.wait(5)
+        finally:
+            worker.stop(timeout=5)
+
+        assert queue.counts() == {"done": 3}
+
+    def test_default_config_starts_a_consumer(self, monkeypatch):
+        """Test that every worker consumes the queue with the shipped settings."""
+        monkeypatch.setattr(job_queue, "_worker", None)
+        with (
+            patch.object(job_queue, "JobQueueWorker") as worker_cls,
+            patch.object(job_queue, "get_job_queue"),
+        ):
+            assert job_queue.start_queue_workers() is worker_cls.return_value
+
+        assert worker_cls.call_args.kwargs["threads"] == 1
+        worker_cls.return_value.start.assert_called_once()
+
+    def test_no_consumers_is_logged(self, monkeypatch, caplog):
+        """Test that JOB_QUEUE_WORKERS=0 does not pass silently."""
+        monkeypatch.setattr(job_queue, "_worker", None)
+        with patch.object(job_queue, "JobQueueWorker") as worker_cls:
+            assert job_queue.start_queue_workers(threads=0) is None
+
+        worker_cls.assert_not_called()
+        assert "queue_worker.py work" in caplog.text
@@ -0,0 +1,121 @@
+"""Tests for json_stream.py - streaming records out of large raw JSON files."""
+
+import gzip
+import io
+import json
+import tracemalloc
+from datetime import date
+from unittest.mock import Mock
+
+import fastavro
+import pytest
+
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+from src.services.storage import json_stream
+from src.services.storage.json_stream import iter_json_array
+
+RECORDS = [
+    {"client": "Тарас Шевченко", "purchase_date": "2022-08-09", "price": 123},
+    {"client": 'a "quoted", [odd] name', "product": "TV", "price": 1.5e3},
+    [1, 2, [3, {"k": None}]],
+    12345678901234567890,
+    -0.25,
+    "рядок",
+    True,
+    None,
+]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Make every value straddle chunk boundaries."""
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", 3)
+
+
+class TestIterJsonArray:
+    """Records come out one by one and equal json.load."""
+
+    @pytest.mark.parametrize("indent", [None, 4])
+    def test_matches_json_load(self, tmp_path, small_chunks, indent):
+        path = tmp_path / "day.json"
+        path.write_text(json.dumps(RECORDS, indent=indent, ensure_ascii=False))
+        assert list(iter_json_array(path)) == RECORDS
+
+    def test_exporter_file_format(self, tmp_path, sample_sales_data):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock())
+        json_path = exporter.save(date(2022, 8, 9), sample_sales_data)
+        assert list(iter_json_array(json_path)) == sample_sales_data
+
+    def test_compressed_stream(self, small_chunks):
+        data = gzip.compress(json.dumps(RECORDS).encode())
+        with gzip.GzipFile(fileobj=io.BytesIO(data)) as f:
+            assert list(iter_json_array(f)) == RECORDS
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [("[]", []), (" \n[ ]\n", []), ("\ufeff[1]", [1]), ('{"a": 1}', [{"a": 1}])],
+    )
+    def test_edge_cases(self, small_chunks, text, expected):
+        assert list(iter_json_array(io.BytesIO(text.encode()))) == expected
+
+    def test_empty_file(self, tmp_path):
+        path = tmp_path / "empty.json"
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            list(iter_json_array(path))
+
+    @pytest.mark.parametrize(
+        "text", ['"text"', "[1, 2", "[1 2]", "[1,]", "[1] 2", '[{"a": }]']
+    )
+    def test_malformed(self, small_chunks, text):
+        with pytest.raises(ValueError):
+            list(iter_json_array(io.BytesIO(text.encode())))
+
+    def test_yields_before_reading_everything(self, small_chunks):
+        stream = io.BytesIO(json.dumps(list(range(10_000))).encode())
+        records = iter_json_array(stream)
+        assert next(records) == 0
+        assert stream.tell() < len(stream.getvalue())
+
+    def test_peak_memory_does_not_grow_with_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(json_stream, "CHUNK_SIZE", 64 * 1024)
+        record = {"client": "x" * 50, "purchase_date": "2022-08-09", "price": 1.0}
+        path = tmp_path / "big.json"
+        with path.open("w") as f:
+            f.write("[")
+            f.write(",\n".join(json.dumps(record) for _ in range(100_000)))
+            f.write("]")
+        assert path.stat().st_size > 8_000_000
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_json_array(path))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert count == 100_000
+        assert peak < 1_000_000
+
+
+class TestExporterStreaming:
+    """STG rebuilt from raw without loading the day."""
+
+    def test_json_to_avro(self, tmp_path, sample_sales_data):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock())
+        json_path = exporter.save(date(2022, 8, 9), sample_sales_data)
+        avro_path = exporter._json_to_avro(json_path, date(2022, 8, 9))
+        with open(avro_path, "rb") as f:
+            assert [r["client"] for r in fastavro.reader(f)] == [
+                r["client"] for r in sample_sales_data
+            ]
+
+    def test_rebuild_stg_registers_records(self, tmp_path, sample_sales_data):
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=Mock())
+        exporter.save(date(2022, 8, 9), sample_sales_data)
+
+        exporter.rebuild_stg(date(2022, 8, 9))
+
+        entry = SalesManifest(tmp_path).get(date(2022, 8, 9), "stg")
+        assert entry["records"] == len(sample_sales_data)
+        assert entry["bytes"] == (tmp_path / entry["path"]).stat().st_size
@@ -0,0 +1,150 @@
+"""Tests for log_reader.py and rotation.py."""
+
+import gzip
+import logging
+import os
+import types
+from pathlib import Path
+from unittest.mock import patch
+
+from src.services.loggers import log_reader
+from src.services.loggers.log_reader import iter_lines_reversed, log_files, read_log
+from src.services.loggers.rotation import build_file_handler
+
+
+class TestLogReader:
+    """Test reverse reading of log files."""
+
+    def test_iter_lines_reversed_small_blocks(self, tmp_path: Path):
+        """Test that lines spanning block boundaries are reassembled."""
+        log_file = tmp_path / "app.log"
+        lines = [f"line number {i}\n" for i in range(100)]
+        log_file.write_text("".join(lines))
+
+        result = list(iter_lines_reversed(str(log_file), block_size=7))
+
+        assert [line.decode() for line in result] == lines[::-1]
+
+    def test_read_log_json_lines(self, tmp_path: Path):
+        """Test that JSON-lines logs are filtered by level too."""
+        log_file = tmp_path / "app.log"
+        log_file.write_text(
+            '{"time": "2022-08-09 10:00:00", "level": "INFO", "message": "a"}\n'
+            '{"time": "2022-08-09 10:00:01", "level": "WARNING", "message": "b"}\n'
+        )
+
+        result = b"".join(read_log(str(log_file), level="warning"))
+
+        assert b'"message": "b"' in result
+        assert b'"message": "a"' not in result
+
+
+def _line(day: int, hour: int, level: str = "INFO") -> str:
+    return (
+        f"2022-08-{day:02d} {hour:02d}:00:00 [{level}] - app - f(1) - d{day}h{hour}\n"
+    )
+
+
+def _rotated_log(tmp_path: Path) -> Path:
+    """app.log plus two gzip archives (.2.gz oldest), mtimes as after rotation."""
+    log_file = tmp_path / "app.log"
+    files = [
+        (tmp_path / "app.log.2.gz", [_line(7, 10), _line(7, 11, "ERROR")], 100),
+        (tmp_path / "app.log.1.gz", [_line(8, 10), "Traceback line\n"], 200),
+        (log_file, [_line(9, 10, "ERROR"), _line(9, 11)], 300),
+    ]
+    for path, lines, mtime in files:
+        data = "".join(lines).encode()
+        path.write_bytes(gzip.compress(data) if path.suffix == ".gz" else data)
+        os.utime(path, (mtime, mtime))
+    (tmp_path / "app.log.lock").write_text("")
+    return log_file
+
+
+class TestReadLogRotated:
+    """read_log streams the current file and the rotated archives in the window."""
+
+    def test_log_files_newest_first(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        assert [Path(p).name for p in log_files(str(log_file))] == [
+            "app.log",
+            "app.log.1.gz",
+            "app.log.2.gz",
+        ]
+
+    def test_is_a_generator(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        assert isinstance(read_log(str(log_file), level="info"), types.GeneratorType)
+
+    def test_window_spans_archives(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        result = b"".join(
+            read_log(str(log_file), since="2022-08-07 11:00", until="2022-08-09 10")
+        ).decode()
+        assert result == (
+            _line(7, 11, "ERROR")
+            + _line(8, 10)
+            + "Traceback line\n"
+            + _line(9, 10, "ERROR")
+        )
+
+    def test_archives_before_since_not_opened(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        with patch.object(
+            log_reader, "_iter_file", wraps=log_reader._iter_file
+        ) as iter_file:
+            result = list(read_log(str(log_file), since="2022-08-08 12:00"))
+        opened = {Path(call.args[0]).name for call in iter_file.call_args_list}
+        assert "app.log.2.gz" not in opened
+        assert len(result) == 2
+
+    def test_level_filter_across_files(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        result = b"".join(read_log(str(log_file), level="error")).decode()
+        assert result == _line(7, 11, "ERROR") + _line(9, 10, "ERROR")
+
+    def test_tail_reaches_into_archives(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        result = b"".join(read_log(str(log_file), tail=4)).decode()
+        assert result == (
+            _line(7, 11, "ERROR")
+            + _line(8, 10)
+            + "Traceback line\n"
+            + _line(9, 10, "ERROR")
+            + _line(9, 11)
+        )
+
+    def test_only_archives_left(self, tmp_path: Path):
+        log_file = _rotated_log(tmp_path)
+        log_file.unlink()
+        assert len(list(read_log(str(log_file), level="info"))) == 3
+
+
+class TestRotation:
+    """Test size-based rotation with gzip archives."""
+
+    def test_size_rotation_compresses_archive(self, tmp_path: Path):
+        """Test that rotated files are gzip archives."""
+        log_file = tmp_path / "app.log"
+        handler = build_file_handler(str(log_file), max_bytes=200, backup_count=2)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for i in range(20):
+            handler.emit(logging.makeLogRecord({"msg": f"message {i:02d} " * 3}))
+        handler.close()
+
+        archives = sorted(tmp_path.glob("app.log.*.gz"))
+        assert [a.name for a in archives] == ["app.log.1.gz", "app.log.2.gz"]
+        assert b"message" in gzip.decompress(archives[0].read_bytes())
+        assert log_file.stat().st_size <= 200
+
+    def test_reopens_after_rotation_by_other_process(self, tmp_path: Path):
+        """Test that a handler follows the file after someone else rotates it."""
+        log_file = tmp_path / "app.log"
+        handler = build_file_handler(str(log_file), max_bytes=10_000, backup_count=1)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.emit(logging.makeLogRecord({"msg": "before"}))
+        log_file.rename(tmp_path / "app.log.moved")
+        handler.emit(logging.makeLogRecord({"msg": "after"}))
+        handler.close()
+
+        assert log_file.read_text() == "after\n"
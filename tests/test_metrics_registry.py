@@ -0,0 +1,217 @@
+"""Tests for metrics/registry.py - multi-process metrics and Prometheus text."""
+
+import json
+import os
+
+import pytest
+
+from src.services.metrics import app_metrics
+from src.services.metrics.registry import MetricsRegistry
+
+DEAD_PID = 2**22 + 1  # above the default pid_max, never a live process
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """A registry writing into a temporary directory."""
+    return MetricsRegistry(str(tmp_path), flush_interval=60)
+
+
+def _write_worker_file(registry, pid, snapshot):
+    with open(f"{registry.directory}/{pid}.json", "w", encoding="utf-8") as f:
+        json.dump(snapshot, f)
+
+
+class TestMetricTypes:
+    """Test counters, gauges and histograms in one process."""
+
+    def test_counter_render(self, registry):
+        """Test counter exposition with labels."""
+        counter = registry.counter("jobs_total", "Jobs.", labels=("zone",))
+        counter.inc(zone="raw")
+        counter.inc(2, zone="raw")
+
+        text = registry.render()
+
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{zone="raw"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Test histogram bucket, sum and count lines."""
+        hist = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            hist.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_sum 5.55" in text
+        assert "latency_seconds_count 3" in text
+
+    def test_gauge_track_inprogress(self, registry):
+        """Test that the in-progress gauge returns to zero."""
+        gauge = registry.gauge("in_flight", "In flight.")
+        with gauge.track_inprogress():
+            assert "in_flight 1" in registry.render()
+        assert "in_flight 0" in registry.render()
+
+    def test_label_values_escaped(self, registry):
+        """Test escaping of quotes and backslashes in label values."""
+        counter = registry.counter("c_total", "C.", labels=("route",))
+        counter.inc(route='a"b\\c')
+
+        assert 'c_total{route="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_same_name_returns_existing_metric(self, registry):
+        """Test that re-declaring a metric reuses it."""
+        first = registry.counter("dup_total", "Dup.")
+        assert registry.counter("dup_total", "Dup.") is first
+
+
+class TestMultiProcess:
+    """Test aggregation of per-process files."""
+
+    def test_counters_summed_across_processes(self, registry):
+        """Test that another worker's counters are added, even after it exited."""
+        registry.counter("jobs_total", "Jobs.", labels=("zone",)).inc(zone="raw")
+        _write_worker_file(
+            registry,
+            DEAD_PID,
+            {
+                "jobs_total": {
+                    "type": "counter",
+                    "help": "Jobs.",
+                    "labels": ["zone"],
+                    "samples": [[["raw"], 4]],
+                }
+            },
+        )
+
+        assert 'jobs_total{zone="raw"} 5' in registry.render()
+
+    def test_dead_process_gauges_ignored(self, registry):
+        """Test that gauges of exited workers are not reported."""
+        registry.gauge("in_flight", "In flight.").inc()
+        _write_worker_file(
+            registry,
+            DEAD_PID,
+            {
+                "in_flight": {
+                    "type": "gauge",
+                    "help": "In flight.",
+                    "labels": [],
+                    "samples": [[[], 7]],
+                }
+            },
+        )
+
+        assert "in_flight 1" in registry.render()
+
+    def test_histograms_merged(self, registry):
+        """Test that histogram buckets are merged across processes."""
+        registry.histogram("lat", "Lat.", buckets=(1.0,)).observe(0.5)
+        _write_worker_file(
+            registry,
+            DEAD_PID,
+            {
+                "lat": {
+                    "type": "histogram",
+                    "help": "Lat.",
+                    "labels": [],
+                    "buckets": [1.0],
+                    "samples": [[[], [[1, 2], 4.5, 3]]],
+                }
+            },
+        )
+
+        text = registry.render()
+
+        assert 'lat_bucket{le="1"} 2' in text
+        assert 'lat_bucket{le="+Inf"} 4' in text
+        assert "lat_count 4" in text
+
+    def test_reset_after_fork_drops_parent_values(self, registry):
+        """Test that a forked child starts from empty values."""
+        counter = registry.counter("jobs_total", "Jobs.")
+        counter.inc()
+        registry._reset_after_fork()
+
+        assert counter._values == {}
+
+    def test_clear_removes_files(self, registry, tmp_path):
+        """Test that clear() removes all process files."""
+        registry.counter("jobs_total", "Jobs.").inc()
+        registry.flush()
+        registry.clear()
+
+        assert list(tmp_path.iterdir()) == []
+
+
+def _counter_snapshot(value, name="jobs_total"):
+    return {
+        name: {
+            "type": "counter",
+            "help": "Jobs.",
+            "labels": [],
+            "samples": [[[], value]],
+        }
+    }
+
+
+class TestDeadProcessFiles:
+    """Test folding exited workers' files into the aggregate."""
+
+    def test_mark_process_dead_folds_and_deletes(self, registry, tmp_path):
+        """Test that counters survive in the aggregate and the pid file is gone."""
+        registry.counter("jobs_total", "Jobs.").inc()
+        snapshot = _counter_snapshot(4)
+        snapshot["in_flight"] = {
+            "type": "gauge",
+            "help": "In flight.",
+            "labels": [],
+            "samples": [[[], 7]],
+        }
+        _write_worker_file(registry, DEAD_PID, snapshot)
+
+        registry.mark_process_dead(DEAD_PID)
+        _write_worker_file(registry, DEAD_PID + 1, _counter_snapshot(2))
+        registry.mark_process_dead(DEAD_PID + 1)
+
+        assert not (tmp_path / f"{DEAD_PID}.json").exists()
+        aggregate = json.loads((tmp_path / "aggregate.json").read_text())
+        assert aggregate["jobs_total"]["samples"] == [[[], 6]]
+        assert "in_flight" not in aggregate
+        assert "jobs_total 7" in registry.render()
+
+    def test_missing_file_is_ignored(self, registry, tmp_path):
+        """Test that an exited worker without metrics leaves no aggregate."""
+        registry.mark_process_dead(DEAD_PID)
+        assert not (tmp_path / "aggregate.json").exists()
+
+    def test_reused_pid_does_not_overwrite(self, registry, tmp_path):
+        """Test that a file left under our pid by a dead process is kept."""
+        _write_worker_file(registry, os.getpid(), _counter_snapshot(5))
+        registry.counter("jobs_total", "Jobs.").inc()
+
+        assert "jobs_total 6" in registry.render()
+        assert "jobs_total 6" in registry.render()
+
+
+class TestDefaultDirectory:
+    """Each app instance gets its own metrics directory."""
+
+    def test_per_file_storage(self, tmp_path):
+        """Test that the directory is keyed by FILE_STORAGE."""
+        first = app_metrics.default_directory(str(tmp_path / "a"))
+        assert first == app_metrics.default_directory(str(tmp_path / "a"))
+        assert first != app_metrics.default_directory(str(tmp_path / "b"))
+        assert os.path.basename(first).startswith("robotdreams_metrics_")
+
+    def test_used_by_the_app_registry(self):
+        """Test that the app registry falls back to the per-instance default."""
+        from src.config import METRICS_DIR
+
+        expected = METRICS_DIR or app_metrics.default_directory()
+        assert app_metrics.registry.directory == expected
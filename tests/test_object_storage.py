@@ -0,0 +1,387 @@
+"""Tests for object_storage.py - local and S3-compatible storage backends."""
+
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+import uuid
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import fastavro
+import pytest
+
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+from src.services.storage import object_storage
+from src.services.storage.object_storage import (
+    LocalStorage,
+    ObjectNotFound,
+    S3Storage,
+    StorageError,
+    get_storage,
+    open_location,
+    upload_tree,
+)
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """Just enough of the S3 REST API: objects, HEAD and multipart uploads."""
+
+    def log_message(self, *args):
+        pass
+
+    def _parse(self):
+        parts = urlsplit(self.path)
+        query = {
+            name: values[0] for name, values in parse_qs(parts.query, True).items()
+        }
+        self.server.log.append((self.command, unquote(parts.path), query))
+        self.server.auth.append(self.headers.get("Authorization"))
+        return unquote(parts.path), query
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_PUT(self):
+        path, query = self._parse()
+        data = self._body()
+        if self.server.fail_next:
+            self.server.fail_next -= 1
+            return self._reply(500, b"<Error>SlowDown</Error>")
+        etag = hashlib.md5(data).hexdigest()
+        if "uploadId" in query:
+            with self.server.lock:
+                self.server.in_flight += 1
+                self.server.max_in_flight = max(
+                    self.server.max_in_flight, self.server.in_flight
+                )
+            time.sleep(self.server.part_delay)
+            self.server.uploads[query["uploadId"]][int(query["partNumber"])] = data
+            with self.server.lock:
+                self.server.in_flight -= 1
+        else:
+            self.server.objects[path] = (data, etag)
+        self._reply(200, headers={"ETag": f'"{etag}"'})
+
+    def do_POST(self):
+        path, query = self._parse()
+        body = self._body()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            self.server.uploads[upload_id] = {}
+            return self._reply(
+                200,
+                f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId>"
+                f"</InitiateMultipartUploadResult>".encode(),
+            )
+        parts = self.server.uploads.pop(query["uploadId"])
+        numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)<", body)]
+        data = b"".join(parts[number] for number in numbers)
+        digests = b"".join(hashlib.md5(parts[n]).digest() for n in numbers)
+        etag = f"{hashlib.md5(digests).hexdigest()}-{len(numbers)}"
+        self.server.objects[path] = (data, etag)
+        self._reply(200, b"<CompleteMultipartUploadResult/>")
+
+    def do_DELETE(self):
+        path, query = self._parse()
+        if "uploadId" in query:
+            self.server.uploads.pop(query["uploadId"], None)
+        else:
+            self.server.objects.pop(path, None)
+        self._reply(204)
+
+    def do_HEAD(self):
+        path, _ = self._parse()
+        if path not in self.server.objects:
+            return self._reply(404)
+        data, etag = self.server.objects[path]
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", f'"{etag}"')
+        self.end_headers()
+
+    def do_GET(self):
+        path, _ = self._parse()
+        if path not in self.server.objects:
+            return self._reply(404, b"<Error>NoSuchKey</Error>")
+        self._reply(200, self.server.objects[path][0])
+
+
+@pytest.fixture
+def s3_server():
+    """A local stand-in for an S3-compatible server."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeS3Handler)
+    server.objects, server.uploads, server.log, server.auth = {}, {}, [], []
+    server.fail_next, server.part_delay = 0, 0.0
+    server.lock, server.in_flight, server.max_in_flight = threading.Lock(), 0, 0
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def s3(s3_server):
+    """S3Storage with tiny parts, pointed at the stand-in server."""
+    host, port = s3_server.server_address
+    return S3Storage(f"http://{host}:{port}", "bucket", prefix="sales", part_size=1024)
+
+
+def _puts(server):
+    return [entry for entry in server.log if entry[0] == "PUT"]
+
+
+class TestLocalStorage:
+    """Directory-backed storage."""
+
+    def test_write_read_and_locations(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        assert storage.write_bytes("raw/a/b.json", b"data") is True
+        path = storage.location("raw/a/b.json")
+        assert path == tmp_path.resolve() / "raw/a/b.json"
+        assert storage.key_of(path) == "raw/a/b.json"
+        assert storage.read_bytes("raw/a/b.json") == b"data"
+        assert storage.exists("raw/a/b.json")
+        assert storage.head("raw/a/b.json").etag == hashlib.md5(b"data").hexdigest()
+        assert storage.head("missing") is None
+
+    def test_failed_write_leaves_nothing(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        with pytest.raises(RuntimeError):
+            with storage.open_write("raw/x.bin") as out:
+                out.write(b"partial")
+                raise RuntimeError("boom")
+        assert list((tmp_path / "raw").iterdir()) == []
+
+
+class TestS3Storage:
+    """S3Storage against the stand-in server."""
+
+    def test_small_write_is_one_put_under_prefix(self, s3, s3_server):
+        assert s3.write_bytes("raw/a.json", b"hello") is True
+        assert s3_server.objects["/bucket/sales/raw/a.json"][0] == b"hello"
+        assert s3.read_bytes("raw/a.json") == b"hello"
+        assert s3.location("raw/a.json") == "s3://bucket/sales/raw/a.json"
+        assert s3.key_of("s3://bucket/sales/raw/a.json") == "raw/a.json"
+        assert len(_puts(s3_server)) == 1
+
+    def test_unchanged_content_is_not_reuploaded(self, s3, s3_server):
+        s3.write_bytes("raw/a.json", b"hello")
+        assert s3.write_bytes("raw/a.json", b"hello") is False
+        assert s3.write_bytes("raw/a.json", b"changed") is True
+        assert len(_puts(s3_server)) == 2
+
+    def test_streaming_write_uses_multipart(self, s3, s3_server):
+        data = bytes(range(256)) * 20  # 5120 bytes -> 5 parts of 1024
+        with s3.open_write("stg/big.avro") as out:
+            for start in range(0, len(data), 100):
+                out.write(data[start : start + 100])
+            assert out.tell() == len(data)
+        stored, etag = s3_server.objects["/bucket/sales/stg/big.avro"]
+        assert stored == data
+        assert etag == s3.etag_of(data) and etag.endswith("-5")
+        assert s3.head("stg/big.avro").size == len(data)
+        assert s3.write_bytes("stg/big.avro", data) is False
+
+    def test_exact_part_size_is_single_put(self, s3, s3_server):
+        s3.write_bytes("a.bin", b"x" * 1024)
+        assert not any("uploads" in query for _, _, query in s3_server.log)
+
+    def test_failed_stream_aborts_upload(self, s3, s3_server):
+        with pytest.raises(RuntimeError):
+            with s3.open_write("stg/broken.avro") as out:
+                out.write(b"x" * 3000)
+                raise RuntimeError("boom")
+        assert s3_server.uploads == {}
+        assert "/bucket/sales/stg/broken.avro" not in s3_server.objects
+        assert s3_server.log[-1][0] == "DELETE"
+
+    def test_put_file_uploads_parts_in_parallel(self, s3, s3_server, tmp_path):
+        s3_server.part_delay = 0.05
+        path = tmp_path / "month.avro"
+        path.write_bytes(bytes(range(256)) * 40)  # 10 parts
+        assert s3.put_file("stg/month.avro", path) is True
+        assert s3_server.objects["/bucket/sales/stg/month.avro"][0] == (
+            path.read_bytes()
+        )
+        assert s3_server.max_in_flight > 1
+        assert s3.put_file("stg/month.avro", path) is False
+
+    def test_retries_server_errors(self, s3, s3_server):
+        s3_server.fail_next = 1
+        assert s3.write_bytes("a.json", b"data") is True
+        assert len(_puts(s3_server)) == 2
+
+    def test_client_errors_raise(self, s3):
+        with pytest.raises(StorageError):
+            s3.read_bytes("missing.json")
+
+    def test_signed_requests(self, s3_server):
+        host, port = s3_server.server_address
+        storage = S3Storage(
+            f"http://{host}:{port}",
+            "bucket",
+            access_key="AKIDEXAMPLE",
+            secret_key="secret",
+            region="eu-central-1",
+        )
+        storage.write_bytes("a.json", b"data")
+        authorization = s3_server.auth[-1]
+        assert re.fullmatch(
+            r"AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/\d{8}/eu-central-1/s3/"
+            r"aws4_request, SignedHeaders=host;x-amz-content-sha256;x-amz-date, "
+            r"Signature=[0-9a-f]{64}",
+            authorization,
+        )
+
+
+class TestExporterOnS3:
+    """SalesExporter writing through S3Storage."""
+
+    def test_export_to_object_storage(self, s3, s3_server, tmp_path, sample_sales_data):
+        api = Mock()
+        api.get_sales.return_value = sample_sales_data
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=api, storage=s3)
+
+        result = exporter.export(for_date=date(2022, 8, 10), to_stg=True)
+
+        assert result == "s3://bucket/sales/stg/sales/2022-08-10/sales_2022-08-10.avro"
+        raw = s3_server.objects[
+            "/bucket/sales/raw/sales/2022-08-10/sales_2022-08-10.json"
+        ]
+        assert json.loads(raw[0]) == sample_sales_data
+        avro = s3.read_bytes("stg/sales/2022-08-10/sales_2022-08-10.avro")
+        assert len(list(fastavro.reader(io.BytesIO(avro)))) == 2
+        entry = SalesManifest(tmp_path).get(date(2022, 8, 10), "stg")
+        assert entry["path"] == "stg/sales/2022-08-10/sales_2022-08-10.avro"
+        assert entry["bytes"] == len(avro)
+        assert not (tmp_path / "raw").exists()
+
+    def test_reexport_skips_unchanged_json(self, s3, s3_server, tmp_path):
+        api = Mock()
+        api.get_sales.return_value = [
+            {"client": "C", "purchase_date": "2022-08-10", "product": "P", "price": 1}
+        ]
+        exporter = SalesExporter(file_storage=tmp_path, api_tool=api, storage=s3)
+        exporter.export(for_date=date(2022, 8, 10))
+        exporter.export(for_date=date(2022, 8, 10))
+        assert len(_puts(s3_server)) == 1
+
+
+class TestTransparentReads:
+    """Reading keys whose content now lives in a compressed copy."""
+
+    def test_local_falls_back_to_compressed_copy(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        storage.write_bytes("raw/a.json.gz", gzip.compress(b'{"a": 1}'))
+        with storage.open_read("raw/a.json") as f:
+            assert f.read() == b'{"a": 1}'
+        assert storage.read_bytes("raw/a.json") == b'{"a": 1}'
+
+    def test_plain_key_wins(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        storage.write_bytes("raw/a.json", b"new")
+        storage.write_bytes("raw/a.json.gz", gzip.compress(b"old"))
+        assert storage.read_bytes("raw/a.json") == b"new"
+
+    def test_missing_raises_not_found(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            LocalStorage(tmp_path).open_read("raw/none.json")
+
+    def test_local_delete(self, tmp_path):
+        storage = LocalStorage(tmp_path)
+        storage.write_bytes("raw/a.json", b"x")
+        storage.delete("raw/a.json")
+        storage.delete("raw/a.json")
+        assert not storage.exists("raw/a.json")
+
+    def test_s3_streams_compressed_copy(self, s3, s3_server):
+        s3.write_bytes("raw/a.json.gz", gzip.compress(b"x" * 5000))
+        with s3.open_read("raw/a.json") as f:
+            assert f.read(10) == b"x" * 10
+            assert len(f.read()) == 4990
+        gets = [path for method, path, _ in s3_server.log if method == "GET"]
+        assert gets[-3:] == [
+            "/bucket/sales/raw/a.json",
+            "/bucket/sales/raw/a.json.zst",
+            "/bucket/sales/raw/a.json.gz",
+        ]
+
+    def test_s3_delete_and_not_found(self, s3, s3_server):
+        s3.write_bytes("raw/a.json", b"x")
+        s3.delete("raw/a.json")
+        assert s3_server.objects == {}
+        with pytest.raises(ObjectNotFound):
+            s3.read_bytes("raw/a.json")
+
+    def test_open_location_local_path(self, tmp_path):
+        LocalStorage(tmp_path).write_bytes("raw/a.json.gz", gzip.compress(b"data"))
+        with open_location(str(tmp_path / "raw" / "a.json")) as f:
+            assert f.read() == b"data"
+
+    def test_open_location_s3(self, s3, monkeypatch):
+        monkeypatch.setattr(object_storage, "STORAGE_BACKEND", "s3")
+        monkeypatch.setattr(object_storage, "_storage", s3)
+        s3.write_bytes("stg/a.avro", b"avro")
+        with open_location("s3://bucket/sales/stg/a.avro") as f:
+            assert f.read() == b"avro"
+
+
+class TestUploadTree:
+    """Moving an existing local file storage into a bucket."""
+
+    def test_upload_then_skip(self, s3, s3_server, tmp_path):
+        local = LocalStorage(tmp_path)
+        local.write_bytes("raw/sales/2022-08-10/a.json", b"a" * 3000)
+        local.write_bytes("stg/sales/2022-08-10/a.avro", b"b" * 10)
+        (tmp_path / "manifest.json").write_text("{}")
+
+        assert upload_tree(s3, tmp_path) == {"uploaded": 2, "skipped": 0}
+        assert upload_tree(s3, tmp_path) == {"uploaded": 0, "skipped": 2}
+        assert "/bucket/sales/manifest.json" not in s3_server.objects
+
+
+class TestGetStorage:
+    """Backend selection from config."""
+
+    def test_local(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(object_storage, "STORAGE_BACKEND", "local")
+        storage = get_storage(tmp_path)
+        assert isinstance(storage, LocalStorage)
+        assert storage.root == tmp_path.resolve()
+
+    def test_s3_needs_endpoint_and_bucket(self, monkeypatch):
+        monkeypatch.setattr(object_storage, "STORAGE_BACKEND", "s3")
+        monkeypatch.setattr(object_storage, "_storage", None)
+        monkeypatch.setattr(object_storage, "S3_ENDPOINT_URL", None)
+        with pytest.raises(ValueError):
+            get_storage()
+
+    def test_s3_is_shared(self, monkeypatch):
+        monkeypatch.setattr(object_storage, "STORAGE_BACKEND", "s3")
+        monkeypatch.setattr(object_storage, "_storage", None)
+        monkeypatch.setattr(object_storage, "S3_ENDPOINT_URL", "http://localhost:9000")
+        monkeypatch.setattr(object_storage, "S3_BUCKET", "sales")
+        assert get_storage() is get_storage()
+        assert isinstance(get_storage(), S3Storage)
+
+    def test_unknown_backend(self, monkeypatch):
+        monkeypatch.setattr(object_storage, "STORAGE_BACKEND", "ftp")
+        with pytest.raises(ValueError):
+            get_storage()
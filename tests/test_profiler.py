@@ -0,0 +1,122 @@
+"""Tests for profiling/profiler.py - sampler, profile store and profile_call."""
+
+import asyncio
+import os
+import threading
+import time
+
+from src.services.profiling import profiler
+from src.services.profiling.profiler import (
+    ProfileStore,
+    StackSampler,
+    profile_call,
+    profile_call_async,
+)
+
+
+def _busy_loop(seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += 1
+    return total
+
+
+class TestStackSampler:
+    """Test the sampling profiler."""
+
+    def test_collapsed_stacks_contain_hot_function(self):
+        """Test that the busy function shows up in folded output."""
+        sampler = StackSampler(threading.get_ident(), interval=0.001)
+        sampler.start()
+        _busy_loop(0.1)
+        sampler.stop()
+
+        folded = sampler.folded()
+        assert "test_profiler:_busy_loop" in folded
+        stack, count = folded.splitlines()[0].rsplit(" ", 1)
+        assert ";" in stack
+        assert int(count) >= 1
+
+
+class TestProfileStore:
+    """Test profile file management."""
+
+    def test_path_rejects_traversal_and_other_files(self, tmp_path):
+        """Test that only profile files inside the directory are served."""
+        (tmp_path / "a.prof").write_text("x")
+        (tmp_path / "notes.txt").write_text("x")
+        store = ProfileStore(tmp_path)
+
+        assert store.path("a.prof") == tmp_path / "a.prof"
+        assert store.path("notes.txt") is None
+        assert store.path("../a.prof") == tmp_path / "a.prof"
+        assert store.path("../../etc/passwd") is None
+
+    def test_prune_keeps_newest(self, tmp_path):
+        """Test that only the last `keep` profiles are kept."""
+        store = ProfileStore(tmp_path, keep=2)
+        for stamp in ("20220801", "20220802", "20220803"):
+            (tmp_path / f"{stamp}.prof").write_text("x")
+            (tmp_path / f"{stamp}.folded").write_text("x")
+
+        store.prune()
+
+        assert sorted(p.name for p in tmp_path.iterdir()) == [
+            "20220802.folded",
+            "20220802.prof",
+            "20220803.folded",
+            "20220803.prof",
+        ]
+
+    def test_list_newest_first(self, tmp_path):
+        """Test that list() orders files by modification time."""
+        store = ProfileStore(tmp_path)
+        (tmp_path / "old.prof").write_text("x")
+        (tmp_path / "new.folded").write_text("xy")
+        os.utime(tmp_path / "old.prof", (0, 0))
+
+        assert store.list() == [
+            {"name": "new.folded", "bytes": 2},
+            {"name": "old.prof", "bytes": 1},
+        ]
+
+
+class TestProfileCall:
+    """Test profile_call."""
+
+    def test_returns_result_and_writes_files(self, tmp_path):
+        """Test that the function result is passed through."""
+        store = ProfileStore(tmp_path)
+
+        result, profile_id = profile_call(lambda: 42, store, "GET /health")
+
+        assert result == 42
+        assert "GET-health" in profile_id
+        assert (tmp_path / f"{profile_id}.prof").exists()
+
+    def test_busy_profiler_runs_unprofiled(self, tmp_path):
+        """Test that a second concurrent profile request is not blocked."""
+        store = ProfileStore(tmp_path)
+        with profiler._busy:
+            result, profile_id = profile_call(lambda: 1, store, "GET /")
+
+        assert result == 1
+        assert profile_id is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_async_profiles_the_coroutine(self, tmp_path):
+        """Test that a coroutine is awaited under the profiler."""
+        store = ProfileStore(tmp_path)
+
+        async def handler():
+            await asyncio.sleep(0)
+            return 42
+
+        result, profile_id = asyncio.run(
+            profile_call_async(handler, store, "POST /v1/api/job", mode="sample")
+        )
+
+        assert result == 42
+        assert (tmp_path / f"{profile_id}.folded").exists()
+        assert not (tmp_path / f"{profile_id}.prof").exists()
@@ -0,0 +1,110 @@
+"""Tests for py_logger.py - queue-based logging pipeline."""
+
+import importlib.util
+import logging
+import queue
+from logging.handlers import QueueListener
+from unittest.mock import patch
+
+from src.services.loggers import py_logger
+from src.services.loggers.py_logger import (
+    APP_LOGGER,
+    BoundedQueueHandler,
+    file_handler,
+    get_logger,
+    parse_levels,
+    queue_handler,
+    setup_logging,
+)
+
+
+def _record(msg: str = "test") -> logging.LogRecord:
+    return logging.makeLogRecord({"msg": msg, "levelno": logging.INFO})
+
+
+class TestBoundedQueueHandler:
+    """Test BoundedQueueHandler drop/backpressure policies."""
+
+    def test_drop_policy_counts_dropped(self):
+        """Test that a full queue drops records instead of blocking."""
+        handler = BoundedQueueHandler(queue.Queue(maxsize=2), policy="drop")
+        for _ in range(5):
+            handler.emit(_record())
+
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+
+    def test_block_policy_waits_then_drops(self):
+        """Test that the block policy gives up after the timeout."""
+        handler = BoundedQueueHandler(
+            queue.Queue(maxsize=1), policy="block", timeout=0.01
+        )
+        handler.emit(_record())
+        handler.emit(_record())
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+
+    def test_listener_delivers_records(self):
+        """Test that records reach the target handler through the listener."""
+        log_queue = queue.Queue(maxsize=10)
+        handler = BoundedQueueHandler(log_queue)
+        received = []
+        target = logging.Handler()
+        target.emit = received.append
+        listener = QueueListener(log_queue, target)
+        listener.start()
+        handler.emit(_record("hello"))
+        listener.stop()
+
+        assert [r.getMessage() for r in received] == ["hello"]
+
+
+class TestGetLogger:
+    """Test get_logger wiring and the idempotent logging setup."""
+
+    def test_logger_writes_only_to_queue(self):
+        """Test that loggers do no direct file or stream I/O."""
+        logger = get_logger("tests.py_logger.queue_only")
+        assert queue_handler in logger.handlers
+        assert file_handler not in logger.handlers
+
+    def test_app_loggers_share_one_handler(self):
+        """Test that src.* loggers propagate to a single app handler."""
+        logger = get_logger("src.tests.shared")
+        assert logger.handlers == []
+        assert logging.getLogger(APP_LOGGER).handlers.count(queue_handler) == 1
+
+    def test_record_emitted_exactly_once(self):
+        """Test that repeated setup and get_logger calls do not duplicate output."""
+        for _ in range(3):
+            setup_logging()
+            get_logger("src")
+            logger = get_logger("src.tests.once")
+
+        with patch.object(queue_handler, "enqueue") as enqueue:
+            logger.info("only once")
+
+        assert enqueue.call_count == 1
+
+    def test_reimported_module_reuses_handler(self):
+        """Test that a second copy of py_logger does not add handlers."""
+        spec = importlib.util.spec_from_file_location(
+            "py_logger_copy", py_logger.__file__
+        )
+        copy = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(copy)
+        logger = copy.get_logger("src.tests.reimport")
+
+        with patch.object(queue_handler, "enqueue") as enqueue:
+            logger.info("only once")
+
+        assert enqueue.call_count == 1
+        assert copy.listener._thread is None
+
+    def test_parse_levels(self):
+        """Test per-module level overrides parsing."""
+        assert parse_levels("src.a=info, src.b=WARNING,") == {
+            "src.a": "INFO",
+            "src.b": "WARNING",
+        }
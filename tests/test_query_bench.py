@@ -0,0 +1,175 @@
+"""Tests for the SQL benchmark harness - dvdrental.py and query_bench.py."""
+
+import sqlite3
+
+import pytest
+
+from src.db.dvdrental import SUPPORTING_INDEXES, build_database, sizes
+from src.db.query_bench import (
+    QUERIES_FILE,
+    Query,
+    fingerprint,
+    load_queries,
+    percentile,
+    regressions,
+    run_query,
+    run_suite,
+)
+
+ALT_FILE = QUERIES_FILE.parent / "home_task_queries_alt.sql"
+
+
+@pytest.fixture(scope="module")
+def conn(tmp_path_factory):
+    """A small (5%) deterministic dataset shared by the module."""
+    conn = build_database(tmp_path_factory.mktemp("dvd") / "dvd.sqlite3", scale=0.05)
+    yield conn
+    conn.close()
+
+
+def _indexes(conn):
+    return {
+        row[0]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'"
+        )
+    }
+
+
+class TestLoadQueries:
+    """Splitting .sql files into named queries."""
+
+    def test_home_task_queries(self):
+        queries = load_queries()
+        assert [q.name for q in queries] == ["1", "2", "3", "4", "5"]
+        assert all(q.sql and "/*" not in q.sql for q in queries)
+        assert queries[3].title.startswith("Вивести назви фільмів")
+
+    def test_alternatives(self):
+        assert [q.name for q in load_queries(ALT_FILE)] == ["2b", "3b", "4b"]
+
+    def test_unnamed_queries_are_numbered(self, tmp_path):
+        path = tmp_path / "q.sql"
+        path.write_text("SELECT 1;\n/* note */ SELECT 2;\n", encoding="utf-8")
+        queries = load_queries(path)
+        assert [(q.name, q.sql) for q in queries] == [
+            ("1", "SELECT 1"),
+            ("2", "SELECT 2"),
+        ]
+
+
+class TestDataset:
+    """Synthetic dvdrental-shaped dataset."""
+
+    def test_scaled_sizes(self, conn):
+        expected = sizes(0.05)
+        assert conn.execute("SELECT COUNT(*) FROM film").fetchone()[0] == (
+            expected["film"]
+        )
+        assert conn.execute("SELECT COUNT(*) FROM rental").fetchone()[0] == (
+            expected["rental"]
+        )
+        assert conn.execute("SELECT COUNT(*) FROM category").fetchone()[0] == 16
+
+    def test_reused_when_parameters_match(self, tmp_path):
+        path = tmp_path / "dvd.sqlite3"
+        build_database(path, scale=0.01, seed=1).close()
+        conn = build_database(path, scale=0.01, seed=1)
+        conn.execute("INSERT INTO category VALUES (99, 'Marker')")
+        conn.commit()
+        conn.close()
+        conn = build_database(path, scale=0.01, seed=1)
+        assert conn.execute("SELECT COUNT(*) FROM category").fetchone()[0] == 17
+        conn.close()
+
+    def test_regenerated_when_parameters_differ(self, tmp_path):
+        path = tmp_path / "dvd.sqlite3"
+        build_database(path, scale=0.01, seed=1).close()
+        conn = build_database(path, scale=0.02, seed=1)
+        assert conn.execute("SELECT COUNT(*) FROM film").fetchone()[0] == 20
+        conn.close()
+
+    def test_deterministic(self, tmp_path):
+        rows = []
+        for name in ("a", "b"):
+            conn = build_database(tmp_path / f"{name}.sqlite3", scale=0.01, seed=7)
+            rows.append(fingerprint(conn.execute("SELECT * FROM payment")))
+            conn.close()
+        assert rows[0] == rows[1]
+
+
+class TestRunQuery:
+    """Timing, plan and result fingerprint of one query."""
+
+    def test_percentiles(self):
+        assert percentile([5.0], 99) == 5.0
+        assert percentile([1.0, 2.0, 3.0, 4.0, 5.0], 50) == 3.0
+        assert percentile([0.0, 10.0], 90) == pytest.approx(9.0)
+
+    def test_result(self, conn):
+        result = run_query(conn, load_queries()[0], repeat=5, warmup=1)
+        assert result["name"] == "1"
+        assert result["runs"] == 5
+        assert result["rows"] == 16
+        assert result["min_ms"] <= result["p50_ms"] <= result["p90_ms"]
+        assert result["p90_ms"] <= result["p99_ms"]
+        assert result["plan"] and all(isinstance(line, str) for line in result["plan"])
+
+    def test_fingerprint_ignores_float_noise(self):
+        assert fingerprint([(1, 0.1 + 0.2)]) == fingerprint([(1, 0.3)])
+        assert fingerprint([(1, 0.3)]) != fingerprint([(2, 0.3)])
+
+
+class TestRunSuite:
+    """Index configurations and equivalence of alternative formulations."""
+
+    def test_indexes_used_then_dropped(self, conn):
+        query = Query("4", "", load_queries()[3].sql)
+        [plain] = run_suite(conn, [query], repeat=1, warmup=0)
+        [indexed] = run_suite(conn, [query], 1, 0, indexes=SUPPORTING_INDEXES)
+        assert "idx_fk_inventory_film_id" in " ".join(indexed["plan"])
+        assert "idx_fk_inventory_film_id" not in " ".join(plain["plan"])
+        assert plain["result"] == indexed["result"]
+        assert _indexes(conn) == set()
+
+    def test_invalid_index_statement(self, conn):
+        with pytest.raises(ValueError):
+            run_suite(conn, [], indexes=["ANALYZE"])
+
+    def test_alternatives_return_same_result(self, conn):
+        results = {
+            r["name"]: r["result"]
+            for r in run_suite(conn, load_queries() + load_queries(ALT_FILE), 1, 0)
+        }
+        for name in ("2", "3", "4"):
+            assert results[f"{name}b"] == results[name]
+
+
+class TestRegressions:
+    """Comparison with a saved baseline run."""
+
+    @staticmethod
+    def _result(name, p50, result="abc"):
+        return {"name": name, "p50_ms": p50, "result": result}
+
+    def test_no_regressions(self):
+        baseline = [self._result("1", 10.0), self._result("2", 5.0)]
+        current = [self._result("1", 12.0), self._result("3", 100.0)]
+        assert regressions(current, baseline) == []
+
+    def test_slowdown_and_changed_result(self):
+        baseline = [self._result("1", 10.0), self._result("2", 5.0)]
+        current = [self._result("1", 13.0), self._result("2", 5.0, "def")]
+        problems = regressions(current, baseline, threshold=1.25)
+        assert problems == ["1: p50_ms 10.0 -> 13.0 (x1.30)", "2: result changed"]
+
+    def test_zero_baseline_is_not_a_regression(self):
+        assert regressions([self._result("1", 1.0)], [self._result("1", 0.0)]) == []
+
+
+def test_database_is_plain_sqlite(tmp_path):
+    """The dataset file opens with the stdlib driver (usable from any SQL tool)."""
+    build_database(tmp_path / "dvd.sqlite3", scale=0.01).close()
+    conn = sqlite3.connect(tmp_path / "dvd.sqlite3")
+    assert conn.execute("SELECT value FROM dataset_meta WHERE key = 'seed'").fetchone()
+    conn.close()
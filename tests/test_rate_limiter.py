@@ -0,0 +1,153 @@
+"""Tests for ratelimit/limiter.py - shared token buckets and job slots."""
+
+import multiprocessing
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from src.services.ratelimit.limiter import JobLimiter, client_address
+
+DEAD_PID = 2**22 + 1  # above the default pid_max, never a live process
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    """A limiter with a small burst and one job slot."""
+    return JobLimiter(
+        tmp_path / "limits.sqlite3", rate_per_minute=60, burst=2, max_jobs=1
+    )
+
+
+def _take_token(path, results):
+    limiter = JobLimiter(path, rate_per_minute=1, burst=5)
+    results.put(limiter.check_rate("shared").allowed)
+
+
+class TestClientAddress:
+    """Test client key extraction."""
+
+    @pytest.mark.parametrize(
+        "trusted, expected",
+        [
+            (0, "127.0.0.1"),  # header ignored without trusted proxies
+            (1, "172.16.0.2"),  # appended by the one trusted proxy
+            (2, "10.0.0.1"),
+            (3, "127.0.0.1"),  # chain shorter than the proxy count
+        ],
+    )
+    def test_trusted_proxy_hops(self, trusted, expected):
+        """Test that only addresses appended by trusted proxies are used."""
+        assert client_address("10.0.0.1, 172.16.0.2", "127.0.0.1", trusted) == expected
+
+    def test_spoofed_prefix_ignored(self):
+        """Test that a client-supplied X-Forwarded-For prefix is not trusted."""
+        forwarded = "1.2.3.4, 203.0.113.7"  # client sent 1.2.3.4, proxy added its peer
+        assert client_address(forwarded, "10.0.0.254", 1) == "203.0.113.7"
+
+    def test_default_from_config(self, monkeypatch):
+        """Test that TRUSTED_PROXIES is the default hop count."""
+        monkeypatch.setattr("src.services.ratelimit.limiter.TRUSTED_PROXIES", 1)
+        assert client_address("10.0.0.1", "127.0.0.1") == "10.0.0.1"
+        monkeypatch.setattr("src.services.ratelimit.limiter.TRUSTED_PROXIES", 0)
+        assert client_address("10.0.0.1", "127.0.0.1") == "127.0.0.1"
+
+    def test_falls_back_to_remote_addr(self):
+        """Test the connection address when there is no X-Forwarded-For."""
+        assert client_address(None, "127.0.0.1") == "127.0.0.1"
+        assert client_address(None, None) == "unknown"
+
+
+class TestTokenBucket:
+    """Test per-client rate limits."""
+
+    def test_burst_then_rejected(self, limiter):
+        """Test that the burst is allowed and the next call gets Retry-After."""
+        assert limiter.check_rate("a").allowed
+        assert limiter.check_rate("a").allowed
+
+        admission = limiter.check_rate("a")
+
+        assert not admission.allowed
+        assert admission.reason == "rate"
+        assert admission.retry_after == 1
+
+    def test_clients_are_independent(self, limiter):
+        """Test that one client's bucket does not affect another."""
+        for _ in range(3):
+            limiter.check_rate("a")
+        assert limiter.check_rate("b").allowed
+
+    def test_tokens_refill_over_time(self, limiter):
+        """Test that a token is back after 1 / rate seconds."""
+        with patch("src.services.ratelimit.limiter.time.time", return_value=1000.0):
+            for _ in range(3):
+                limiter.check_rate("a")
+        with patch("src.services.ratelimit.limiter.time.time", return_value=1001.0):
+            assert limiter.check_rate("a").allowed
+
+    def test_zero_rate_disables_limit(self, tmp_path):
+        """Test that RATE_LIMIT_PER_MINUTE=0 turns the bucket off."""
+        limiter = JobLimiter(tmp_path / "limits.sqlite3", rate_per_minute=0, burst=0)
+        assert limiter.check_rate("a").allowed
+
+    def test_shared_between_processes(self, tmp_path):
+        """Test that workers draw from the same bucket file."""
+        path = str(tmp_path / "limits.sqlite3")
+        results = multiprocessing.get_context("fork").Queue()
+        workers = [
+            multiprocessing.get_context("fork").Process(
+                target=_take_token, args=(path, results)
+            )
+            for _ in range(7)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        allowed = [results.get(timeout=5) for _ in workers]
+
+        assert allowed.count(True) == 5
+
+    def test_storage_error_fails_open(self, limiter):
+        """Test that a broken store lets requests through."""
+        with patch.object(
+            limiter.store, "connection", side_effect=sqlite3.Error("locked")
+        ):
+            assert limiter.check_rate("a").allowed
+
+
+class TestJobSlots:
+    """Test the global cap on concurrent jobs."""
+
+    def test_cap_and_release(self, limiter):
+        """Test that a second job is rejected until the first one finishes."""
+        with limiter.job_slot() as first:
+            assert first.allowed
+            with limiter.job_slot() as second:
+                assert not second.allowed
+                assert second.reason == "concurrency"
+                assert second.retry_after > 0
+        with limiter.job_slot() as third:
+            assert third.allowed
+
+    def test_slot_released_on_error(self, limiter):
+        """Test that a failing job frees its slot."""
+        with pytest.raises(RuntimeError):
+            with limiter.job_slot():
+                raise RuntimeError("boom")
+        with limiter.job_slot() as admission:
+            assert admission.allowed
+
+    def test_slots_of_dead_workers_reclaimed(self, limiter):
+        """Test that a crashed worker does not hold a slot forever."""
+        with limiter.job_slot():
+            pass  # creates the schema
+        conn = sqlite3.connect(limiter.path)
+        conn.execute("INSERT INTO job_slots (pid, started) VALUES (?, 0)", (DEAD_PID,))
+        conn.commit()
+        conn.close()
+
+        with limiter.job_slot() as admission:
+            assert admission.allowed
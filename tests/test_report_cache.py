@@ -0,0 +1,211 @@
+"""Tests for report_cache.py - materialized reporting aggregates and their endpoint."""
+
+import pytest
+
+from src.db import report_cache as cache_module
+from src.db.dvdrental import build_database
+from src.db.query_bench import load_queries
+from src.db.report_cache import REPORTS, ReportCache
+
+
+class Clock:
+    """A manually advanced clock."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "dvd.sqlite3"
+    build_database(path, scale=0.05).close()
+    return path
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(db_path, clock):
+    return ReportCache(db_path, max_staleness=60, clock=clock)
+
+
+def _original(cache, number, limit=True):
+    """Run query N from home_task_queries.sql directly against the source tables."""
+    sql = load_queries()[number - 1].sql
+    if not limit:
+        sql = sql.rsplit("LIMIT", 1)[0]
+    conn = cache.store.connection()
+    return [tuple(row) for row in conn.execute(sql)]
+
+
+def _add_rentals(cache, count, film_id=1):
+    """Append rentals (each with a 1.99 payment) for a copy of film_id."""
+    with cache.store.transaction() as conn:
+        inventory_id = conn.execute(
+            "SELECT inventory_id FROM inventory WHERE film_id = ? LIMIT 1", (film_id,)
+        ).fetchone()[0]
+        for _ in range(count):
+            rental_id = conn.execute(
+                "INSERT INTO rental (rental_date, inventory_id, customer_id) "
+                "VALUES ('2005-09-01 10:00:00', ?, 1)",
+                (inventory_id,),
+            ).lastrowid
+            conn.execute(
+                "INSERT INTO payment (customer_id, rental_id, amount, payment_date) "
+                "VALUES (1, ?, 1.99, '2005-09-01 11:00:00')",
+                (rental_id,),
+            )
+
+
+class TestMaterializedResults:
+    """Cached rows equal the original queries."""
+
+    def test_category_films(self, cache):
+        rows = cache.get("category_films")["rows"]
+        assert sorted((r["category"], r["film_count"]) for r in rows) == sorted(
+            _original(cache, 1)
+        )
+
+    def test_top_actors(self, cache):
+        rows = cache.get("top_actors", limit=1000)["rows"]
+        expected = {row[0]: row[3] for row in _original(cache, 2, limit=False)}
+        assert {r["actor_id"]: r["rentals_count"] for r in rows} == expected
+        assert len(cache.get("top_actors")["rows"]) == 10
+
+    def test_category_revenue(self, cache):
+        [row] = cache.get("category_revenue")["rows"]
+        [(category, revenue)] = _original(cache, 3)
+        assert row["category"] == category
+        assert row["total_revenue"] == pytest.approx(revenue, abs=0.01)
+
+    def test_unknown_report(self, cache):
+        with pytest.raises(KeyError):
+            cache.get("nope")
+
+
+class TestIncrementalRefresh:
+    """Only rows past the watermark are folded in."""
+
+    def test_first_get_builds_and_sets_watermarks(self, cache):
+        result = cache.get("top_actors")
+        conn = cache.store.connection()
+        [(rentals, payments)] = conn.execute(
+            "SELECT (SELECT MAX(rental_id) FROM rental), "
+            "(SELECT MAX(payment_id) FROM payment)"
+        )
+        assert result["watermarks"] == {"rental": rentals, "payment": payments}
+        assert result["staleness_s"] == 0
+
+    def test_refresh_adds_only_new_rows(self, cache):
+        cache.refresh()
+        _add_rentals(cache, 3)
+        assert cache.refresh() == {"rental": 3, "payment": 3}
+        assert cache.refresh() == {"rental": 0, "payment": 0}
+        rows = cache.get("top_actors", limit=1000)["rows"]
+        expected = {row[0]: row[3] for row in _original(cache, 2, limit=False)}
+        assert {r["actor_id"]: r["rentals_count"] for r in rows} == expected
+
+    def test_incremental_equals_rebuild(self, cache):
+        cache.refresh()
+        _add_rentals(cache, 5, film_id=2)
+        cache.refresh()
+        incremental = [cache.get(name, limit=1000)["rows"] for name in REPORTS]
+        cache.rebuild()
+        assert [cache.get(name, limit=1000)["rows"] for name in REPORTS] == incremental
+
+    def test_rebuild_picks_up_changed_old_rows(self, cache):
+        cache.refresh()
+        with cache.store.transaction() as conn:
+            conn.execute(
+                "UPDATE payment SET amount = amount + 1000 WHERE payment_id = 1"
+            )
+        before = cache.get("category_revenue", limit=100)["rows"]
+        cache.rebuild()
+        after = cache.get("category_revenue", limit=100)["rows"]
+        assert sum(r["total_revenue"] for r in after) == pytest.approx(
+            sum(r["total_revenue"] for r in before) + 1000
+        )
+
+
+class TestStaleness:
+    """The staleness bound decides when get() refreshes."""
+
+    def test_within_bound_serves_cached_rows(self, cache, clock):
+        first = cache.get("top_actors", limit=1000)
+        _add_rentals(cache, 50, film_id=1)
+        clock.now += 30
+        result = cache.get("top_actors", limit=1000)
+        assert result["rows"] == first["rows"]
+        assert result["staleness_s"] == 30
+
+    def test_past_bound_refreshes(self, cache, clock):
+        first = cache.get("top_actors")
+        _add_rentals(cache, 1)
+        clock.now += 61
+        result = cache.get("top_actors")
+        assert result["staleness_s"] == 0
+        assert result["watermarks"]["rental"] == first["watermarks"]["rental"] + 1
+
+    def test_tighter_bound_per_request(self, cache, clock):
+        cache.get("category_films")
+        _add_rentals(cache, 1)
+        clock.now += 5
+        assert cache.get("top_actors", max_staleness=10)["staleness_s"] == 5
+        assert cache.get("top_actors", max_staleness=1)["staleness_s"] == 0
+
+    def test_refresh_with_bound_skips_fresh_cache(self, cache, clock):
+        cache.refresh()
+        _add_rentals(cache, 2)
+        assert cache.refresh(max_staleness=60) == {"rental": 0, "payment": 0}
+        clock.now += 61
+        assert cache.refresh(max_staleness=60) == {"rental": 2, "payment": 2}
+
+
+class TestReportRoute:
+    """GET /v1/api/reports/<name>."""
+
+    @pytest.fixture
+    def route_cache(self, cache, monkeypatch):
+        monkeypatch.setattr(cache_module, "_cache", cache)
+        return cache
+
+    def test_not_configured(self, client, monkeypatch):
+        monkeypatch.setattr(cache_module, "_cache", None)
+        monkeypatch.setattr(cache_module, "REPORT_DB", None)
+        response = client.get("/v1/api/reports/top_actors")
+        assert response.status_code == 503
+
+    def test_report(self, client, route_cache, clock):
+        route_cache.refresh()
+        clock.now += 7
+        response = client.get("/v1/api/reports/category_revenue")
+        assert response.status_code == 200
+        assert response.headers["Age"] == "7"
+        body = response.get_json()
+        assert body["report"] == "category_revenue"
+        assert len(body["rows"]) == 1
+        assert body["staleness_s"] == 7
+
+    def test_query_parameters(self, client, route_cache, clock):
+        route_cache.refresh()
+        clock.now += 7
+        response = client.get("/v1/api/reports/top_actors?limit=3&max_staleness=5")
+        body = response.get_json()
+        assert len(body["rows"]) == 3
+        assert body["staleness_s"] == 0
+
+    def test_unknown_report(self, client, route_cache):
+        response = client.get("/v1/api/reports/nope")
+        assert response.status_code == 404
+        assert response.get_json()["reports"] == list(REPORTS)
+
+    @pytest.mark.parametrize("query", ["limit=0", "max_staleness=-1"])
+    def test_invalid_parameters(self, client, route_cache, query):
+        response = client.get(f"/v1/api/reports/top_actors?{query}")
+        assert response.status_code == 400
@@ -28,6 +28,37 @@ class TestHealthCheck:
         assert data["status"] == "ok"
 
 
+class TestMetrics:
+    """Test /metrics endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def metrics_dir(self, tmp_path, monkeypatch):
+        """Keep metric files of this test in a temporary directory."""
+        from src.services.metrics.app_metrics import registry
+
+        monkeypatch.setattr(registry, "directory", str(tmp_path))
+
+    def test_metrics_prometheus_text(self, client: FlaskClient):
+        """Test that /metrics returns Prometheus text format."""
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.content_type.startswith("text/plain; version=0.0.4")
+
+    def test_request_latency_by_route_template(self, client: FlaskClient):
+        """Test that requests are recorded per route template and status."""
+        client.get("/health")
+        client.get("/no-such-page")
+
+        text = client.get("/metrics").get_data(as_text=True)
+
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert (
+            'http_request_duration_seconds_count{route="/health",method="GET",'
+            'status="200"}' in text
+        )
+        assert 'route="<unmatched>",method="GET",status="404"' in text
+
+
 class TestHomeRoute:
     """Test home route endpoint."""
 
@@ -0,0 +1,99 @@
+"""Tests for sampling.py - SamplingFilter."""
+
+import logging
+from unittest.mock import patch
+
+from src.services.loggers.sampling import SamplingFilter
+
+
+def _record(
+    msg: str = "Fetching page %s", *args, level: int = logging.DEBUG
+) -> logging.LogRecord:
+    return logging.makeLogRecord(
+        {"name": "src.test", "levelno": level, "msg": msg, "args": args}
+    )
+
+
+class TestSamplingFilter:
+    """Test 1-in-N sampling and per-interval rate limiting."""
+
+    def test_every_n_keeps_first_of_each_n(self):
+        """Test that 1 in N repeated messages passes."""
+        sampler = SamplingFilter(every_n=3)
+        passed = [sampler.filter(_record("page %s", i)) for i in range(7)]
+        assert passed == [True, False, False, True, False, False, True]
+
+    def test_different_templates_are_independent(self):
+        """Test that sampling is keyed by the message template."""
+        sampler = SamplingFilter(every_n=100)
+        assert sampler.filter(_record("a %s", 1))
+        assert sampler.filter(_record("b %s", 1))
+        assert not sampler.filter(_record("a %s", 2))
+
+    def test_max_per_interval(self):
+        """Test that at most K messages pass per interval."""
+        sampler = SamplingFilter(max_per_interval=2, interval=60)
+        with patch("src.services.loggers.sampling.time.monotonic") as clock:
+            clock.return_value = 0.0
+            passed = [sampler.filter(_record()) for _ in range(5)]
+            clock.return_value = 61.0
+            after_interval = sampler.filter(_record())
+
+        assert passed == [True, True, False, False, False]
+        assert after_interval is True
+
+    def test_reports_suppressed_count(self):
+        """Test that the next passing record carries the suppressed count."""
+        sampler = SamplingFilter(every_n=3)
+        for i in range(3):
+            sampler.filter(_record("page %s", i))
+        record = _record("page %s", 3)
+
+        assert sampler.filter(record)
+        assert record.suppressed == 2
+        assert record.getMessage() == "page 3 [2 similar suppressed]"
+
+    def test_bounded_number_of_keys(self):
+        """Test that the state table does not grow without bound."""
+        sampler = SamplingFilter(max_keys=10)
+        for i in range(50):
+            sampler.filter(_record(f"unique {i}"))
+        assert len(sampler._state) == 10
+
+    def test_warning_and_above_not_thinned(self):
+        """Test that WARNING+ skip 1-in-N sampling, INFO is sampled."""
+        sampler = SamplingFilter(every_n=100)
+        for level in (logging.WARNING, logging.ERROR, logging.CRITICAL):
+            assert all(
+                sampler.filter(_record("upstream failed", level=level))
+                for _ in range(5)
+            )
+        info = [sampler.filter(_record("page", level=logging.INFO)) for _ in range(3)]
+        assert info == [True, False, False]
+
+    def test_warnings_rate_limited_with_summary(self):
+        """Test that an error flood is capped per interval and summarised."""
+        sampler = SamplingFilter(
+            every_n=100, max_per_interval=1, warning_per_interval=3, interval=60
+        )
+        with patch("src.services.loggers.sampling.time.monotonic") as clock:
+            clock.return_value = 0.0
+            passed = [
+                sampler.filter(_record("upstream failed", level=logging.ERROR))
+                for _ in range(10)
+            ]
+            clock.return_value = 61.0
+            record = _record("upstream failed", level=logging.ERROR)
+            assert sampler.filter(record)
+
+        assert passed == [True] * 3 + [False] * 7
+        assert record.suppressed == 7
+        assert record.getMessage() == "upstream failed [7 similar suppressed]"
+
+    def test_warning_limit_defaults_to_max_per_interval(self):
+        """Test that WARNING+ are never exempt from the interval cap."""
+        sampler = SamplingFilter(max_per_interval=2)
+        passed = [
+            sampler.filter(_record("retry", level=logging.WARNING)) for _ in range(4)
+        ]
+        assert passed == [True, True, False, False]
@@ -116,6 +116,33 @@ class TestSalesExporterExport:
 
             mock_logger.warning.assert_called()
 
+    def test_save_does_not_call_api(self, temp_file_storage, sample_sales_data):
+        """Test that save() writes already fetched records without the API."""
+        mock_api = Mock()
+
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+        result = exporter.save(date(2022, 8, 10), sample_sales_data, to_stg=True)
+
+        assert result.suffix == ".avro"
+        mock_api.get_sales.assert_not_called()
+
+    def test_export_counts_records_and_bytes(
+        self, temp_file_storage, sample_sales_data
+    ):
+        """Test that written records and bytes are counted per zone."""
+        from src.services.metrics.app_metrics import BYTES_WRITTEN, RECORDS_WRITTEN
+
+        mock_api = Mock()
+        mock_api.get_sales.return_value = sample_sales_data
+        records_before = RECORDS_WRITTEN._values.get(("stg",), 0)
+        bytes_before = BYTES_WRITTEN._values.get(("stg",), 0)
+
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+        result = exporter.export(for_date=date(2022, 8, 10), to_stg=True)
+
+        assert RECORDS_WRITTEN._values[("stg",)] == records_before + 2
+        assert BYTES_WRITTEN._values[("stg",)] == bytes_before + result.stat().st_size
+
 
 class TestSalesExporterWriteJson:
     """Test SalesExporter._write_json method."""
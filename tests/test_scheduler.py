@@ -0,0 +1,203 @@
+"""Tests for scheduler.py - incremental ingestion with a manifest watermark."""
+
+from datetime import date, datetime
+
+import pytest
+
+from src.services.jobs.job_1_and_2.job_queue import SalesJobQueue
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.scheduler import (
+    SECTION,
+    IngestionScheduler,
+    SchedulerRunner,
+)
+
+
+class FakeClock:
+    """A settable clock for the scheduler."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """An isolated job queue."""
+    return SalesJobQueue(tmp_path / "jobs.sqlite3")
+
+
+@pytest.fixture
+def clock():
+    """Noon on 2022-08-12."""
+    return FakeClock(datetime(2022, 8, 12, 12, 0))
+
+
+@pytest.fixture
+def scheduler(queue, temp_file_storage, clock):
+    """A scheduler starting on 2022-08-09 with two jobs in flight at most."""
+    return IngestionScheduler(
+        queue=queue,
+        manifest=SalesManifest(temp_file_storage),
+        start_date=date(2022, 8, 9),
+        grace=3600,
+        poll_today=900,
+        max_in_flight=2,
+        clock=clock,
+    )
+
+
+def _finish_all(queue):
+    """Run every claimable job to success."""
+    while (job := queue.claim("w")) is not None:
+        queue.complete(job["id"], "w", "path")
+
+
+def _fail_claimed(queue):
+    """Fail the next claimable job for good (no queue-level retries left)."""
+    job = queue.claim("w")
+    queue.store.connection().execute(
+        "UPDATE jobs SET max_attempts = 1 WHERE id = ?", (job["id"],)
+    )
+    queue.fail(job["id"], "w", "upstream 500")
+
+
+def _queued_dates(queue):
+    rows = queue.store.connection().execute(
+        "SELECT for_date FROM jobs WHERE status = 'queued' ORDER BY id"
+    )
+    return [row["for_date"] for row in rows]
+
+
+class TestIngestionScheduler:
+    """Test catch-up, polling and freezing."""
+
+    def test_first_tick_bounded_today_first(self, scheduler, queue):
+        """Test that today goes first and the backfill respects max_in_flight."""
+        result = scheduler.tick()
+
+        assert result["enqueued"] == 2
+        assert _queued_dates(queue) == ["2022-08-12", "2022-08-09"]
+
+    def test_backfill_catches_up_and_freezes(self, scheduler, queue):
+        """Test that closed dates are frozen and the watermark moves up to today."""
+        for _ in range(4):
+            scheduler.tick()
+            _finish_all(queue)
+        scheduler.tick()
+
+        assert scheduler.watermark() == date(2022, 8, 11)
+        state = scheduler.manifest.state(SECTION)
+        assert list(state["dates"]) == ["2022-08-12"]
+
+    def test_frozen_dates_never_refetched(self, scheduler, queue, clock):
+        """Test that dates at or below the watermark are not queued again."""
+        for _ in range(4):
+            scheduler.tick()
+            _finish_all(queue)
+        clock.now = datetime(2022, 8, 12, 23, 0)
+
+        scheduler.tick()
+
+        assert _queued_dates(queue) == ["2022-08-12"]
+
+    def test_today_repolled_on_cadence(self, scheduler, queue, clock):
+        """Test that an open date is polled again only after poll_today."""
+        scheduler.max_in_flight = 1
+        scheduler.tick()
+        _finish_all(queue)
+
+        clock.now = datetime(2022, 8, 12, 12, 10)
+        scheduler.tick()
+        assert _queued_dates(queue) == ["2022-08-09"]  # gap, not today
+        _finish_all(queue)
+
+        clock.now = datetime(2022, 8, 12, 12, 16)
+        scheduler.tick()
+        assert _queued_dates(queue) == ["2022-08-12"]
+
+    def test_open_date_reloaded_once_after_close(self, scheduler, queue, clock):
+        """Test that a date fetched while open gets one final load after grace."""
+        scheduler.max_in_flight = 1
+        scheduler.tick()
+        _finish_all(queue)
+
+        clock.now = datetime(2022, 8, 13, 0, 30)  # closed, but still in grace
+        scheduler.tick()
+        entry = scheduler.manifest.state(SECTION)["dates"]["2022-08-12"]
+        assert not entry["final"]
+
+        clock.now = datetime(2022, 8, 13, 1, 30)
+        for _ in range(6):
+            _finish_all(queue)
+            scheduler.tick()
+        assert scheduler.watermark() == date(2022, 8, 12)
+
+    def test_failed_job_retried_with_backoff(self, scheduler, queue, clock):
+        """Test that a failed date is queued again only after a growing pause."""
+        scheduler.max_in_flight = 1
+        scheduler.retry_backoff = 300
+        scheduler.tick()
+        _fail_claimed(queue)
+
+        scheduler.tick()
+        assert "2022-08-12" not in _queued_dates(queue)  # not on every tick
+        _finish_all(queue)  # the backfill took the free slot meanwhile
+
+        clock.now = datetime(2022, 8, 12, 12, 5)
+        scheduler.tick()
+        assert _queued_dates(queue) == ["2022-08-12"]
+
+        _fail_claimed(queue)
+        clock.now = datetime(2022, 8, 12, 12, 9)
+        scheduler.tick()
+        assert "2022-08-12" not in _queued_dates(queue)  # second failure waits 600 s
+        _finish_all(queue)
+        clock.now = datetime(2022, 8, 12, 12, 19)
+        scheduler.tick()
+        assert _queued_dates(queue) == ["2022-08-12"]
+
+    def test_failed_closed_date_blocks_watermark(self, scheduler, queue, clock):
+        """Test that a closed date is frozen only after its job is DONE."""
+        scheduler.max_in_flight = 1
+        clock.now = datetime(2022, 8, 10, 12, 0)
+        scheduler.tick()  # 2022-08-10 (today)
+        _finish_all(queue)
+        clock.now = datetime(2022, 8, 11, 2, 0)
+        scheduler.tick()  # 2022-08-11
+        _finish_all(queue)
+        scheduler.tick()  # 2022-08-09, closed
+        _fail_claimed(queue)
+
+        for _ in range(3):
+            scheduler.tick()
+        assert scheduler.watermark() == date(2022, 8, 8)
+        state = scheduler.manifest.state(SECTION)["dates"]["2022-08-09"]
+        assert state["failures"] == 1
+
+    def test_state_kept_next_to_sales(self, scheduler, temp_file_storage):
+        """Test that the scheduler state does not disturb sales entries."""
+        manifest = SalesManifest(temp_file_storage)
+        manifest.update(date(2022, 8, 9), "raw", path="raw.json")
+
+        scheduler.tick()
+
+        assert manifest.get(date(2022, 8, 9), "raw")["path"] == "raw.json"
+        assert manifest.state(SECTION)["watermark"] == "2022-08-08"
+
+
+class TestSchedulerRunner:
+    """Test single-leader election between processes."""
+
+    def test_only_one_leader(self, scheduler, tmp_path):
+        """Test that a second runner cannot take the lock until the first stops."""
+        first = SchedulerRunner(scheduler, tmp_path / "scheduler.lock")
+        second = SchedulerRunner(scheduler, tmp_path / "scheduler.lock")
+
+        assert first.is_leader()
+        assert not second.is_leader()
+        first.stop()
+        assert second.is_leader()
+        second.stop()
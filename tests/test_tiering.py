@@ -0,0 +1,207 @@
+"""Tests for tiering.py - cold-tier compression and deletion of raw partitions."""
+
+import io
+import json
+from datetime import date
+from unittest.mock import Mock, patch
+
+import fastavro
+import pytest
+
+from src.services.jobs.job_1_and_2 import tiering
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+from src.services.jobs.job_1_and_2.tiering import RawTiering
+from src.services.storage.codecs import compress_stream, decompressing_reader
+from src.services.storage.object_storage import LocalStorage
+
+TODAY = date(2022, 9, 30)
+
+
+def _records(for_date, count=50):
+    return [
+        {
+            "client": f"client {i}",
+            "purchase_date": for_date.isoformat(),
+            "product": "TV",
+            "price": 100.0 + i,
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(tmp_path)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return SalesManifest(tmp_path)
+
+
+@pytest.fixture
+def exporter(tmp_path, storage, manifest):
+    return SalesExporter(
+        file_storage=tmp_path, api_tool=Mock(), manifest=manifest, storage=storage
+    )
+
+
+def _tiering(storage, manifest, **kwargs):
+    kwargs.setdefault("codec", "gzip")
+    return RawTiering(storage, manifest, today=lambda: TODAY, **kwargs)
+
+
+def _json_key(for_date):
+    return f"raw/sales/{for_date}/sales_{for_date}.json"
+
+
+class TestCompression:
+    """Days older than compress_after_days get a compressed copy."""
+
+    def test_only_old_days_are_compressed(self, exporter, storage, manifest):
+        old, recent = date(2022, 8, 1), date(2022, 9, 20)
+        exporter.save(old, _records(old))
+        exporter.save(recent, _records(recent))
+
+        counts = _tiering(storage, manifest, compress_after_days=30).run()
+
+        assert counts["compressed"] == 1
+        assert counts["bytes_out"] < counts["bytes_in"] / 5
+        assert not storage.exists(_json_key(old))
+        assert storage.exists(_json_key(old) + ".gz")
+        assert storage.exists(_json_key(recent))
+        entry = manifest.get(old, "raw")
+        assert entry["path"] == _json_key(old) + ".gz"
+        assert entry["codec"] == "gzip"
+        assert entry["records"] == 50
+        assert entry["bytes"] == storage.head(entry["path"]).size
+        assert entry["raw_bytes"] == counts["bytes_in"]
+
+    def test_reads_are_transparent(self, exporter, storage, manifest):
+        old = date(2022, 8, 1)
+        exporter.save(old, _records(old))
+        _tiering(storage, manifest).run()
+        assert json.loads(storage.read_bytes(_json_key(old))) == _records(old)
+
+    def test_second_run_is_a_noop(self, exporter, storage, manifest):
+        old = date(2022, 8, 1)
+        exporter.save(old, _records(old))
+        _tiering(storage, manifest).run()
+        assert _tiering(storage, manifest).run()["compressed"] == 0
+
+    def test_json_to_avro_from_compressed_copy(self, exporter, storage, manifest):
+        old = date(2022, 8, 1)
+        json_path = exporter.save(old, _records(old))
+        _tiering(storage, manifest).run()
+
+        avro_path = exporter._json_to_avro(json_path=json_path, for_date=old)
+
+        with open(avro_path, "rb") as f:
+            assert list(fastavro.reader(f)) == _records(old)
+
+    def test_reexport_after_compression(self, exporter, storage, manifest):
+        old = date(2022, 8, 1)
+        exporter.save(old, _records(old))
+        _tiering(storage, manifest).run()
+        exporter.save(old, _records(old, count=3))
+        assert len(json.loads(storage.read_bytes(_json_key(old)))) == 3
+        assert _tiering(storage, manifest).run()["compressed"] == 1
+        assert len(json.loads(storage.read_bytes(_json_key(old)))) == 3
+
+
+class TestDefaultConfig:
+    """tier_raw_partitions with the shipped settings (zstd)."""
+
+    def test_compresses_with_default_codec(self, tmp_path, exporter, monkeypatch):
+        old = date(2022, 8, 1)
+        exporter.save(old, _records(old))
+        monkeypatch.setattr(tiering, "FILE_STORAGE", tmp_path)
+
+        counts = tiering.tier_raw_partitions()
+
+        assert tiering.RAW_COLD_CODEC == "zstd"
+        assert counts["compressed"] == 1
+        storage = LocalStorage(tmp_path)
+        assert storage.exists(_json_key(old) + ".zst")
+        assert json.loads(storage.read_bytes(_json_key(old))) == _records(old)
+
+
+class TestDeletion:
+    """Days older than delete_after_days go away once STG holds them."""
+
+    def test_deletes_only_days_with_stg(self, exporter, storage, manifest):
+        with_stg, raw_only = date(2022, 6, 1), date(2022, 6, 2)
+        exporter.save(with_stg, _records(with_stg), to_stg=True)
+        exporter.save(raw_only, _records(raw_only))
+
+        counts = _tiering(
+            storage, manifest, compress_after_days=30, delete_after_days=90
+        ).run()
+
+        assert counts == {**counts, "deleted": 1, "compressed": 1}
+        assert not storage.exists(_json_key(with_stg))
+        assert manifest.get(with_stg, "raw")["deleted"] is True
+        assert manifest.get(with_stg, "raw")["path"] is None
+        assert manifest.get(with_stg, "stg")["path"]
+        assert storage.exists(_json_key(raw_only) + ".gz")
+
+    def test_deletes_compressed_copy(self, exporter, storage, manifest):
+        old = date(2022, 6, 1)
+        exporter.save(old, _records(old), to_stg=True)
+        _tiering(storage, manifest).run()
+        _tiering(storage, manifest, delete_after_days=90).run()
+        assert not storage.exists(_json_key(old) + ".gz")
+
+    def test_missing_stg_file_keeps_raw(self, exporter, storage, manifest):
+        old = date(2022, 6, 1)
+        exporter.save(old, _records(old), to_stg=True)
+        storage.delete(manifest.get(old, "stg")["path"])
+
+        counts = _tiering(storage, manifest, delete_after_days=90).run()
+
+        assert counts["deleted"] == 0
+        assert storage.exists(_json_key(old) + ".gz")
+
+
+class TestValidation:
+    """Constructor arguments."""
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [{"compress_after_days": 0}, {"delete_after_days": -1}, {"codec": "lz4"}],
+    )
+    def test_invalid_arguments(self, storage, manifest, kwargs):
+        with pytest.raises(ValueError):
+            _tiering(storage, manifest, **kwargs)
+
+
+class TestCodecs:
+    """Streaming codecs."""
+
+    @pytest.mark.parametrize("codec", ["gzip", "zstd"])
+    def test_round_trip(self, codec):
+        data = b'{"client": "x"}\n' * 10_000
+        out = io.BytesIO()
+        assert compress_stream(io.BytesIO(data), out, codec)[0] == len(data)
+        out.seek(0)
+        with decompressing_reader(out, codec) as reader:
+            assert reader.read() == data
+
+
+class TestHomeRoute:
+    """The download form serves compressed raw files decompressed."""
+
+    @patch("src.flask_app.routes.routers.save_sales_to_local_disk")
+    def test_download_of_compressed_json(
+        self, mock_save_sales, client, exporter, storage, manifest
+    ):
+        old = date(2022, 8, 1)
+        json_path = exporter.save(old, _records(old))
+        _tiering(storage, manifest).run()
+        mock_save_sales.return_value = str(json_path)
+
+        response = client.post("/", data={"sale_date": "2022-08-01"})
+
+        assert response.status_code == 200
+        assert json.loads(response.data) == _records(old)
@@ -0,0 +1,140 @@
+"""Tests for time_formatter.py and request_context.py."""
+
+import json
+import logging
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueListener
+
+from flask.testing import FlaskClient
+
+from src.services.loggers.py_logger import BoundedQueueHandler
+from src.services.loggers.request_context import RequestContextFilter
+from src.services.loggers.time_formatter import (
+    KYIV_TZ,
+    JsonLinesFormatter,
+    KyivTimeFormatter,
+)
+
+
+def _record(created: float, **extra) -> logging.LogRecord:
+    record = logging.makeLogRecord(
+        {"msg": "hello %s", "args": ("world",), "levelname": "INFO", **extra}
+    )
+    record.created = created
+    return record
+
+
+class TestKyivTimeFormatter:
+    """Test KyivTimeFormatter timestamps."""
+
+    def test_uses_record_created(self):
+        """Test that the timestamp comes from the record, not from now()."""
+        created = datetime(2022, 8, 9, 12, 30, 15, tzinfo=KYIV_TZ).timestamp()
+        formatter = KyivTimeFormatter("%(asctime)s %(message)s")
+
+        assert formatter.format(_record(created)) == "2022-08-09 12:30:15 hello world"
+
+    def test_caches_formatted_second(self):
+        """Test that records within one second reuse the cached text."""
+        formatter = KyivTimeFormatter()
+        created = datetime(2022, 8, 9, 12, 0, 0, tzinfo=KYIV_TZ).timestamp()
+
+        first = formatter.formatTime(_record(created + 0.1))
+        assert formatter._cached == (int(created), first)
+        assert formatter.formatTime(_record(created + 0.9)) == first
+        assert formatter.formatTime(_record(created + 1.0)) != first
+
+    def test_custom_datefmt(self):
+        """Test that an explicit datefmt is honoured."""
+        created = datetime(2022, 8, 9, 12, 0, 0, tzinfo=KYIV_TZ).timestamp()
+        formatter = KyivTimeFormatter()
+        assert formatter.formatTime(_record(created), datefmt="%H:%M") == "12:00"
+
+
+class TestJsonLinesFormatter:
+    """Test JsonLinesFormatter output."""
+
+    def test_json_line_with_request_fields(self):
+        """Test that request fields are included when present."""
+        created = datetime(2022, 8, 9, 12, 0, 0, tzinfo=KYIV_TZ).timestamp()
+        record = _record(
+            created, request_id="abc", route="/v1/api/job", duration_ms=12.5
+        )
+
+        payload = json.loads(JsonLinesFormatter().format(record))
+
+        assert payload["message"] == "hello world"
+        assert payload["time"] == "2022-08-09 12:00:00"
+        assert payload["request_id"] == "abc"
+        assert payload["route"] == "/v1/api/job"
+        assert payload["duration_ms"] == 12.5
+
+    def test_json_line_without_request(self):
+        """Test that request fields are omitted outside a request."""
+        payload = json.loads(JsonLinesFormatter().format(_record(0.0)))
+        assert "request_id" not in payload
+
+    def test_exception_through_the_queue(self):
+        """Test that exc_info survives the QueueHandler -> listener pipeline."""
+        log_queue = queue.Queue()
+        lines = []
+        target = logging.Handler()
+        target.setFormatter(JsonLinesFormatter())
+        target.emit = lambda record: lines.append(target.format(record))
+        listener = QueueListener(log_queue, target)
+        logger = logging.getLogger("test.json.queue")
+        handler = BoundedQueueHandler(log_queue)
+        logger.addHandler(handler)
+        listener.start()
+        try:
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("export %s failed", "2022-08-09")
+        finally:
+            listener.stop()
+            logger.removeHandler(handler)
+
+        payload = json.loads(lines[0])
+        assert payload["message"] == "export 2022-08-09 failed"
+        assert payload["exc_info"].startswith("Traceback")
+        assert "ValueError: boom" in payload["exc_info"]
+
+    def test_text_format_keeps_traceback_through_the_queue(self):
+        """Test that the text format still appends the traceback."""
+        handler = BoundedQueueHandler(queue.Queue())
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.makeLogRecord(
+                {"msg": "failed", "exc_info": sys.exc_info()}
+            )
+        queued = handler.prepare(record)
+
+        text = KyivTimeFormatter("%(message)s").format(queued)
+        assert queued.exc_info is None
+        assert text.startswith("failed\nTraceback")
+        assert text.endswith("ValueError: boom")
+
+
+class TestRequestContext:
+    """Test request id propagation."""
+
+    def test_filter_adds_request_fields(self, app):
+        """Test that the filter copies request_id and route from the request."""
+        record = _record(0.0)
+        with app.test_request_context("/health"):
+            from flask import g
+
+            g.request_id = "req-1"
+            RequestContextFilter().filter(record)
+
+        assert record.request_id == "req-1"
+        assert record.route == "/health"
+
+    def test_response_has_request_id(self, client: FlaskClient):
+        """Test that the incoming X-Request-ID is echoed back."""
+        response = client.get("/health", headers={"X-Request-ID": "req-42"})
+        assert response.headers["X-Request-ID"] == "req-42"
@@ -0,0 +1,102 @@
+"""Tests for metrics/timings.py - per-request stage timings."""
+
+import contextvars
+import threading
+from datetime import date
+from unittest.mock import Mock
+
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter
+from src.services.metrics.timings import (
+    StageTimings,
+    collect_timings,
+    record_stage,
+    stage,
+)
+
+
+class TestStageTimings:
+    """Test StageTimings formatting."""
+
+    def test_server_timing_header(self):
+        """Test the Server-Timing value, ordering and repeat counts."""
+        timings = StageTimings()
+        timings.add("avro", 0.003)
+        timings.add("page", 0.1)
+        timings.add("page", 0.2)
+        timings.add("fetch", 0.31)
+
+        header = timings.server_timing()
+
+        assert header.startswith('fetch;dur=310.0, page;dur=300.0;desc="2x", avro;')
+        assert "total;dur=" in header
+
+    def test_as_dict_in_milliseconds(self):
+        """Test that stage durations are reported in ms with a total."""
+        timings = StageTimings()
+        timings.add("write", 0.0015)
+
+        result = timings.as_dict()
+
+        assert result["write"] == 1.5
+        assert "total" in result
+
+
+class TestCollectTimings:
+    """Test the context-local collection of stages."""
+
+    def test_stage_recorded_inside_collect(self):
+        """Test that stage() adds to the active collector."""
+        with collect_timings() as timings:
+            with stage("serialize"):
+                pass
+        assert "serialize" in timings.stages
+
+    def test_no_collector_is_noop(self):
+        """Test that stages outside a request are not an error."""
+        record_stage("page", 0.1)
+        with stage("write"):
+            pass
+
+    def test_collectors_are_isolated_between_threads(self):
+        """Test that concurrent requests do not see each other's stages."""
+        other = {}
+
+        def worker():
+            with collect_timings() as timings:
+                record_stage("page", 0.1)
+            other["stages"] = timings.stages
+
+        with collect_timings() as timings:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        assert "page" not in timings.stages
+        assert "page" in other["stages"]
+
+    def test_copied_context_reaches_executor_thread(self):
+        """Test that a copied context carries the collector into a thread."""
+        with collect_timings() as timings:
+            context = contextvars.copy_context()
+            thread = threading.Thread(
+                target=context.run, args=(record_stage, "avro", 0.01)
+            )
+            thread.start()
+            thread.join()
+
+        assert "avro" in timings.stages
+
+
+class TestExporterStages:
+    """Test that SalesExporter reports all export stages."""
+
+    def test_export_stages(self, temp_file_storage, sample_sales_data):
+        """Test fetch, serialize, write, schema and avro stages."""
+        mock_api = Mock()
+        mock_api.get_sales.return_value = sample_sales_data
+        exporter = SalesExporter(file_storage=temp_file_storage, api_tool=mock_api)
+
+        with collect_timings() as timings:
+            exporter.export(for_date=date(2022, 8, 10), to_stg=True)
+
+        assert {"fetch", "serialize", "write", "schema", "avro"} <= set(timings.stages)
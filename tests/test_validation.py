@@ -0,0 +1,172 @@
+"""Tests for validation.py - batched schema checks and the STG quarantine."""
+
+import json
+from datetime import date
+from unittest.mock import Mock
+
+import fastavro
+import pytest
+
+from src.services.jobs.job_1_and_2.manifest import SalesManifest
+from src.services.jobs.job_1_and_2.save_sales import SalesExporter, quarantine_key
+from src.services.jobs.job_1_and_2.validation import RecordValidator
+
+SCHEMA = SalesExporter.DEFAULT_SALES_SCHEMA
+DAY = date(2022, 8, 10)
+
+
+def _record(**overrides):
+    record = {
+        "client": "A",
+        "purchase_date": "2022-08-10",
+        "product": "TV",
+        "price": 10.0,
+    }
+    record.update(overrides)
+    return {key: value for key, value in record.items() if value is not ...}
+
+
+def _validate(records, schema=SCHEMA, batch_size=1000):
+    validator = RecordValidator(schema, batch_size=batch_size)
+    return list(validator.filter(records)), validator
+
+
+class TestRecordValidator:
+    """Valid rows pass (coerced), bad rows are rejected with reasons."""
+
+    def test_valid_rows_pass_unchanged(self):
+        records = [_record(), _record(price=3)]
+        valid, validator = _validate(records)
+        assert valid == records
+        assert all(a is b for a, b in zip(valid, records))
+        assert validator.valid == 2
+        assert validator.rejected == []
+
+    def test_numeric_string_is_coerced(self):
+        record = _record(price=" 12.50 ")
+        valid, validator = _validate([record])
+        assert valid == [_record(price=12.5)]
+        assert record["price"] == " 12.50 "  # input left untouched
+
+    @pytest.mark.parametrize(
+        "record, reason",
+        [
+            (_record(price="abc"), "price: expected a number, got str 'abc'"),
+            (_record(price=True), "price: expected a number, got bool True"),
+            (_record(client=...), "client: missing"),
+            (_record(client=None), "client: expected a string, got NoneType None"),
+            (_record(product=5), "product: expected a string, got int 5"),
+            ("not a record", "expected an object, got str"),
+        ],
+    )
+    def test_rejects_with_reason(self, record, reason):
+        valid, validator = _validate([_record(), record])
+        assert valid == [_record()]
+        assert validator.rejected == [{"row": 1, "errors": [reason], "record": record}]
+
+    def test_all_reasons_of_a_row(self):
+        _, validator = _validate([_record(client=..., price="x")])
+        assert len(validator.rejected[0]["errors"]) == 2
+
+    def test_rows_counted_across_batches(self):
+        records = [_record()] * 5
+        records[3] = _record(price="x")
+        valid, validator = _validate(records, batch_size=2)
+        assert len(valid) == 4
+        assert [item["row"] for item in validator.rejected] == [3]
+
+    def test_default_and_nullable_fields(self):
+        schema = {
+            "type": "record",
+            "name": "R",
+            "fields": [
+                {"name": "qty", "type": "long", "default": 1},
+                {"name": "note", "type": ["null", "string"], "default": None},
+                {"name": "discount", "type": ["null", "double"]},
+            ],
+        }
+        valid, validator = _validate(
+            [{"discount": None}, {"qty": 2.0, "discount": "0.5"}], schema
+        )
+        assert valid == [
+            {"qty": 1, "note": None, "discount": None},
+            {"qty": 2, "note": None, "discount": 0.5},
+        ]
+        assert validator.rejected == []
+
+    def test_int_range(self):
+        schema = {
+            "type": "record",
+            "name": "R",
+            "fields": [{"name": "n", "type": "int"}],
+        }
+        valid, validator = _validate([{"n": 1}, {"n": 2**40}, {"n": 2.5}], schema)
+        assert valid == [{"n": 1}]
+        assert [item["row"] for item in validator.rejected] == [1, 2]
+
+    def test_complex_field_checked_by_fastavro(self):
+        schema = {
+            "type": "record",
+            "name": "R",
+            "fields": [{"name": "tags", "type": {"type": "array", "items": "string"}}],
+        }
+        valid, validator = _validate([{"tags": ["a"]}, {"tags": [1]}], schema)
+        assert valid == [{"tags": ["a"]}]
+        assert len(validator.rejected) == 1
+
+    def test_output_is_accepted_by_fastavro(self, tmp_path):
+        records = [_record(), _record(price="7"), _record(price=None)]
+        valid, _ = _validate(records)
+        with (tmp_path / "out.avro").open("wb") as f:
+            fastavro.writer(f, fastavro.parse_schema(SCHEMA), valid)
+
+
+class TestExporterQuarantine:
+    """A bad record no longer fails the STG export of the whole day."""
+
+    @pytest.fixture
+    def exporter(self, tmp_path):
+        return SalesExporter(
+            file_storage=tmp_path,
+            api_tool=Mock(),
+            schema_file=tmp_path / "schema.avsc",
+        )
+
+    def test_bad_rows_go_to_quarantine(self, exporter, sample_sales_data):
+        bad = dict(sample_sales_data[0], price="n/a")
+        avro_path = exporter.save(DAY, sample_sales_data + [bad], to_stg=True)
+
+        with avro_path.open("rb") as f:
+            assert len(list(fastavro.reader(f))) == len(sample_sales_data)
+        lines = (exporter.file_storage / quarantine_key(DAY)).read_text().splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "row": len(sample_sales_data),
+                "errors": ["price: expected a number, got str 'n/a'"],
+                "record": bad,
+            }
+        ]
+
+        manifest = SalesManifest(exporter.file_storage)
+        assert manifest.get(DAY, "stg")["records"] == len(sample_sales_data)
+        assert manifest.get(DAY, "quarantine")["records"] == 1
+        assert manifest.get(DAY, "raw")["records"] == len(sample_sales_data) + 1
+        assert exporter.last_quarantined == 1
+
+    def test_clean_rerun_clears_quarantine(self, exporter, sample_sales_data):
+        exporter.save(DAY, sample_sales_data + [{"client": "x"}], to_stg=True)
+        exporter.save(DAY, sample_sales_data, to_stg=True)
+
+        assert not (exporter.file_storage / quarantine_key(DAY)).exists()
+        entry = SalesManifest(exporter.file_storage).get(DAY, "quarantine")
+        assert entry["deleted"] is True
+        assert exporter.last_quarantined == 0
+
+    def test_rebuild_stg_quarantines(self, exporter, sample_sales_data):
+        exporter.save(DAY, sample_sales_data + [{"client": "x"}])
+
+        exporter.rebuild_stg(DAY)
+
+        manifest = SalesManifest(exporter.file_storage)
+        assert manifest.get(DAY, "stg")["records"] == len(sample_sales_data)
+        assert manifest.get(DAY, "quarantine")["records"] == 1